@@ -0,0 +1,254 @@
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+Accounting reports over the job finish records in lsb.acct files.
+
+Finish records are read in batches with EventLogReader.read_finish_columns(), which
+fills array.array columns directly from the C structs.  Each batch is wrapped with
+numpy.frombuffer() and aggregated with numpy, so no Python object is created per job.
+Each file is aggregated in its own worker process and the partial results are merged.
+
+numpy is required for this module, but is not a dependency of openlava-python as a whole.
+
+Usage
+-----
+Print the CPU hours used by each user in each queue during January::
+
+    import glob
+    from openlava.accounting import aggregate
+
+    report = aggregate(glob.glob("/opt/openlava/work/logdir/lsb.acct*"),
+                       by=('user', 'queue'), start_time=1388534400, end_time=1391212800)
+    for row in report:
+        print row['user'], row['queue'], row['cpu_hours']
+
+Members
+-------
+"""
+import multiprocessing
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from openlava import constants, lsblib
+
+#rows read from the file at a time
+BATCH_SIZE = 500000
+
+#names that can be passed in the by argument of aggregate(), and the column each one uses
+GROUP_COLUMNS = {
+    'user': 'userName',
+    'queue': 'queue',
+    'host': 'execHost',
+}
+
+#summed per group, in the order they are held in the partial results
+_SUMS = ('jobs', 'failed', 'started', 'cpu_seconds', 'wall_seconds', 'slot_seconds',
+         'wait_seconds')
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("openlava.accounting requires numpy")
+
+
+def _column(batch, name):
+    """Wrap a column of a FinishColumns batch as a numpy array without copying it"""
+    column = batch[name]
+    return numpy.frombuffer(column, dtype=column.typecode)
+
+
+def _group_keys(batch, by, bucket):
+    """Return one integer array per grouping, using the string codes of the batch"""
+    keys = []
+    for name in by:
+        if name == 'bucket':
+            keys.append(_column(batch, 'endTime') // bucket)
+        else:
+            keys.append(_column(batch, GROUP_COLUMNS[name]).astype('i8'))
+    return keys
+
+
+def _aggregate_batch(batch, by, bucket, partial):
+    """Add the totals for one batch into partial, a dict of group -> [sums, maxrss arrays]"""
+    if not len(batch):
+        return
+    keys = _group_keys(batch, by, bucket)
+
+    #combine the group columns into a single key so numpy.unique can find the groups
+    combined = numpy.zeros(len(batch), dtype='i8')
+    radixes = []
+    for key in keys:
+        low = key.min()
+        radix = key.max() - low + 1
+        combined = combined * radix + (key - low)
+        radixes.append((low, radix))
+    groups, inverse = numpy.unique(combined, return_inverse=True)
+
+    submit = _column(batch, 'submitTime')
+    start = _column(batch, 'startTime')
+    end = _column(batch, 'endTime')
+    started = start > 0
+    wall = numpy.where(started, end - start, 0).astype('f8')
+
+    values = (
+        numpy.ones(len(batch)),
+        (_column(batch, 'jStatus') & constants.JOB_STAT_EXIT) != 0,
+        started,
+        _column(batch, 'cpuTime'),
+        wall,
+        wall * _column(batch, 'numProcessors'),
+        numpy.where(started, start - submit, 0),
+    )
+    sums = numpy.vstack([numpy.bincount(inverse, weights=v, minlength=len(groups))
+                         for v in values])
+
+    #maxrss grouped by sorting on the group index and splitting
+    order = numpy.argsort(inverse, kind='mergesort')
+    counts = numpy.bincount(inverse, minlength=len(groups))
+    maxrss = numpy.split(_column(batch, 'ru_maxrss')[order], numpy.cumsum(counts)[:-1])
+
+    strings = batch.strings.values
+    for i, group in enumerate(groups):
+        names = []
+        for (low, radix) in reversed(radixes):
+            names.append(int(group % radix + low))
+            group //= radix
+        names.reverse()
+        for j, name in enumerate(by):
+            if name != 'bucket':
+                names[j] = strings[names[j]]
+            else:
+                names[j] *= bucket
+        name = tuple(names)
+
+        if name in partial:
+            partial[name][0] += sums[:, i]
+            partial[name][1].append(maxrss[i])
+        else:
+            partial[name] = [sums[:, i].copy(), [maxrss[i]]]
+
+
+def _aggregate_file(args):
+    """Aggregate one file in a worker process"""
+    path, by, bucket, start_time, end_time = args
+    partial = {}
+    strings = lsblib.StringTable()
+    reader = lsblib.EventLogReader(path, event_types=[constants.EVENT_JOB_FINISH],
+                                   start_time=start_time, end_time=end_time)
+    try:
+        while True:
+            batch = reader.read_finish_columns(BATCH_SIZE, strings)
+            if not len(batch):
+                break
+            _aggregate_batch(batch, by, bucket, partial)
+    finally:
+        reader.close()
+
+    for group in partial.values():
+        group[1] = numpy.concatenate(group[1]).astype('f4')
+    return partial
+
+
+def aggregate(paths, by=('user',), bucket=86400, percentiles=(50, 90, 99), workers=None,
+              start_time=0, end_time=0):
+    """openlava.accounting.aggregate(paths, by=('user',), bucket=86400, percentiles=(50, 90, 99), workers=None, start_time=0, end_time=0)
+
+Reads the job finish records from a list of lsb.acct files and returns totals for each
+group of jobs.
+
+Each row of the result is a dict containing the group names, plus:
+
+* jobs: number of jobs
+* failed: number of jobs that finished with status EXIT
+* failure_rate: failed / jobs
+* cpu_hours: user plus system CPU time
+* wall_hours: time from start to end of each job
+* slot_hours: wall time multiplied by the number of processors
+* mean_wait: mean seconds from submission to start, of the jobs that started
+* maxrss_pNN: percentiles of ru_maxrss in kilobytes, one for each entry in percentiles
+
+:param list paths: Paths of the lsb.acct files to read
+:param tuple by: Group by any of 'user', 'queue', 'host' (the first execution host) and 'bucket' (the end time rounded down to a multiple of bucket)
+:param int bucket: Size of the time buckets in seconds
+:param list percentiles: Percentiles of max RSS to compute
+:param int workers: Number of processes to use, defaults to the number of CPUs
+:param int start_time: Skip jobs that finished before this epoch time
+:param int end_time: Skip jobs that finished after this epoch time, 0 for no limit
+:return: Rows sorted by group
+:rtype: list
+
+::
+
+    >>> from openlava.accounting import aggregate
+    >>> aggregate(["lsb.acct"], by=('queue',))
+    [{'queue': 'normal', 'jobs': 2, 'failed': 1, 'failure_rate': 0.5, 'cpu_hours': 0.01, ...}]
+
+"""
+    _require_numpy()
+    by = tuple(by)
+    for name in by:
+        if name != 'bucket' and name not in GROUP_COLUMNS:
+            raise ValueError("Unknown group {}".format(name))
+    paths = list(paths)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    jobs = [(path, by, bucket, start_time, end_time) for path in paths]
+    if workers <= 1 or len(paths) <= 1:
+        partials = [_aggregate_file(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(min(workers, len(paths)))
+        try:
+            partials = pool.map(_aggregate_file, jobs, chunksize=1)
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    totals = {}
+    for partial in partials:
+        for name, (sums, maxrss) in partial.items():
+            if name in totals:
+                totals[name][0] += sums
+                totals[name][1].append(maxrss)
+            else:
+                totals[name] = [sums, [maxrss]]
+
+    rows = []
+    for name in sorted(totals):
+        sums, maxrss = totals[name]
+        sums = dict(zip(_SUMS, sums))
+        maxrss = numpy.concatenate(maxrss)
+
+        row = dict(zip(by, name))
+        row['jobs'] = int(sums['jobs'])
+        row['failed'] = int(sums['failed'])
+        row['failure_rate'] = sums['failed'] / sums['jobs']
+        row['cpu_hours'] = sums['cpu_seconds'] / 3600.0
+        row['wall_hours'] = sums['wall_seconds'] / 3600.0
+        row['slot_hours'] = sums['slot_seconds'] / 3600.0
+        row['mean_wait'] = sums['wait_seconds'] / sums['started'] if sums['started'] else 0.0
+        for p in percentiles:
+            row['maxrss_p{}'.format(p)] = float(numpy.percentile(maxrss, p))
+        rows.append(row)
+    return rows
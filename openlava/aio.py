@@ -0,0 +1,250 @@
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+Awaitable versions of the common lsblib and lslib calls, for use from asyncio.
+
+Calls are run on a small thread pool of their own, so the event loop keeps running while
+openlava waits for the MBD or the LIM.  Queries that are identical to one already in
+flight are not sent again: every caller waits on the same call and gets the same result.
+A hundred clients asking for all running jobs at once cause one query to the MBD.
+
+Results are copied out of openlava's buffers before they are returned, so they stay valid
+however many calls follow.  Results of coalesced queries are shared between the callers,
+so treat them as read only.
+
+asyncio is used where available, otherwise trollius, which with the futures package is
+required on Python 2.  Neither is a dependency of openlava-python as a whole, they are
+installed by the aio extra: pip install openlava-bindings[aio].
+
+Usage
+-----
+Count the running jobs from a coroutine::
+
+    import trollius as asyncio
+    from trollius import From, Return
+    from openlava import aio, constants
+
+    @asyncio.coroutine
+    def running_jobs():
+        jobs = yield From(aio.jobs(options=constants.RUN_JOB))
+        raise Return(len(jobs))
+
+On Python 3 the same is written with async def and await.
+
+Members
+-------
+"""
+import functools
+import threading
+
+try:
+    import asyncio
+except ImportError:
+    try:
+        import trollius as asyncio
+    except ImportError:
+        asyncio = None
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
+from openlava import constants, lsblib, lslib
+from openlava.utils import library_lock, snapshot
+
+#calls into openlava are serialized on library_lock, so more threads than this only queue
+DEFAULT_WORKERS = 4
+
+
+def _require_asyncio():
+    if asyncio is None or ThreadPoolExecutor is None:
+        raise ImportError("openlava.aio requires asyncio, or trollius and futures")
+
+
+def _jobs(job_id, job_name, user, queue, host, options):
+    """Read the matching jobs in a worker thread, lsb_readjobinfo() returns copies"""
+    jobs = []
+    num_jobs = lsblib.lsb_openjobinfo(job_id=job_id, job_name=job_name, user=user,
+                                      queue=queue, host=host, options=options)
+    try:
+        for i in range(max(num_jobs, 0)):
+            jobs.append(lsblib.lsb_readjobinfo())
+    finally:
+        lsblib.lsb_closejobinfo()
+    return jobs
+
+
+def _detached(func, *args, **kwargs):
+    """Call func and snapshot its result before any other thread can reuse the buffers"""
+    with library_lock:
+        return snapshot(func(*args, **kwargs))
+
+
+class Client(object):
+    """openlava.aio.Client(max_workers=DEFAULT_WORKERS)
+
+Runs openlava calls on a thread pool and coalesces identical queries.  Each method returns
+a future, which can be awaited, or yielded from in a trollius coroutine.
+
+The module level functions use a Client created on first use.
+
+:param int max_workers: Number of threads to run calls on
+"""
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        _require_asyncio()
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def _query(self, key, func, *args, **kwargs):
+        """Run a query, or join the identical query already in flight"""
+        loop = asyncio.get_event_loop()
+        key = (id(loop),) + key
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._run(func, *args, **kwargs)
+                self._in_flight[key] = future
+                future.add_done_callback(functools.partial(self._done, key))
+        #one caller being cancelled must not cancel the query for the others
+        return asyncio.shield(future)
+
+    def _done(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    @property
+    def in_flight(self):
+        """Number of distinct queries currently running or queued"""
+        return len(self._in_flight)
+
+    def jobs(self, job_id=0, job_name="", user="all", queue="", host="", options=constants.ALL_JOB):
+        """Returns a future of the list of JobInfoEnt objects matching the arguments, as for lsb_openjobinfo()"""
+        key = ('jobs', job_id, job_name, user, queue, host, options)
+        return self._query(key, _jobs, job_id, job_name, user, queue, host, options)
+
+    def hostinfo(self, hosts=(), numHosts=0):
+        """Returns a future of a snapshot of lsb_hostinfo(hosts, numHosts)"""
+        hosts = list(hosts)
+        key = ('hostinfo', tuple(hosts), numHosts)
+        return self._query(key, _detached, lsblib.lsb_hostinfo, hosts, numHosts)
+
+    def queueinfo(self, queues=(), hostname="", username="", options=0):
+        """Returns a future of a snapshot of lsb_queueinfo(queues, hostname=hostname, username=username, options=options)"""
+        queues = list(queues)
+        key = ('queueinfo', tuple(queues), hostname, username, options)
+        return self._query(key, _detached, lsblib.lsb_queueinfo, queues, hostname=hostname,
+                           username=username, options=options)
+
+    def userinfo(self, users=()):
+        """Returns a future of a snapshot of lsb_userinfo(users)"""
+        users = list(users)
+        key = ('userinfo', tuple(users))
+        return self._query(key, _detached, lsblib.lsb_userinfo, users)
+
+    def load(self, resreq=None, numhosts=0, options=0, fromhost=None):
+        """Returns a future of a snapshot of ls_load(resreq, numhosts, options, fromhost)"""
+        key = ('load', resreq, numhosts, options, fromhost)
+        return self._query(key, _detached, lslib.ls_load, resreq, numhosts, options, fromhost)
+
+    def submit(self, submit):
+        """Returns a future of the SubmitReply of lsb_submit(submit).  Submissions are never coalesced."""
+        return self._run(lsblib.lsb_submit, submit)
+
+    def signaljob(self, job_id, signal):
+        """Returns a future of the result of lsb_signaljob(job_id, signal).  Signals are never coalesced."""
+        return self._run(lsblib.lsb_signaljob, job_id, signal)
+
+    def close(self, wait=True):
+        """Shut down the thread pool, waiting for running calls to finish if wait is True"""
+        self._executor.shutdown(wait)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def client():
+    """Returns the Client used by the module level functions, creating it if needed"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = Client()
+        return _client
+
+
+def jobs(job_id=0, job_name="", user="all", queue="", host="", options=constants.ALL_JOB):
+    """openlava.aio.jobs(job_id=0, job_name="", user="all", queue="", host="", options=ALL_JOB)
+
+Awaitable list of the JobInfoEnt objects matching the arguments, see lsblib.lsb_openjobinfo()
+"""
+    return client().jobs(job_id, job_name, user, queue, host, options)
+
+
+def lsb_hostinfo(hosts=(), numHosts=0):
+    """openlava.aio.lsb_hostinfo(hosts=(), numHosts=0)
+
+Awaitable version of lsblib.lsb_hostinfo()
+"""
+    return client().hostinfo(hosts, numHosts)
+
+
+def lsb_queueinfo(queues=(), hostname="", username="", options=0):
+    """openlava.aio.lsb_queueinfo(queues=(), hostname="", username="", options=0)
+
+Awaitable version of lsblib.lsb_queueinfo()
+"""
+    return client().queueinfo(queues, hostname, username, options)
+
+
+def lsb_userinfo(users=()):
+    """openlava.aio.lsb_userinfo(users=())
+
+Awaitable version of lsblib.lsb_userinfo()
+"""
+    return client().userinfo(users)
+
+
+def ls_load(resreq=None, numhosts=0, options=0, fromhost=None):
+    """openlava.aio.ls_load(resreq=None, numhosts=0, options=0, fromhost=None)
+
+Awaitable version of lslib.ls_load()
+"""
+    return client().load(resreq, numhosts, options, fromhost)
+
+
+def lsb_submit(submit):
+    """openlava.aio.lsb_submit(submit)
+
+Awaitable version of lsblib.lsb_submit()
+"""
+    return client().submit(submit)
+
+
+def lsb_signaljob(job_id, signal):
+    """openlava.aio.lsb_signaljob(job_id, signal)
+
+Awaitable version of lsblib.lsb_signaljob()
+"""
+    return client().signaljob(job_id, signal)
@@ -0,0 +1,167 @@
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+Counts of the native memory owned by lsblib objects, and a soak test for leaks.
+
+JobInfoEnt, Submit, JRusage, PidInfo, SubmitReply, XFile and Environment objects copy data
+out of openlava into memory they allocate themselves, and free it when they are
+deallocated.  While tracking is on, every such object created is counted until it is
+deallocated, so snapshot() gives the number of live objects of each type and the bytes
+they own, as well as the number created and deallocated.  Objects created before tracking
+was turned on are not counted.
+
+Tracking is off by default, and costs a flag test per object when off.  Set
+OPENLAVA_TRACK_ALLOCATIONS=1 in the environment to turn it on when lsblib is imported.
+
+soak() calls a function over and over, and raises LeakError if the live objects, the bytes
+they own or the resident memory of the process keep growing once the first rounds are
+over.  tools/soak.py runs it for each of the lsblib and lslib calls.
+
+Usage
+-----
+::
+
+    from openlava import allocations, lsblib
+
+    allocations.enable()
+    jobs = lsblib.lsb_jobinfo_many([4562, 4563])
+    print allocations.snapshot()['JobInfoEnt'].bytes
+    allocations.soak(lsblib.lsb_hostinfo, rounds=20, iterations=1000)
+
+Members
+-------
+"""
+import gc
+import os
+
+from openlava import lsblib
+
+
+class AllocationStats(object):
+    """Objects of one type that own native memory"""
+    __slots__ = ('name', 'live', 'bytes', 'created', 'deallocated')
+
+    def __init__(self, name, live, bytes, created, deallocated):
+        self.name = name
+        self.live = live
+        self.bytes = bytes
+        self.created = created
+        self.deallocated = deallocated
+
+    def __repr__(self):
+        return "<AllocationStats {}: live={} bytes={} created={} deallocated={}>".format(
+            self.name, self.live, self.bytes, self.created, self.deallocated)
+
+
+class LeakError(Exception):
+    """Raised by soak() when memory keeps growing, samples is the list of Samples taken"""
+    def __init__(self, message, samples):
+        Exception.__init__(self, message)
+        self.samples = samples
+
+
+class Sample(object):
+    """Memory in use after a round of soak()"""
+    __slots__ = ('round', 'live', 'bytes', 'rss')
+
+    def __init__(self, round, live, bytes, rss):
+        self.round = round
+        self.live = live
+        self.bytes = bytes
+        self.rss = rss
+
+
+def enable():
+    """Start counting objects that own native memory"""
+    lsblib._set_tracking(True)
+
+
+def disable():
+    """Stop counting, and forget the objects already counted"""
+    lsblib._set_tracking(False)
+
+
+def enabled():
+    """True if objects are being counted"""
+    return lsblib._tracking_enabled()
+
+
+def reset():
+    """Forget the numbers of objects created and deallocated, live objects are still counted"""
+    lsblib._reset_allocations()
+
+
+def snapshot():
+    """Dict of type name -> AllocationStats"""
+    return dict((name, AllocationStats(name, *values))
+                for name, values in lsblib._allocations().items())
+
+
+def resident_bytes():
+    """Resident memory of this process in bytes, from /proc/self/statm"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def soak(func, rounds=10, iterations=100, warmup=2, max_rss_growth=4 << 20):
+    """Call func() iterations times in each of rounds, and check memory stops growing.
+
+Results of each call are dropped straight away.  After each round the garbage collector is
+run and a Sample taken.  The first warmup rounds let caches and the allocator settle, after
+that the number of live objects and the bytes they own must not grow at all, and resident
+memory must not grow by more than max_rss_growth bytes.  Tracking is turned on for the
+duration if it was off.
+
+:param callable func: Function to call, with no arguments
+:param int rounds: Rounds to measure, after the warmup rounds
+:param int iterations: Calls in each round
+:param int warmup: Rounds to run before the first sample is compared
+:param int max_rss_growth: Bytes resident memory may grow by over the measured rounds
+:return: List of Samples, one per round including the warmup rounds
+:rtype: list
+:raises LeakError: If memory grew
+
+"""
+    was_enabled = enabled()
+    if not was_enabled:
+        enable()
+    samples = []
+    try:
+        for round in range(warmup + rounds):
+            for i in xrange(iterations):
+                func()
+            gc.collect()
+            stats = snapshot().values()
+            samples.append(Sample(round, sum(s.live for s in stats), sum(s.bytes for s in stats),
+                                  resident_bytes()))
+    finally:
+        if not was_enabled:
+            disable()
+
+    base = samples[max(warmup - 1, 0)]
+    last = samples[-1]
+    if last.live > base.live:
+        raise LeakError("{} objects owning native memory were not released".format(
+            last.live - base.live), samples)
+    if last.bytes > base.bytes:
+        raise LeakError("{} bytes of native memory were not released".format(
+            last.bytes - base.bytes), samples)
+    if last.rss - base.rss > max_rss_growth:
+        raise LeakError("Resident memory grew by {} bytes over {} rounds".format(
+            last.rss - base.rss, rounds), samples)
+    return samples
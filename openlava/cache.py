@@ -0,0 +1,268 @@
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+Opt-in cache for cluster metadata that rarely changes, such as the cluster and master
+names, host types and models, static host information and the queue and user lists.
+
+Each call has its own time to live, and the cache holds at most max_size results,
+discarding the least recently used.  Results are copied out of openlava's buffers with
+utils.snapshot() when they are cached, which packs and unpacks them, so they are the usual
+HostInfo, LsInfo, QueueInfoEnt and UserInfoEnt objects, methods such as
+HostInfo.has_resource() included.  They are shared by every caller, so treat them as read
+only.
+
+Entries can be dropped with invalidate().  An EventWatcher follows lsb.events and drops
+them automatically: everything when the MBD restarts or is reconfigured (EVENT_MBD_START),
+the queue lists when a queue is opened, closed, activated or inactivated
+(EVENT_QUEUE_CTRL), and the host lists when a host is opened or closed (EVENT_HOST_CTRL).
+
+Usage
+-----
+Cache host information for the life of a scheduling daemon::
+
+    from openlava.cache import MetadataCache
+
+    cache = MetadataCache()
+    cache.watch("/opt/openlava/work/logdir/lsb.events")
+    for host in cache.ls_gethostinfo():
+        print host.hostName, host.maxCpus
+
+Members
+-------
+"""
+import collections
+import os
+import threading
+import time
+
+from openlava import constants, lsblib, lslib
+from openlava.utils import library_lock, snapshot
+
+#seconds each call is cached for, 0 disables caching for that call
+DEFAULT_TTLS = {
+    'ls_getclustername': 3600,
+    'ls_getmastername': 60,
+    'ls_info': 600,
+    'ls_gethosttype': 3600,
+    'ls_gethostmodel': 3600,
+    'ls_gethostfactor': 3600,
+    'ls_gethostinfo': 300,
+    'lsb_queueinfo': 60,
+    'lsb_userinfo': 60,
+}
+
+#calls invalidated by each event type, None invalidates everything
+INVALIDATED_BY = {
+    constants.EVENT_MBD_START: None,
+    constants.EVENT_QUEUE_CTRL: ('lsb_queueinfo',),
+    constants.EVENT_HOST_CTRL: ('ls_gethostinfo',),
+}
+
+
+def _freeze(value):
+    """Turn list arguments into tuples so they can be part of a key"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class MetadataCache(object):
+    """openlava.cache.MetadataCache(max_size=1024, ttls=None)
+
+Caches the results of the lslib and lsblib calls listed in DEFAULT_TTLS.  Each of those
+calls is a method of the cache, taking the same arguments.  The cache can be used from any
+number of threads.
+
+:param int max_size: Maximum number of results to hold
+:param dict ttls: Seconds to cache each call for, overriding DEFAULT_TTLS
+"""
+    def __init__(self, max_size=1024, ttls=None):
+        self.max_size = max_size
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        #bumped by invalidate(), so results fetched before an invalidation are not cached
+        self._generation = 0
+        self._hooks = []
+        self._watcher = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _call(self, name, func, *args, **kwargs):
+        key = (name, _freeze(args), _freeze(sorted(kwargs.items())))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry[0] > now:
+                #move it to the most recently used end
+                self._entries[key] = entry
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        #copy the result out of openlava's buffers before another call reuses them
+        with library_lock:
+            value = snapshot(func(*args, **kwargs))
+
+        ttl = self.ttls.get(name, 0)
+        if ttl > 0 and value is not None:
+            with self._lock:
+                if self._generation != generation:
+                    #invalidated while the call was in flight, the value may be stale
+                    return value
+                self._entries[key] = (now + ttl, value)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *names):
+        """Drop the cached results of the named calls, or of every call if no names are given"""
+        with self._lock:
+            self._generation += 1
+            if not names:
+                self._entries.clear()
+            else:
+                for key in list(self._entries):
+                    if key[0] in names:
+                        del self._entries[key]
+        for hook in list(self._hooks):
+            hook(names)
+
+    def add_invalidation_hook(self, hook):
+        """Call hook(names) after every invalidation, names is empty when everything was invalidated"""
+        self._hooks.append(hook)
+
+    def remove_invalidation_hook(self, hook):
+        """Stop calling a hook added with add_invalidation_hook()"""
+        self._hooks.remove(hook)
+
+    def watch(self, path, poll_interval=1.0):
+        """Start an EventWatcher that invalidates this cache from the events logged in path.
+
+:param str path: Path to lsb.events
+:param float poll_interval: Seconds between checks for new events
+:return: The running watcher
+:rtype: EventWatcher
+"""
+        if self._watcher is not None:
+            self._watcher.stop()
+        self._watcher = EventWatcher(self, path, poll_interval)
+        self._watcher.start()
+        return self._watcher
+
+    def close(self):
+        """Stop the watcher, if there is one"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def ls_getclustername(self):
+        return self._call('ls_getclustername', lslib.ls_getclustername)
+
+    def ls_getmastername(self):
+        return self._call('ls_getmastername', lslib.ls_getmastername)
+
+    def ls_info(self):
+        return self._call('ls_info', lslib.ls_info)
+
+    def ls_gethosttype(self, hostname):
+        return self._call('ls_gethosttype', lslib.ls_gethosttype, hostname)
+
+    def ls_gethostmodel(self, hostname):
+        return self._call('ls_gethostmodel', lslib.ls_gethostmodel, hostname)
+
+    def ls_gethostfactor(self, hostname):
+        return self._call('ls_gethostfactor', lslib.ls_gethostfactor, hostname)
+
+    def ls_gethostinfo(self, resReq="", hostList=[], options=0):
+        return self._call('ls_gethostinfo', lslib.ls_gethostinfo, resReq, list(hostList), options)
+
+    def lsb_queueinfo(self, queues=[], numqueues=0, hostname="", username="", options=0):
+        return self._call('lsb_queueinfo', lsblib.lsb_queueinfo, list(queues), numqueues,
+                          hostname, username, options)
+
+    def lsb_userinfo(self, user_list=[], numusers=0):
+        return self._call('lsb_userinfo', lsblib.lsb_userinfo, list(user_list), numusers)
+
+
+class EventWatcher(threading.Thread):
+    """openlava.cache.EventWatcher(cache, path, poll_interval=1.0)
+
+Background thread that follows lsb.events from its current end, and invalidates cache
+whenever one of the events in INVALIDATED_BY is logged.  It carries on with the new file
+when openlava switches log files.
+
+:param MetadataCache cache: Cache to invalidate
+:param str path: Path to lsb.events
+:param float poll_interval: Seconds between checks for new events
+"""
+    def __init__(self, cache, path, poll_interval=1.0):
+        threading.Thread.__init__(self, name="openlava-cache-watcher")
+        self.daemon = True
+        self.cache = cache
+        self.path = path
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        #decodes the event types under library_lock, as the reader's records are only
+        #valid until the next read
+        self._serializer = lsblib.EventSerializer(['type'], as_tuple=True)
+        #only events from now on are of interest
+        self._reader = self._open(os.path.getsize(path))
+
+    def _open(self, offset):
+        return lsblib.EventLogReader(self.path, event_types=list(INVALIDATED_BY), offset=offset)
+
+    def _rotated(self):
+        try:
+            return os.stat(self.path).st_ino != self._reader.inode
+        except OSError:
+            #openlava is in the middle of switching files
+            return False
+
+    def poll(self):
+        """Read any new events and invalidate the cache as needed"""
+        for event_type, in self._serializer.read(self._reader):
+            names = INVALIDATED_BY[event_type]
+            if names is None:
+                self.cache.invalidate()
+            else:
+                self.cache.invalidate(*names)
+        if self._rotated():
+            self._reader.close()
+            self._reader = self._open(0)
+            self.poll()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                self.poll()
+                self._stop_event.wait(self.poll_interval)
+        finally:
+            self._reader.close()
+
+    def stop(self):
+        """Stop the thread and wait for it to finish"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
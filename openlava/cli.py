@@ -0,0 +1,440 @@
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+The olbjobs, olbhosts and olbqueues commands, which list jobs, hosts and queues in the
+same columns as bjobs, bhosts and bqueues, or as JSON lines or CSV.
+
+olbjobs streams the job list: jobs are read in batches with lsblib.read_job_batches(),
+each batch is formatted a column at a time and written with a single write, so memory use
+does not grow with the number of jobs and the time taken is that of reading the jobs
+from the MBD.  Formatted times, status names and execution host lists are cached, as the
+same values repeat across many jobs.
+
+Columns are chosen with -o, as a comma or space separated list of the names in
+JOB_COLUMNS, HOST_COLUMNS or QUEUE_COLUMNS.  In the table and CSV formats values are
+shown as bjobs shows them, in JSON times are seconds since the epoch, execution hosts a
+list and unlimited values null.
+
+When openlava reports an error the commands print it on stderr, prefixed by the command
+name as lsb_perror() does, and exit with status 1.
+
+Usage
+-----
+::
+
+    $ olbjobs -u all -a --format json -o jobid,stat,exec_host,submit_time
+    {"jobid": 4562, "stat": "DONE", "exec_host": ["comp00"], "submit_time": 1390404552}
+    $ olbhosts --format csv
+    $ olbqueues normal
+
+The same commands can be run from Python, writing to any file object::
+
+    from openlava import cli
+
+    cli.olbjobs(["-u", "all", "--format", "csv"], out=open("jobs.csv", "w"))
+
+Members
+-------
+"""
+import argparse
+import csv
+import errno
+import getpass
+import json
+import sys
+import time
+
+from openlava import constants, lsblib
+
+#jobs formatted and written at a time
+BATCH_SIZE = 1000
+
+
+class Column(object):
+    """A column of output: values(batch) returns the value of each record in a batch of
+    records, text(values) converts those values to the strings shown in tables and CSV,
+    and width is the width of the column in tables."""
+    __slots__ = ('name', 'header', 'width', 'values', 'text')
+
+    def __init__(self, name, header, width, values, text=None):
+        self.name = name
+        self.header = header
+        self.width = width
+        self.values = values
+        self.text = text or _plain
+
+
+def _plain(values):
+    return ["" if v is None else str(v) for v in values]
+
+
+class TimeFormatter(object):
+    """Formats times as bjobs does, caching the text for each minute"""
+    def __init__(self, format="%b %d %H:%M"):
+        self.format = format
+        self._cache = {}
+
+    def __call__(self, values):
+        cache = self._cache
+        result = []
+        append = result.append
+        for t in values:
+            if not t:
+                append("-")
+                continue
+            minute = t // 60
+            text = cache.get(minute)
+            if text is None:
+                text = cache[minute] = time.strftime(self.format, time.localtime(minute * 60))
+            append(text)
+        return result
+
+
+class HostListFormatter(object):
+    """Formats execution host lists as bjobs does, 4*host for repeated hosts"""
+    def __init__(self):
+        self._cache = {}
+
+    def __call__(self, values):
+        cache = self._cache
+        result = []
+        for hosts in values:
+            text = cache.get(hosts)
+            if text is None:
+                text = cache[hosts] = self._format(hosts)
+            result.append(text)
+        return result
+
+    @staticmethod
+    def _format(hosts):
+        if not hosts:
+            return "-"
+        parts = []
+        last, count = hosts[0], 0
+        for host in hosts:
+            if host == last:
+                count += 1
+                continue
+            parts.append(last if count == 1 else "{}*{}".format(count, last))
+            last, count = host, 1
+        parts.append(last if count == 1 else "{}*{}".format(count, last))
+        return ":".join(parts)
+
+
+def _unlimited(value):
+    """None for openlava's 'no limit' values"""
+    if value is None or value >= constants.INFINIT_INT or value < 0:
+        return None
+    return value
+
+
+def _limit_text(values):
+    return ["-" if v is None else str(v) for v in values]
+
+
+def _epoch(values):
+    return [t or None for t in values]
+
+
+def _job_columns():
+    status = lsblib.JOB_STATUS_STRINGS
+    columns = [
+        Column('jobid', 'JOBID', 7, lambda b: [j & 0x0FFFFFFFF for j in b.jobId]),
+        Column('array_index', 'INDEX', 5, lambda b: [lsblib.get_array_index(j) for j in b.jobId]),
+        Column('user', 'USER', 7, lambda b: b.user),
+        Column('stat', 'STAT', 5, lambda b: [status.get(s, "ERROR") for s in b.status]),
+        Column('queue', 'QUEUE', 10, lambda b: b.queue),
+        Column('from_host', 'FROM_HOST', 11, lambda b: b.fromHost),
+        Column('exec_host', 'EXEC_HOST', 11, lambda b: b.exHosts, HostListFormatter()),
+        Column('job_name', 'JOB_NAME', 10, lambda b: b.jName),
+        Column('submit_time', 'SUBMIT_TIME', 12, lambda b: _epoch(b.submitTime), TimeFormatter()),
+        Column('start_time', 'START_TIME', 12, lambda b: _epoch(b.startTime), TimeFormatter()),
+        Column('finish_time', 'FINISH_TIME', 12, lambda b: _epoch(b.endTime), TimeFormatter()),
+        Column('cpu_time', 'CPU_TIME', 9, lambda b: list(b.cpuTime),
+               lambda values: ["{:.1f}".format(v) for v in values]),
+        Column('exit_code', 'EXIT', 4, lambda b: [(s >> 8) & 0xFF for s in b.exitStatus]),
+        Column('pid', 'PID', 7, lambda b: list(b.jobPid)),
+    ]
+    return columns
+
+#bjobs' default columns
+JOB_DEFAULT = ('jobid', 'user', 'stat', 'queue', 'from_host', 'exec_host', 'job_name', 'submit_time')
+
+
+def _host_status(status):
+    if status & (constants.HOST_STAT_UNAVAIL | constants.HOST_STAT_NO_LIM):
+        return "unavail"
+    if status & constants.HOST_STAT_UNREACH:
+        return "unreach"
+    if status & constants.HOST_STAT_FULL and not status & ~constants.HOST_STAT_FULL:
+        return "closed_Full"
+    if status:
+        return "closed"
+    return "ok"
+
+
+def _host_columns():
+    return [
+        Column('host_name', 'HOST_NAME', 19, lambda b: [h.host for h in b]),
+        Column('status', 'STATUS', 15, lambda b: [_host_status(h.hStatus) for h in b]),
+        Column('jl_u', 'JL/U', 4, lambda b: [_unlimited(h.userJobLimit) for h in b], _limit_text),
+        Column('max', 'MAX', 5, lambda b: [_unlimited(h.maxJobs) for h in b], _limit_text),
+        Column('njobs', 'NJOBS', 5, lambda b: [h.numJobs for h in b]),
+        Column('run', 'RUN', 5, lambda b: [h.numRUN for h in b]),
+        Column('ssusp', 'SSUSP', 5, lambda b: [h.numSSUSP for h in b]),
+        Column('ususp', 'USUSP', 5, lambda b: [h.numUSUSP for h in b]),
+        Column('rsv', 'RSV', 5, lambda b: [h.numRESERVE for h in b]),
+        Column('cpuf', 'CPUF', 6, lambda b: [h.cpuFactor for h in b],
+               lambda values: ["{:.2f}".format(v) for v in values]),
+    ]
+
+HOST_DEFAULT = ('host_name', 'status', 'jl_u', 'max', 'njobs', 'run', 'ssusp', 'ususp', 'rsv')
+
+
+def _queue_status(status):
+    text = "Open" if status & constants.QUEUE_STAT_OPEN else "Closed"
+    if status & constants.QUEUE_STAT_ACTIVE and not status & constants.QUEUE_STAT_RUNWIN_CLOSE:
+        return text + ":Active"
+    return text + ":Inact"
+
+
+def _queue_columns():
+    return [
+        Column('queue_name', 'QUEUE_NAME', 15, lambda b: [q.queue for q in b]),
+        Column('prio', 'PRIO', 4, lambda b: [q.priority for q in b]),
+        Column('status', 'STATUS', 14, lambda b: [_queue_status(q.qStatus) for q in b]),
+        Column('max', 'MAX', 4, lambda b: [_unlimited(q.maxJobs) for q in b], _limit_text),
+        Column('jl_u', 'JL/U', 4, lambda b: [_unlimited(q.userJobLimit) for q in b], _limit_text),
+        Column('jl_p', 'JL/P', 4, lambda b: [_unlimited(int(q.procJobLimit)) for q in b], _limit_text),
+        Column('jl_h', 'JL/H', 4, lambda b: [_unlimited(q.hostJobLimit) for q in b], _limit_text),
+        Column('njobs', 'NJOBS', 5, lambda b: [q.numJobs for q in b]),
+        Column('pend', 'PEND', 5, lambda b: [q.numPEND for q in b]),
+        Column('run', 'RUN', 5, lambda b: [q.numRUN for q in b]),
+        Column('susp', 'SUSP', 5, lambda b: [q.numSSUSP + q.numUSUSP for q in b]),
+    ]
+
+QUEUE_DEFAULT = ('queue_name', 'prio', 'status', 'max', 'jl_u', 'jl_p', 'jl_h', 'njobs', 'pend',
+                 'run', 'susp')
+
+JOB_COLUMNS = tuple(c.name for c in _job_columns())
+HOST_COLUMNS = tuple(c.name for c in _host_columns())
+QUEUE_COLUMNS = tuple(c.name for c in _queue_columns())
+
+
+def select_columns(columns, names):
+    """The Columns named in names, a list or a comma or space separated string, in that order"""
+    if isinstance(names, basestring):
+        names = names.replace(",", " ").split()
+    by_name = dict((c.name, c) for c in columns)
+    unknown = [n for n in names if n not in by_name]
+    if unknown:
+        raise ValueError("Unknown column {}, choose from {}".format(
+            ", ".join(unknown), ", ".join(c.name for c in columns)))
+    return [by_name[n] for n in names]
+
+
+class TableWriter(object):
+    """Writes fixed width columns as the b* commands do, the last column is not padded"""
+    def __init__(self, out, columns, header=True):
+        self.out = out
+        self.columns = columns
+        widths = [c.width for c in columns[:-1]]
+        self._format = " ".join(["%-{}s".format(w) for w in widths] + ["%s"]) + "\n"
+        if header:
+            out.write(self._format % tuple(c.header for c in columns))
+
+    def write(self, batch):
+        texts = [c.text(c.values(batch)) for c in self.columns]
+        line = self._format
+        self.out.write("".join([line % row for row in zip(*texts)]))
+
+
+class CSVWriter(object):
+    """Writes comma separated values, with a header of column names"""
+    def __init__(self, out, columns, header=True):
+        self.columns = columns
+        self._writer = csv.writer(out)
+        if header:
+            self._writer.writerow([c.name for c in columns])
+
+    def write(self, batch):
+        self._writer.writerows(zip(*[c.text(c.values(batch)) for c in self.columns]))
+
+
+class JSONWriter(object):
+    """Writes one JSON object per record"""
+    def __init__(self, out, columns, header=True):
+        self.out = out
+        self.columns = columns
+        self._names = [c.name for c in columns]
+        self._encode = json.JSONEncoder(separators=(", ", ": ")).encode
+
+    def write(self, batch):
+        names = self._names
+        encode = self._encode
+        values = [c.values(batch) for c in self.columns]
+        self.out.write("".join([encode(dict(zip(names, row))) + "\n" for row in zip(*values)]))
+
+WRITERS = {
+    'table': TableWriter,
+    'csv': CSVWriter,
+    'json': JSONWriter,
+}
+
+
+def _parser(prog, description, columns, default):
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    parser.add_argument("-o", "--columns", default=" ".join(default),
+                        help="Columns to show, from: {}".format(", ".join(columns)))
+    parser.add_argument("--format", choices=sorted(WRITERS), default="table", help="Output format")
+    parser.add_argument("--no-header", action="store_false", dest="header",
+                        help="Leave out the header line of table and CSV output")
+    return parser
+
+
+def _columns(parser, columns, names):
+    try:
+        return select_columns(columns, names)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+def _error(prog, message):
+    """Print message on stderr as lsb_perror() would, and return the exit status for it"""
+    sys.stderr.write("{}: {}\n".format(prog, message))
+    return 1
+
+
+def _run(main, argv, out):
+    """Run main and return its exit status, exiting quietly if the reader of out goes away,
+    as when piped into head"""
+    out = out or sys.stdout
+    try:
+        status = main(argv, out)
+        out.flush()
+    except IOError as e:
+        if e.errno != errno.EPIPE:
+            raise
+        status = 0
+    return status
+
+
+def olbjobs(argv=None, out=None):
+    """Run olbjobs with the arguments in argv, writing to out, and return the exit status"""
+    return _run(_olbjobs, argv, out)
+
+
+def _olbjobs(argv, out):
+    parser = _parser("olbjobs", "List jobs, like bjobs", JOB_COLUMNS, JOB_DEFAULT)
+    parser.add_argument("job_id", nargs="?", type=int, default=0, help="Only show this job")
+    parser.add_argument("-u", "--user", default=getpass.getuser(),
+                        help="Only show jobs of this user, all for every user")
+    parser.add_argument("-q", "--queue", default="", help="Only show jobs in this queue")
+    parser.add_argument("-m", "--host", default="", help="Only show jobs on this host")
+    parser.add_argument("-J", "--job-name", default="", help="Only show jobs with this name")
+    states = parser.add_mutually_exclusive_group()
+    for flag, option, text in [("-a", constants.ALL_JOB, "all jobs, including those recently finished"),
+                               ("-d", constants.DONE_JOB, "recently finished jobs"),
+                               ("-p", constants.PEND_JOB, "pending jobs"),
+                               ("-r", constants.RUN_JOB, "running jobs"),
+                               ("-s", constants.SUSP_JOB, "suspended jobs")]:
+        states.add_argument(flag, dest="options", action="store_const", const=option,
+                            help="Show {}".format(text))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Jobs formatted at a time")
+    args = parser.parse_args(argv)
+
+    columns = _columns(parser, _job_columns(), args.columns)
+    options = args.options if args.options is not None else constants.CUR_JOB
+    if lsblib.lsb_init("olbjobs") < 0:
+        return _error("olbjobs", lsblib.lsb_sysmsg())
+    batches = lsblib.read_job_batches(args.batch_size, job_id=args.job_id, job_name=args.job_name,
+                                      user=args.user, queue=args.queue, host=args.host,
+                                      options=options)
+    try:
+        #the cursor is opened by the first batch, so nothing is written if that fails
+        try:
+            first = next(batches, None)
+        except lsblib.ConnectionResetByPeer:
+            return _error("olbjobs", "Connection reset by peer")
+        except Exception as e:
+            return _error("olbjobs", e)
+        if first is None and args.format == "table":
+            sys.stderr.write("No job found\n")
+            return 0
+        writer = WRITERS[args.format](out, columns, args.header)
+        if first is not None:
+            writer.write(first)
+        for batch in batches:
+            writer.write(batch)
+    finally:
+        #closes the job cursor if writing failed part way through
+        batches.close()
+    return 0
+
+
+def olbhosts(argv=None, out=None):
+    """Run olbhosts with the arguments in argv, writing to out, and return the exit status"""
+    return _run(_olbhosts, argv, out)
+
+
+def _olbhosts(argv, out):
+    parser = _parser("olbhosts", "List batch hosts, like bhosts", HOST_COLUMNS, HOST_DEFAULT)
+    parser.add_argument("hosts", nargs="*", help="Only show these hosts")
+    args = parser.parse_args(argv)
+
+    columns = _columns(parser, _host_columns(), args.columns)
+    if lsblib.lsb_init("olbhosts") < 0:
+        return _error("olbhosts", lsblib.lsb_sysmsg())
+    hosts = lsblib.lsb_hostinfo(args.hosts)
+    if hosts is None:
+        return _error("olbhosts", lsblib.lsb_sysmsg())
+    WRITERS[args.format](out, columns, args.header).write(hosts)
+    return 0
+
+
+def olbqueues(argv=None, out=None):
+    """Run olbqueues with the arguments in argv, writing to out, and return the exit status"""
+    return _run(_olbqueues, argv, out)
+
+
+def _olbqueues(argv, out):
+    parser = _parser("olbqueues", "List queues, like bqueues", QUEUE_COLUMNS, QUEUE_DEFAULT)
+    parser.add_argument("queues", nargs="*", help="Only show these queues")
+    args = parser.parse_args(argv)
+
+    columns = _columns(parser, _queue_columns(), args.columns)
+    if lsblib.lsb_init("olbqueues") < 0:
+        return _error("olbqueues", lsblib.lsb_sysmsg())
+    queues = lsblib.lsb_queueinfo(args.queues)
+    if queues is None:
+        return _error("olbqueues", lsblib.lsb_sysmsg())
+    WRITERS[args.format](out, columns, args.header).write(queues)
+    return 0
+
+
+#console_scripts entry points, see setup.py
+def main_jobs():
+    sys.exit(olbjobs())
+
+
+def main_hosts():
+    sys.exit(olbhosts())
+
+
+def main_queues():
+    sys.exit(olbqueues())
@@ -0,0 +1,1189 @@
+# Generated by tools/gen_event_fields.py from lsstructs.pxd, do not edit.
+#
+# For each struct in the eventLog union there is a tuple of its field names, and a
+# function returning the value of a field by its position in that tuple.  Structs
+# embedded in the logs are returned as dicts.  Included into lsblib.pyx and used by
+# EventSerializer.
+
+cdef dict _lsfRusage_dict(lsfRusage * d):
+    return {
+        'ru_utime': d.ru_utime,
+        'ru_stime': d.ru_stime,
+        'ru_maxrss': d.ru_maxrss,
+        'ru_ixrss': d.ru_ixrss,
+        'ru_ismrss': d.ru_ismrss,
+        'ru_idrss': d.ru_idrss,
+        'ru_isrss': d.ru_isrss,
+        'ru_minflt': d.ru_minflt,
+        'ru_majflt': d.ru_majflt,
+        'ru_nswap': d.ru_nswap,
+        'ru_inblock': d.ru_inblock,
+        'ru_oublock': d.ru_oublock,
+        'ru_ioch': d.ru_ioch,
+        'ru_msgsnd': d.ru_msgsnd,
+        'ru_msgrcv': d.ru_msgrcv,
+        'ru_nsignals': d.ru_nsignals,
+        'ru_nvcsw': d.ru_nvcsw,
+        'ru_nivcsw': d.ru_nivcsw,
+        'ru_exutime': d.ru_exutime,
+    }
+
+
+cdef dict _xFile_dict(xFile * d):
+    return {
+        'subFn': _field_string(d.subFn),
+        'execFn': _field_string(d.execFn),
+        'options': d.options,
+    }
+
+
+_JOBNEWLOG_FIELDS = (
+    'jobId',
+    'userId',
+    'userName',
+    'options',
+    'options2',
+    'numProcessors',
+    'submitTime',
+    'beginTime',
+    'termTime',
+    'sigValue',
+    'chkpntPeriod',
+    'restartPid',
+    'rLimits',
+    'hostSpec',
+    'hostFactor',
+    'umask',
+    'queue',
+    'resReq',
+    'fromHost',
+    'cwd',
+    'chkpntDir',
+    'inFile',
+    'outFile',
+    'errFile',
+    'inFileSpool',
+    'commandSpool',
+    'jobSpoolDir',
+    'subHomeDir',
+    'jobFile',
+    'numAskedHosts',
+    'askedHosts',
+    'dependCond',
+    'jobName',
+    'command',
+    'nxf',
+    'xf',
+    'preExecCmd',
+    'mailUser',
+    'projectName',
+    'niosPort',
+    'maxNumProcessors',
+    'schedHostType',
+    'loginShell',
+    'idx',
+    'userPriority',
+)
+
+cdef object _jobNewLog_field(jobNewLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.userId
+    elif i == 2:
+        return _field_string(d.userName)
+    elif i == 3:
+        return d.options
+    elif i == 4:
+        return d.options2
+    elif i == 5:
+        return d.numProcessors
+    elif i == 6:
+        return d.submitTime
+    elif i == 7:
+        return d.beginTime
+    elif i == 8:
+        return d.termTime
+    elif i == 9:
+        return d.sigValue
+    elif i == 10:
+        return d.chkpntPeriod
+    elif i == 11:
+        return d.restartPid
+    elif i == 12:
+        return _field_ints(d.rLimits, 11)
+    elif i == 13:
+        return _field_string(d.hostSpec)
+    elif i == 14:
+        return d.hostFactor
+    elif i == 15:
+        return d.umask
+    elif i == 16:
+        return _field_string(d.queue)
+    elif i == 17:
+        return _field_string(d.resReq)
+    elif i == 18:
+        return _field_string(d.fromHost)
+    elif i == 19:
+        return _field_string(d.cwd)
+    elif i == 20:
+        return _field_string(d.chkpntDir)
+    elif i == 21:
+        return _field_string(d.inFile)
+    elif i == 22:
+        return _field_string(d.outFile)
+    elif i == 23:
+        return _field_string(d.errFile)
+    elif i == 24:
+        return _field_string(d.inFileSpool)
+    elif i == 25:
+        return _field_string(d.commandSpool)
+    elif i == 26:
+        return _field_string(d.jobSpoolDir)
+    elif i == 27:
+        return _field_string(d.subHomeDir)
+    elif i == 28:
+        return _field_string(d.jobFile)
+    elif i == 29:
+        return d.numAskedHosts
+    elif i == 30:
+        return _field_strings(d.askedHosts, d.numAskedHosts)
+    elif i == 31:
+        return _field_string(d.dependCond)
+    elif i == 32:
+        return _field_string(d.jobName)
+    elif i == 33:
+        return _field_string(d.command)
+    elif i == 34:
+        return d.nxf
+    elif i == 35:
+        return _field_xfiles(d.xf, d.nxf)
+    elif i == 36:
+        return _field_string(d.preExecCmd)
+    elif i == 37:
+        return _field_string(d.mailUser)
+    elif i == 38:
+        return _field_string(d.projectName)
+    elif i == 39:
+        return d.niosPort
+    elif i == 40:
+        return d.maxNumProcessors
+    elif i == 41:
+        return _field_string(d.schedHostType)
+    elif i == 42:
+        return _field_string(d.loginShell)
+    elif i == 43:
+        return d.idx
+    elif i == 44:
+        return d.userPriority
+    return None
+
+
+_JOBSTARTLOG_FIELDS = (
+    'jobId',
+    'jStatus',
+    'jobPid',
+    'jobPGid',
+    'hostFactor',
+    'numExHosts',
+    'execHosts',
+    'queuePreCmd',
+    'queuePostCmd',
+    'jFlags',
+    'idx',
+)
+
+cdef object _jobStartLog_field(jobStartLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.jStatus
+    elif i == 2:
+        return d.jobPid
+    elif i == 3:
+        return d.jobPGid
+    elif i == 4:
+        return d.hostFactor
+    elif i == 5:
+        return d.numExHosts
+    elif i == 6:
+        return _field_strings(d.execHosts, d.numExHosts)
+    elif i == 7:
+        return _field_string(d.queuePreCmd)
+    elif i == 8:
+        return _field_string(d.queuePostCmd)
+    elif i == 9:
+        return d.jFlags
+    elif i == 10:
+        return d.idx
+    return None
+
+
+_JOBSTATUSLOG_FIELDS = (
+    'jobId',
+    'jStatus',
+    'reason',
+    'subreasons',
+    'cpuTime',
+    'endTime',
+    'ru',
+    'lsfRusage',
+    'jFlags',
+    'exitStatus',
+    'idx',
+)
+
+cdef object _jobStatusLog_field(jobStatusLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.jStatus
+    elif i == 2:
+        return d.reason
+    elif i == 3:
+        return d.subreasons
+    elif i == 4:
+        return d.cpuTime
+    elif i == 5:
+        return d.endTime
+    elif i == 6:
+        return d.ru
+    elif i == 7:
+        return _lsfRusage_dict(&d.lsfRusage)
+    elif i == 8:
+        return d.jFlags
+    elif i == 9:
+        return d.exitStatus
+    elif i == 10:
+        return d.idx
+    return None
+
+
+_SBDJOBSTATUSLOG_FIELDS = (
+    'jobId',
+    'jStatus',
+    'reasons',
+    'subreasons',
+    'actPid',
+    'actValue',
+    'actPeriod',
+    'actFlags',
+    'actStatus',
+    'actReasons',
+    'actSubReasons',
+    'idx',
+)
+
+cdef object _sbdJobStatusLog_field(sbdJobStatusLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.jStatus
+    elif i == 2:
+        return d.reasons
+    elif i == 3:
+        return d.subreasons
+    elif i == 4:
+        return d.actPid
+    elif i == 5:
+        return d.actValue
+    elif i == 6:
+        return d.actPeriod
+    elif i == 7:
+        return d.actFlags
+    elif i == 8:
+        return d.actStatus
+    elif i == 9:
+        return d.actReasons
+    elif i == 10:
+        return d.actSubReasons
+    elif i == 11:
+        return d.idx
+    return None
+
+
+_JOBSWITCHLOG_FIELDS = (
+    'userId',
+    'jobId',
+    'queue',
+    'idx',
+    'userName',
+)
+
+cdef object _jobSwitchLog_field(jobSwitchLog * d, int i):
+    if i == 0:
+        return d.userId
+    elif i == 1:
+        return d.jobId
+    elif i == 2:
+        return _field_string(d.queue)
+    elif i == 3:
+        return d.idx
+    elif i == 4:
+        return _field_string(d.userName)
+    return None
+
+
+_JOBMOVELOG_FIELDS = (
+    'userId',
+    'jobId',
+    'position',
+    'base',
+    'idx',
+    'userName',
+)
+
+cdef object _jobMoveLog_field(jobMoveLog * d, int i):
+    if i == 0:
+        return d.userId
+    elif i == 1:
+        return d.jobId
+    elif i == 2:
+        return d.position
+    elif i == 3:
+        return d.base
+    elif i == 4:
+        return d.idx
+    elif i == 5:
+        return _field_string(d.userName)
+    return None
+
+
+_QUEUECTRLLOG_FIELDS = (
+    'opCode',
+    'queue',
+    'userId',
+    'userName',
+)
+
+cdef object _queueCtrlLog_field(queueCtrlLog * d, int i):
+    if i == 0:
+        return d.opCode
+    elif i == 1:
+        return _field_string(d.queue)
+    elif i == 2:
+        return d.userId
+    elif i == 3:
+        return _field_string(d.userName)
+    return None
+
+
+_NEWDEBUGLOG_FIELDS = (
+    'opCode',
+    'level',
+    'logclass',
+    'turnOff',
+    'logFileName',
+    'userId',
+)
+
+cdef object _newDebugLog_field(newDebugLog * d, int i):
+    if i == 0:
+        return d.opCode
+    elif i == 1:
+        return d.level
+    elif i == 2:
+        return d.logclass
+    elif i == 3:
+        return d.turnOff
+    elif i == 4:
+        return _field_string(d.logFileName)
+    elif i == 5:
+        return d.userId
+    return None
+
+
+_HOSTCTRLLOG_FIELDS = (
+    'opCode',
+    'host',
+    'userId',
+    'userName',
+)
+
+cdef object _hostCtrlLog_field(hostCtrlLog * d, int i):
+    if i == 0:
+        return d.opCode
+    elif i == 1:
+        return _field_string(d.host)
+    elif i == 2:
+        return d.userId
+    elif i == 3:
+        return _field_string(d.userName)
+    return None
+
+
+_MBDSTARTLOG_FIELDS = (
+    'master',
+    'cluster',
+    'numHosts',
+    'numQueues',
+)
+
+cdef object _mbdStartLog_field(mbdStartLog * d, int i):
+    if i == 0:
+        return _field_string(d.master)
+    elif i == 1:
+        return _field_string(d.cluster)
+    elif i == 2:
+        return d.numHosts
+    elif i == 3:
+        return d.numQueues
+    return None
+
+
+_MBDDIELOG_FIELDS = (
+    'master',
+    'numRemoveJobs',
+    'exitCode',
+)
+
+cdef object _mbdDieLog_field(mbdDieLog * d, int i):
+    if i == 0:
+        return _field_string(d.master)
+    elif i == 1:
+        return d.numRemoveJobs
+    elif i == 2:
+        return d.exitCode
+    return None
+
+
+_UNFULFILLLOG_FIELDS = (
+    'jobId',
+    'notSwitched',
+    'sig',
+    'sig1',
+    'sig1Flags',
+    'chkPeriod',
+    'notModified',
+    'idx',
+)
+
+cdef object _unfulfillLog_field(unfulfillLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.notSwitched
+    elif i == 2:
+        return d.sig
+    elif i == 3:
+        return d.sig1
+    elif i == 4:
+        return d.sig1Flags
+    elif i == 5:
+        return d.chkPeriod
+    elif i == 6:
+        return d.notModified
+    elif i == 7:
+        return d.idx
+    return None
+
+
+_JOBFINISHLOG_FIELDS = (
+    'jobId',
+    'userId',
+    'userName',
+    'options',
+    'numProcessors',
+    'jStatus',
+    'submitTime',
+    'beginTime',
+    'termTime',
+    'startTime',
+    'endTime',
+    'queue',
+    'resReq',
+    'fromHost',
+    'cwd',
+    'inFile',
+    'outFile',
+    'errFile',
+    'inFileSpool',
+    'commandSpool',
+    'jobFile',
+    'numAskedHosts',
+    'askedHosts',
+    'hostFactor',
+    'numExHosts',
+    'execHosts',
+    'cpuTime',
+    'jobName',
+    'command',
+    'lsfRusage',
+    'dependCond',
+    'preExecCmd',
+    'mailUser',
+    'projectName',
+    'exitStatus',
+    'maxNumProcessors',
+    'loginShell',
+    'idx',
+    'maxRMem',
+    'maxRSwap',
+)
+
+cdef object _jobFinishLog_field(jobFinishLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.userId
+    elif i == 2:
+        return _field_string(d.userName)
+    elif i == 3:
+        return d.options
+    elif i == 4:
+        return d.numProcessors
+    elif i == 5:
+        return d.jStatus
+    elif i == 6:
+        return d.submitTime
+    elif i == 7:
+        return d.beginTime
+    elif i == 8:
+        return d.termTime
+    elif i == 9:
+        return d.startTime
+    elif i == 10:
+        return d.endTime
+    elif i == 11:
+        return _field_string(d.queue)
+    elif i == 12:
+        return _field_string(d.resReq)
+    elif i == 13:
+        return _field_string(d.fromHost)
+    elif i == 14:
+        return _field_string(d.cwd)
+    elif i == 15:
+        return _field_string(d.inFile)
+    elif i == 16:
+        return _field_string(d.outFile)
+    elif i == 17:
+        return _field_string(d.errFile)
+    elif i == 18:
+        return _field_string(d.inFileSpool)
+    elif i == 19:
+        return _field_string(d.commandSpool)
+    elif i == 20:
+        return _field_string(d.jobFile)
+    elif i == 21:
+        return d.numAskedHosts
+    elif i == 22:
+        return _field_strings(d.askedHosts, d.numAskedHosts)
+    elif i == 23:
+        return d.hostFactor
+    elif i == 24:
+        return d.numExHosts
+    elif i == 25:
+        return _field_strings(d.execHosts, d.numExHosts)
+    elif i == 26:
+        return d.cpuTime
+    elif i == 27:
+        return _field_string(d.jobName)
+    elif i == 28:
+        return _field_string(d.command)
+    elif i == 29:
+        return _lsfRusage_dict(&d.lsfRusage)
+    elif i == 30:
+        return _field_string(d.dependCond)
+    elif i == 31:
+        return _field_string(d.preExecCmd)
+    elif i == 32:
+        return _field_string(d.mailUser)
+    elif i == 33:
+        return _field_string(d.projectName)
+    elif i == 34:
+        return d.exitStatus
+    elif i == 35:
+        return d.maxNumProcessors
+    elif i == 36:
+        return _field_string(d.loginShell)
+    elif i == 37:
+        return d.idx
+    elif i == 38:
+        return d.maxRMem
+    elif i == 39:
+        return d.maxRSwap
+    return None
+
+
+_LOADINDEXLOG_FIELDS = (
+    'nIdx',
+    'name',
+)
+
+cdef object _loadIndexLog_field(loadIndexLog * d, int i):
+    if i == 0:
+        return d.nIdx
+    elif i == 1:
+        return _field_strings(d.name, d.nIdx)
+    return None
+
+
+_MIGLOG_FIELDS = (
+    'jobId',
+    'numAskedHosts',
+    'askedHosts',
+    'userId',
+    'idx',
+    'userName',
+)
+
+cdef object _migLog_field(migLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.numAskedHosts
+    elif i == 2:
+        return _field_strings(d.askedHosts, d.numAskedHosts)
+    elif i == 3:
+        return d.userId
+    elif i == 4:
+        return d.idx
+    elif i == 5:
+        return _field_string(d.userName)
+    return None
+
+
+_SIGNALLOG_FIELDS = (
+    'userId',
+    'jobId',
+    'signalSymbol',
+    'runCount',
+    'idx',
+    'userName',
+)
+
+cdef object _signalLog_field(signalLog * d, int i):
+    if i == 0:
+        return d.userId
+    elif i == 1:
+        return d.jobId
+    elif i == 2:
+        return _field_string(d.signalSymbol)
+    elif i == 3:
+        return d.runCount
+    elif i == 4:
+        return d.idx
+    elif i == 5:
+        return _field_string(d.userName)
+    return None
+
+
+_JOBEXECUTELOG_FIELDS = (
+    'jobId',
+    'execUid',
+    'execHome',
+    'execCwd',
+    'jobPGid',
+    'execUsername',
+    'jobPid',
+    'idx',
+)
+
+cdef object _jobExecuteLog_field(jobExecuteLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.execUid
+    elif i == 2:
+        return _field_string(d.execHome)
+    elif i == 3:
+        return _field_string(d.execCwd)
+    elif i == 4:
+        return d.jobPGid
+    elif i == 5:
+        return _field_string(d.execUsername)
+    elif i == 6:
+        return d.jobPid
+    elif i == 7:
+        return d.idx
+    return None
+
+
+_JOBMSGLOG_FIELDS = (
+    'usrId',
+    'jobId',
+    'msgId',
+    'type',
+    'src',
+    'dest',
+    'msg',
+    'idx',
+)
+
+cdef object _jobMsgLog_field(jobMsgLog * d, int i):
+    if i == 0:
+        return d.usrId
+    elif i == 1:
+        return d.jobId
+    elif i == 2:
+        return d.msgId
+    elif i == 3:
+        return d.type
+    elif i == 4:
+        return _field_string(d.src)
+    elif i == 5:
+        return _field_string(d.dest)
+    elif i == 6:
+        return _field_string(d.msg)
+    elif i == 7:
+        return d.idx
+    return None
+
+
+_JOBMSGACKLOG_FIELDS = (
+    'usrId',
+    'jobId',
+    'msgId',
+    'type',
+    'src',
+    'dest',
+    'msg',
+    'idx',
+)
+
+cdef object _jobMsgAckLog_field(jobMsgAckLog * d, int i):
+    if i == 0:
+        return d.usrId
+    elif i == 1:
+        return d.jobId
+    elif i == 2:
+        return d.msgId
+    elif i == 3:
+        return d.type
+    elif i == 4:
+        return _field_string(d.src)
+    elif i == 5:
+        return _field_string(d.dest)
+    elif i == 6:
+        return _field_string(d.msg)
+    elif i == 7:
+        return d.idx
+    return None
+
+
+_JOBREQUEUELOG_FIELDS = (
+    'jobId',
+    'idx',
+)
+
+cdef object _jobRequeueLog_field(jobRequeueLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.idx
+    return None
+
+
+_CHKPNTLOG_FIELDS = (
+    'jobId',
+    'period',
+    'pid',
+    'ok',
+    'flags',
+    'idx',
+)
+
+cdef object _chkpntLog_field(chkpntLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.period
+    elif i == 2:
+        return d.pid
+    elif i == 3:
+        return d.ok
+    elif i == 4:
+        return d.flags
+    elif i == 5:
+        return d.idx
+    return None
+
+
+_SIGACTLOG_FIELDS = (
+    'jobId',
+    'period',
+    'pid',
+    'jStatus',
+    'reasons',
+    'flags',
+    'signalSymbol',
+    'actStatus',
+    'idx',
+)
+
+cdef object _sigactLog_field(sigactLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.period
+    elif i == 2:
+        return d.pid
+    elif i == 3:
+        return d.jStatus
+    elif i == 4:
+        return d.reasons
+    elif i == 5:
+        return d.flags
+    elif i == 6:
+        return _field_string(d.signalSymbol)
+    elif i == 7:
+        return d.actStatus
+    elif i == 8:
+        return d.idx
+    return None
+
+
+_JOBSTARTACCEPTLOG_FIELDS = (
+    'jobId',
+    'jobPid',
+    'jobPGid',
+    'idx',
+)
+
+cdef object _jobStartAcceptLog_field(jobStartAcceptLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.jobPid
+    elif i == 2:
+        return d.jobPGid
+    elif i == 3:
+        return d.idx
+    return None
+
+
+_JOBCLEANLOG_FIELDS = (
+    'jobId',
+    'idx',
+)
+
+cdef object _jobCleanLog_field(jobCleanLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.idx
+    return None
+
+
+_JOBFORCEREQUESTLOG_FIELDS = (
+    'userId',
+    'numExecHosts',
+    'execHosts',
+    'jobId',
+    'idx',
+    'options',
+    'userName',
+)
+
+cdef object _jobForceRequestLog_field(jobForceRequestLog * d, int i):
+    if i == 0:
+        return d.userId
+    elif i == 1:
+        return d.numExecHosts
+    elif i == 2:
+        return _field_strings(d.execHosts, d.numExecHosts)
+    elif i == 3:
+        return d.jobId
+    elif i == 4:
+        return d.idx
+    elif i == 5:
+        return d.options
+    elif i == 6:
+        return _field_string(d.userName)
+    return None
+
+
+_LOGSWITCHLOG_FIELDS = (
+    'lastJobId',
+)
+
+cdef object _logSwitchLog_field(logSwitchLog * d, int i):
+    if i == 0:
+        return d.lastJobId
+    return None
+
+
+_JOBMODLOG_FIELDS = (
+    'jobIdStr',
+    'options',
+    'options2',
+    'delOptions',
+    'delOptions2',
+    'userId',
+    'userName',
+    'submitTime',
+    'umask',
+    'numProcessors',
+    'beginTime',
+    'termTime',
+    'sigValue',
+    'restartPid',
+    'jobName',
+    'queue',
+    'numAskedHosts',
+    'askedHosts',
+    'resReq',
+    'rLimits',
+    'hostSpec',
+    'dependCond',
+    'subHomeDir',
+    'inFile',
+    'outFile',
+    'errFile',
+    'command',
+    'inFileSpool',
+    'commandSpool',
+    'chkpntPeriod',
+    'chkpntDir',
+    'nxf',
+    'xf',
+    'jobFile',
+    'fromHost',
+    'cwd',
+    'preExecCmd',
+    'mailUser',
+    'projectName',
+    'niosPort',
+    'maxNumProcessors',
+    'loginShell',
+    'schedHostType',
+    'userPriority',
+)
+
+cdef object _jobModLog_field(jobModLog * d, int i):
+    if i == 0:
+        return _field_string(d.jobIdStr)
+    elif i == 1:
+        return d.options
+    elif i == 2:
+        return d.options2
+    elif i == 3:
+        return d.delOptions
+    elif i == 4:
+        return d.delOptions2
+    elif i == 5:
+        return d.userId
+    elif i == 6:
+        return _field_string(d.userName)
+    elif i == 7:
+        return d.submitTime
+    elif i == 8:
+        return d.umask
+    elif i == 9:
+        return d.numProcessors
+    elif i == 10:
+        return d.beginTime
+    elif i == 11:
+        return d.termTime
+    elif i == 12:
+        return d.sigValue
+    elif i == 13:
+        return d.restartPid
+    elif i == 14:
+        return _field_string(d.jobName)
+    elif i == 15:
+        return _field_string(d.queue)
+    elif i == 16:
+        return d.numAskedHosts
+    elif i == 17:
+        return _field_strings(d.askedHosts, d.numAskedHosts)
+    elif i == 18:
+        return _field_string(d.resReq)
+    elif i == 19:
+        return _field_ints(d.rLimits, 11)
+    elif i == 20:
+        return _field_string(d.hostSpec)
+    elif i == 21:
+        return _field_string(d.dependCond)
+    elif i == 22:
+        return _field_string(d.subHomeDir)
+    elif i == 23:
+        return _field_string(d.inFile)
+    elif i == 24:
+        return _field_string(d.outFile)
+    elif i == 25:
+        return _field_string(d.errFile)
+    elif i == 26:
+        return _field_string(d.command)
+    elif i == 27:
+        return _field_string(d.inFileSpool)
+    elif i == 28:
+        return _field_string(d.commandSpool)
+    elif i == 29:
+        return d.chkpntPeriod
+    elif i == 30:
+        return _field_string(d.chkpntDir)
+    elif i == 31:
+        return d.nxf
+    elif i == 32:
+        return _field_xfiles(d.xf, d.nxf)
+    elif i == 33:
+        return _field_string(d.jobFile)
+    elif i == 34:
+        return _field_string(d.fromHost)
+    elif i == 35:
+        return _field_string(d.cwd)
+    elif i == 36:
+        return _field_string(d.preExecCmd)
+    elif i == 37:
+        return _field_string(d.mailUser)
+    elif i == 38:
+        return _field_string(d.projectName)
+    elif i == 39:
+        return d.niosPort
+    elif i == 40:
+        return d.maxNumProcessors
+    elif i == 41:
+        return _field_string(d.loginShell)
+    elif i == 42:
+        return _field_string(d.schedHostType)
+    elif i == 43:
+        return d.userPriority
+    return None
+
+
+_JOBATTRSETLOG_FIELDS = (
+    'jobId',
+    'idx',
+    'uid',
+    'port',
+    'hostname',
+)
+
+cdef object _jobAttrSetLog_field(jobAttrSetLog * d, int i):
+    if i == 0:
+        return d.jobId
+    elif i == 1:
+        return d.idx
+    elif i == 2:
+        return d.uid
+    elif i == 3:
+        return d.port
+    elif i == 4:
+        return _field_string(d.hostname)
+    return None
+
+
+#members of the eventLog union, in declaration order
+LOG_MEMBERS = (
+    'jobNewLog',
+    'jobStartLog',
+    'jobStatusLog',
+    'sbdJobStatusLog',
+    'jobSwitchLog',
+    'jobMoveLog',
+    'queueCtrlLog',
+    'newDebugLog',
+    'hostCtrlLog',
+    'mbdStartLog',
+    'mbdDieLog',
+    'unfulfillLog',
+    'jobFinishLog',
+    'loadIndexLog',
+    'migLog',
+    'signalLog',
+    'jobExecuteLog',
+    'jobMsgLog',
+    'jobMsgAckLog',
+    'jobRequeueLog',
+    'chkpntLog',
+    'sigactLog',
+    'jobStartAcceptLog',
+    'jobCleanLog',
+    'jobForceRequestLog',
+    'logSwitchLog',
+    'jobModLog',
+    'jobAttrSetLog',
+)
+
+#field names of each member of the eventLog union
+LOG_FIELDS = {
+    'jobNewLog': _JOBNEWLOG_FIELDS,
+    'jobStartLog': _JOBSTARTLOG_FIELDS,
+    'jobStatusLog': _JOBSTATUSLOG_FIELDS,
+    'sbdJobStatusLog': _SBDJOBSTATUSLOG_FIELDS,
+    'jobSwitchLog': _JOBSWITCHLOG_FIELDS,
+    'jobMoveLog': _JOBMOVELOG_FIELDS,
+    'queueCtrlLog': _QUEUECTRLLOG_FIELDS,
+    'newDebugLog': _NEWDEBUGLOG_FIELDS,
+    'hostCtrlLog': _HOSTCTRLLOG_FIELDS,
+    'mbdStartLog': _MBDSTARTLOG_FIELDS,
+    'mbdDieLog': _MBDDIELOG_FIELDS,
+    'unfulfillLog': _UNFULFILLLOG_FIELDS,
+    'jobFinishLog': _JOBFINISHLOG_FIELDS,
+    'loadIndexLog': _LOADINDEXLOG_FIELDS,
+    'migLog': _MIGLOG_FIELDS,
+    'signalLog': _SIGNALLOG_FIELDS,
+    'jobExecuteLog': _JOBEXECUTELOG_FIELDS,
+    'jobMsgLog': _JOBMSGLOG_FIELDS,
+    'jobMsgAckLog': _JOBMSGACKLOG_FIELDS,
+    'jobRequeueLog': _JOBREQUEUELOG_FIELDS,
+    'chkpntLog': _CHKPNTLOG_FIELDS,
+    'sigactLog': _SIGACTLOG_FIELDS,
+    'jobStartAcceptLog': _JOBSTARTACCEPTLOG_FIELDS,
+    'jobCleanLog': _JOBCLEANLOG_FIELDS,
+    'jobForceRequestLog': _JOBFORCEREQUESTLOG_FIELDS,
+    'logSwitchLog': _LOGSWITCHLOG_FIELDS,
+    'jobModLog': _JOBMODLOG_FIELDS,
+    'jobAttrSetLog': _JOBATTRSETLOG_FIELDS,
+}
+
+cdef object _log_field(int member, eventLog * el, int i):
+    """Return field i of the member of the union at position member in LOG_MEMBERS"""
+    if member == 0:
+        return _jobNewLog_field(&el.jobNewLog, i)
+    elif member == 1:
+        return _jobStartLog_field(&el.jobStartLog, i)
+    elif member == 2:
+        return _jobStatusLog_field(&el.jobStatusLog, i)
+    elif member == 3:
+        return _sbdJobStatusLog_field(&el.sbdJobStatusLog, i)
+    elif member == 4:
+        return _jobSwitchLog_field(&el.jobSwitchLog, i)
+    elif member == 5:
+        return _jobMoveLog_field(&el.jobMoveLog, i)
+    elif member == 6:
+        return _queueCtrlLog_field(&el.queueCtrlLog, i)
+    elif member == 7:
+        return _newDebugLog_field(&el.newDebugLog, i)
+    elif member == 8:
+        return _hostCtrlLog_field(&el.hostCtrlLog, i)
+    elif member == 9:
+        return _mbdStartLog_field(&el.mbdStartLog, i)
+    elif member == 10:
+        return _mbdDieLog_field(&el.mbdDieLog, i)
+    elif member == 11:
+        return _unfulfillLog_field(&el.unfulfillLog, i)
+    elif member == 12:
+        return _jobFinishLog_field(&el.jobFinishLog, i)
+    elif member == 13:
+        return _loadIndexLog_field(&el.loadIndexLog, i)
+    elif member == 14:
+        return _migLog_field(&el.migLog, i)
+    elif member == 15:
+        return _signalLog_field(&el.signalLog, i)
+    elif member == 16:
+        return _jobExecuteLog_field(&el.jobExecuteLog, i)
+    elif member == 17:
+        return _jobMsgLog_field(&el.jobMsgLog, i)
+    elif member == 18:
+        return _jobMsgAckLog_field(&el.jobMsgAckLog, i)
+    elif member == 19:
+        return _jobRequeueLog_field(&el.jobRequeueLog, i)
+    elif member == 20:
+        return _chkpntLog_field(&el.chkpntLog, i)
+    elif member == 21:
+        return _sigactLog_field(&el.sigactLog, i)
+    elif member == 22:
+        return _jobStartAcceptLog_field(&el.jobStartAcceptLog, i)
+    elif member == 23:
+        return _jobCleanLog_field(&el.jobCleanLog, i)
+    elif member == 24:
+        return _jobForceRequestLog_field(&el.jobForceRequestLog, i)
+    elif member == 25:
+        return _logSwitchLog_field(&el.logSwitchLog, i)
+    elif member == 26:
+        return _jobModLog_field(&el.jobModLog, i)
+    elif member == 27:
+        return _jobAttrSetLog_field(&el.jobAttrSetLog, i)
+    return None
@@ -0,0 +1,171 @@
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+Tools for reading many lsb.events and lsb.acct files at once.
+
+Usage
+-----
+Scan a directory of rotated event logs using all available cores, and print
+the finish time and user of every job::
+
+    import glob
+    from openlava import constants
+    from openlava.events import scan_event_files
+
+    paths = glob.glob("/opt/openlava/work/logdir/lsb.events*")
+    for row in scan_event_files(paths, [constants.EVENT_JOB_FINISH], ['jobId', 'userName']):
+        event_time, event_type, job_id, user = row
+        print event_time, job_id, user
+
+Members
+-------
+"""
+import heapq
+import itertools
+import marshal
+import multiprocessing
+import os
+import shutil
+import tempfile
+from operator import itemgetter
+
+from openlava import lsblib
+
+#rows a worker reads and sorts at a time, which bounds the memory it uses
+RUN_SIZE = 200000
+
+#number of rows serialized together in a run file, and read back at a time by the merge
+BATCH_SIZE = 10000
+
+
+def _scan_file(args):
+    """Read one event file in a worker process.  Writes runs of up to RUN_SIZE rows, each
+    sorted by eventTime unless keep_file_order is set, to files in spill_dir as serialized
+    batches of rows, and returns their paths."""
+    path, event_types, fields, start_time, end_time, keep_file_order, spill_dir = args
+
+    serializer = lsblib.EventSerializer(('eventTime', 'type') + fields, as_tuple=True)
+    reader = lsblib.EventLogReader(path, event_types=event_types,
+                                   start_time=start_time, end_time=end_time)
+    runs = []
+    try:
+        while True:
+            rows = serializer.read(reader, RUN_SIZE)
+            if not rows:
+                break
+            if not keep_file_order:
+                #sort is stable so records logged in the same second keep their order
+                rows.sort(key=itemgetter(0))
+            fd, run_path = tempfile.mkstemp(suffix=".run", dir=spill_dir)
+            with os.fdopen(fd, "wb") as run_file:
+                for i in range(0, len(rows), BATCH_SIZE):
+                    marshal.dump(rows[i:i + BATCH_SIZE], run_file)
+            runs.append(run_path)
+    finally:
+        reader.close()
+    return runs
+
+
+def _rows(run_paths, key):
+    #decorated with the file and run numbers so heapq.merge never has to compare the field values
+    for run_path in run_paths:
+        with open(run_path, "rb") as run_file:
+            while True:
+                try:
+                    batch = marshal.load(run_file)
+                except EOFError:
+                    break
+                for row in batch:
+                    yield row[0], key, row
+        os.remove(run_path)
+
+
+def scan_event_files(paths, event_types=None, fields=(), workers=None, start_time=0, end_time=0,
+                     keep_file_order=False, spill_dir=None):
+    """openlava.events.scan_event_files(paths, event_types=None, fields=(), workers=None, start_time=0, end_time=0, keep_file_order=False, spill_dir=None)
+
+Reads a list of event log files in a pool of worker processes, each using
+lsblib.EventLogReader, and yields the matching records merged into a single stream
+ordered by eventTime.  Each worker reads and sorts at most RUN_SIZE records at a time and
+writes each sorted run to a temporary file.  The merge then reads one batch of
+BATCH_SIZE records at a time from each run, so the memory used is bounded by RUN_SIZE
+records in each worker and one batch per run in the calling process, however large the
+files are.  The first record is only yielded once every file has been read, as it may
+come from any of them, and the run files are removed as the merge finishes with them,
+or when the generator is closed.
+
+Each record is returned as a tuple of (eventTime, type) followed by the value of each
+of the requested fields, decoded by lsblib.EventSerializer.  Fields that the event type
+does not have are None, nested structs such as lsfRusage are returned as dicts.
+
+:param list paths: Paths of the event files to read
+:param list event_types: Only return records of these types, None for all types
+:param list fields: Names of the log attributes to return for each record
+:param int workers: Number of processes to use, defaults to the number of CPUs
+:param int start_time: Skip records logged before this epoch time
+:param int end_time: Skip records logged after this epoch time, 0 for no limit
+:param bool keep_file_order: Keep the records from each file in the order they were logged rather than sorting them by eventTime.  The merged stream is then only as ordered as the files themselves.
+:param str spill_dir: Directory to write the sorted runs in, defaults to the system temporary directory
+:return: Generator of record tuples
+:rtype: generator
+
+::
+
+    >>> from openlava import constants
+    >>> from openlava.events import scan_event_files
+    >>> rows = scan_event_files(["lsb.acct", "lsb.acct.1"], [constants.EVENT_JOB_FINISH], ['jobId', 'queue'])
+    >>> rows.next()
+    (1390404552, 10, 4562, u'normal')
+
+"""
+    paths = list(paths)
+    fields = tuple(fields)
+    if event_types is not None:
+        event_types = list(event_types)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    spill_dir = tempfile.mkdtemp(prefix="openlava-scan-", dir=spill_dir)
+    pool = None
+    try:
+        jobs = [(path, event_types, fields, start_time, end_time, keep_file_order, spill_dir)
+                for path in paths]
+        if workers <= 1 or len(paths) <= 1:
+            results = itertools.imap(_scan_file, jobs)
+        else:
+            pool = multiprocessing.Pool(min(workers, len(paths)))
+            results = pool.imap(_scan_file, jobs, chunksize=1)
+        streams = []
+        for file_number, runs in enumerate(results):
+            if keep_file_order:
+                streams.append(_rows(runs, (file_number,)))
+            else:
+                streams.extend(_rows([run], (file_number, run_number))
+                               for run_number, run in enumerate(runs))
+        if pool is not None:
+            pool.close()
+            pool.join()
+            pool = None
+
+        for event_time, key, row in heapq.merge(*streams):
+            yield row
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        shutil.rmtree(spill_dir, ignore_errors=True)
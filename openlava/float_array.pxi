@@ -0,0 +1,90 @@
+# FloatArray, included into lsblib.pyx and lslib.pyx.
+#
+# On Python 2 array.array only has the old buffer interface, so numpy.asarray() copies it
+# into float64 and memoryview() refuses it.  FloatArray holds the floats in an
+# array.array('f') and exports them through the new buffer interface as well, so both
+# see them in place.
+
+cdef class FloatArray:
+    """
+Sequence of float32 values, such as the load indices of a host, that supports the buffer
+protocol: numpy.asarray() gives a float32 view of it, and memoryview() and
+numpy.frombuffer(x, 'f4') work, without copying.  values is the underlying
+array.array('f').
+
+::
+
+    >>> import numpy
+    >>> numpy.asarray(host.li).dtype
+    dtype('float32')
+
+"""
+    cdef readonly array.array values
+    cdef Py_ssize_t _shape[1]
+
+    def __cinit__(self, values=()):
+        self.values = array.array('f', values)
+        self._shape[0] = len(self.values)
+
+    def __len__(self):
+        return self._shape[0]
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __repr__(self):
+        return "FloatArray({!r})".format(self.values.tolist())
+
+    def __reduce__(self):
+        return FloatArray, (self.values.tolist(),)
+
+    def tolist(self):
+        return self.values.tolist()
+
+    def __getbuffer__(self, Py_buffer * buffer, int flags):
+        buffer.buf = self.values.data.as_voidptr
+        buffer.obj = self
+        buffer.len = self._shape[0] * sizeof(float)
+        buffer.readonly = 0
+        buffer.itemsize = sizeof(float)
+        buffer.format = 'f'
+        buffer.ndim = 1
+        buffer.shape = self._shape
+        buffer.strides = NULL
+        buffer.suboffsets = NULL
+        buffer.internal = NULL
+
+    def __releasebuffer__(self, Py_buffer * buffer):
+        pass
+
+    #the old buffer interface, for numpy.frombuffer() and buffer() on Python 2
+    def __getsegcount__(self, Py_ssize_t * length):
+        if length != NULL:
+            length[0] = self._shape[0] * sizeof(float)
+        return 1
+
+    def __getreadbuffer__(self, Py_ssize_t segment, void ** pointer):
+        if segment != 0:
+            raise SystemError("FloatArray has only one segment")
+        pointer[0] = self.values.data.as_voidptr
+        return self._shape[0] * sizeof(float)
+
+    def __getwritebuffer__(self, Py_ssize_t segment, void ** pointer):
+        if segment != 0:
+            raise SystemError("FloatArray has only one segment")
+        pointer[0] = self.values.data.as_voidptr
+        return self._shape[0] * sizeof(float)
+
+cdef array.array _FLOAT_ARRAY = array.array('f')
+
+cdef FloatArray _float_array(float * values, int n):
+    """Copy n floats into a new FloatArray"""
+    cdef FloatArray a = FloatArray()
+    a.values = array.clone(_FLOAT_ARRAY, max(n, 0), False)
+    a._shape[0] = max(n, 0)
+    if values != NULL and n > 0:
+        memcpy(a.values.data.as_floats, values, n * sizeof(float))
+    return a
@@ -0,0 +1,309 @@
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+Call counts, latencies and errors for every lsb_* and ls_* call.
+
+When enabled, each of the lsb_* and ls_* functions of lsblib and lslib, and read_jobs()
+and pending_reasons(), is replaced by a wrapper that records into a Registry:
+
+* the number of calls and a histogram of their latency,
+* the time spent inside liblsbatch and liblsf, the rest being spent in the wrapper
+  copying and converting results,
+* the number of records returned, the length of the list or dict, and the bytes of
+  string and array results,
+* the lsberrno and lserrno of failed calls, and the exceptions raised.
+
+Hooks can be added to receive a CallRecord for every call, and the registry can be written
+in the Prometheus text format, for example for the node exporter's textfile collector.
+
+When disabled, which is the default, the original functions are put back and nothing is
+recorded, so there is no overhead beyond checking a flag around each C call.  Only calls
+made through the modules are seen, not functions imported by name before enable().
+
+Usage
+-----
+::
+
+    from openlava import instrument, lsblib
+
+    instrument.enable()
+    lsblib.lsb_hostinfo()
+    print instrument.registry.stats()['lsb_hostinfo'].calls
+    instrument.registry.write_prometheus("/var/lib/node_exporter/openlava.prom")
+
+Members
+-------
+"""
+import array
+import bisect
+import os
+import tempfile
+import threading
+import time
+
+from openlava import lsblib, lslib
+from openlava.utils import library_errors
+
+#upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+#lsblib functions that call into liblsbatch without an lsb_ prefix
+EXTRA_FUNCTIONS = ('read_jobs', 'pending_reasons')
+
+#functions that return None when they succeed, so fail only by raising
+NO_RESULT_FUNCTIONS = ('lsb_closejobinfo', 'lsb_perror', 'ls_perror')
+
+
+class CallRecord(object):
+    """Details of one call, as passed to hooks"""
+    __slots__ = ('name', 'elapsed', 'c_time', 'records', 'bytes', 'lsberrno', 'lserrno', 'exception')
+
+    def __init__(self, name, elapsed, c_time, records, bytes, lsberrno, lserrno, exception):
+        self.name = name
+        self.elapsed = elapsed
+        self.c_time = c_time
+        self.records = records
+        self.bytes = bytes
+        self.lsberrno = lsberrno
+        self.lserrno = lserrno
+        self.exception = exception
+
+    @property
+    def failed(self):
+        return self.exception is not None or bool(self.lsberrno or self.lserrno)
+
+
+class CallStats(object):
+    """Totals for one function"""
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.c_seconds = 0.0
+        self.records = 0
+        self.bytes = 0
+        #one count per bucket in BUCKETS, and one for slower calls
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        #(lsberrno, lserrno) -> count, and exception class name -> count
+        self.errors = {}
+        self.exceptions = {}
+
+    @property
+    def convert_seconds(self):
+        """Time spent in the wrapper rather than in openlava"""
+        return self.seconds - self.c_seconds
+
+    def _add(self, record):
+        self.calls += 1
+        self.seconds += record.elapsed
+        self.c_seconds += record.c_time
+        self.records += record.records
+        self.bytes += record.bytes
+        self.buckets[bisect.bisect_left(BUCKETS, record.elapsed)] += 1
+        if record.lsberrno or record.lserrno:
+            key = (record.lsberrno, record.lserrno)
+            self.errors[key] = self.errors.get(key, 0) + 1
+        if record.exception is not None:
+            key = type(record.exception).__name__
+            self.exceptions[key] = self.exceptions.get(key, 0) + 1
+
+
+def _measure(result):
+    """Records and bytes in a result"""
+    if isinstance(result, basestring):
+        return 1, len(result)
+    if isinstance(result, array.array):
+        return len(result), len(result) * result.itemsize
+    if isinstance(result, (list, tuple, dict, lsblib.JobColumns, lslib.LoadMatrix)):
+        return len(result), 0
+    if result is None or isinstance(result, (int, long, float)):
+        return 0, 0
+    return 1, 0
+
+
+def _failed(name, result):
+    """True if result is the documented failure return of the function called name"""
+    if name in NO_RESULT_FUNCTIONS:
+        return False
+    return result is None or (isinstance(result, (int, long)) and result < 0)
+
+
+class Registry(object):
+    """openlava.instrument.Registry()
+
+Thread safe collection of CallStats, one per function.
+"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._hooks = []
+
+    def record(self, record):
+        """Add a CallRecord to the totals, and pass it to each hook"""
+        with self._lock:
+            stats = self._stats.get(record.name)
+            if stats is None:
+                stats = self._stats[record.name] = CallStats(record.name)
+            stats._add(record)
+        for hook in list(self._hooks):
+            hook(record)
+
+    def stats(self):
+        """Dict of function name -> CallStats, for functions that have been called"""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset(self):
+        """Forget every total"""
+        with self._lock:
+            self._stats = {}
+
+    def add_hook(self, hook):
+        """Call hook(record) with a CallRecord after every call"""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Stop calling a hook added with add_hook()"""
+        self._hooks.remove(hook)
+
+    def prometheus(self):
+        """Returns the totals in the Prometheus text exposition format"""
+        lines = []
+
+        def metric(name, kind, text, samples):
+            lines.append("# HELP {} {}".format(name, text))
+            lines.append("# TYPE {} {}".format(name, kind))
+            for labels, value in samples:
+                label_text = ",".join('{}="{}"'.format(k, v) for k, v in labels)
+                lines.append("{}{{{}}} {}".format(name, label_text, repr(float(value))))
+
+        stats = sorted(self.stats().values(), key=lambda s: s.name)
+        metric("openlava_calls_total", "counter", "Calls made to openlava",
+               [((('function', s.name),), s.calls) for s in stats])
+
+        lines.append("# HELP openlava_call_seconds Latency of calls to openlava")
+        lines.append("# TYPE openlava_call_seconds histogram")
+        for s in stats:
+            count = 0
+            for bound, n in zip(BUCKETS + (float('inf'),), s.buckets):
+                count += n
+                le = "+Inf" if bound == float('inf') else repr(bound)
+                lines.append('openlava_call_seconds_bucket{{function="{}",le="{}"}} {}'.format(s.name, le, count))
+            lines.append('openlava_call_seconds_sum{{function="{}"}} {}'.format(s.name, repr(s.seconds)))
+            lines.append('openlava_call_seconds_count{{function="{}"}} {}'.format(s.name, s.calls))
+
+        metric("openlava_call_library_seconds_total", "counter", "Time spent inside liblsf and liblsbatch",
+               [((('function', s.name),), s.c_seconds) for s in stats])
+        metric("openlava_call_convert_seconds_total", "counter", "Time spent copying and converting results",
+               [((('function', s.name),), s.convert_seconds) for s in stats])
+        metric("openlava_call_records_total", "counter", "Records returned",
+               [((('function', s.name),), s.records) for s in stats])
+        metric("openlava_call_bytes_total", "counter", "Bytes of string and array results returned",
+               [((('function', s.name),), s.bytes) for s in stats])
+        metric("openlava_call_errors_total", "counter", "Failed calls by lsberrno and lserrno",
+               [((('function', s.name), ('lsberrno', e[0]), ('lserrno', e[1])), n)
+                for s in stats for e, n in sorted(s.errors.items())])
+        metric("openlava_call_exceptions_total", "counter", "Exceptions raised by calls",
+               [((('function', s.name), ('exception', e)), n)
+                for s in stats for e, n in sorted(s.exceptions.items())])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write prometheus() to path, replacing the file in one step so readers never see half of it"""
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".openlava")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.prometheus())
+            os.chmod(tmp, 0644)
+            os.rename(tmp, path)
+        except:
+            os.unlink(tmp)
+            raise
+
+
+#totals recorded by the wrappers installed by enable()
+registry = Registry()
+
+_originals = {}
+_enable_lock = threading.Lock()
+
+
+def _wrap(name, func):
+    def wrapper(*args, **kwargs):
+        c_before = getattr(library_errors, 'c_time', 0.0)
+        start = time.time()
+        result = None
+        exception = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except Exception as e:
+            exception = e
+            raise
+        finally:
+            elapsed = time.time() - start
+            c_time = getattr(library_errors, 'c_time', 0.0) - c_before
+            if exception is None:
+                records, size = _measure(result)
+            else:
+                records, size = 0, 0
+            if exception is not None or _failed(name, result):
+                lsberrno = getattr(library_errors, 'lsberrno', 0)
+                lserrno = getattr(library_errors, 'lserrno', 0)
+            else:
+                lsberrno = lserrno = 0
+            registry.record(CallRecord(name, elapsed, c_time, records, size, lsberrno, lserrno, exception))
+    wrapper.__name__ = name
+    wrapper.__doc__ = func.__doc__
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def _functions(module, prefix):
+    for name in dir(module):
+        if name.startswith(prefix) or (module is lsblib and name in EXTRA_FUNCTIONS):
+            func = getattr(module, name)
+            if callable(func) and not isinstance(func, type):
+                yield name, func
+
+
+def enable():
+    """Start recording calls to lsblib and lslib in registry"""
+    with _enable_lock:
+        if _originals:
+            return
+        for module, prefix in ((lsblib, 'lsb_'), (lslib, 'ls_')):
+            for name, func in _functions(module, prefix):
+                _originals[(module, name)] = func
+                setattr(module, name, _wrap(name, func))
+            module._set_timing(True)
+
+
+def disable():
+    """Stop recording, and put back the original functions"""
+    with _enable_lock:
+        for (module, name), func in _originals.items():
+            setattr(module, name, func)
+        _originals.clear()
+        lsblib._set_timing(False)
+        lslib._set_timing(False)
+
+
+def enabled():
+    """True if calls are being recorded"""
+    return bool(_originals)
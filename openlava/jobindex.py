@@ -0,0 +1,365 @@
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+On-disk index of the job records in lsb.events and lsb.acct files, so the history of a
+single job can be found without reading every event file.
+
+The index lives in its own directory.  It holds a small JSON file listing the event files
+that have been indexed, and how far into each one, plus one or more segment files.  Each
+segment is a sorted run of fixed size entries of (jobId, eventTime, file, byte offset,
+array index, event type), which are searched in place through mmap.
+
+Each call to JobIndex.update() reads only the records appended since the last update and
+writes them out as a new segment.  Once there are more than max_segments segments they
+are merged back into one.
+
+Files are tracked by inode, so when openlava rotates lsb.events to lsb.events.1 the
+existing entries follow the file to its new name.
+
+Usage
+-----
+Index the current and rotated event logs, then print the history of a job::
+
+    import glob
+    from openlava.jobindex import JobIndex
+
+    index = JobIndex("/var/cache/openlava/jobindex")
+    index.update(glob.glob("/opt/openlava/work/logdir/lsb.events*") +
+                 glob.glob("/opt/openlava/work/logdir/lsb.acct*"))
+    for rec in index.job_history(4562):
+        print rec.eventTime, rec.type
+
+Members
+-------
+"""
+import collections
+import errno
+import heapq
+import json
+import mmap
+import os
+import struct
+
+from openlava import constants, lsblib
+
+#jobId, eventTime, file number, byte offset, array index, event type, in sort order
+ENTRY = struct.Struct("<iqIqiH")
+
+#event types that refer to a single job
+JOB_EVENT_TYPES = (
+    constants.EVENT_JOB_NEW,
+    constants.EVENT_JOB_START,
+    constants.EVENT_JOB_STATUS,
+    constants.EVENT_JOB_SWITCH,
+    constants.EVENT_JOB_MOVE,
+    constants.EVENT_MBD_UNFULFILL,
+    constants.EVENT_JOB_FINISH,
+    constants.EVENT_CHKPNT,
+    constants.EVENT_MIG,
+    constants.EVENT_PRE_EXEC_START,
+    constants.EVENT_JOB_MODIFY,
+    constants.EVENT_JOB_SIGNAL,
+    constants.EVENT_JOB_EXECUTE,
+    constants.EVENT_JOB_MSG,
+    constants.EVENT_JOB_MSG_ACK,
+    constants.EVENT_JOB_REQUEUE,
+    constants.EVENT_JOB_SIGACT,
+    constants.EVENT_SBD_JOB_STATUS,
+    constants.EVENT_JOB_START_ACCEPT,
+    constants.EVENT_JOB_CLEAN,
+    constants.EVENT_JOB_FORCE,
+    constants.EVENT_JOB_MODIFY2,
+    constants.EVENT_JOB_ATTR_SET,
+)
+
+IndexEntry = collections.namedtuple('IndexEntry',
+                                    ['jobId', 'idx', 'eventTime', 'type', 'path', 'offset'])
+
+STATE_FILE = "index.json"
+STATE_VERSION = 2
+
+
+class StaleIndex(Exception):
+    """Raised when an indexed event file has changed in a way the index cannot follow"""
+    pass
+
+
+class _Segment(object):
+    """A sorted run of index entries, searched in place through mmap"""
+    def __init__(self, path):
+        self.path = path
+        self._fh = open(path, "rb")
+        self._map = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = len(self._map) // ENTRY.size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return ENTRY.unpack_from(self._map, i * ENTRY.size)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def _job_id(self, i):
+        return ENTRY.unpack_from(self._map, i * ENTRY.size)[0]
+
+    def find(self, job_id):
+        """Return all the entries for job_id"""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._job_id(mid) < job_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        entries = []
+        while lo < self._count:
+            entry = self[lo]
+            if entry[0] != job_id:
+                break
+            entries.append(entry)
+            lo += 1
+        return entries
+
+    def close(self):
+        self._map.close()
+        self._fh.close()
+
+
+class JobIndex(object):
+    """openlava.jobindex.JobIndex(index_dir, max_segments=16)
+
+Index of job records by job id over a set of event files.
+
+:param str index_dir: Directory to keep the index in, created if it does not exist
+:param int max_segments: Number of segments to allow before update() merges them
+"""
+    def __init__(self, index_dir, max_segments=16):
+        self.index_dir = index_dir
+        self.max_segments = max_segments
+        if not os.path.isdir(index_dir):
+            os.makedirs(index_dir)
+        self._state = None
+        self._state_mtime = None
+        self._segments = {}
+        self._load()
+
+    def _state_path(self):
+        return os.path.join(self.index_dir, STATE_FILE)
+
+    def _load(self):
+        """(Re)read the list of files and segments if another process has changed it"""
+        try:
+            mtime = os.stat(self._state_path()).st_mtime
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            self._state = {'version': STATE_VERSION, 'files': [], 'segments': [],
+                           'next_file': 0, 'next_segment': 0}
+            return
+        if self._state is not None and mtime == self._state_mtime:
+            return
+
+        with open(self._state_path()) as fh:
+            state = json.load(fh)
+        if state.get('version') != STATE_VERSION:
+            raise StaleIndex("Index in {} has version {}, expected {}".format(
+                self.index_dir, state.get('version'), STATE_VERSION))
+        self._state = state
+        self._state_mtime = mtime
+
+        for name in list(self._segments):
+            if name not in state['segments']:
+                self._segments.pop(name).close()
+
+    def _save(self):
+        tmp = self._state_path() + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump(self._state, fh)
+        os.rename(tmp, self._state_path())
+        self._state_mtime = os.stat(self._state_path()).st_mtime
+
+    def _segment(self, name):
+        if name not in self._segments:
+            self._segments[name] = _Segment(os.path.join(self.index_dir, name))
+        return self._segments[name]
+
+    def _write_segment(self, entries):
+        name = "segment.{:08d}".format(self._state['next_segment'])
+        self._state['next_segment'] += 1
+        path = os.path.join(self.index_dir, name)
+        with open(path + ".tmp", "wb") as fh:
+            for entry in entries:
+                fh.write(ENTRY.pack(*entry))
+        os.rename(path + ".tmp", path)
+        return name
+
+    @property
+    def files(self):
+        """List of dicts describing each indexed file: path, inode, and the offset indexed up to"""
+        self._load()
+        return [dict(f) for f in self._state['files']]
+
+    def update(self, paths, event_types=JOB_EVENT_TYPES):
+        """Index any records appended to the event files since the last update.
+
+Files that have not been seen before are indexed from the start.  Previously indexed files
+that are not in paths are dropped from the index, so paths should include all the rotated
+files that are to remain searchable.
+
+:param list paths: Paths of the lsb.events and lsb.acct files to index
+:param list event_types: Event types to index, defaults to all the job events
+:return: Number of new entries indexed
+:rtype: int
+"""
+        self._load()
+        by_inode = dict((f['inode'], f) for f in self._state['files'])
+        files = []
+        entries = []
+
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                if e.errno == errno.ENOENT:
+                    #rotated away since the caller listed the directory
+                    continue
+                raise
+
+            f = by_inode.pop(st.st_ino, None)
+            if f is None or f['offset'] > st.st_size:
+                #a new file, or one that has been truncated and rewritten
+                f = {'file': self._state['next_file'], 'inode': st.st_ino,
+                     'offset': 0, 'line_number': 0}
+                self._state['next_file'] += 1
+            f['path'] = os.path.abspath(path)
+            files.append(f)
+
+            reader = lsblib.EventLogReader(path, event_types=event_types, offset=f['offset'],
+                                           line_number=f['line_number'], inode=f['inode'])
+            try:
+                for rec in reader:
+                    job_id = rec.jobId
+                    if job_id <= 0:
+                        continue
+                    entries.append((lsblib.get_job_id(job_id), rec.eventTime, f['file'],
+                                    reader.record_offset, lsblib.get_array_index(job_id),
+                                    rec.type))
+                f['offset'] = reader.offset
+                f['line_number'] = reader.line_number
+            finally:
+                reader.close()
+
+        self._state['files'] = files
+        if entries:
+            entries.sort()
+            self._state['segments'].append(self._write_segment(entries))
+        self._save()
+
+        if len(self._state['segments']) > self.max_segments:
+            self.compact()
+        return len(entries)
+
+    def compact(self):
+        """Merge all the segments into one, dropping entries for files no longer indexed"""
+        self._load()
+        old = list(self._state['segments'])
+        live = set(f['file'] for f in self._state['files'])
+
+        merged = heapq.merge(*[iter(self._segment(name)) for name in old])
+        entries = [entry for entry in merged if entry[2] in live]
+        self._state['segments'] = [self._write_segment(entries)] if entries else []
+        self._save()
+
+        for name in old:
+            self._segments.pop(name).close()
+            os.unlink(os.path.join(self.index_dir, name))
+
+    def lookup(self, job_id):
+        """Return the index entries for a job, ordered by eventTime.
+
+If job_id includes an array index only that element is returned, along with the records
+for the array as a whole, otherwise all elements are returned.
+
+:param int job_id: Job id, as returned by lsblib.create_job_id()
+:return: List of IndexEntry tuples
+:rtype: list
+"""
+        self._load()
+        base_id = lsblib.get_job_id(job_id)
+        array_index = lsblib.get_array_index(job_id)
+        paths = dict((f['file'], f['path']) for f in self._state['files'])
+
+        found = []
+        for name in self._state['segments']:
+            for entry in self._segment(name).find(base_id):
+                jid, event_time, file_number, offset, idx, event_type = entry
+                if file_number not in paths:
+                    continue
+                if array_index and idx not in (0, array_index):
+                    continue
+                found.append((event_time, file_number, offset, idx, event_type))
+        found.sort()
+        return [IndexEntry(base_id, idx, event_time, event_type, paths[file_number], offset)
+                for event_time, file_number, offset, idx, event_type in found]
+
+    def job_history(self, job_id):
+        """Returns a generator of the EventRecords for a job, read straight from the indexed offsets.
+
+As with EventLogReader, each record refers to memory that is reused by the next read, so
+take what is needed from each record before moving on.
+
+:param int job_id: Job id, as returned by lsblib.create_job_id()
+:return: Generator of EventRecord objects, ordered by eventTime
+:rtype: generator
+:raises StaleIndex: if an indexed file has been replaced since the last update()
+"""
+        entries = self.lookup(job_id)
+        inodes = dict((f['path'], f['inode']) for f in self._state['files'])
+        base_id = lsblib.get_job_id(job_id)
+        readers = {}
+        try:
+            for entry in entries:
+                reader = readers.get(entry.path)
+                if reader is None:
+                    reader = lsblib.EventLogReader(entry.path)
+                    if reader.inode != inodes[entry.path]:
+                        reader.close()
+                        raise StaleIndex("{} has been rotated since the index was updated".format(
+                            entry.path))
+                    readers[entry.path] = reader
+                reader.seek(entry.offset)
+                try:
+                    rec = next(reader)
+                except StopIteration:
+                    raise StaleIndex("{} is shorter than the index expects".format(entry.path))
+                if lsblib.get_job_id(rec.jobId) != base_id:
+                    raise StaleIndex("Record at {} in {} is not for job {}".format(
+                        entry.offset, entry.path, base_id))
+                yield rec
+        finally:
+            for reader in readers.values():
+                reader.close()
+
+    def close(self):
+        """Unmap all the segments"""
+        for segment in self._segments.values():
+            segment.close()
+        self._segments = {}
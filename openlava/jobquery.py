@@ -0,0 +1,301 @@
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+Indexed queries over a snapshot of the job list.
+
+lsb_openjobinfo() accepts only one of job name, user, queue or host at a time, so
+questions such as "pending jobs for a user in a queue on a host" mean reading every job
+and filtering them in Python.  A JobSnapshot holds the jobs with hash indexes on user,
+queue, submission host, execution host, job name and status, and indexes sorted by
+submission and start time, and answers compound queries from those indexes.
+
+A snapshot can be taken once and queried many times, which suits services answering
+many queries a minute, or select() can be used for a single query.  It sends the most
+selective of the filters that lsb_openjobinfo() understands to the MBD, and evaluates the
+rest locally.
+
+Jobs are dicts with the same keys as JobColumns.row(), so the tables of a
+jobtracker.JobTracker can be queried as well.
+
+Usage
+-----
+Pending jobs of one user in one queue, oldest first::
+
+    from openlava import constants
+    from openlava.jobquery import JobSnapshot
+
+    jobs = JobSnapshot.read()
+    for job in jobs.select(user="irvined", queue="normal", status=constants.JOB_STAT_PEND,
+                           order_by="submitTime", limit=10):
+        print job['jobId']
+
+Members
+-------
+"""
+import bisect
+import heapq
+import itertools
+import operator
+
+from openlava import constants, lsblib
+
+#filter -> job field, for the hash indexes
+INDEXED_FIELDS = {
+    'user': 'user',
+    'queue': 'queue',
+    'from_host': 'fromHost',
+    'host': 'exHosts',
+    'job_name': 'jName',
+    'status': 'status',
+}
+
+#filters that lsb_openjobinfo() accepts, most selective first when there is nothing to go on
+PUSH_DOWN_ORDER = ('job_name', 'host', 'user', 'queue')
+
+#status bits that lsb_openjobinfo() options can select on the MBD
+STATUS_OPTIONS = (
+    (constants.JOB_STAT_PEND, constants.PEND_JOB),
+    (constants.JOB_STAT_RUN, constants.RUN_JOB),
+    (constants.JOB_STAT_PSUSP | constants.JOB_STAT_USUSP | constants.JOB_STAT_SSUSP,
+     constants.SUSP_JOB),
+    (constants.JOB_STAT_DONE | constants.JOB_STAT_EXIT, constants.DONE_JOB),
+)
+
+
+def _values(value):
+    """Filters take one value or a collection of values"""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return value
+    return (value,)
+
+
+def push_down(criteria, snapshot=None):
+    """Choose the arguments of lsb_openjobinfo() or read_jobs() for a query.
+
+The filter expected to match the fewest jobs is passed to the MBD, the others are left to
+JobSnapshot.select().  When an earlier snapshot is given, its indexes are used to estimate
+how many jobs each filter matches, otherwise PUSH_DOWN_ORDER is used.  A status filter is
+also turned into options when it only selects pending, running, suspended or finished jobs.
+
+:param dict criteria: Keyword arguments of JobSnapshot.select()
+:param JobSnapshot snapshot: Earlier snapshot to estimate selectivity from, or None
+:return: Keyword arguments for read_jobs()
+:rtype: dict
+"""
+    candidates = []
+    for name in PUSH_DOWN_ORDER:
+        value = criteria.get(name)
+        #only a single value can be sent to the MBD
+        if value is None or len(_values(value)) != 1:
+            continue
+        value = _values(value)[0]
+        if snapshot is not None:
+            rank = snapshot.estimate(name, value)
+        else:
+            rank = PUSH_DOWN_ORDER.index(name)
+        candidates.append((rank, name, value))
+
+    kwargs = {'options': constants.ALL_JOB}
+    if candidates:
+        rank, name, value = min(candidates)
+        kwargs[name] = value
+
+    status = criteria.get('status')
+    if status is not None:
+        options = 0
+        for bits, option in STATUS_OPTIONS:
+            if status & bits:
+                options |= option
+        covered = reduce(operator.or_, [bits for bits, option in STATUS_OPTIONS if option & options], 0)
+        if options and not status & ~covered:
+            kwargs['options'] = options
+    return kwargs
+
+
+def select(**criteria):
+    """openlava.jobquery.select(**criteria)
+
+Reads the jobs matching the most selective filter that the MBD understands, and returns
+those matching every filter.  Takes the same arguments as JobSnapshot.select().
+
+:return: Matching jobs
+:rtype: list
+"""
+    return JobSnapshot.read(**push_down(criteria)).select(**criteria)
+
+
+class JobSnapshot(object):
+    """openlava.jobquery.JobSnapshot(jobs)
+
+Indexed, read only table of jobs.  Snapshots are not updated, take a new one to see
+changes on the cluster.  The jobs returned by select() are shared with the snapshot,
+treat them as read only.
+
+:param jobs: Dicts with the same keys as JobColumns.row()
+"""
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self._indexes = dict((name, {}) for name in INDEXED_FIELDS)
+        for position, job in enumerate(self.jobs):
+            for name, field in INDEXED_FIELDS.items():
+                index = self._indexes[name]
+                if name == 'host':
+                    #a job may run on the same host several times
+                    for host in set(job.get(field) or ()):
+                        index.setdefault(host, []).append(position)
+                else:
+                    index.setdefault(job[field], []).append(position)
+
+        self._sorted = {}
+        for field in ('submitTime', 'startTime'):
+            order = sorted(range(len(self.jobs)), key=lambda p: self.jobs[p][field])
+            self._sorted[field] = ([self.jobs[p][field] for p in order], order)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Build a snapshot from the JobColumns returned by read_jobs()"""
+        names = lsblib.JobColumns.COLUMNS
+        return cls(dict(itertools.izip(names, values))
+                   for values in itertools.izip(*[columns[name] for name in names]))
+
+    @classmethod
+    def read(cls, job_id=0, job_name="", user="all", queue="", host="", options=constants.ALL_JOB):
+        """Read the jobs from the MBD with read_jobs(), which takes the same arguments"""
+        return cls.from_columns(lsblib.read_jobs(job_id=job_id, job_name=job_name, user=user,
+                                                 queue=queue, host=host, options=options))
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def estimate(self, name, value):
+        """Number of jobs matching a single value of one of the indexed filters"""
+        if name == 'status':
+            return len(self._status_positions(value))
+        return len(self._indexes[name].get(value, ()))
+
+    def values(self, name):
+        """Distinct values of an indexed filter, such as every user with a job"""
+        return list(self._indexes[name])
+
+    def _status_positions(self, mask):
+        positions = []
+        for status, matches in self._indexes['status'].items():
+            if status & mask:
+                positions.extend(matches)
+        return positions
+
+    def _time_positions(self, field, after, before):
+        keys, order = self._sorted[field]
+        start = bisect.bisect_left(keys, after) if after is not None else 0
+        end = bisect.bisect_left(keys, before) if before is not None else len(keys)
+        return order[start:end]
+
+    def select(self, user=None, queue=None, from_host=None, host=None, job_name=None,
+               status=None, submitted_after=None, submitted_before=None, started_after=None,
+               started_before=None, where=None, order_by=None, reverse=False, limit=None):
+        """Returns the jobs matching every filter given.
+
+user, queue, from_host, host and job_name take a single value or a list of values, any of
+which may match.  Times are seconds since the epoch, "after" includes the time given and
+"before" does not.
+
+The filter matching the fewest jobs is read from its index, and the other filters are
+checked against those jobs only.
+
+:param user: Job owner
+:param queue: Queue name
+:param from_host: Submission host
+:param host: Execution host
+:param job_name: Job name
+:param int status: Bitwise or of JOB_STAT_* values, jobs in any of them match
+:param int submitted_after: Earliest submission time
+:param int submitted_before: Latest submission time
+:param int started_after: Earliest start time
+:param int started_before: Latest start time
+:param where: Function called with each remaining job, returning True to keep it
+:param str order_by: Field to sort by, None keeps the order of the snapshot
+:param bool reverse: Sort in descending order
+:param int limit: Maximum number of jobs to return
+:return: Matching jobs
+:rtype: list
+"""
+        sources = []
+        filters = []
+        for name, value in (('user', user), ('queue', queue), ('from_host', from_host),
+                            ('host', host), ('job_name', job_name)):
+            if value is None:
+                continue
+            index = self._indexes[name]
+            values = _values(value)
+            positions = []
+            for v in values:
+                positions.extend(index.get(v, ()))
+            sources.append((len(positions), len(values) > 1, positions))
+            filters.append((INDEXED_FIELDS[name], frozenset(values)))
+        if status is not None:
+            positions = self._status_positions(status)
+            sources.append((len(positions), True, positions))
+        for field, after, before in (('submitTime', submitted_after, submitted_before),
+                                     ('startTime', started_after, started_before)):
+            if after is not None or before is not None:
+                positions = self._time_positions(field, after, before)
+                sources.append((len(positions), True, positions))
+
+        if sources:
+            count, merged, positions = min(sources, key=operator.itemgetter(0))
+            if merged:
+                #a job may match several values, such as two of its execution hosts
+                positions = sorted(set(positions))
+        else:
+            positions = xrange(len(self.jobs))
+
+        jobs = self.jobs
+        result = []
+        for position in positions:
+            job = jobs[position]
+            if status is not None and not job['status'] & status:
+                continue
+            if submitted_after is not None and job['submitTime'] < submitted_after:
+                continue
+            if submitted_before is not None and job['submitTime'] >= submitted_before:
+                continue
+            if started_after is not None and job['startTime'] < started_after:
+                continue
+            if started_before is not None and job['startTime'] >= started_before:
+                continue
+            for field, values in filters:
+                if field == 'exHosts':
+                    if values.isdisjoint(job.get(field) or ()):
+                        break
+                elif job[field] not in values:
+                    break
+            else:
+                if where is None or where(job):
+                    result.append(job)
+                    if limit is not None and order_by is None and not reverse and len(result) >= limit:
+                        break
+
+        if order_by is not None:
+            key = operator.itemgetter(order_by)
+            if limit is not None:
+                select = heapq.nlargest if reverse else heapq.nsmallest
+                return select(limit, result, key=key)
+            result.sort(key=key, reverse=reverse)
+        elif reverse:
+            result.reverse()
+        return result[:limit] if limit is not None else result
@@ -0,0 +1,365 @@
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+A live table of jobs, kept up to date from lsb.events instead of by polling the MBD.
+
+JobTracker reads the full job list once with read_jobs(), then follows lsb.events and
+applies each job event to the table as it is logged.  Every change is numbered, so
+clients can ask for just the jobs that changed since the last version they saw, and
+callbacks can be registered to hear about each change of job status.
+
+Jobs are held as dicts with the same keys as JobColumns.row().  Finished jobs are
+dropped once they have been finished for longer than clean_period, as mbatchd does.  A
+job array has no row of its own: its submission adds a row for each element in the index
+list of its name, and events for the whole array are applied to each element.
+
+Usage
+-----
+Print each job as it starts or finishes::
+
+    from openlava import lsblib
+    from openlava.jobtracker import JobTracker
+
+    def changed(job_id, old_status, new_status, job):
+        print job_id, lsblib.JOB_STATUS_STRINGS.get(new_status)
+
+    tracker = JobTracker("/opt/openlava/work/logdir/lsb.events")
+    tracker.add_callback(changed)
+    tracker.start()
+
+Poll for changes from a web handler::
+
+    version, changes = tracker.changed_since(last_version)
+
+Members
+-------
+"""
+import os
+import re
+import threading
+import time
+
+from openlava import constants, lsblib
+
+#job events applied to the table
+TRACKED_EVENTS = (
+    constants.EVENT_JOB_NEW,
+    constants.EVENT_JOB_START,
+    constants.EVENT_JOB_STATUS,
+    constants.EVENT_JOB_SWITCH,
+    constants.EVENT_JOB_MOVE,
+    constants.EVENT_JOB_MODIFY,
+    constants.EVENT_JOB_MODIFY2,
+    constants.EVENT_JOB_FINISH,
+)
+
+#fields read from each event, missing fields are None
+EVENT_FIELDS = (
+    'type', 'eventTime', 'jobId', 'idx', 'jobIdStr', 'jStatus', 'userName', 'queue',
+    'fromHost', 'jobName', 'submitTime', 'startTime', 'endTime', 'cpuTime', 'exitStatus',
+    'jobPid', 'numExHosts', 'execHosts',
+)
+
+FINISHED = constants.JOB_STAT_DONE | constants.JOB_STAT_EXIT
+
+#the index list at the end of the name of a job array, "name[1-10:2,15]%4"
+_ARRAY_SPEC = re.compile(r"^(.*)\[([-0-9:,]+)\](%\d+)?$")
+
+
+def _parse_job_id(job_id_str):
+    """Turn the jobIdStr of a JobModLog, "1234" or "1234[5]", into a job id"""
+    if "[" in job_id_str:
+        job_id, idx = job_id_str.rstrip("]").split("[", 1)
+        return lsblib.create_job_id(int(job_id), int(idx))
+    return int(job_id_str)
+
+
+def _array_indices(job_name):
+    """Turn the name of a job array, "name[1-10:2,15]", into the name without the index list
+    and the list of element indices, or return None if job_name is not that of an array"""
+    match = _ARRAY_SPEC.match(job_name or u"")
+    if match is None:
+        return None
+    indices = []
+    for part in match.group(2).split(","):
+        bounds, _, step = part.partition(":")
+        first, _, last = bounds.partition("-")
+        try:
+            first = int(first)
+            last = int(last) if last else first
+            step = int(step) if step else 1
+        except ValueError:
+            return None
+        if step < 1:
+            return None
+        indices.extend(range(first, last + 1, step))
+    return match.group(1), sorted(set(indices))
+
+
+class JobTracker(object):
+    """openlava.jobtracker.JobTracker(path, poll_interval=1.0, clean_period=3600)
+
+Job table built from one snapshot of the MBD and kept current from lsb.events.
+
+The table can be updated by calling poll() regularly, or by start(), which polls from a
+background thread.  Callbacks are called from whichever thread polls.
+
+:param str path: Path to lsb.events
+:param float poll_interval: Seconds between checks for new events when started
+:param int clean_period: Seconds to keep finished jobs in the table
+"""
+    def __init__(self, path, poll_interval=1.0, clean_period=3600):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.clean_period = clean_period
+        self.version = 0
+        self._lock = threading.RLock()
+        self._jobs = {}
+        #array job id -> job ids of its elements, as an array has no row of its own
+        self._arrays = {}
+        #job id -> version it last changed at, and for removed jobs (version, time) of removal
+        self._changed = {}
+        self._removed = {}
+        self._callbacks = []
+        self._serializer = lsblib.EventSerializer(EVENT_FIELDS)
+        self._reader = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def snapshot(self):
+        """Load the job table from the MBD, and follow lsb.events from its current end"""
+        #events logged while the snapshot is taken are applied on top of it
+        offset = os.path.getsize(self.path)
+        jobs = lsblib.read_jobs(options=constants.ALL_JOB)
+        with self._lock:
+            old = self._jobs
+            self._jobs = {}
+            self._arrays = {}
+            self.version += 1
+            for i in range(len(jobs)):
+                row = jobs.row(i)
+                self._jobs[row['jobId']] = row
+                self._changed[row['jobId']] = self.version
+                if lsblib.get_array_index(row['jobId']):
+                    self._arrays.setdefault(lsblib.get_job_id(row['jobId']), []).append(row['jobId'])
+            now = time.time()
+            for job_id in old:
+                if job_id not in self._jobs:
+                    del self._changed[job_id]
+                    self._removed[job_id] = (self.version, now)
+            if self._reader is not None:
+                self._reader.close()
+            self._reader = self._open(offset)
+
+    def _open(self, offset):
+        return lsblib.EventLogReader(self.path, event_types=TRACKED_EVENTS, offset=offset)
+
+    def _rotated(self):
+        try:
+            return os.stat(self.path).st_ino != self._reader.inode
+        except OSError:
+            #openlava is in the middle of switching files
+            return False
+
+    def poll(self):
+        """Apply any new events to the table, taking a snapshot first if there is none yet.
+
+:return: Number of events applied
+:rtype: int
+"""
+        if self._reader is None:
+            self.snapshot()
+        transitions = []
+        count = 0
+        with self._lock:
+            while True:
+                events = self._serializer.read(self._reader, 1000)
+                for event in events:
+                    self._apply(event, transitions)
+                count += len(events)
+                if events:
+                    continue
+                if not self._rotated():
+                    break
+                self._reader.close()
+                self._reader = self._open(0)
+            self._clean(transitions)
+
+        for transition in transitions:
+            for callback in list(self._callbacks):
+                callback(*transition)
+        return count
+
+    def _touch(self, job_id, job, old_status, transitions):
+        self.version += 1
+        self._changed[job_id] = self.version
+        self._removed.pop(job_id, None)
+        if job['status'] != old_status:
+            transitions.append((job_id, old_status, job['status'], dict(job)))
+
+    def _new_row(self, job_id, event, job_name):
+        return {
+            'jobId': job_id, 'status': constants.JOB_STAT_PEND,
+            'submitTime': event['submitTime'] or event['eventTime'], 'startTime': 0,
+            'endTime': 0, 'cpuTime': 0.0, 'exitStatus': 0, 'jobPid': 0, 'numExHosts': 0,
+            'user': event['userName'] or u"", 'queue': event['queue'] or u"",
+            'fromHost': event['fromHost'] or u"", 'jName': job_name or u"",
+            'exHosts': (),
+        }
+
+    def _apply(self, event, transitions):
+        event_type = event['type']
+        if event_type in (constants.EVENT_JOB_MODIFY, constants.EVENT_JOB_MODIFY2):
+            job_id = _parse_job_id(event['jobIdStr'])
+        else:
+            job_id = lsblib.create_job_id(event['jobId'], event['idx'] or 0)
+
+        if event_type == constants.EVENT_JOB_NEW:
+            array = _array_indices(event['jobName']) if job_id == event['jobId'] else None
+            if array is None:
+                rows = [(job_id, event['jobName'])]
+            else:
+                #an array is tracked as its elements, named as bjobs names them
+                name, indices = array
+                rows = [(lsblib.create_job_id(job_id, i), u"%s[%d]" % (name, i)) for i in indices]
+                self._arrays[job_id] = [element_id for element_id, element_name in rows]
+            for element_id, element_name in rows:
+                if element_id not in self._jobs:
+                    job = self._jobs[element_id] = self._new_row(element_id, event, element_name)
+                    self._touch(element_id, job, None, transitions)
+            return
+
+        if job_id in self._jobs:
+            self._update(job_id, event, transitions)
+        else:
+            #events for a whole array apply to each of its elements
+            for element_id in self._arrays.get(job_id, ()):
+                if element_id in self._jobs:
+                    self._update(element_id, event, transitions)
+
+    def _update(self, job_id, event, transitions):
+        event_type = event['type']
+        job = self._jobs[job_id]
+        old_status = job['status']
+        if event_type == constants.EVENT_JOB_START:
+            job['status'] = event['jStatus']
+            job['startTime'] = event['eventTime']
+            job['jobPid'] = event['jobPid']
+            job['numExHosts'] = event['numExHosts']
+            job['exHosts'] = tuple(event['execHosts'] or ())
+        elif event_type in (constants.EVENT_JOB_STATUS, constants.EVENT_JOB_FINISH):
+            job['status'] = event['jStatus']
+            job['cpuTime'] = event['cpuTime']
+            job['exitStatus'] = event['exitStatus']
+            if event['endTime']:
+                job['endTime'] = event['endTime']
+            elif job['status'] & FINISHED:
+                job['endTime'] = event['eventTime']
+            if event['startTime']:
+                job['startTime'] = event['startTime']
+        elif event_type == constants.EVENT_JOB_SWITCH:
+            job['queue'] = event['queue']
+        elif event_type == constants.EVENT_JOB_MOVE:
+            #the position in the queue is not part of the table, but the job has changed
+            pass
+        else:
+            if event['queue']:
+                job['queue'] = event['queue']
+            if event['jobName']:
+                job['jName'] = event['jobName']
+        self._touch(job_id, job, old_status, transitions)
+
+    def _clean(self, transitions):
+        if not self.clean_period:
+            return
+        now = time.time()
+        cutoff = now - self.clean_period
+        for job_id, job in list(self._jobs.items()):
+            if job['status'] & FINISHED and 0 < job['endTime'] < cutoff:
+                del self._jobs[job_id]
+                del self._changed[job_id]
+                self.version += 1
+                self._removed[job_id] = (self.version, now)
+        for array_id, element_ids in list(self._arrays.items()):
+            if not any(element_id in self._jobs for element_id in element_ids):
+                del self._arrays[array_id]
+        #clients are not expected to lag by more than clean_period
+        for job_id, (v, removed) in list(self._removed.items()):
+            if removed < cutoff:
+                del self._removed[job_id]
+
+    def job(self, job_id):
+        """Returns a copy of a job in the table, or None if it is not there"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    @property
+    def jobs(self):
+        """Copy of the whole table, as a dict of job id -> job"""
+        with self._lock:
+            return dict((job_id, dict(job)) for job_id, job in self._jobs.items())
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def changed_since(self, version):
+        """Returns the jobs that have changed since version.
+
+:param int version: A version returned by an earlier call, or 0 for every job
+:return: The current version, and a dict of job id -> job for each changed job, or None for jobs that have been removed
+:rtype: tuple
+"""
+        with self._lock:
+            changes = dict((job_id, dict(self._jobs[job_id]))
+                           for job_id, v in self._changed.items() if v > version)
+            for job_id, (v, removed) in self._removed.items():
+                if v > version:
+                    changes[job_id] = None
+            return self.version, changes
+
+    def add_callback(self, callback):
+        """Call callback(job_id, old_status, new_status, job) whenever a job changes status, old_status is None for new jobs"""
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """Stop calling a callback added with add_callback()"""
+        self._callbacks.remove(callback)
+
+    def start(self):
+        """Take a snapshot, then keep the table up to date from a background thread"""
+        self.snapshot()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="openlava-job-tracker")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.poll()
+            self._stop_event.wait(self.poll_interval)
+
+    def stop(self):
+        """Stop the background thread and close lsb.events"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+        self._thread = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
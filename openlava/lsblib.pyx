@@ -59,6 +59,22 @@ unsupported in python.  Instead use len(returned_array).
     Attributes and methods are lazy, that is to say that data is only copied and returned from the underlying struct when
     accessed by the python code.  As such, be careful when creating lists of jobs from readjobinfo() calls.
 
+Threads
+-------
+Calls that wait for the MBD or read from a file release the GIL, so other Python
+threads carry on running while one thread is blocked in openlava.  The openlava
+libraries are not thread safe themselves, so every call into them is made while
+holding openlava.utils.library_lock; threads waiting for the lock do not hold the GIL.
+
+* get_lsberrno(), lsb_perror() and lsb_sysmsg() report the error from the last call
+  made by the calling thread.
+* The job cursor belongs to the thread that opened it.  lsb_openjobinfo() in any other
+  thread waits until the owner calls lsb_closejobinfo().
+* Objects that point into openlava's buffers, such as the results of lsb_hostinfo(),
+  lsb_queueinfo(), lsb_userinfo() and the records returned by EventLogReader, are
+  overwritten by the next call of the same function from any thread.  Take a copy of
+  the data that is needed, or hold library_lock while using them.
+
 Members
 -------
 """
@@ -71,34 +87,233 @@ from lstypes cimport LS_LONG_INT, LS_UNS_LONG_INT
 
 from traceback import print_stack
 from libc.stdlib cimport realloc, malloc, calloc, free
-from libc.string cimport strcmp, memset, strcpy, strdup, memcpy
+from libc.string cimport strcmp, memset, strcpy, strdup, memcpy, strlen
+from libc.stdio cimport fseek, ftell, feof, clearerr, SEEK_SET
 from cpython.string cimport PyString_AsString
 from cpython cimport bool
+from cpython.ref cimport PyObject
+from cpython cimport array
+import array
 import time
 import os
+import random
 import threading
 import contextlib
+from posix.time cimport clock_gettime, timespec, CLOCK_MONOTONIC
+from openlava.utils import library_lock, library_errors
 
 #import lsconstants
 #raise Exception("{}".format(lsconstants.__dict__))
 
-lock = threading.Lock()
+#kept for backwards compatibility, this is the lock shared with lslib
+lock = library_lock
 
 cdef extern from "Python.h":
     ctypedef struct FILE
     FILE* PyFile_AsFile(object)
     void fprintf(FILE* f, char* s, char* s)
 
+#the process environment as seen by C, swapped for the duration of lsb_submit()
+cdef extern from *:
+    """
+    extern char **environ;
+    """
+    char ** environ
+
 cdef extern from "fileobject.h":
     ctypedef class __builtin__.file [object PyFileObject]:
         pass
 
-_OPENJOBINFO_COUNT = False
+include "packing.pxi"
+
 CONN_RESET_BY_PEER = 104 #from the c errno.h
 
+#event types are small integers, EventLogReader keeps a flag for each
+DEF EVENT_TYPE_SLOTS = 64
+
+#incremented whenever openlava frees the jobInfoEnt returned by lsb_readjobinfo,
+#so JobInfoView objects know when their pointers are no longer valid
+cdef unsigned long _jobinfo_generation = 0
+
+#status codes that status_as_str() knows about, we don't do ZOMBI here
+#job->reasons & EXIT_ZOMBIE is ZOMBI
+JOB_STATUS_STRINGS = {
+    JOB_STAT_NULL:  "NULL",
+    JOB_STAT_PEND:  "PEND",
+    JOB_STAT_PSUSP: "PSUSP",
+    JOB_STAT_RUN:   "RUN",
+    JOB_STAT_RUN|JOB_STAT_WAIT: "WAIT",
+    JOB_STAT_SSUSP: "SSUSP",
+    JOB_STAT_USUSP: "USUSP",
+    JOB_STAT_EXIT:  "EXIT",
+    JOB_STAT_DONE:  "DONE",
+    JOB_STAT_DONE|JOB_STAT_PDONE: "DONE",
+    JOB_STAT_DONE|JOB_STAT_WAIT: "DONE",
+    JOB_STAT_DONE|JOB_STAT_PERR: "DONE",
+    JOB_STAT_UNKWN: "UNKNWN"
+}
+
 class ConnectionResetByPeer(Exception):
     pass
 
+class SubmitError(Exception):
+    """A job in a call to lsb_submit_many() that was not submitted.
+
+    index is the position of the job in the list passed to lsb_submit_many(), lsberrno the
+    error code returned by the MBD, and reply the SubmitReply for the job.
+    """
+    def __init__(self, index, lsberrno, message, reply):
+        Exception.__init__(self, "Job {} not submitted: {}".format(index, message))
+        self.index = index
+        self.lsberrno = lsberrno
+        self.reply = reply
+
+#the thread that has the job cursor open, see lsb_openjobinfo()
+_cursor = threading.Condition(threading.Lock())
+_cursor_owner = None
+
+cdef _save_errors():
+    """Remember the error codes of the last call for this thread, call while holding library_lock"""
+    library_errors.lsberrno = lsberrno
+    library_errors.lserrno = lserrno
+
+cdef _restore_errors():
+    """Put back this thread's error codes before asking openlava to describe them"""
+    global lsberrno, lserrno
+    lsberrno = getattr(library_errors, 'lsberrno', lsberrno)
+    lserrno = getattr(library_errors, 'lserrno', lserrno)
+
+#set by openlava.instrument, while on the time spent in liblsbatch is added to library_errors.c_time
+cdef bint _timing = False
+cdef timespec _c_started
+
+cdef inline void _c_start():
+    if _timing:
+        clock_gettime(CLOCK_MONOTONIC, &_c_started)
+
+cdef inline _c_stop():
+    cdef timespec now
+    if _timing:
+        clock_gettime(CLOCK_MONOTONIC, &now)
+        library_errors.c_time = (getattr(library_errors, 'c_time', 0.0) + (now.tv_sec - _c_started.tv_sec) +
+                                 (now.tv_nsec - _c_started.tv_nsec) * 1e-9)
+
+def _set_timing(enabled):
+    """Turn the timing of calls into liblsbatch on or off, used by openlava.instrument"""
+    global _timing
+    _timing = enabled
+
+#set by openlava.allocations, or at import by OPENLAVA_TRACK_ALLOCATIONS.  While on, each
+#object that owns native memory is kept in _live, keyed by its address and without a
+#reference, from creation until it is deallocated
+cdef bint _tracking = bool(os.environ.get("OPENLAVA_TRACK_ALLOCATIONS"))
+cdef dict _live = {}
+#type name -> [objects created, objects deallocated] while tracking
+cdef dict _alloc_totals = {}
+
+cdef _track(object obj, name):
+    """Start counting the native memory owned by obj"""
+    if not _tracking:
+        return
+    _live[<Py_ssize_t><PyObject *>obj] = name
+    totals = _alloc_totals.get(name)
+    if totals is None:
+        totals = _alloc_totals[name] = [0, 0]
+    totals[0] += 1
+
+cdef _untrack(object obj):
+    """Stop counting obj, called first thing in __dealloc__.  Never raises, so the memory
+    obj owns is always freed after it."""
+    if not _live:
+        return
+    try:
+        name = _live.pop(<Py_ssize_t><PyObject *>obj, None)
+        if name is not None:
+            _alloc_totals.setdefault(name, [0, 0])[1] += 1
+    except Exception:
+        pass
+
+cdef inline Py_ssize_t _string_bytes(char * s):
+    return strlen(s) + 1 if s is not NULL else 0
+
+cdef Py_ssize_t _submit_bytes(submit * s):
+    """Heap memory hanging off a submit struct, not counting the struct itself"""
+    cdef Py_ssize_t size = 0
+    cdef int i
+    size += (_string_bytes(s.jobName) + _string_bytes(s.queue) + _string_bytes(s.resReq) +
+             _string_bytes(s.hostSpec) + _string_bytes(s.dependCond) + _string_bytes(s.inFile) +
+             _string_bytes(s.outFile) + _string_bytes(s.errFile) + _string_bytes(s.command) +
+             _string_bytes(s.newCommand) + _string_bytes(s.chkpntDir) +
+             _string_bytes(s.preExecCmd) + _string_bytes(s.mailUser) +
+             _string_bytes(s.projectName) + _string_bytes(s.loginShell))
+    if s.askedHosts is not NULL:
+        size += max(s.numAskedHosts, 1) * sizeof(char *)
+        for i in range(s.numAskedHosts):
+            size += _string_bytes(s.askedHosts[i])
+    if s.xf is not NULL:
+        size += s.nxf * sizeof(xFile)
+    return size
+
+cdef Py_ssize_t _jrusage_bytes(jRusage * jr):
+    """Heap memory hanging off a jRusage struct, not counting the struct itself"""
+    cdef Py_ssize_t size = 0
+    if jr.pgid is not NULL:
+        size += jr.npgids * sizeof(int)
+    if jr.pidInfo is not NULL:
+        size += jr.npids * sizeof(pidInfo)
+    return size
+
+cdef Py_ssize_t _jobinfo_bytes(jobInfoEnt * j):
+    """Heap memory owned by a jobInfoEnt copied with JobInfoEnt.copy(), including the struct"""
+    cdef Py_ssize_t size = sizeof(jobInfoEnt)
+    cdef int i
+    size += (_string_bytes(j.user) + _string_bytes(j.cwd) + _string_bytes(j.subHomeDir) +
+             _string_bytes(j.fromHost) + _string_bytes(j.execHome) + _string_bytes(j.execCwd) +
+             _string_bytes(j.execUsername) + _string_bytes(j.parentGroup) +
+             _string_bytes(j.jName))
+    if j.exHosts is not NULL:
+        size += j.numExHosts * sizeof(char *)
+        for i in range(j.numExHosts):
+            size += _string_bytes(j.exHosts[i])
+    if j.reasonTb is not NULL:
+        size += j.numReasons * sizeof(int)
+    if j.loadSched is not NULL:
+        size += j.nIdx * sizeof(float)
+    if j.loadStop is not NULL:
+        size += j.nIdx * sizeof(float)
+    return size + _submit_bytes(&j.submit) + _jrusage_bytes(&j.runRusage)
+
+def _set_tracking(enabled):
+    """Turn allocation tracking on or off, used by openlava.allocations.  Objects created
+    while tracking was on are forgotten when it is turned off."""
+    global _tracking
+    _tracking = enabled
+    if not enabled:
+        _live.clear()
+
+def _tracking_enabled():
+    """True while allocation tracking is on"""
+    return _tracking
+
+def _reset_allocations():
+    """Forget the numbers of objects created and deallocated, live objects are still counted"""
+    _alloc_totals.clear()
+    for name in _live.itervalues():
+        _alloc_totals[name] = [0, 0]
+
+def _allocations():
+    """Dict of type name -> (live objects, live bytes, created, deallocated), used by openlava.allocations"""
+    cdef dict result = {}
+    cdef Py_ssize_t address
+    for name, totals in _alloc_totals.items():
+        result[name] = [0, 0, totals[0], totals[1]]
+    for address, name in _live.items():
+        obj = <object><PyObject *>address
+        entry = result.setdefault(name, [0, 0, 0, 0])
+        entry[0] += 1
+        entry[1] += _owned_bytes(obj)
+    return dict((name, tuple(entry)) for name, entry in result.items())
+
 cdef char * string_copy(char * dest, src_p, free_dest=True):
     """
     Copy the string contents from a python string onto the heap and return a pointer to it
@@ -120,8 +335,9 @@ cdef char * string_copy(char * dest, src_p, free_dest=True):
     return new
 
 cpdef char * return_string(char * string):
+    #returning <bytes>string would hand back the buffer of a temporary object
     if string is not NULL:
-        return <bytes>string
+        return string
     else:
         return ""
 
@@ -156,6 +372,55 @@ def set_env(environment):
         os.environ.update(old_environ)
 
 
+cdef class Environment:
+    """openlava.lsblib.Environment(variables)
+
+    A job environment built once as a C environment block, which lsb_submit() hands to
+    openlava by swapping the environ pointer for the duration of the call.  Unlike set_env(),
+    os.environ is never modified, so the cost of a submission does not grow with the size
+    of the environment.
+
+    Submit objects build one from their environment dict when they are created, pass an
+    Environment instead to share one block between many jobs.
+
+    :param dict variables: Environment variables for the job, values are converted to str
+    """
+    cdef char ** _block
+    cdef readonly dict variables
+
+    def __cinit__(self, variables):
+        cdef int i = 0
+        self.variables = dict((str(k), str(v)) for k, v in variables.items())
+        self._block = <char **>calloc(len(self.variables) + 1, sizeof(char *))
+        if self._block is NULL:
+            raise MemoryError("Could not allocate memory for environment")
+        for key, value in self.variables.items():
+            self._block[i] = string_copy(NULL, "{}={}".format(key, value), free_dest=False)
+            i += 1
+        _track(self, "Environment")
+
+    def __dealloc__(self):
+        cdef int i = 0
+        _untrack(self)
+        if self._block is NULL:
+            return
+        while self._block[i] is not NULL:
+            free(self._block[i])
+            i += 1
+        free(self._block)
+
+    def __len__(self):
+        return len(self.variables)
+
+    cdef Py_ssize_t _native_bytes(self):
+        cdef Py_ssize_t size = (len(self.variables) + 1) * sizeof(char *)
+        cdef int i = 0
+        while self._block[i] is not NULL:
+            size += _string_bytes(self._block[i])
+            i += 1
+        return size
+
+
 def create_job_id(job_id, array_index):
     """openlava.lsblib.create_job_id(job_id, array_index)
 
@@ -374,11 +639,13 @@ Returns the lsberrno
     u'User permission denied'
     >>>
 
+Thread safety: returns the lsberrno left by the last lsblib call made in the calling thread.
+
 """
-    return lsberrno
+    return getattr(library_errors, 'lsberrno', lsberrno)
 
 cdef char ** to_cstring_array(list_str):
-    cdef char **ret = <char **>malloc(len(list_str) * sizeof(char *))
+    cdef char **ret = <char **>malloc(max(len(list_str), 1) * sizeof(char *))
     if ret==NULL:
         raise MemoryError()
     for i in xrange(len(list_str)):
@@ -386,7 +653,7 @@ cdef char ** to_cstring_array(list_str):
     return ret
 
 cdef int * to_int_array(list_int):
-    cdef int *ret=<int *>malloc(sizeof(int) * len(list_int))
+    cdef int *ret=<int *>malloc(sizeof(int) * max(len(list_int), 1))
     if ret==NULL:
         raise MemoryError()
     for i in range(len(list_int)):
@@ -394,7 +661,7 @@ cdef int * to_int_array(list_int):
     return ret
 
 cdef LS_LONG_INT * to_ls_long_int_array(list_int):
-    cdef LS_LONG_INT *ret=<LS_LONG_INT *>malloc(sizeof(LS_LONG_INT) * len(list_int))
+    cdef LS_LONG_INT *ret=<LS_LONG_INT *>malloc(sizeof(LS_LONG_INT) * max(len(list_int), 1))
     if ret==NULL:
         raise MemoryError()
     for i in range(len(list_int)):
@@ -416,10 +683,23 @@ Closes the connection to the MBD that was opened with lsb_openjobinfo()
     4562
     >>> lsblib.lsb_closejobinfo()
 
+Thread safety: only the thread that opened the cursor can close it, calls from any other
+thread while the cursor is open are ignored.  Closing the cursor wakes up any threads
+waiting in lsb_openjobinfo().
+
 """
-    global _OPENJOBINFO_COUNT
-    _OPENJOBINFO_COUNT = False
-    lsmethods.lsb_closejobinfo()
+    global _jobinfo_generation, _cursor_owner
+    with _cursor:
+        if _cursor_owner is not None and _cursor_owner is not threading.current_thread():
+            return
+        with library_lock:
+            _jobinfo_generation += 1
+            _c_start()
+            with nogil:
+                lsmethods.lsb_closejobinfo()
+            _c_stop()
+        _cursor_owner = None
+        _cursor.notify_all()
 
 def lsb_deletejob(job_id, submit_time, options=0):
     """openlava.lsblib.lsb_deletejob(job_id, submit_time, [options=0])
@@ -445,8 +725,20 @@ Removes a job from the schedluing system.  If the job is running it is killed.
     -1
     >>> lsblib.lsb_closejobinfo()
 
+Thread safety: releases the GIL while waiting for the MBD.
+
 """
-    return lsmethods.lsb_deletejob(job_id, submit_time, options)
+    cdef LS_LONG_INT c_job_id = job_id
+    cdef int c_submit_time = submit_time
+    cdef int c_options = options
+    cdef int ret
+    with library_lock:
+        _c_start()
+        with nogil:
+            ret = lsmethods.lsb_deletejob(c_job_id, c_submit_time, c_options)
+        _c_stop()
+        _save_errors()
+    return ret
 
 def lsb_geteventrec(fh, line_number):
     """
@@ -454,13 +746,21 @@ def lsb_geteventrec(fh, line_number):
     :param fh: Open file handle to log file
     :param line_number: line number of file
     :return: eventRec object
+
+    Thread safety: releases the GIL while reading.  The record is overwritten by the next
+    call from any thread, or by any EventLogReader.
     """
     cdef eventRec * er
     cdef int ln
     ln=line_number
     cdef FILE * cfh
     cfh=PyFile_AsFile(fh)
-    er = lsmethods.lsb_geteventrec(cfh, &ln)
+    with library_lock:
+        _c_start()
+        with nogil:
+            er = lsmethods.lsb_geteventrec(cfh, &ln)
+        _c_stop()
+        _save_errors()
     if er == NULL:
         return None
     rec = EventRecord()
@@ -484,11 +784,20 @@ Opens or closes a host, shutsdown or restarts SBD.
     >>> lsblib.lsb_hostcontrol("localhost", lsblib.HOST_OPEN)
     -1
 
-"""
+Thread safety: releases the GIL while waiting for the MBD.
 
-    opCode=int(opCode)
+"""
+    cdef int c_op_code = int(opCode)
+    cdef int ret
     host=str(host)
-    return lsmethods.lsb_hostcontrol(host, opCode)
+    cdef char * c_host = host
+    with library_lock:
+        _c_start()
+        with nogil:
+            ret = lsmethods.lsb_hostcontrol(c_host, c_op_code)
+        _c_stop()
+        _save_errors()
+    return ret
 
 def lsb_hostinfo(hosts=[], numHosts=0):
     """openlava.lsblib.lsb_hostinfo(hosts=[], numHosts=0)
@@ -519,6 +828,9 @@ Returns information about Openlava hosts.
     ...
     master
 
+Thread safety: releases the GIL while waiting for the MBD.  The returned objects point
+into a buffer that is reused by the next call to lsb_hostinfo() from any thread.
+
 """
     assert(isinstance(hosts,list))
     cdef int num_hosts
@@ -534,7 +846,15 @@ Returns information about Openlava hosts.
     cdef hostInfoEnt *host_info
     cdef hostInfoEnt *h
 
-    host_info=lsmethods.lsb_hostinfo(host_list, &num_hosts)
+    try:
+        with library_lock:
+            _c_start()
+            with nogil:
+                host_info=lsmethods.lsb_hostinfo(host_list, &num_hosts)
+            _c_stop()
+            _save_errors()
+    finally:
+        free(host_list)
     if host_info==NULL:
         return None
 
@@ -561,8 +881,19 @@ Initialize the lsb library
     >>> lsblib.lsb_init("testing")
     0
 
+Thread safety: may be called from any thread, the library is initialised once per process.
+
 """
-    return lsmethods.lsb_init(appName)
+    cdef int ret
+    appName = str(appName)
+    cdef char * c_app_name = appName
+    with library_lock:
+        _c_start()
+        with nogil:
+            ret = lsmethods.lsb_init(c_app_name)
+        _c_stop()
+        _save_errors()
+    return ret
 
 def lsb_modify(jobSubReq, jobSubReply, jobId):
     """openlava.lsblib.lsb_modify(jobSubReq, jobSubReply, jobId)
@@ -573,6 +904,8 @@ Modifies an existing job
 :param int jobId: Job ID
 :return: Job ID, -1 on failure.
 :rtype: int
+
+Thread safety: releases the GIL while waiting for the MBD.
 """
     assert(isinstance(jobSubReq, Submit))
     assert(isinstance(jobSubReply,SubmitReply))
@@ -605,36 +938,68 @@ Get information about jobs that match the specified criteria.
     4562
     >>> lsblib.lsb_closejobinfo()
 
+Thread safety: openlava has a single job cursor, which belongs to the thread that opens
+it until that thread calls lsb_closejobinfo().  If another thread has the cursor open
+this call waits for it to be closed, releasing the GIL while it waits and while waiting
+for the MBD.  If the owning thread exits without closing the cursor it is taken over.
 
 """
-    global _OPENJOBINFO_COUNT
-    if _OPENJOBINFO_COUNT:
-        print_stack()
-        raise Exception("closejobinfo has not been called after previous openjobinfo call")
-    _OPENJOBINFO_COUNT = True
+    global _cursor_owner
     cdef jobInfoHead * job_info_head
-    #numJobs=lsmethods.lsb_openjobinfo(job_id,job_name,user,queue,host,options)
-    #return numJobs
-    job_info_head = lsmethods.lsb_openjobinfo_a(job_id, job_name, user, queue, host, options)
-    cdef int errno = lserrno #save errno before it gets changed
+    cdef long c_job_id = job_id
+    cdef int c_options = options
+    job_name = str(job_name)
+    user = str(user)
+    queue = str(queue)
+    host = str(host)
+    cdef char * c_job_name = job_name
+    cdef char * c_user = user
+    cdef char * c_queue = queue
+    cdef char * c_host = host
+    cdef int errno
+    cdef int c_lsberrno
+
+    me = threading.current_thread()
+    with _cursor:
+        if _cursor_owner is me:
+            print_stack()
+            raise Exception("closejobinfo has not been called after previous openjobinfo call")
+        while _cursor_owner is not None and _cursor_owner.is_alive():
+            _cursor.wait(1.0)
+        _cursor_owner = me
+
+    with library_lock:
+        #numJobs=lsmethods.lsb_openjobinfo(job_id,job_name,user,queue,host,options)
+        #return numJobs
+        _c_start()
+        with nogil:
+            job_info_head = lsmethods.lsb_openjobinfo_a(c_job_id, c_job_name, c_user, c_queue,
+                                                         c_host, c_options)
+        _c_stop()
+        errno = lserrno #save errno before it gets changed
+        c_lsberrno = lsberrno
+        _save_errors()
     if job_info_head is not NULL:
         #theres other stuff in  here we might want
         return job_info_head.numJobs
 
-    if lsberrno == LSBE_NO_JOB:
+    if c_lsberrno == LSBE_NO_JOB:
         return 0
 
+    #the cursor was not opened, so let the next call open it rather than wait for a close
+    lsb_closejobinfo()
+
     #there was an error of some kind, we will raise a specific error if it is connection
     #reset by peer as that seems to happen a lot and it isn't really fatal
 
     #for some reason after a connection reset by peer we get an errno of 2,
     #need to track that down and find out where that's getting set before we reach here.
     #will hack this in for now
-    if lsberrno == LSBE_LSLIB and errno in [CONN_RESET_BY_PEER, 2]:
+    if c_lsberrno == LSBE_LSLIB and errno in [CONN_RESET_BY_PEER, 2]:
         raise ConnectionResetByPeer()
 
     lsb_perror("lsb_openjobinfo_a")
-    raise Exception("Error calling lsb_openjobinfo_a: lsberrno {} (lserrno {})".format(lsberrno, errno))
+    raise Exception("Error calling lsb_openjobinfo_a: lsberrno {} (lserrno {})".format(c_lsberrno, errno))
 
 def lsb_pendreason (numReasons, rsTb, jInfoH, ld):
     """openlava.lsblib.lsb_pendreason(numReasons, rsTb, jInfoH, ld)
@@ -659,27 +1024,103 @@ Get the reason a job is pending
     ...                 print "Job %d: %s" % (job.jobId, lsblib.lsb_pendreason(job.numReasons, job.reasonTb, None, ld))
     ...
 
+Thread safety: the result is copied before the library lock is released.
 
 """
-    cdef int * reasonsTb
-    reasonsTb=to_int_array(rsTb)
+    cdef int * reasonsTb = NULL
     cdef jobInfoHead jInfo
-
-    if jInfoH != None:
-        jInfo.jobIds=NULL
-        jInfo.hostNames=NULL
-        jInfo.numJobs=jInfoH.numJobs
-        jInfo.jobIds=to_ls_long_int_array(jInfoH.hobIds)
-        jInfo.numHosts=jInfoH.numHosts
-        jInfo.hostNames=to_cstring_array(jInfoH.hostNames)
+    cdef jobInfoHead * jInfoP = NULL
     cdef loadIndexLog loadIndex
-    loadIndex.nIdx=ld.nIdx
-    loadIndex.name=to_cstring_array(ld.name)
-    reasons=lsmethods.lsb_pendreason(numReasons, reasonsTb, &jInfo, &loadIndex)
-    if jInfoH != None:
+    cdef char * reasons
+    #the C arrays point into these strings, so keep them alive until the call is done
+    host_names = [str(h) for h in jInfoH.hostNames] if jInfoH is not None else []
+    index_names = [str(n) for n in ld.name]
+
+    jInfo.jobIds = NULL
+    jInfo.hostNames = NULL
+    loadIndex.name = NULL
+    try:
+        reasonsTb = to_int_array(rsTb)
+        if jInfoH is not None:
+            jInfo.numJobs = jInfoH.numJobs
+            jInfo.jobIds = to_ls_long_int_array(jInfoH.jobIds)
+            jInfo.numHosts = jInfoH.numHosts
+            jInfo.hostNames = to_cstring_array(host_names)
+            jInfoP = &jInfo
+        loadIndex.nIdx = len(index_names)
+        loadIndex.name = to_cstring_array(index_names)
+        with library_lock:
+            reasons = lsmethods.lsb_pendreason(numReasons, reasonsTb, jInfoP, &loadIndex)
+            return u"%s" % reasons
+    finally:
+        free(reasonsTb)
         free(jInfo.jobIds)
         free(jInfo.hostNames)
-    return u"%s" % reasons
+        free(loadIndex.name)
+
+def pending_reasons(jobs, ld=None):
+    """openlava.lsblib.pending_reasons(jobs, ld=None)
+
+Decodes the pending reasons of many jobs at once.  Jobs often share the same reasons, so
+each distinct reason table is decoded only once, and the text reused for every job that has
+it.
+
+As well as the text for each job, returns a histogram of the individual reasons, counting
+the jobs pending for each, which answers why a queue is not moving.
+
+:param list jobs: JobInfoEnt objects, as returned by lsb_readjobinfo() or lsb_jobinfo_many()
+:param LoadIndexLog ld: LoadIndexLog naming the load indices, or None
+:return: Dict of job id -> reason text, and dict of reason -> number of jobs
+:rtype: tuple
+
+::
+
+    >>> from openlava import lsblib
+    >>> lsblib.lsb_init("testing")
+    0
+    >>> jobs = [j for j in lsblib.lsb_jobinfo_many([4562, 4563]).values() if j.status == "PEND"]
+    >>> reasons, histogram = lsblib.pending_reasons(jobs)
+    >>> histogram
+    {u'New job is waiting for scheduling;': 2}
+
+Thread safety: the library lock is held while the distinct tables are decoded.
+
+"""
+    cdef loadIndexLog loadIndex
+    cdef int * reasonsTb = NULL
+    cdef int num_reasons
+    cdef char * reasons
+    cdef dict memo = {}
+    cdef dict by_job = {}
+    cdef dict histogram = {}
+    index_names = [str(n) for n in ld.name] if ld is not None else []
+
+    for job in jobs:
+        table = tuple(job.reasonTb)
+        memo.setdefault(table, []).append(job.jobId)
+
+    loadIndex.nIdx = len(index_names)
+    loadIndex.name = to_cstring_array(index_names)
+    try:
+        for table, job_ids in memo.items():
+            num_reasons = len(table)
+            reasonsTb = to_int_array(table)
+            try:
+                with library_lock:
+                    reasons = lsmethods.lsb_pendreason(num_reasons, reasonsTb, NULL, &loadIndex)
+                    text = u"%s" % reasons
+            finally:
+                free(reasonsTb)
+                reasonsTb = NULL
+            for job_id in job_ids:
+                by_job[job_id] = text
+            for line in text.splitlines():
+                line = line.strip()
+                if line:
+                    histogram[line] = histogram.get(line, 0) + len(job_ids)
+    finally:
+        free(loadIndex.name)
+    return by_job, histogram
 
 def lsb_peekjob(jobId):
     """
@@ -704,14 +1145,21 @@ Get the name of the file where job output is being spooled.
     Job: 4562: /home/brian/.lsbatch/1390404552.4562
     >>>
 
+Thread safety: releases the GIL while waiting for the MBD.
+
 """
-    jobId = long(jobId)
+    cdef unsigned long c_job_id = long(jobId)
     cdef char * fname
-    fname = lsmethods.lsb_peekjob(jobId)
-    if fname == NULL:
-        return None
-    else:
-        return fname
+    with library_lock:
+        _c_start()
+        with nogil:
+            fname = lsmethods.lsb_peekjob(c_job_id)
+        _c_stop()
+        _save_errors()
+        if fname == NULL:
+            return None
+        else:
+            return fname
 
 
 def lsb_perror(message):
@@ -738,11 +1186,15 @@ Prints the lsblib error message associated with the lsberrno prefixed by message
     u'User permission denied'
     >>>
 
+Thread safety: describes the error from the last lsblib call made in the calling thread.
+
 """
     cdef char * m
     message=str(message)
     m=message
-    lsmethods.lsb_perror(m)
+    with library_lock:
+        _restore_errors()
+        lsmethods.lsb_perror(m)
 
 
 def lsb_queuecontrol(queue, opCode):
@@ -762,11 +1214,20 @@ Opens, closes, activates or inactivates a queue.
     >>> lsblib.lsb_queuecontrol("normal", lsblib.QUEUE_CLOSED)
     -1
 
+Thread safety: releases the GIL while waiting for the MBD.
 
 """
     queue=str(queue)
-    opCode=int(opCode)
-    return lsmethods.lsb_queuecontrol(queue, opCode)
+    cdef char * c_queue = queue
+    cdef int c_op_code = int(opCode)
+    cdef int ret
+    with library_lock:
+        _c_start()
+        with nogil:
+            ret = lsmethods.lsb_queuecontrol(c_queue, c_op_code)
+        _c_stop()
+        _save_errors()
+    return ret
 
 def lsb_queueinfo(queues=[], numqueues=0, hostname="", username="", options=0):
     """openlava.lsblib.lsb_queueinfo(queues=[], numqueues=0, hostname="", username="", options=0)
@@ -801,6 +1262,9 @@ Get information on specified queues.
     normal
     >>>
 
+Thread safety: releases the GIL while waiting for the MBD.  The returned objects point
+into a buffer that is reused by the next call to lsb_queueinfo() from any thread.
+
 """
     queue_list=[]
     cdef queueInfoEnt * qs
@@ -831,7 +1295,15 @@ Get information on specified queues.
     options=int(options)
     opts=options
 
-    qs=lsmethods.lsb_queueinfo(queueNames, &numQueues, hostName, userName, opts)
+    try:
+        with library_lock:
+            _c_start()
+            with nogil:
+                qs=lsmethods.lsb_queueinfo(queueNames, &numQueues, hostName, userName, opts)
+            _c_stop()
+            _save_errors()
+    finally:
+        free(queueNames)
     if qs==NULL:
         return None
 
@@ -841,13 +1313,18 @@ Get information on specified queues.
         queue_list.append(q)
     return queue_list
 
-def lsb_readjobinfo():
-    """openlava.lsblib.lsb_readjobinfo()
+def lsb_readjobinfo(view=False):
+    """openlava.lsblib.lsb_readjobinfo(view=False)
 Get the next job in the list from the MBD.
 
 .. note:: The more parameter is not supported as passing integers as in/out parameters is not supported by Python.
 
-:param int options: Return jobs that match the following options, where option is a bitwise or of the following paramters: ALL_JOB - All jobs; CUR_JOB - All unfinished jobs; DONE_JOB - Jobs that have finished or exited; PEND_JOB - Jobs that are pending; SUSP_JOB - Jobs that are suspended; LAST_JOB - The last submitted job
+When view is True a JobInfoView is returned instead of a JobInfoEnt.  Only the fixed size
+fields are copied, strings and arrays are read from openlava's buffer when first accessed,
+which must happen before the next call to lsb_readjobinfo() or lsb_closejobinfo().  Call
+materialize() on a view to keep all of its data.
+
+:param bool view: Return a JobInfoView rather than a full copy of the job
 :return: JobInfoEnt object or None on error
 :rtype: JobInfoEnt
 
@@ -861,18 +1338,44 @@ Get the next job in the list from the MBD.
     ...
     4562
     >>> lsblib.lsb_closejobinfo()
+    >>> for i in range(lsblib.lsb_openjobinfo()):
+    ...     job=lsblib.lsb_readjobinfo(view=True)
+    ...     print job.jobId, job.status, job.user
+    ...
+    4562 RUN irvined
+    >>> lsblib.lsb_closejobinfo()
 
+Thread safety: must be called from the thread that opened the cursor with
+lsb_openjobinfo().  Releases the GIL while waiting for the MBD.  A JobInfoEnt is a
+full copy of the job, a JobInfoView is only valid until the owning thread reads the
+next job.
 
 """
+    global _jobinfo_generation
     cdef jobInfoEnt * j
     cdef int * more
+    cdef JobInfoView job_view
     more = NULL
-    j = lsmethods.lsb_readjobinfo(more)
-    if j == NULL:
-        return None
-
-    job_info = JobInfoEnt()
-    JobInfoEnt.copy(j, job_info._data)
+    if _cursor_owner is not None and _cursor_owner is not threading.current_thread():
+        raise Exception("The job cursor was opened by another thread")
+
+    with library_lock:
+        _jobinfo_generation += 1
+        _c_start()
+        with nogil:
+            j = lsmethods.lsb_readjobinfo(more)
+        _c_stop()
+        _save_errors()
+        if j == NULL:
+            return None
+
+        if view:
+            job_view = JobInfoView(initialise=False)
+            job_view._attach(j)
+            return job_view
+
+        job_info = JobInfoEnt()
+        JobInfoEnt.copy(j, job_info._data)
 
     return job_info
 
@@ -894,9 +1397,18 @@ Reloads configuration information for the batch system.
     -1
     >>>
 
+Thread safety: releases the GIL while waiting for the MBD.
+
 """
-    opCode=int(opCode)
-    return lsmethods.lsb_reconfig(opCode)
+    cdef int c_op_code = int(opCode)
+    cdef int ret
+    with library_lock:
+        _c_start()
+        with nogil:
+            ret = lsmethods.lsb_reconfig(c_op_code)
+        _c_stop()
+        _save_errors()
+    return ret
 
 def lsb_requeuejob(rq):
     """openlava.lsblib.lsb_requeuejob(rq)
@@ -919,6 +1431,8 @@ Requeues a job.
     >>> lsblib.lsb_requeuejob(rq)
     0
 
+Thread safety: releases the GIL while waiting for the MBD.
+
 """
     assert(isinstance(rq,JobRequeue))
     return rq._requeue()
@@ -943,8 +1457,19 @@ Sends the specified signal to the job.
     >>> lsblib.lsb_signaljob(4563, lsblib.SIGCONT)
     0
 
+Thread safety: releases the GIL while waiting for the MBD.
+
 """
-    return lsmethods.lsb_signaljob(jobId, sigValue)
+    cdef LS_LONG_INT c_job_id = jobId
+    cdef int c_sig_value = sigValue
+    cdef int ret
+    with library_lock:
+        _c_start()
+        with nogil:
+            ret = lsmethods.lsb_signaljob(c_job_id, c_sig_value)
+        _c_stop()
+        _save_errors()
+    return ret
 
 def lsb_submit(submit_req):
     """openlava.lsblib.lsb_submit(jobSubReq, jobSubReply)
@@ -971,10 +1496,87 @@ Submits a new job into the scheduling environment.
     4564
     >>>
 
+Thread safety: releases the GIL while waiting for the MBD, unless the Submit has an
+environment.  Then the C environ pointer is swapped to it for the duration of the call,
+and the GIL is held throughout so other Python threads never see it.  os.environ is not
+changed.
+
 """
     assert(isinstance(submit_req, Submit))
     return submit_req.submit()
 
+def lsb_submit_many(submits, environment=None, rate=None):
+    """openlava.lsblib.lsb_submit_many(submits, environment=None, rate=None)
+
+Submits a list of jobs without releasing the library between them.  Use Submit.clone() to
+create the jobs from a template, the clones share the template's Environment.
+
+A job that is rejected does not stop the rest of the batch.  Its SubmitReply has a jobId
+of -1, and a SubmitError describing why is added to the list of errors.
+
+:param list submits: Submit objects to submit, in order
+:param dict environment: Environment, or dict of variables, to submit all the jobs with, by default each job uses the environment of its Submit object
+:param float rate: Maximum number of jobs to submit per second, None for no limit
+:return: List of SubmitReply objects, one per job, and a list of SubmitError objects
+:rtype: tuple
+
+::
+
+    >>> from openlava import lsblib
+    >>> template = lsblib.Submit()
+    >>> template.queue = "normal"
+    >>> template.numProcessors = 1
+    >>> jobs = [template.clone(command="align.sh {}".format(i), jobName="align{}".format(i))
+    ...         for i in range(3)]
+    >>> replies, errors = lsblib.lsb_submit_many(jobs, rate=50)
+    >>> [r.jobId for r in replies]
+    [4565, 4566, 4567]
+    >>> errors
+    []
+
+Thread safety: releases the GIL while waiting for the MBD.  Other threads calling into
+openlava wait while each run of jobs is submitted, but not while waiting to honour rate.
+Environments are handled as in lsb_submit().
+
+"""
+    cdef Submit s
+    cdef SubmitReply sr
+    cdef Environment env = None
+    cdef LS_LONG_INT c_job_id
+    cdef int i = 0
+    cdef int n
+    cdef double interval = 1.0 / rate if rate else 0
+    cdef double next_submit = time.time()
+
+    if environment is not None:
+        env = environment if isinstance(environment, Environment) else Environment(environment)
+    submits = list(submits)
+    n = len(submits)
+    replies = []
+    errors = []
+
+    while i < n:
+        with library_lock:
+            #submit until it is time to pause
+            while i < n:
+                if interval and time.time() < next_submit:
+                    break
+                s = submits[i]
+                sr = SubmitReply()
+                c_job_id = s._submit(sr, env if env is not None else s._environ)
+                replies.append(sr)
+                if c_job_id == -1:
+                    errors.append(SubmitError(i, get_lsberrno(), lsb_sysmsg(), sr))
+                if interval:
+                    next_submit = max(next_submit, time.time()) + interval
+                i += 1
+        if interval and i < n:
+            delay = next_submit - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+    return replies, errors
+
 
 def lsb_suspreason (reasons, subreasons, ld):
     """openlava.lsblib.lsb_suspreason(reasons, subreasons, ld)
@@ -1003,13 +1605,23 @@ Get reasons why a job is suspended
 
     Job 4563:  The job was suspended by user;
 
+Thread safety: the result is copied before the library lock is released.
+
 """
 
     cdef loadIndexLog loadIndex
-    loadIndex.nIdx=ld.nIdx
-    loadIndex.name=to_cstring_array(ld.name)
-    reasons=lsmethods.lsb_suspreason(reasons, subreasons, &loadIndex)
-    return u"%s" % reasons
+    cdef char * text
+    cdef int c_reasons = reasons
+    cdef int c_subreasons = subreasons
+    index_names = [str(n) for n in ld.name]
+    loadIndex.nIdx = len(index_names)
+    loadIndex.name = to_cstring_array(index_names)
+    try:
+        with library_lock:
+            text = lsmethods.lsb_suspreason(c_reasons, c_subreasons, &loadIndex)
+            return u"%s" % text
+    finally:
+        free(loadIndex.name)
 
 def lsb_sysmsg():
     """openlava.lsblib.lsb_sysmsg()
@@ -1034,13 +1646,17 @@ Get the lsblib error message associated with lsberrno
     u'User permission denied'
     >>>
 
+Thread safety: describes the error from the last lsblib call made in the calling thread.
+
 """
     cdef char * msg
-    msg=lsmethods.lsb_sysmsg()
-    if msg==NULL:
-        return u""
-    else:
-        return u"%s" % msg
+    with library_lock:
+        _restore_errors()
+        msg=lsmethods.lsb_sysmsg()
+        if msg==NULL:
+            return u""
+        else:
+            return u"%s" % msg
 
 def lsb_userinfo(user_list=[], numusers=0):
     """openlava.lsblib.lsb_userinfo(user_list=[])
@@ -1071,6 +1687,9 @@ Get information on specified users
     irvined
     >>>
 
+Thread safety: releases the GIL while waiting for the MBD.  The returned objects point
+into a buffer that is reused by the next call to lsb_userinfo() from any thread.
+
 """
     assert(isinstance(user_list,list))
     numusers=int(numusers)
@@ -1087,7 +1706,15 @@ Get information on specified users
     cdef userInfoEnt *user_info
     cdef userInfoEnt *u
 
-    user_info=lsmethods.lsb_userinfo(users,&num_users)
+    try:
+        with library_lock:
+            _c_start()
+            with nogil:
+                user_info=lsmethods.lsb_userinfo(users,&num_users)
+            _c_stop()
+            _save_errors()
+    finally:
+        free(users)
     if user_info == NULL:
         return None
     usrs=[]
@@ -1098,6 +1725,355 @@ Get information on specified users
         usrs.append(user)
     return usrs
 
+def read_jobs(job_id=0, job_name="", user="all", queue="", host="", options=ALL_JOB):
+    """openlava.lsblib.read_jobs(job_id=0, job_name="", user="all", queue="", host="", options=ALL_JOB)
+
+Opens the job cursor, reads every matching job and closes the cursor again, returning
+the jobs as a JobColumns object.  Unlike lsb_readjobinfo() the jobs are never copied
+into JobInfoEnt objects, only the fields held in the columns are read from each struct.
+
+The parameters are the same as lsb_openjobinfo(), and the same restrictions apply.
+
+:param int job_id: Return jobs with this job id.
+:param str job_name: Return jobs with this name
+:param str user: Return jobs owned by this user
+:param str queue: Return jobs in this queue
+:param str host: Return jobs on this host
+:param int options: Bitwise or of ALL_JOB, CUR_JOB, DONE_JOB, PEND_JOB, SUSP_JOB, LAST_JOB
+:return: Columns of job data, one row per job
+:rtype: JobColumns
+
+::
+
+    >>> from openlava import lsblib
+    >>> lsblib.lsb_init("testing")
+    0
+    >>> jobs = lsblib.read_jobs()
+    >>> len(jobs)
+    2
+    >>> jobs.jobId
+    array('l', [4562L, 4563L])
+    >>> jobs.user
+    ['irvined', 'irvined']
+
+Thread safety: as lsb_openjobinfo(), waits for any other thread using the job cursor.
+The library lock is held for the whole read, with the GIL released while waiting for
+each job.
+
+"""
+    cdef int num_jobs
+    cdef int count = 0
+    cdef jobInfoEnt * j
+    cdef dict strings = {}
+    cdef JobColumns columns
+
+    num_jobs = lsb_openjobinfo(job_id, job_name, user, queue, host, options)
+    columns = JobColumns(num_jobs)
+    try:
+        with library_lock:
+            while count < num_jobs:
+                _c_start()
+                with nogil:
+                    j = lsmethods.lsb_readjobinfo(NULL)
+                _c_stop()
+                if j == NULL:
+                    break
+                columns._set_row(count, j, strings, strings)
+                count += 1
+            _save_errors()
+    finally:
+        lsb_closejobinfo()
+
+    columns._truncate(count)
+    return columns
+
+def read_job_batches(batch_size=1000, job_id=0, job_name="", user="all", queue="", host="", options=ALL_JOB):
+    """openlava.lsblib.read_job_batches(batch_size=1000, job_id=0, job_name="", user="all", queue="", host="", options=ALL_JOB)
+
+Generator version of read_jobs(), which yields the jobs as they are read, as JobColumns
+objects of up to batch_size jobs each.  This bounds the memory used however many jobs
+there are, and lets the caller process one batch while the next is not yet read.  User,
+queue and execution host names are shared between batches, so each is only converted
+once.  Job names and submission hosts are only shared within a batch, so the strings kept
+do not grow with the number of jobs.
+
+The cursor stays open until the generator is exhausted or closed, so the other job
+cursor functions can not be used by this thread while iterating over it.
+
+:param int batch_size: Most jobs in each batch
+:return: Generator of JobColumns
+:rtype: generator
+
+::
+
+    >>> from openlava import lsblib
+    >>> lsblib.lsb_init("testing")
+    0
+    >>> for batch in lsblib.read_job_batches(batch_size=1):
+    ...     print batch.jobId
+    ...
+    array('l', [4562L])
+    array('l', [4563L])
+
+Thread safety: as lsb_openjobinfo(), waits for any other thread using the job cursor.
+The library lock is held while reading each batch, and released between batches.
+
+"""
+    cdef int num_jobs
+    cdef int count = 0
+    cdef int rows
+    cdef int size
+    cdef jobInfoEnt * j
+    cdef dict strings = {}
+    cdef dict names
+    cdef JobColumns columns
+
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    num_jobs = lsb_openjobinfo(job_id, job_name, user, queue, host, options)
+    try:
+        while count < num_jobs:
+            size = min(batch_size, num_jobs - count)
+            columns = JobColumns(size)
+            names = {}
+            rows = 0
+            with library_lock:
+                while rows < size:
+                    _c_start()
+                    with nogil:
+                        j = lsmethods.lsb_readjobinfo(NULL)
+                    _c_stop()
+                    if j == NULL:
+                        break
+                    columns._set_row(rows, j, strings, names)
+                    rows += 1
+                _save_errors()
+            count += rows
+            columns._truncate(rows)
+            if rows:
+                yield columns
+            if rows < size:
+                break
+    finally:
+        lsb_closejobinfo()
+
+#lsb_jobinfo_many() scans every job when asked for at least 1/PER_ID_SCAN_RATIO of them
+PER_ID_SCAN_RATIO = 20
+
+def lsb_jobinfo_many(job_ids, options=ALL_JOB):
+    """openlava.lsblib.lsb_jobinfo_many(job_ids, options=ALL_JOB)
+
+Reads a set of jobs by id.  When only a few of the jobs known to the MBD are wanted each is
+asked for with its own query, otherwise every job is read in one pass and those not wanted
+are skipped without being copied.  The choice is made from the number of jobs reported when
+the cursor is opened, see PER_ID_SCAN_RATIO.
+
+Ids can be those of array elements, made with create_job_id().  The id of an array job
+itself returns every element of the array.
+
+:param list job_ids: Ids of the jobs to read
+:param int options: Bitwise or of ALL_JOB, CUR_JOB, DONE_JOB, PEND_JOB, SUSP_JOB, as for lsb_openjobinfo()
+:return: Dict of job id -> JobInfoEnt for each job found, jobs that do not exist are left out
+:rtype: dict
+
+::
+
+    >>> from openlava import lsblib
+    >>> lsblib.lsb_init("testing")
+    0
+    >>> jobs = lsblib.lsb_jobinfo_many([4562, 4563, lsblib.create_job_id(4570, 2)])
+    >>> sorted(jobs)
+    [4562L, 4563L, 8589939162L]
+
+Thread safety: as lsb_openjobinfo(), waits for any other thread using the job cursor.
+The cursor is opened and closed once per query, so other threads can use it in between.
+
+"""
+    cdef int num_jobs
+    cdef set wanted = set()
+    cdef set arrays = set()
+    cdef dict jobs = {}
+
+    for job_id in job_ids:
+        wanted.add(job_id)
+        if get_array_index(job_id) == 0:
+            arrays.add(job_id)
+    if not wanted:
+        return jobs
+
+    if len(wanted) > 1:
+        num_jobs = lsb_openjobinfo(options=options)
+        try:
+            if len(wanted) * PER_ID_SCAN_RATIO >= num_jobs:
+                _read_matching(num_jobs, wanted, arrays, jobs)
+                return jobs
+        finally:
+            lsb_closejobinfo()
+
+    for job_id in wanted:
+        num_jobs = lsb_openjobinfo(job_id=job_id, options=options)
+        try:
+            _read_matching(num_jobs, None, None, jobs)
+        finally:
+            lsb_closejobinfo()
+    return jobs
+
+cdef _read_matching(int num_jobs, set wanted, set arrays, dict jobs):
+    """Copy the jobs on the open cursor whose ids are wanted, or all of them if wanted is None"""
+    cdef int count = 0
+    cdef jobInfoEnt * j
+    cdef JobInfoEnt job
+    with library_lock:
+        while count < num_jobs:
+            _c_start()
+            with nogil:
+                j = lsmethods.lsb_readjobinfo(NULL)
+            _c_stop()
+            if j == NULL:
+                break
+            count += 1
+            if wanted is not None and j.jobId not in wanted and (j.jobId & 0x0FFFFFFFF) not in arrays:
+                continue
+            job = JobInfoEnt()
+            JobInfoEnt.copy(j, job._data)
+            jobs[j.jobId] = job
+        _save_errors()
+
+def _connection_reset():
+    """True if the last call made by this thread failed because the MBD dropped the connection"""
+    #see lsb_openjobinfo() for why errno 2 is included
+    return (getattr(library_errors, 'lsberrno', 0) == LSBE_LSLIB and
+            getattr(library_errors, 'lserrno', 0) in [CONN_RESET_BY_PEER, 2])
+
+class JobInfoCursor(object):
+    """openlava.lsblib.JobInfoCursor(job_id=0, job_name="", user="all", queue="", host="", options=ALL_JOB, view=False, retries=5, backoff=0.5, max_backoff=30.0)
+
+Context manager for the job cursor, which iterates over the jobs matching the same
+arguments as lsb_openjobinfo(), and always closes the cursor on leaving.
+
+When the MBD resets the connection, while opening the cursor or part way through the jobs,
+the cursor is closed and opened again after a pause, and jobs that have already been
+returned are skipped by job id.  Pauses double after each reset, starting at backoff and
+up to max_backoff seconds, and are jittered so that many clients do not retry together.
+ConnectionResetByPeer is raised once retries resets have been retried.
+
+The counters retries, skipped, open_time and read_time report the number of resets
+retried, the jobs skipped after resuming, and the seconds spent opening the cursor and
+reading jobs.
+
+:param bool view: Return JobInfoView objects, as lsb_readjobinfo(view=True)
+:param int retries: Maximum number of resets to retry
+:param float backoff: Seconds to wait after the first reset
+:param float max_backoff: Longest wait between retries
+
+::
+
+    >>> from openlava import lsblib
+    >>> lsblib.lsb_init("testing")
+    0
+    >>> with lsblib.JobInfoCursor(options=lsblib.RUN_JOB) as cursor:
+    ...     for job in cursor:
+    ...         print job.jobId
+    ...
+    4562
+    >>> cursor.retries, cursor.skipped
+    (0, 0)
+
+Thread safety: the cursor belongs to the thread that iterates over it, as for
+lsb_openjobinfo().
+
+"""
+    def __init__(self, job_id=0, job_name="", user="all", queue="", host="", options=ALL_JOB,
+                 view=False, retries=5, backoff=0.5, max_backoff=30.0):
+        self.query = dict(job_id=job_id, job_name=job_name, user=user, queue=queue, host=host,
+                          options=options)
+        self.view = view
+        self.max_retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retries = 0
+        self.skipped = 0
+        self.open_time = 0.0
+        self.read_time = 0.0
+        self.num_jobs = None
+        self._read = 0
+        self._seen = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def __len__(self):
+        """Number of jobs reported when the cursor was last opened"""
+        if self.num_jobs is None:
+            self._open()
+        return self.num_jobs
+
+    def _open(self):
+        while True:
+            start = time.time()
+            try:
+                self.num_jobs = lsb_openjobinfo(**self.query)
+            except ConnectionResetByPeer:
+                self.open_time += time.time() - start
+                if not self._retry():
+                    raise
+            else:
+                self.open_time += time.time() - start
+                self._read = 0
+                return
+
+    def _retry(self):
+        """Close the cursor and wait before trying again, returns False when out of retries"""
+        self.close()
+        if self.retries >= self.max_retries:
+            return False
+        delay = min(self.max_backoff, self.backoff * 2 ** self.retries)
+        self.retries += 1
+        time.sleep(random.uniform(delay / 2.0, delay))
+        return True
+
+    def __iter__(self):
+        while True:
+            if self.num_jobs is None:
+                self._open()
+            try:
+                while self._read < self.num_jobs:
+                    start = time.time()
+                    job = lsb_readjobinfo(view=self.view)
+                    self.read_time += time.time() - start
+                    if job is None:
+                        if _connection_reset():
+                            raise ConnectionResetByPeer()
+                        return
+                    self._read += 1
+                    if job.jobId in self._seen:
+                        self.skipped += 1
+                        continue
+                    self._seen.add(job.jobId)
+                    yield job
+                return
+            except ConnectionResetByPeer:
+                if not self._retry():
+                    raise
+
+    def close(self):
+        """Close the cursor, if it is open"""
+        if self.num_jobs is not None:
+            self.num_jobs = None
+            lsb_closejobinfo()
+
+cdef inline object _intern_string(dict strings, char * s):
+    """Return s as a python string, reusing the same object for strings already seen"""
+    if s == NULL:
+        return ""
+    value = <bytes>s
+    return strings.setdefault(value, value)
+
 #stolen from stackoverflow
 def format_memory(size):
     suffixes = ['B','KB','MB','GB','TB']
@@ -1120,7 +2096,13 @@ def format_seconds(seconds):
 
     return dhms
 
-cdef class HostInfoEnt:
+cdef array.array _LONG_COLUMN = array.array('l')
+cdef array.array _INT_COLUMN = array.array('i')
+cdef array.array _FLOAT_COLUMN = array.array('f')
+
+include "float_array.pxi"
+
+cdef class HostInfoEnt(_Record):
     cdef hostInfoEnt * _data
 
     cdef _load_struct(self, hostInfoEnt * data):
@@ -1164,15 +2146,15 @@ cdef class HostInfoEnt:
 
     property load:
         def __get__(self):
-            return [self._data.load[i] for i in range(self.nIdx)]
+            return _float_array(self._data.load, self._data.nIdx)
 
     property loadSched:
         def __get__(self):
-            return [self._data.loadSched[i] for i in range(self.nIdx)]
+            return _float_array(self._data.loadSched, self._data.nIdx)
 
     property loadStop:
         def __get__(self):
-            return [self._data.loadStop[i] for i in range(self.nIdx)]
+            return _float_array(self._data.loadStop, self._data.nIdx)
 
     property windows:
         def __get__(self):
@@ -1212,7 +2194,7 @@ cdef class HostInfoEnt:
 
     property realLoad:
         def __get__(self):
-            return [self._data.realLoad[i] for i in range(self.nIdx)]
+            return _float_array(self._data.realLoad, self._data.nIdx)
 
     property numRESERVE:
         def __get__(self):
@@ -1223,8 +2205,261 @@ cdef class HostInfoEnt:
             return self._data.chkSig
 
 
+cdef class JobColumns:
+    """
+Job data stored by column, as returned by read_jobs().  Numeric fields are held in
+array.array objects, which support the buffer protocol so can be wrapped without
+copying by numpy.frombuffer().  String fields are lists in which equal strings
+share a single object.  exHosts holds a tuple of host names for each job.
+
+::
+
+    >>> jobs = lsblib.read_jobs()
+    >>> jobs.row(0)['queue']
+    'normal'
+
+"""
+    COLUMNS = (
+        'jobId', 'status', 'submitTime', 'startTime', 'endTime', 'cpuTime',
+        'exitStatus', 'jobPid', 'numExHosts', 'user', 'queue', 'fromHost', 'jName',
+        'exHosts',
+    )
+
+    cdef readonly array.array jobId
+    cdef readonly array.array status
+    cdef readonly array.array submitTime
+    cdef readonly array.array startTime
+    cdef readonly array.array endTime
+    cdef readonly array.array cpuTime
+    cdef readonly array.array exitStatus
+    cdef readonly array.array jobPid
+    cdef readonly array.array numExHosts
+    cdef readonly list user
+    cdef readonly list queue
+    cdef readonly list fromHost
+    cdef readonly list jName
+    cdef readonly list exHosts
+    cdef int _length
+
+    def __cinit__(self, int size=0):
+        self._length = size
+        self.jobId = array.clone(_LONG_COLUMN, size, zero=True)
+        self.status = array.clone(_INT_COLUMN, size, zero=True)
+        self.submitTime = array.clone(_LONG_COLUMN, size, zero=True)
+        self.startTime = array.clone(_LONG_COLUMN, size, zero=True)
+        self.endTime = array.clone(_LONG_COLUMN, size, zero=True)
+        self.cpuTime = array.clone(_FLOAT_COLUMN, size, zero=True)
+        self.exitStatus = array.clone(_INT_COLUMN, size, zero=True)
+        self.jobPid = array.clone(_INT_COLUMN, size, zero=True)
+        self.numExHosts = array.clone(_INT_COLUMN, size, zero=True)
+        self.user = [""] * size
+        self.queue = [""] * size
+        self.fromHost = [""] * size
+        self.jName = [""] * size
+        self.exHosts = [()] * size
+
+    cdef _set_row(self, int i, jobInfoEnt * j, dict strings, dict names):
+        """Copy j into row i, interning user, queue and host names in strings, and job
+        names and submission hosts, of which there can be one per job, in names"""
+        cdef int k
+        self.jobId.data.as_longs[i] = j.jobId
+        self.status.data.as_ints[i] = j.status
+        self.submitTime.data.as_longs[i] = j.submitTime
+        self.startTime.data.as_longs[i] = j.startTime
+        self.endTime.data.as_longs[i] = j.endTime
+        self.cpuTime.data.as_floats[i] = j.cpuTime
+        self.exitStatus.data.as_ints[i] = j.exitStatus
+        self.jobPid.data.as_ints[i] = j.jobPid
+        self.numExHosts.data.as_ints[i] = j.numExHosts
+        self.user[i] = _intern_string(strings, j.user)
+        self.queue[i] = _intern_string(strings, j.submit.queue)
+        self.fromHost[i] = _intern_string(names, j.fromHost)
+        self.jName[i] = _intern_string(names, j.jName)
+        if j.numExHosts > 0 and j.exHosts != NULL:
+            self.exHosts[i] = tuple([_intern_string(strings, j.exHosts[k]) for k in range(j.numExHosts)])
+
+    cdef _truncate(self, int size):
+        if size >= self._length:
+            return
+        for column in (self.jobId, self.status, self.submitTime, self.startTime, self.endTime,
+                       self.cpuTime, self.exitStatus, self.jobPid, self.numExHosts):
+            array.resize(column, size)
+        del self.user[size:]
+        del self.queue[size:]
+        del self.fromHost[size:]
+        del self.jName[size:]
+        del self.exHosts[size:]
+        self._length = size
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, name):
+        if name not in JobColumns.COLUMNS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def row(self, int i):
+        """Return the values for a single job as a dict keyed by column name"""
+        if i < 0:
+            i += self._length
+        if i < 0 or i >= self._length:
+            raise IndexError("Row {} out of range".format(i))
+        return dict((name, getattr(self, name)[i]) for name in JobColumns.COLUMNS)
+
+
+cdef array.array _DOUBLE_COLUMN = array.array('d')
+
+cdef class StringTable:
+    """
+Assigns each distinct string a small integer code, in the order they are first seen.
+Used by FinishColumns so that string fields can be stored, compared and grouped as
+integers.
+
+::
+
+    >>> strings = lsblib.StringTable()
+    >>> strings.code("normal")
+    0
+    >>> strings[0]
+    'normal'
+
+"""
+    cdef readonly list values
+    cdef dict _codes
+
+    def __cinit__(self):
+        self.values = []
+        self._codes = {}
+
+    cdef int _code(self, char * s) except -1:
+        value = <bytes>s if s != NULL else b""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def code(self, value):
+        """Return the code for value, adding it to the table if it is new"""
+        return self._code(value)
+
+    def __len__(self):
+        return len(self.values)
 
-cdef class JobInfoEnt:
+    def __getitem__(self, int code):
+        return self.values[code]
+
+
+cdef class FinishColumns:
+    """
+Job finish records stored by column, as returned by EventLogReader.read_finish_columns().
+Numeric fields are held in array.array objects, which support the buffer protocol so can
+be wrapped without copying by numpy.frombuffer().  The string fields userName, queue and
+execHost (the first execution host) hold codes into the StringTable in strings.
+
+The CPU time used by the job is ru_utime + ru_stime, ru_maxrss is in kilobytes.
+
+::
+
+    >>> reader = lsblib.EventLogReader("lsb.acct")
+    >>> batch = reader.read_finish_columns()
+    >>> batch.strings[batch.queue[0]]
+    'normal'
+    >>> batch.row(0)['queue']
+    'normal'
+
+"""
+    COLUMNS = (
+        'jobId', 'userName', 'queue', 'execHost', 'numProcessors', 'jStatus', 'exitStatus',
+        'submitTime', 'startTime', 'endTime', 'hostFactor', 'cpuTime', 'ru_utime',
+        'ru_stime', 'ru_maxrss',
+    )
+    STRING_COLUMNS = ('userName', 'queue', 'execHost')
+
+    cdef readonly StringTable strings
+    cdef readonly array.array jobId
+    cdef readonly array.array userName
+    cdef readonly array.array queue
+    cdef readonly array.array execHost
+    cdef readonly array.array numProcessors
+    cdef readonly array.array jStatus
+    cdef readonly array.array exitStatus
+    cdef readonly array.array submitTime
+    cdef readonly array.array startTime
+    cdef readonly array.array endTime
+    cdef readonly array.array hostFactor
+    cdef readonly array.array cpuTime
+    cdef readonly array.array ru_utime
+    cdef readonly array.array ru_stime
+    cdef readonly array.array ru_maxrss
+    cdef int _length
+
+    def __cinit__(self, int size=0, StringTable strings=None):
+        self._length = size
+        self.strings = strings if strings is not None else StringTable()
+        self.jobId = array.clone(_LONG_COLUMN, size, zero=True)
+        self.userName = array.clone(_INT_COLUMN, size, zero=True)
+        self.queue = array.clone(_INT_COLUMN, size, zero=True)
+        self.execHost = array.clone(_INT_COLUMN, size, zero=True)
+        self.numProcessors = array.clone(_INT_COLUMN, size, zero=True)
+        self.jStatus = array.clone(_INT_COLUMN, size, zero=True)
+        self.exitStatus = array.clone(_INT_COLUMN, size, zero=True)
+        self.submitTime = array.clone(_LONG_COLUMN, size, zero=True)
+        self.startTime = array.clone(_LONG_COLUMN, size, zero=True)
+        self.endTime = array.clone(_LONG_COLUMN, size, zero=True)
+        self.hostFactor = array.clone(_FLOAT_COLUMN, size, zero=True)
+        self.cpuTime = array.clone(_DOUBLE_COLUMN, size, zero=True)
+        self.ru_utime = array.clone(_DOUBLE_COLUMN, size, zero=True)
+        self.ru_stime = array.clone(_DOUBLE_COLUMN, size, zero=True)
+        self.ru_maxrss = array.clone(_DOUBLE_COLUMN, size, zero=True)
+
+    cdef _set_row(self, int i, jobFinishLog * f):
+        self.jobId.data.as_longs[i] = (<LS_LONG_INT>f.idx << 32) | f.jobId
+        self.userName.data.as_ints[i] = self.strings._code(f.userName)
+        self.queue.data.as_ints[i] = self.strings._code(f.queue)
+        self.execHost.data.as_ints[i] = self.strings._code(f.execHosts[0] if f.numExHosts > 0 else NULL)
+        self.numProcessors.data.as_ints[i] = f.numProcessors
+        self.jStatus.data.as_ints[i] = f.jStatus
+        self.exitStatus.data.as_ints[i] = f.exitStatus
+        self.submitTime.data.as_longs[i] = f.submitTime
+        self.startTime.data.as_longs[i] = f.startTime
+        self.endTime.data.as_longs[i] = f.endTime
+        self.hostFactor.data.as_floats[i] = f.hostFactor
+        self.cpuTime.data.as_doubles[i] = f.lsfRusage.ru_utime + f.lsfRusage.ru_stime
+        self.ru_utime.data.as_doubles[i] = f.lsfRusage.ru_utime
+        self.ru_stime.data.as_doubles[i] = f.lsfRusage.ru_stime
+        self.ru_maxrss.data.as_doubles[i] = f.lsfRusage.ru_maxrss
+
+    cdef _truncate(self, int size):
+        if size >= self._length:
+            return
+        for name in FinishColumns.COLUMNS:
+            array.resize(getattr(self, name), size)
+        self._length = size
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, name):
+        if name not in FinishColumns.COLUMNS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def row(self, int i):
+        """Return the values for a single job as a dict keyed by column name, with the string fields decoded"""
+        if i < 0:
+            i += self._length
+        if i < 0 or i >= self._length:
+            raise IndexError("Row {} out of range".format(i))
+        row = dict((name, getattr(self, name)[i]) for name in FinishColumns.COLUMNS)
+        for name in FinishColumns.STRING_COLUMNS:
+            row[name] = self.strings.values[row[name]]
+        return row
+
+
+cdef class JobInfoEnt(_Record):
     cdef jobInfoEnt * _data
     cdef bool initialise
 
@@ -1234,6 +2469,7 @@ cdef class JobInfoEnt:
             #initialise a new Submit struct on the heap and
             #set self._data to point to it
             self._load_struct( JobInfoEnt.new() )
+            _track(self, "JobInfoEnt")
         else:
             self._data = NULL
 
@@ -1395,6 +2631,7 @@ cdef class JobInfoEnt:
         free(j)
 
     def __dealloc__(self):
+        _untrack(self)
         if self.initialise and self._data is not NULL:
             JobInfoEnt.free(self._data)
 
@@ -1414,28 +2651,7 @@ cdef class JobInfoEnt:
         )
 
     def status_as_str(self):
-        #we don't do ZOMBI here
-        #job->reasons & EXIT_ZOMBIE is ZOMBI
-        mapping = {
-            JOB_STAT_NULL:  "NULL",
-            JOB_STAT_PEND:  "PEND",
-            JOB_STAT_PSUSP: "PSUSP",
-            JOB_STAT_RUN:   "RUN",
-            JOB_STAT_RUN|JOB_STAT_WAIT: "WAIT",
-            JOB_STAT_SSUSP: "SSUSP",
-            JOB_STAT_USUSP: "USUSP",
-            JOB_STAT_EXIT:  "EXIT",
-            JOB_STAT_DONE:  "DONE",
-            JOB_STAT_DONE|JOB_STAT_PDONE: "DONE",
-            JOB_STAT_DONE|JOB_STAT_WAIT: "DONE",
-            JOB_STAT_DONE|JOB_STAT_PERR: "DONE",
-            JOB_STAT_UNKWN: "UNKNWN"
-        }
-
-        if self._data.status in mapping:
-            return mapping[self._data.status]
-        else:
-            return "ERROR"
+        return JOB_STATUS_STRINGS.get(self._data.status, "ERROR")
 
     def as_dict(self):
         """Convert a JobInfoEnt object into a dict"""
@@ -1512,6 +2728,18 @@ cdef class JobInfoEnt:
         def __get__(self):
             return time.localtime(self._data.endTime)
 
+    property submit_epoch:
+        def __get__(self):
+            return self._data.submitTime
+
+    property start_epoch:
+        def __get__(self):
+            return self._data.startTime
+
+    property end_epoch:
+        def __get__(self):
+            return self._data.endTime
+
     property cpuTime:
         def __get__(self):
             return self._data.cpuTime
@@ -1550,11 +2778,11 @@ cdef class JobInfoEnt:
 
     property loadSched:
         def __get__(self):
-            return [self._data.loadSched[i] for i in range(self.nIdx)]
+            return _float_array(self._data.loadSched, self._data.nIdx)
 
     property loadStop:
         def __get__(self):
-            return [self._data.loadStop[i] for i in range(self.nIdx)]
+            return _float_array(self._data.loadStop, self._data.nIdx)
 
     property submit:
         def __get__(self):
@@ -1624,6 +2852,111 @@ cdef class JobInfoEnt:
             return self._data.jobPriority
 
 
+#attributes of JobInfoView that are read through pointers into openlava's buffer
+_JOB_VIEW_LAZY_FIELDS = (
+    'user', 'cwd', 'subHomeDir', 'fromHost', 'exHosts', 'execHome', 'execCwd',
+    'execUsername', 'parentGroup', 'jName', 'reasonTb', 'loadSched', 'loadStop',
+    'submit', 'runRusage',
+)
+
+cdef class JobInfoView(JobInfoEnt):
+    """
+A JobInfoEnt that does not copy the job out of openlava, as returned by
+lsb_readjobinfo(view=True).  The fixed size fields are copied when the view is created,
+everything else is converted when first accessed and then cached.  Accessing a field
+that has not been converted after the cursor has moved on raises ValueError.
+"""
+    cdef jobInfoEnt _view
+    cdef unsigned long _generation
+    cdef dict _cache
+
+    cdef _attach(self, jobInfoEnt * j):
+        #copies the scalars, the pointers still point at openlava's buffer
+        self._view = j[0]
+        self._data = &self._view
+        self._generation = _jobinfo_generation
+
+    cdef object _lazy(self, name):
+        if self._cache is not None and name in self._cache:
+            return self._cache[name]
+
+        if self._data == &self._view and self._generation != _jobinfo_generation:
+            raise ValueError("{} of job {} was not read before the job cursor moved on, "
+                             "call materialize() first".format(name, self._view.jobId))
+
+        value = getattr(JobInfoEnt, name).__get__(self, JobInfoEnt)
+        if self._cache is None:
+            self._cache = {}
+        self._cache[name] = value
+        return value
+
+    def materialize(self):
+        """Convert all remaining fields so the view stays usable after the cursor moves on"""
+        for name in _JOB_VIEW_LAZY_FIELDS:
+            self._lazy(name)
+        return self
+
+    property user:
+        def __get__(self):
+            return self._lazy('user')
+
+    property cwd:
+        def __get__(self):
+            return self._lazy('cwd')
+
+    property subHomeDir:
+        def __get__(self):
+            return self._lazy('subHomeDir')
+
+    property fromHost:
+        def __get__(self):
+            return self._lazy('fromHost')
+
+    property exHosts:
+        def __get__(self):
+            return self._lazy('exHosts')
+
+    property execHome:
+        def __get__(self):
+            return self._lazy('execHome')
+
+    property execCwd:
+        def __get__(self):
+            return self._lazy('execCwd')
+
+    property execUsername:
+        def __get__(self):
+            return self._lazy('execUsername')
+
+    property parentGroup:
+        def __get__(self):
+            return self._lazy('parentGroup')
+
+    property jName:
+        def __get__(self):
+            return self._lazy('jName')
+
+    property reasonTb:
+        def __get__(self):
+            return self._lazy('reasonTb')
+
+    property loadSched:
+        def __get__(self):
+            return self._lazy('loadSched')
+
+    property loadStop:
+        def __get__(self):
+            return self._lazy('loadStop')
+
+    property submit:
+        def __get__(self):
+            return self._lazy('submit')
+
+    property runRusage:
+        def __get__(self):
+            return self._lazy('runRusage')
+
+
 cdef class JobRequeue:
     cdef jobrequeue _data
 
@@ -1655,7 +2988,14 @@ cdef class JobRequeue:
         options=self.options
         if options != REQUEUE_DONE and options != REQUEUE_EXIT and options != REQUEUE_RUN:
             raise ValueError("Invalid Option")
-        return lsmethods.lsb_requeuejob(&self._data)
+        cdef int ret
+        with library_lock:
+            _c_start()
+            with nogil:
+                ret = lsmethods.lsb_requeuejob(&self._data)
+            _c_stop()
+            _save_errors()
+        return ret
 
 
 cdef class JRusage:
@@ -1668,6 +3008,7 @@ cdef class JRusage:
             #initialise a new Submit struct on the heap and
             #set self._data to point to it
             self._load_struct( JRusage.new() )
+            _track(self, "JRusage")
         else:
             self._data = NULL
 
@@ -1728,6 +3069,7 @@ cdef class JRusage:
             free(jr)
 
     def __dealloc__(self):
+        _untrack(self)
         if self.initialise and self._data is not NULL:
             JRusage.free(self._data)
 
@@ -1797,6 +3139,7 @@ cdef class PidInfo:
             #initialise a new Submit struct on the heap and
             #set self._data to point to it
             self._load_struct( PidInfo.new() )
+            _track(self, "PidInfo")
         else:
             self._data = NULL
 
@@ -1832,6 +3175,7 @@ cdef class PidInfo:
         free(pi)
 
     def __dealloc__(self):
+        _untrack(self)
         if self.initialise and self._data is not NULL:
             PidInfo.free(self._data)
 
@@ -1852,8 +3196,11 @@ cdef class PidInfo:
             return self._data.jobid
 
 
-cdef class QueueInfoEnt:
+cdef class QueueInfoEnt(_Record):
     cdef queueInfoEnt * _data
+    #split on first access
+    cdef tuple _userList
+    cdef tuple _hostList
 
     cdef _load_struct(self, queueInfoEnt * data ):
         self._data=data
@@ -1876,11 +3223,17 @@ cdef class QueueInfoEnt:
 
     property userList:
         def __get__(self):
-            return [u'%s' % i for i in self._data.userList.split()]
+            """Users of the queue, the same tuple is returned on every access"""
+            if self._userList is None:
+                self._userList = tuple([u'%s' % i for i in self._data.userList.split()])
+            return self._userList
 
     property hostList:
         def __get__(self):
-            return [u'%s' % i for i in self._data.hostList.split()]
+            """Hosts of the queue, the same tuple is returned on every access"""
+            if self._hostList is None:
+                self._hostList = tuple([u'%s' % i for i in self._data.hostList.split()])
+            return self._hostList
 
     property nIdx:
         def __get__(self):
@@ -1888,11 +3241,11 @@ cdef class QueueInfoEnt:
 
     property loadSched:
         def __get__(self):
-            return [float(self._data.loadSched[i]) for i in range(self.nIdx)]
+            return _float_array(self._data.loadSched, self._data.nIdx)
 
     property loadStop:
         def __get__(self):
-            return [float(self._data.loadStop[i]) for i in range(self.nIdx)]
+            return _float_array(self._data.loadStop, self._data.nIdx)
 
     property userJobLimit:
         def __get__(self):
@@ -2058,6 +3411,7 @@ cdef class Submit:
     cdef bool initialise
     cdef submit * _data
     cdef dict environment
+    cdef Environment _environ
 
     def __str__(self):
         fields = []
@@ -2072,15 +3426,23 @@ cdef class Submit:
 
     def __cinit__(self, initialise=True, environment=None):
         self.initialise = initialise
-        self.environment = environment
+        if isinstance(environment, Environment):
+            self._environ = environment
+            self.environment = self._environ.variables
+        else:
+            self.environment = environment
+            if environment is not None:
+                self._environ = Environment(environment)
         if initialise:
             #initialise a new Submit struct on the heap and
             #set self._data to point to it
             self._load_struct( Submit.new() )
+            _track(self, "Submit")
         else:
             self._data = NULL
 
     def __dealloc__(self):
+        _untrack(self)
         #this is when we didn't create the struct so we don't
         #want to free it because it isn't ours
         if not self.initialise:
@@ -2097,26 +3459,95 @@ cdef class Submit:
 
     def _modify(self, reply, job_id):
         cdef submitReply subRep
-        job_id = lsmethods.lsb_modify(self._data, &subRep, job_id)
+        cdef LS_LONG_INT c_job_id = job_id
+        with library_lock:
+            _c_start()
+            with nogil:
+                c_job_id = lsmethods.lsb_modify(self._data, &subRep, c_job_id)
+            _c_stop()
+            _save_errors()
+        job_id = c_job_id
 
         if job_id < 0:
             raise Exception("Error modifying job {}".format(job_id))
 
+    cdef LS_LONG_INT _submit(self, SubmitReply sr, Environment env) except? -2:
+        """Submit the job with env as its environment, or the process environment if env is None.
+        Call while holding library_lock"""
+        global environ
+        cdef submitReply * reply = sr._data
+        cdef LS_LONG_INT c_job_id
+        cdef char ** block = NULL
+        cdef char ** saved = NULL
+        if env is not None:
+            block = env._block
+        _c_start()
+        if block is NULL:
+            with nogil:
+                c_job_id = lsmethods.lsb_submit(self._data, reply)
+        else:
+            #keep the GIL while environ is swapped so no other Python thread can see it
+            saved = environ
+            environ = block
+            c_job_id = lsmethods.lsb_submit(self._data, reply)
+            environ = saved
+        _c_stop()
+        _save_errors()
+        sr._set_job_id(c_job_id)
+        return c_job_id
+
     def submit(self):
-        sr = SubmitReply()
+        cdef SubmitReply sr = SubmitReply()
         global lock
         with lock:
-            #set our local ENV to whatever is in self.environment dict
-            #when environment is None nothing will be changed
-            with set_env(self.environment):
-                job_id = lsmethods.lsb_submit(self._data, sr._data)
-                sr._set_job_id(job_id)
-                if job_id == -1:
-                    lsb_perror("lsb_submit")
-                    raise Exception("Error submitting job")
+            #submit with the environment built from self.environment, or the
+            #process environment when there isn't one
+            if self._submit(sr, self._environ) == -1:
+                lsb_perror("lsb_submit")
+                raise Exception("Error submitting job")
 
         return sr
 
+    def clone(self, **overrides):
+        """Returns a copy of this Submit, with any attributes passed as keyword arguments set on the copy.
+
+The copy has its own memory, so the original can be changed or released without affecting
+it.  Attributes are set through the usual properties, so the submission options they imply
+are set as well.
+
+:param overrides: Attributes to set on the copy, such as command, jobName, outFile or resReq
+:return: New Submit object
+:rtype: Submit
+
+::
+
+    >>> template = lsblib.Submit()
+    >>> template.queue = "normal"
+    >>> job = template.clone(command="hostname", jobName="host1")
+    >>> job.queue, job.command
+    ('normal', 'hostname')
+
+"""
+        cdef Submit other = Submit(environment=self._environ)
+        Submit.copy(self._data, other._data)
+        if self._data.numAskedHosts > 0:
+            other._data.askedHosts = <char **>malloc(self._data.numAskedHosts * sizeof(char *))
+            if other._data.askedHosts is NULL:
+                raise MemoryError("Couldn't allocate memory for askedHosts")
+            for i in range(self._data.numAskedHosts):
+                other._data.askedHosts[i] = strdup(self._data.askedHosts[i])
+            other._data.numAskedHosts = self._data.numAskedHosts
+        if self._data.nxf > 0:
+            other._data.xf = <xFile *>malloc(self._data.nxf * sizeof(xFile))
+            if other._data.xf is NULL:
+                raise MemoryError("Couldn't allocate memory for xf")
+            memcpy(other._data.xf, self._data.xf, self._data.nxf * sizeof(xFile))
+            other._data.nxf = self._data.nxf
+
+        for name, value in overrides.items():
+            setattr(other, name, value)
+        return other
+
     @staticmethod
     cdef submit * new():
         """This should be in openlava. it creates a Submit struct on the heap and returns a pointer"""
@@ -2209,6 +3640,16 @@ cdef class Submit:
         #also ignoring xFile because I don't know what it is
         #if dest.nxf              is not NULL: dest.nxf              = src.nxf
 
+    @staticmethod
+    cdef void _free_asked_hosts(submit * s):
+        if s.askedHosts is NULL:
+            return
+        for i in range(s.numAskedHosts):
+            if s.askedHosts[i] is not NULL: free(s.askedHosts[i])
+        free(s.askedHosts)
+        s.askedHosts = NULL
+        s.numAskedHosts = 0
+
     @staticmethod
     cdef void free(submit * s, free_struct=True):
         #return codes from free?
@@ -2216,7 +3657,7 @@ cdef class Submit:
         #god damn cython doesn't let me do getattr or __getitem__
         if s.jobName is not NULL: free(s.jobName)
         if s.queue is not NULL: free(s.queue)
-        if s.askedHosts is not NULL: free(s.askedHosts)
+        Submit._free_asked_hosts(s)
         if s.resReq is not NULL: free(s.resReq)
         if s.hostSpec is not NULL: free(s.hostSpec)
         if s.dependCond is not NULL: free(s.dependCond)
@@ -2295,7 +3736,13 @@ cdef class Submit:
         def __get__(self):
             return [return_string(self._data.askedHosts[i]) for i in range(self.numAskedHosts)]
         def __set__(self, hosts):
-            self._data.askedHosts = to_cstring_array(hosts)
+            cdef char ** asked = <char **>calloc(max(len(hosts), 1), sizeof(char *))
+            if asked is NULL:
+                raise MemoryError("Couldn't allocate memory for askedHosts")
+            for i in range(len(hosts)):
+                asked[i] = string_copy(NULL, hosts[i], free_dest=False)
+            Submit._free_asked_hosts(self._data)
+            self._data.askedHosts = asked
             self._data.numAskedHosts = len(hosts)
 
     property resReq:
@@ -2431,10 +3878,12 @@ cdef class Submit:
             for xf in xfs:
                 assert(isinstance(xf,XFile))
             free(self._data.xf)
+            self._data.xf = NULL
+            self._data.nxf = 0
             if len(xfs)>0:
-                self._data.xf = <xFile *>malloc(len(xf)*cython.sizeof(xFile))
-            if self._data.xf is NULL:
-                raise MemoryError("Couldn't allocate memory for xf")
+                self._data.xf = <xFile *>malloc(len(xfs)*cython.sizeof(xFile))
+                if self._data.xf is NULL:
+                    raise MemoryError("Couldn't allocate memory for xf")
 
             for i in range(len(xfs)):
                 for c in len(xfs[i].subFn):
@@ -2518,6 +3967,7 @@ cdef class SubmitReply:
             #initialise a new Submit struct on the heap and
             #set self._data to point to it
             self._load_struct( SubmitReply.new() )
+            _track(self, "SubmitReply")
         else:
             self._data = NULL
 
@@ -2548,6 +3998,7 @@ cdef class SubmitReply:
         free(sr)
 
     def __dealloc__(self):
+        _untrack(self)
         #this is when we didn't create the struct so we don't
         #want to free it because it isn't ours
         if not self.initialise:
@@ -2586,7 +4037,7 @@ cdef class SubmitReply:
         #def __set__(self, v):
         #    self._data.badReqIndx = int(v)
 
-cdef class UserInfoEnt:
+cdef class UserInfoEnt(_Record):
     cdef userInfoEnt * _data
     cdef _load_struct(self, userInfoEnt * data ):
         self._data=data
@@ -2657,7 +4108,16 @@ cdef class XFile:
             raise ValueError
         if self._data==NULL:
             self._data = <xFile *>malloc(sizeof(xFile))
+            if self._data==NULL:
+                raise MemoryError("Could not malloc enough memory for new xFile struct")
             self._data.options=0
+            _track(self, "XFile")
+
+    def __dealloc__(self):
+        _untrack(self)
+        #loaded structs belong to whatever they were loaded from
+        if not self._tainted and self._data!=NULL:
+            free(self._data)
     property subFn:
         def __get__(self):
             return self._data.subFn
@@ -2689,6 +4149,24 @@ cdef class XFile:
             v=int(v)
             self._data.options=v
 
+cdef Py_ssize_t _owned_bytes(object obj):
+    """Native memory owned by an object counted with _track()"""
+    if isinstance(obj, JobInfoEnt):
+        return _jobinfo_bytes((<JobInfoEnt>obj)._data)
+    if isinstance(obj, Submit):
+        return sizeof(submit) + _submit_bytes((<Submit>obj)._data)
+    if isinstance(obj, JRusage):
+        return sizeof(jRusage) + _jrusage_bytes((<JRusage>obj)._data)
+    if isinstance(obj, PidInfo):
+        return sizeof(pidInfo)
+    if isinstance(obj, SubmitReply):
+        return sizeof(submitReply)
+    if isinstance(obj, XFile):
+        return sizeof(xFile)
+    if isinstance(obj, Environment):
+        return (<Environment>obj)._native_bytes()
+    return 0
+
 cdef class JobInfoHead:
     cdef jobInfoHead * _data
     cdef _load_struct(self, jobInfoHead * data ):
@@ -2699,13 +4177,13 @@ cdef class JobInfoHead:
             return int(self._data.numJobs)
     property jobIds:
         def __get__(self):
-            [int(self._data.jobIds[i]) for i in range(self.numJobs)]
+            return [int(self._data.jobIds[i]) for i in range(self.numJobs)]
     property numHosts:
         def __get__(self):
             return int(self._data.numHosts)
     property hostNames:
         def __get__(self):
-            [int(self._data.hostNames[i]) for i in range(self.numHosts)]
+            return [u"%s" % self._data.hostNames[i] for i in range(self.numHosts)]
 
 # class LoadIndexLog:
 #     def __init__(self):
@@ -2721,7 +4199,7 @@ cdef class JobInfoHead:
 
 
 
-cdef class LogSwitchLog:
+cdef class LogSwitchLog(_Record):
     cdef logSwitchLog * _data
     cdef _load_struct(self, logSwitchLog * data ):
         self._data=data
@@ -2731,7 +4209,7 @@ cdef class LogSwitchLog:
             return self._data.lastJobId
 
 
-cdef class JobNewLog:
+cdef class JobNewLog(_Record):
     cdef jobNewLog * _data
     cdef _load_struct(self, jobNewLog * data ):
         self._data=data
@@ -3016,7 +4494,7 @@ cdef class JobNewLog:
             return self._data.userPriority
 
 
-cdef class JobModLog:
+cdef class JobModLog(_Record):
     cdef jobModLog * _data
     cdef _load_struct(self, jobModLog * data ):
         self._data=data
@@ -3244,7 +4722,7 @@ cdef class JobModLog:
             return self._data.userPriority
 
 
-cdef class JobStartLog:
+cdef class JobStartLog(_Record):
     cdef jobStartLog * _data
     cdef _load_struct(self, jobStartLog * data ):
         self._data=data
@@ -3311,7 +4789,7 @@ cdef class JobStartLog:
 
 
 
-cdef class JobStartAcceptLog:
+cdef class JobStartAcceptLog(_Record):
     cdef jobStartAcceptLog * _data
     cdef _load_struct(self, jobStartAcceptLog * data ):
         self._data=data
@@ -3337,7 +4815,7 @@ cdef class JobStartAcceptLog:
             return self._data.idx
 
 
-cdef class JobExecuteLog:
+cdef class JobExecuteLog(_Record):
     cdef jobExecuteLog * _data
     cdef _load_struct(self, jobExecuteLog * data ):
         self._data=data
@@ -3381,7 +4859,7 @@ cdef class JobExecuteLog:
             return self._data.idx
 
 
-cdef class JobStatusLog:
+cdef class JobStatusLog(_Record):
     cdef jobStatusLog * _data
     cdef _load_struct(self, jobStatusLog * data ):
         self._data=data
@@ -3441,7 +4919,7 @@ cdef class JobStatusLog:
             return self._data.idx
 
 
-cdef class SbdJobStatusLog:
+cdef class SbdJobStatusLog(_Record):
     cdef sbdJobStatusLog * _data
     cdef _load_struct(self, sbdJobStatusLog * data ):
         self._data=data
@@ -3506,7 +4984,7 @@ cdef class SbdJobStatusLog:
             return self._data.idx
 
 
-cdef class JobSwitchLog:
+cdef class JobSwitchLog(_Record):
     cdef jobSwitchLog * _data
     cdef _load_struct(self, jobSwitchLog * data ):
         self._data=data
@@ -3535,7 +5013,7 @@ cdef class JobSwitchLog:
             return u"%s" % self._data.userName
 
 
-cdef class JobMoveLog:
+cdef class JobMoveLog(_Record):
     cdef jobMoveLog * _data
     cdef _load_struct(self, jobMoveLog * data ):
         self._data=data
@@ -3570,7 +5048,7 @@ cdef class JobMoveLog:
             return u"%s" % self._data.userName
 
 
-cdef class ChkpntLog:
+cdef class ChkpntLog(_Record):
     cdef chkpntLog * _data
     cdef _load_struct(self, chkpntLog * data ):
         self._data=data
@@ -3605,7 +5083,7 @@ cdef class ChkpntLog:
             return self._data.idx
 
 
-cdef class JobRequeueLog:
+cdef class JobRequeueLog(_Record):
     cdef jobRequeueLog * _data
     cdef _load_struct(self, jobRequeueLog * data ):
         self._data=data
@@ -3619,7 +5097,7 @@ cdef class JobRequeueLog:
             return self._data.idx
 
 
-cdef class JobCleanLog:
+cdef class JobCleanLog(_Record):
     cdef jobCleanLog * _data
     cdef _load_struct(self, jobCleanLog * data ):
         self._data=data
@@ -3634,7 +5112,7 @@ cdef class JobCleanLog:
             return self._data.idx
 
 
-cdef class SigactLog:
+cdef class SigactLog(_Record):
     cdef sigactLog * _data
     cdef _load_struct(self, sigactLog * data ):
         self._data=data
@@ -3684,7 +5162,7 @@ cdef class SigactLog:
             return self._data.idx
 
 
-cdef class MigLog:
+cdef class MigLog(_Record):
     cdef migLog * _data
     cdef _load_struct(self, migLog * data ):
         self._data=data
@@ -3719,7 +5197,7 @@ cdef class MigLog:
             return u"%s" % self._data.userName
 
 
-cdef class SignalLog:
+cdef class SignalLog(_Record):
     cdef signalLog * _data
     cdef _load_struct(self, signalLog * data ):
         self._data=data
@@ -3754,7 +5232,7 @@ cdef class SignalLog:
             return u"   %s" % self._data.userName
 
 
-cdef class QueueCtrlLog:
+cdef class QueueCtrlLog(_Record):
     cdef queueCtrlLog * _data
     cdef _load_struct(self, queueCtrlLog * data ):
         self._data=data
@@ -3779,7 +5257,7 @@ cdef class QueueCtrlLog:
             return u"%s" % self._data.userName
 
 
-cdef class NewDebugLog:
+cdef class NewDebugLog(_Record):
     cdef newDebugLog * _data
     cdef _load_struct(self, newDebugLog * data ):
         self._data=data
@@ -3814,7 +5292,7 @@ cdef class NewDebugLog:
             return self._data.userId
 
 
-cdef class HostCtrlLog:
+cdef class HostCtrlLog(_Record):
     cdef hostCtrlLog * _data
     cdef _load_struct(self, hostCtrlLog * data ):
         self._data=data
@@ -3838,7 +5316,7 @@ cdef class HostCtrlLog:
             return u"%s" % self._data.userName
 
 
-cdef class MbdStartLog:
+cdef class MbdStartLog(_Record):
     cdef mbdStartLog * _data
     cdef _load_struct(self, mbdStartLog * data ):
         self._data=data
@@ -3864,7 +5342,7 @@ cdef class MbdStartLog:
 
 
 
-cdef class MbdDieLog:
+cdef class MbdDieLog(_Record):
     cdef mbdDieLog * _data
     cdef _load_struct(self, mbdDieLog * data ):
         self._data=data
@@ -3881,7 +5359,7 @@ cdef class MbdDieLog:
         def __get__(self):
             return self._data.exitCode
 
-cdef class UnfulfillLog:
+cdef class UnfulfillLog(_Record):
     cdef unfulfillLog * _data
     cdef _load_struct(self, unfulfillLog * data ):
         self._data=data
@@ -3926,7 +5404,7 @@ cdef class UnfulfillLog:
             return self._data.idx
 
 
-cdef class JobFinishLog:
+cdef class JobFinishLog(_Record):
     cdef jobFinishLog * _data
     cdef _load_struct(self, jobFinishLog * data ):
         self._data=data
@@ -4182,7 +5660,7 @@ cdef class JobFinishLog:
 
 
 
-cdef class LoadIndexLog:
+cdef class LoadIndexLog(_Record):
     cdef loadIndexLog * _data
     cdef _load_struct(self, loadIndexLog * data ):
         self._data=data
@@ -4201,7 +5679,7 @@ cdef class LoadIndexLog:
                 return [u"%s" % self._data.name[i] for i in range(self.nIdx)]
 
 
-cdef class JobMsgLog:
+cdef class JobMsgLog(_Record):
     cdef jobMsgLog * _data
     cdef _load_struct(self, jobMsgLog * data ):
         self._data=data
@@ -4237,7 +5715,7 @@ cdef class JobMsgLog:
 
 
 
-cdef class JobMsgAckLog:
+cdef class JobMsgAckLog(_Record):
     cdef jobMsgAckLog * _data
     cdef _load_struct(self, jobMsgAckLog * data):
         self._data=data
@@ -4281,7 +5759,7 @@ cdef class JobMsgAckLog:
         def __get__(self):
             return self._data.idx
 
-cdef class JobForceRequestLog:
+cdef class JobForceRequestLog(_Record):
     cdef jobForceRequestLog * _data
     cdef _load_struct(self, jobForceRequestLog * data):
         self._data=data
@@ -4314,7 +5792,7 @@ cdef class JobForceRequestLog:
         def __get__(self):
             return u"%s" % self._data.userName
 
-cdef class JobAttrSetLog:
+cdef class JobAttrSetLog(_Record):
     cdef jobAttrSetLog * _data
 
     cdef _load_struct(self, jobAttrSetLog * data):
@@ -4341,7 +5819,105 @@ cdef class JobAttrSetLog:
             return u"%s" % self._data.hostname
 
 
-cdef class EventRecord:
+#the member of the eventLog union that holds the data for each event type
+EVENT_LOG_ATTRIBUTES = {
+    EVENT_JOB_NEW:          'jobNewLog',
+    EVENT_JOB_START:        'jobStartLog',
+    EVENT_JOB_STATUS:       'jobStatusLog',
+    EVENT_JOB_SWITCH:       'jobSwitchLog',
+    EVENT_JOB_MOVE:         'jobMoveLog',
+    EVENT_QUEUE_CTRL:       'queueCtrlLog',
+    EVENT_HOST_CTRL:        'hostCtrlLog',
+    EVENT_MBD_DIE:          'mbdDieLog',
+    EVENT_MBD_UNFULFILL:    'unfulfillLog',
+    EVENT_JOB_FINISH:       'jobFinishLog',
+    EVENT_LOAD_INDEX:       'loadIndexLog',
+    EVENT_CHKPNT:           'chkpntLog',
+    EVENT_MIG:              'migLog',
+    EVENT_PRE_EXEC_START:   'jobStartLog',
+    EVENT_MBD_START:        'mbdStartLog',
+    EVENT_JOB_MODIFY:       'jobModLog',
+    EVENT_JOB_SIGNAL:       'signalLog',
+    EVENT_JOB_EXECUTE:      'jobExecuteLog',
+    EVENT_JOB_MSG:          'jobMsgLog',
+    EVENT_JOB_MSG_ACK:      'jobMsgAckLog',
+    EVENT_JOB_REQUEUE:      'jobRequeueLog',
+    EVENT_JOB_SIGACT:       'sigactLog',
+    EVENT_SBD_JOB_STATUS:   'sbdJobStatusLog',
+    EVENT_JOB_START_ACCEPT: 'jobStartAcceptLog',
+    EVENT_JOB_CLEAN:        'jobCleanLog',
+    EVENT_JOB_FORCE:        'jobForceRequestLog',
+    EVENT_LOG_SWITCH:       'logSwitchLog',
+    EVENT_JOB_MODIFY2:      'jobModLog',
+    EVENT_JOB_ATTR_SET:     'jobAttrSetLog',
+}
+
+
+cdef LS_LONG_INT _event_job_id(eventRec * er):
+    """Returns the full job id of the job an event refers to, or 0 if it is not a job event"""
+    cdef eventLog * el = &er.eventLog
+    cdef int job_id = 0
+    cdef int idx = 0
+    if er.type == EVENT_JOB_NEW:
+        job_id, idx = el.jobNewLog.jobId, el.jobNewLog.idx
+    elif er.type == EVENT_JOB_START or er.type == EVENT_PRE_EXEC_START:
+        job_id, idx = el.jobStartLog.jobId, el.jobStartLog.idx
+    elif er.type == EVENT_JOB_START_ACCEPT:
+        job_id, idx = el.jobStartAcceptLog.jobId, el.jobStartAcceptLog.idx
+    elif er.type == EVENT_JOB_EXECUTE:
+        job_id, idx = el.jobExecuteLog.jobId, el.jobExecuteLog.idx
+    elif er.type == EVENT_JOB_STATUS:
+        job_id, idx = el.jobStatusLog.jobId, el.jobStatusLog.idx
+    elif er.type == EVENT_SBD_JOB_STATUS:
+        job_id, idx = el.sbdJobStatusLog.jobId, el.sbdJobStatusLog.idx
+    elif er.type == EVENT_JOB_SWITCH:
+        job_id, idx = el.jobSwitchLog.jobId, el.jobSwitchLog.idx
+    elif er.type == EVENT_JOB_MOVE:
+        job_id, idx = el.jobMoveLog.jobId, el.jobMoveLog.idx
+    elif er.type == EVENT_CHKPNT:
+        job_id, idx = el.chkpntLog.jobId, el.chkpntLog.idx
+    elif er.type == EVENT_JOB_REQUEUE:
+        job_id, idx = el.jobRequeueLog.jobId, el.jobRequeueLog.idx
+    elif er.type == EVENT_JOB_CLEAN:
+        job_id, idx = el.jobCleanLog.jobId, el.jobCleanLog.idx
+    elif er.type == EVENT_JOB_SIGACT:
+        job_id, idx = el.sigactLog.jobId, el.sigactLog.idx
+    elif er.type == EVENT_MIG:
+        job_id, idx = el.migLog.jobId, el.migLog.idx
+    elif er.type == EVENT_JOB_SIGNAL:
+        job_id, idx = el.signalLog.jobId, el.signalLog.idx
+    elif er.type == EVENT_MBD_UNFULFILL:
+        job_id, idx = el.unfulfillLog.jobId, el.unfulfillLog.idx
+    elif er.type == EVENT_JOB_FINISH:
+        job_id, idx = el.jobFinishLog.jobId, el.jobFinishLog.idx
+    elif er.type == EVENT_JOB_MSG:
+        job_id, idx = el.jobMsgLog.jobId, el.jobMsgLog.idx
+    elif er.type == EVENT_JOB_MSG_ACK:
+        job_id, idx = el.jobMsgAckLog.jobId, el.jobMsgAckLog.idx
+    elif er.type == EVENT_JOB_FORCE:
+        job_id, idx = el.jobForceRequestLog.jobId, el.jobForceRequestLog.idx
+    elif er.type == EVENT_JOB_ATTR_SET:
+        job_id, idx = el.jobAttrSetLog.jobId, el.jobAttrSetLog.idx
+    elif er.type == EVENT_JOB_MODIFY or er.type == EVENT_JOB_MODIFY2:
+        return _parse_job_id_str(el.jobModLog.jobIdStr)
+    return (<LS_LONG_INT>idx << 32) | job_id
+
+
+cdef LS_LONG_INT _parse_job_id_str(char * job_id_str):
+    #jobIdStr is either "1234" or "1234[5]" for an element of an array job
+    if job_id_str == NULL:
+        return 0
+    value = job_id_str.decode('ascii', 'replace').strip()
+    job_id, sep, idx = value.partition(u"[")
+    try:
+        job_id = int(job_id)
+        idx = int(idx.rstrip(u"]")) if sep else 0
+    except ValueError:
+        return 0
+    return create_job_id(job_id, idx)
+
+
+cdef class EventRecord(_Record):
     cdef eventRec * _data
 
     cdef _load_struct(self, eventRec * data ):
@@ -4363,8 +5939,22 @@ cdef class EventRecord:
         def __get__(self):
             EL=EventLog()
             EL._load_struct(&self._data.eventLog)
+            _share_block(EL, self)
             return EL
 
+    property log:
+        def __get__(self):
+            """The log object for this type of event, eg a JobNewLog for EVENT_JOB_NEW, or None for unknown types"""
+            name = EVENT_LOG_ATTRIBUTES.get(self._data.type)
+            if name is None:
+                return None
+            return getattr(self.eventLog, name)
+
+    property jobId:
+        def __get__(self):
+            """The full job id (including the array index) of the job the event refers to, or 0 if the event is not about a job"""
+            return _event_job_id(self._data)
+
     def __to_dict(self):
         d={}
 
@@ -4401,10 +5991,9 @@ cdef class EventRecord:
             'jobModLog':None,
             'jobAttrSetLog':None,
         }
-        if self.type == EVENT_JOB_NEW:
-            l['jobNewLog'] = self.eventLog.jobNewLog
-        elif self.type == EVENT_JOB_FINISH:
-            l['jobFinishLog'] = self.eventLog.jobFinishLog
+        name = EVENT_LOG_ATTRIBUTES.get(self._data.type)
+        if name is not None:
+            l[name] = self.log
 
         d['eventLog']=l
         return d
@@ -4412,7 +6001,7 @@ cdef class EventRecord:
 
 
 
-cdef class EventLog:
+cdef class EventLog(_Record):
     cdef eventLog * _data
     cdef _load_struct(self, eventLog * data ):
         self._data=data
@@ -4421,171 +6010,766 @@ cdef class EventLog:
         def __get__(self):
             a=JobNewLog()
             a._load_struct(&self._data.jobNewLog)
+            _share_block(a, self)
             return a
 
     property jobStartLog:
         def __get__(self):
             a=JobStartLog()
             a._load_struct(&self._data.jobStartLog)
+            _share_block(a, self)
             return a
 
     property jobStatusLog:
         def __get__(self):
             a=JobStatusLog()
             a._load_struct(&self._data.jobStatusLog)
+            _share_block(a, self)
             return a
 
     property sbdJobStatusLog:
         def __get__(self):
             a=SbdJobStatusLog()
             a._load_struct(&self._data.sbdJobStatusLog)
+            _share_block(a, self)
             return a
 
     property jobSwitchLog:
         def __get__(self):
             a=JobSwitchLog()
             a._load_struct(&self._data.jobSwitchLog)
+            _share_block(a, self)
             return a
 
     property jobMoveLog:
         def __get__(self):
             a=JobMoveLog()
             a._load_struct(&self._data.jobMoveLog)
+            _share_block(a, self)
             return a
 
     property queueCtrlLog:
         def __get__(self):
             a=QueueCtrlLog()
             a._load_struct(&self._data.queueCtrlLog)
+            _share_block(a, self)
             return a
 
     property newDebugLog:
         def __get__(self):
             a=NewDebugLog()
             a._load_struct(&self._data.newDebugLog)
+            _share_block(a, self)
             return a
 
     property hostCtrlLog:
         def __get__(self):
             a=HostCtrlLog()
             a._load_struct(&self._data.hostCtrlLog)
+            _share_block(a, self)
             return a
 
     property mbdStartLog:
         def __get__(self):
             a=MbdStartLog()
             a._load_struct(&self._data.mbdStartLog)
+            _share_block(a, self)
             return a
 
     property mbdDieLog:
         def __get__(self):
             a=MbdDieLog()
             a._load_struct(&self._data.mbdDieLog)
+            _share_block(a, self)
             return a
 
     property unfulfillLog:
         def __get__(self):
             a=UnfulfillLog()
             a._load_struct(&self._data.unfulfillLog)
+            _share_block(a, self)
             return a
 
     property jobFinishLog:
         def __get__(self):
             a=JobFinishLog()
             a._load_struct(&self._data.jobFinishLog)
+            _share_block(a, self)
             return a
 
     property loadIndexLog:
         def __get__(self):
             a=LoadIndexLog()
             a._load_struct(&self._data.loadIndexLog)
+            _share_block(a, self)
             return a
 
     property migLog:
         def __get__(self):
             a=MigLog()
             a._load_struct(&self._data.migLog)
+            _share_block(a, self)
             return a
 
     property signalLog:
         def __get__(self):
             a=SignalLog()
             a._load_struct(&self._data.signalLog)
+            _share_block(a, self)
             return a
 
     property jobExecuteLog:
         def __get__(self):
             a=JobExecuteLog()
             a._load_struct(&self._data.jobExecuteLog)
+            _share_block(a, self)
             return a
 
     property jobMsgLog:
         def __get__(self):
             a=JobMsgLog()
             a._load_struct(&self._data.jobMsgLog)
+            _share_block(a, self)
             return a
 
     property jobMsgAckLog:
         def __get__(self):
             a=JobMsgAckLog()
             a._load_struct(&self._data.jobMsgAckLog)
+            _share_block(a, self)
             return a
 
     property jobRequeueLog:
         def __get__(self):
             a=JobRequeueLog()
             a._load_struct(&self._data.jobRequeueLog)
+            _share_block(a, self)
             return a
 
     property chkpntLog:
         def __get__(self):
             a=ChkpntLog()
             a._load_struct(&self._data.chkpntLog)
+            _share_block(a, self)
             return a
 
     property sigactLog:
         def __get__(self):
             a=SigactLog()
             a._load_struct(&self._data.sigactLog)
+            _share_block(a, self)
             return a
 
     property jobStartAcceptLog:
         def __get__(self):
             a=JobStartAcceptLog()
             a._load_struct(&self._data.jobStartAcceptLog)
+            _share_block(a, self)
             return a
 
     property jobCleanLog:
         def __get__(self):
             a=JobCleanLog()
             a._load_struct(&self._data.jobCleanLog)
+            _share_block(a, self)
             return a
 
     property jobForceRequestLog:
         def __get__(self):
             a=JobForceRequestLog()
             a._load_struct(&self._data.jobForceRequestLog)
+            _share_block(a, self)
             return a
 
     property logSwitchLog:
         def __get__(self):
             a=LogSwitchLog()
             a._load_struct(&self._data.logSwitchLog)
+            _share_block(a, self)
             return a
 
     property jobModLog:
         def __get__(self):
             a=JobModLog()
             a._load_struct(&self._data.jobModLog)
+            _share_block(a, self)
             return a
 
     property jobAttrSetLog:
         def __get__(self):
             a=JobAttrSetLog()
             a._load_struct(&self._data.jobAttrSetLog)
+            _share_block(a, self)
             return a
 
 
+cdef class EventLogReader:
+    """
+Iterates over the records in an lsb.events or lsb.acct file, returning EventRecord
+objects.  Records can be filtered by event type and by event time, records that do not
+match are skipped without creating any Python objects.
+
+The position of the reader can be saved with checkpoint() and later passed back to the
+constructor to carry on from where the reader stopped.  If the file is smaller than the
+saved offset, or its inode no longer matches, it is assumed to have been rotated and the
+reader starts again from the beginning of the file.
+
+In follow mode the reader waits for new records at the end of the file rather than
+stopping.  When openlava switches to a new lsb.events file (logged as an
+EVENT_LOG_SWITCH record) the reader reopens the path and carries on with the new file.
+
+.. note:: As with lsb_geteventrec(), the returned EventRecord refers to memory that is reused by the next read, from this or any other reader.
+
+Thread safety: each reader should only be used by one thread at a time.  Readers in
+different threads can run at the same time, the GIL is released while each record is
+parsed.
+
+:param str path: Path to the event log file
+:param list event_types: Only return records of these types, eg EVENT_JOB_NEW, EVENT_JOB_FINISH. None returns all types
+:param int start_time: Skip records logged before this epoch time
+:param int end_time: Skip records logged after this epoch time, 0 for no limit
+:param int offset: Byte offset in the file to start reading from
+:param int line_number: Line number of the record at offset
+:param int inode: Inode of the file the offset refers to, as saved by checkpoint()
+:param bool follow: Wait for new records at the end of the file instead of stopping
+:param float poll_interval: Seconds to wait between checks for new records in follow mode
+
+::
+
+    >>> from openlava import lsblib
+    >>> reader = lsblib.EventLogReader("/opt/openlava/work/logdir/lsb.events",
+    ...                                event_types=[lsblib.EVENT_JOB_FINISH])
+    >>> for rec in reader:
+    ...     print rec.eventLog.jobFinishLog.jobId
+    ...
+    4562
+    >>> reader.checkpoint()
+    {'path': '/opt/openlava/work/logdir/lsb.events', 'line_number': 1093, 'offset': 377212, 'inode': 1050371}
+
+"""
+    cdef object _path
+    cdef object _fh
+    cdef FILE * _cfh
+    cdef int _line_number
+    cdef long _record_offset
+    cdef char _types[EVENT_TYPE_SLOTS]
+    cdef bint _filter_types
+    cdef long _start_time
+    cdef long _end_time
+    cdef bint _follow
+    cdef double _poll_interval
+    cdef int _bad_records
+
+    def __cinit__(self, path, event_types=None, start_time=0, end_time=0, offset=0,
+                  line_number=0, inode=None, follow=False, poll_interval=1.0):
+        self._path = path
+        self._fh = None
+        self._cfh = NULL
+        self._start_time = start_time
+        self._end_time = end_time
+        self._follow = follow
+        self._poll_interval = poll_interval
+        self._bad_records = 0
+
+        memset(self._types, 0, sizeof(self._types))
+        self._filter_types = event_types is not None
+        if event_types is not None:
+            for t in event_types:
+                if t < 0 or t >= EVENT_TYPE_SLOTS:
+                    raise ValueError("Unknown event type {}".format(t))
+                self._types[t] = 1
+
+        self._open(offset, line_number, inode)
+
+    cdef _open(self, long offset, int line_number, inode):
+        self.close()
+        self._fh = open(self._path)
+        self._cfh = PyFile_AsFile(self._fh)
+        st = os.fstat(self._fh.fileno())
+        if offset > st.st_size or (inode is not None and inode != st.st_ino):
+            #the file has been rotated since the offset was saved
+            offset = 0
+            line_number = 0
+        if offset > 0 and fseek(self._cfh, offset, SEEK_SET) != 0:
+            raise IOError("Unable to seek to {} in {}".format(offset, self._path))
+        self._line_number = line_number
+        self._record_offset = offset
+
+    cdef bint _rotated(self):
+        try:
+            return os.stat(self._path).st_ino != os.fstat(self._fh.fileno()).st_ino
+        except OSError:
+            #openlava is in the middle of switching files, try again next time
+            return False
+
+    def close(self):
+        """Close the underlying file"""
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = None
+        self._cfh = NULL
+
+    def seek(self, offset, line_number=0):
+        """Move the reader to the record starting at offset, eg a record_offset saved earlier"""
+        if self._cfh == NULL:
+            raise ValueError("I/O operation on closed reader")
+        if fseek(self._cfh, offset, SEEK_SET) != 0:
+            raise IOError("Unable to seek to {} in {}".format(offset, self._path))
+        self._line_number = line_number
+        self._record_offset = offset
+
+    property inode:
+        def __get__(self):
+            """Inode of the open file, None once the reader is closed"""
+            if self._fh is None:
+                return None
+            return os.fstat(self._fh.fileno()).st_ino
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        cdef eventRec * er
+        while True:
+            with library_lock:
+                er = self._read()
+                if er != NULL:
+                    rec = EventRecord()
+                    rec._load_struct(er)
+                    return rec
+            if not self._wait():
+                raise StopIteration
+
+    cdef eventRec * _read(self) except? NULL:
+        """Return the next matching record, or NULL at the end of the file.  Call while holding library_lock"""
+        cdef eventRec * er
+        cdef FILE * cfh = self._cfh
+        cdef long start
+        cdef int line_number
+        cdef int next_line_number
+
+        if cfh == NULL:
+            return NULL
+
+        while True:
+            start = ftell(cfh)
+            line_number = self._line_number
+            next_line_number = line_number
+            _c_start()
+            with nogil:
+                er = lsmethods.lsb_geteventrec(cfh, &next_line_number)
+            _c_stop()
+            self._line_number = next_line_number
+
+            if er == NULL:
+                if lsberrno == LSBE_EVENT_FORMAT and not feof(cfh):
+                    self._bad_records += 1
+                    continue
+
+                if lsberrno != LSBE_EOF and lsberrno != LSBE_EVENT_FORMAT:
+                    raise IOError("Error reading {} at line {}: lsberrno {}".format(
+                        self._path, self._line_number, lsberrno))
+
+                #end of file, possibly part way through a record that is still being written,
+                #so go back to the start of it to read it again next time
+                clearerr(cfh)
+                fseek(cfh, start, SEEK_SET)
+                self._line_number = line_number
+                return NULL
+
+            if self._filter_types and (er.type < 0 or er.type >= EVENT_TYPE_SLOTS or not self._types[er.type]):
+                continue
+            if er.eventTime < self._start_time:
+                continue
+            if self._end_time and er.eventTime > self._end_time:
+                continue
+
+            self._record_offset = start
+            return er
+
+    cdef bint _wait(self) except -1:
+        """Called at the end of the file, returns False if the reader should stop, otherwise waits for more records"""
+        if self._cfh == NULL or not self._follow:
+            return False
+        if self._rotated():
+            #openlava has logged EVENT_LOG_SWITCH, moved the file out of the
+            #way and started a new one
+            self._open(0, 0, None)
+        else:
+            time.sleep(self._poll_interval)
+        return True
+
+    def read_finish_columns(self, int max_rows=100000, StringTable strings=None):
+        """Read up to max_rows EVENT_JOB_FINISH records into a FinishColumns batch.
+
+Other event types are skipped.  The batch stops early at the end of the file, even in
+follow mode, so an empty batch means there are no more records yet.
+
+:param int max_rows: Maximum number of records to read
+:param StringTable strings: Table to encode the string columns with, use the same table for every batch to get codes that can be compared between batches
+:return: The records read, one row per job
+:rtype: FinishColumns
+"""
+        cdef eventRec * er
+        cdef int count = 0
+        cdef FinishColumns columns
+
+        if strings is None:
+            strings = StringTable()
+        columns = FinishColumns(max_rows, strings)
+        while count < max_rows:
+            with library_lock:
+                er = self._read()
+                if er == NULL:
+                    break
+                if er.type != EVENT_JOB_FINISH:
+                    continue
+                columns._set_row(count, &er.eventLog.jobFinishLog)
+            count += 1
+        columns._truncate(count)
+        return columns
+
+    def checkpoint(self):
+        """Return the position of the reader as a dict, which can be passed as keyword arguments to EventLogReader() to resume"""
+        return {
+            'path': self._path,
+            'offset': self.offset,
+            'line_number': self._line_number,
+            'inode': self.inode,
+        }
+
+    property path:
+        def __get__(self):
+            return self._path
+
+    property offset:
+        def __get__(self):
+            """Byte offset just after the last record read"""
+            if self._cfh == NULL:
+                return self._record_offset
+            return ftell(self._cfh)
+
+    property record_offset:
+        def __get__(self):
+            """Byte offset of the start of the last record returned"""
+            return self._record_offset
+
+    property line_number:
+        def __get__(self):
+            return self._line_number
+
+    property bad_records:
+        def __get__(self):
+            """Number of records skipped because they could not be parsed"""
+            return self._bad_records
+
+
+include "event_fields.pxi"
+
+#kinds of record in the index of packed records
+DEF _KIND_JOB_INFO = 1
+DEF _KIND_HOST_INFO = 2
+DEF _KIND_QUEUE_INFO = 3
+DEF _KIND_USER_INFO = 4
+DEF _KIND_EVENT_RECORD = 5
+#plus the position of the member in LOG_MEMBERS
+DEF _KIND_LOG = 32
+
+include "record_layouts.pxi"
+
+cdef int _pack_event_record(_Packer p, eventRec * er) except -1:
+    cdef Py_ssize_t at = p.image(er, sizeof(eventRec))
+    name = EVENT_LOG_ATTRIBUTES.get(er.type)
+    if name is None:
+        #nothing is known about the union for this type, so its pointers can't be followed
+        memset(&(<eventRec *>(p.data + at)).eventLog, 0, sizeof(eventLog))
+        p.add(_KIND_EVENT_RECORD, -1, at)
+    else:
+        member = LOG_MEMBERS.index(name)
+        _pack_log_member(member, p, &er.eventLog, at + (<char *>&er.eventLog - <char *>er))
+        p.add(_KIND_EVENT_RECORD, member, at)
+    return 0
+
+def pack_records(records):
+    """pack_records(records)
+
+Packs records into a single string of bytes, which unpack_records() turns back into
+records.  This is much cheaper than converting each record to a dict, and is what is
+used when records are pickled.
+
+JobInfoEnt, HostInfoEnt, QueueInfoEnt, UserInfoEnt, EventRecord, EventLog and the *Log
+objects can be packed, the record is copied along with the strings and arrays it points
+to.  The bytes use the layout of the C structs on this machine, so they can be passed to
+other processes using the same build, but are not a storage format.  The words of the
+copies that are zero, most of a job's submit options and resource usage, are left out, so
+a job takes about 560 bytes rather than the 968 of its structs and strings.
+
+:param list records: Records to pack
+:return: Packed records
+:rtype: str
+:raises ValueError: If a JobInfoView was not materialized before the job cursor moved on
+:raises TypeError: If a record can not be packed
+
+::
+
+    >>> from openlava import lsblib
+    >>> lsblib.lsb_init("test")
+    0
+    >>> data = lsblib.pack_records(lsblib.lsb_hostinfo())
+    >>> [h.host for h in lsblib.unpack_records(data)]
+    [u'master', u'comp00', u'comp01', u'comp02', u'comp03']
+
+"""
+    cdef _Packer p = _Packer()
+    cdef JobInfoEnt job
+    cdef JobInfoView view
+    cdef Py_ssize_t at
+    for rec in records:
+        if isinstance(rec, JobInfoEnt):
+            job = rec
+            if isinstance(rec, JobInfoView):
+                view = rec
+                if view._data == &view._view and view._generation != _jobinfo_generation:
+                    raise ValueError("Job {} can not be packed after the job cursor moved on".format(
+                        view._view.jobId))
+            at = p.image(job._data, sizeof(jobInfoEnt))
+            _pack_jobInfoEnt(p, job._data, at)
+            p.add(_KIND_JOB_INFO, 0, at)
+        elif isinstance(rec, HostInfoEnt):
+            at = p.image((<HostInfoEnt>rec)._data, sizeof(hostInfoEnt))
+            _pack_hostInfoEnt(p, (<HostInfoEnt>rec)._data, at)
+            p.add(_KIND_HOST_INFO, 0, at)
+        elif isinstance(rec, QueueInfoEnt):
+            at = p.image((<QueueInfoEnt>rec)._data, sizeof(queueInfoEnt))
+            _pack_queueInfoEnt(p, (<QueueInfoEnt>rec)._data, at)
+            p.add(_KIND_QUEUE_INFO, 0, at)
+        elif isinstance(rec, UserInfoEnt):
+            at = p.image((<UserInfoEnt>rec)._data, sizeof(userInfoEnt))
+            _pack_userInfoEnt(p, (<UserInfoEnt>rec)._data, at)
+            p.add(_KIND_USER_INFO, 0, at)
+        elif isinstance(rec, EventRecord):
+            if (<EventRecord>rec)._data == NULL:
+                raise ValueError("Record has no data")
+            _pack_event_record(p, (<EventRecord>rec)._data)
+        elif isinstance(rec, EventLog):
+            #the union can only be packed along with the type of the record it is part of
+            raise TypeError("EventLog objects can not be packed, pack the EventRecord or its log instead")
+        elif not _pack_log_object(p, rec):
+            raise TypeError("Can not pack {} objects".format(type(rec).__name__))
+    return p.finish()
+
+def unpack_records(data):
+    """unpack_records(data)
+
+Turns the bytes returned by pack_records() back into records.  The records of one call
+share a single block of memory, which is freed when the last of them is gone.
+
+:param str data: Packed records
+:return: List of records
+:rtype: list
+:raises ValueError: If data is not packed records
+
+"""
+    cdef _Block block = _open_block(data)
+    cdef list records = []
+    cdef Py_ssize_t i
+    cdef int kind, extra
+    cdef JobInfoEnt job
+    cdef HostInfoEnt host
+    cdef QueueInfoEnt queue
+    cdef UserInfoEnt user
+    cdef EventRecord event
+    cdef eventRec * er
+    for i in range(block.count):
+        kind = block.index[i].kind
+        extra = block.index[i].extra
+        if kind == _KIND_JOB_INFO:
+            job = JobInfoEnt(initialise=False)
+            job._data = <jobInfoEnt *>block.record(i, sizeof(jobInfoEnt))
+            _relocate_jobInfoEnt(block.data, job._data)
+            job._block = block
+            records.append(job)
+        elif kind == _KIND_HOST_INFO:
+            host = HostInfoEnt()
+            host._data = <hostInfoEnt *>block.record(i, sizeof(hostInfoEnt))
+            _relocate_hostInfoEnt(block.data, host._data)
+            host._block = block
+            records.append(host)
+        elif kind == _KIND_QUEUE_INFO:
+            queue = QueueInfoEnt()
+            queue._data = <queueInfoEnt *>block.record(i, sizeof(queueInfoEnt))
+            _relocate_queueInfoEnt(block.data, queue._data)
+            queue._block = block
+            records.append(queue)
+        elif kind == _KIND_USER_INFO:
+            user = UserInfoEnt()
+            user._data = <userInfoEnt *>block.record(i, sizeof(userInfoEnt))
+            _relocate_userInfoEnt(block.data, user._data)
+            user._block = block
+            records.append(user)
+        elif kind == _KIND_EVENT_RECORD:
+            er = <eventRec *>block.record(i, sizeof(eventRec))
+            if extra >= 0:
+                _relocate_log_member(extra, block.data, &er.eventLog)
+            event = EventRecord()
+            event._data = er
+            event._block = block
+            records.append(event)
+        elif kind >= _KIND_LOG and kind - _KIND_LOG < len(LOG_MEMBERS):
+            records.append(_unpack_log_object(kind - _KIND_LOG, block, i))
+        else:
+            raise ValueError("Unknown packed record kind {}".format(kind))
+    return records
+
+def _unpack_record(data):
+    """Unpickles a single record packed by _Record.__reduce__()"""
+    return unpack_records(data)[0]
+
+cdef inline object _field_string(char * s):
+    if s == NULL:
+        return u""
+    return s.decode('utf-8', 'replace')
+
+cdef list _field_strings(char ** s, int n):
+    cdef int i
+    if s == NULL:
+        return []
+    return [_field_string(s[i]) for i in range(n)]
+
+cdef list _field_ints(int * v, int n):
+    cdef int i
+    return [v[i] for i in range(n)]
+
+cdef list _field_xfiles(xFile * xf, int n):
+    cdef int i
+    if xf == NULL:
+        return []
+    return [_xFile_dict(&xf[i]) for i in range(n)]
+
+#fields of the event record itself, available for every event type
+EVENT_HEADER_FIELDS = ('version', 'type', 'eventTime')
+DEF FIELD_MISSING = -1
+DEF FIELD_VERSION = -2
+DEF FIELD_TYPE = -3
+DEF FIELD_EVENT_TIME = -4
+
+cdef class EventSerializer:
+    """
+Converts event records of any type into dicts or tuples, decoding only the requested
+fields straight from the C structs rather than going through the *Log objects.
+
+Fields are named as in the *Log classes, LOG_FIELDS lists the fields of each member of
+the eventLog union.  The record fields version, type and eventTime can also be
+requested, and take precedence over log fields with the same name (jobMsgLog.type).
+Requested fields that an event type does not have are returned as None.  Nested
+structs, such as lsfRusage and xf, are returned as dicts.
+
+With no fields given each record is converted in full: version, type and eventTime
+followed by every field of its log.
+
+:param list fields: Names of the fields to return, None for all fields
+:param bool as_tuple: Return tuples of values in the order of fields, instead of dicts
+
+::
+
+    >>> from openlava import lsblib
+    >>> serializer = lsblib.EventSerializer(['eventTime', 'jobId', 'userName'], as_tuple=True)
+    >>> reader = lsblib.EventLogReader("lsb.acct")
+    >>> serializer.read(reader, 2)
+    [(1390404552, 4562, u'irvined'), (1390404571, 4563, u'irvined')]
+    >>> serializer = lsblib.EventSerializer(['jobId', 'queue'])
+    >>> serializer(lsblib.lsb_geteventrec(open("lsb.events"), 0))
+    {'jobId': 4562, 'queue': u'normal'}
+
+"""
+    cdef tuple _fields
+    cdef bint _as_tuple
+    cdef list _plans
+    cdef list _names
+    cdef int _members[EVENT_TYPE_SLOTS + 1]
+
+    def __cinit__(self, fields=None, as_tuple=False):
+        cdef int t
+        self._fields = tuple(fields) if fields is not None else None
+        self._as_tuple = as_tuple
+        #plans are built the first time each type is seen, the last slot is for unknown types
+        self._plans = [None] * (EVENT_TYPE_SLOTS + 1)
+        self._names = [None] * (EVENT_TYPE_SLOTS + 1)
+        for t in range(EVENT_TYPE_SLOTS + 1):
+            name = EVENT_LOG_ATTRIBUTES.get(t) if t < EVENT_TYPE_SLOTS else None
+            self._members[t] = LOG_MEMBERS.index(name) if name is not None else -1
+
+    property fields:
+        def __get__(self):
+            return self._fields
+
+    cdef array.array _plan(self, int slot):
+        """Return the field codes to decode for records using the given type slot"""
+        cdef array.array plan = self._plans[slot]
+        if plan is not None:
+            return plan
+
+        member = self._members[slot]
+        log_fields = LOG_FIELDS[LOG_MEMBERS[member]] if member >= 0 else ()
+        names = self._fields if self._fields is not None else EVENT_HEADER_FIELDS + log_fields
+        codes = []
+        for name in names:
+            if name == 'version':
+                codes.append(FIELD_VERSION)
+            elif name == 'type':
+                codes.append(FIELD_TYPE)
+            elif name == 'eventTime':
+                codes.append(FIELD_EVENT_TIME)
+            elif name in log_fields:
+                codes.append(log_fields.index(name))
+            else:
+                codes.append(FIELD_MISSING)
+        plan = array.array('i', codes)
+        self._plans[slot] = plan
+        self._names[slot] = tuple(names)
+        return plan
+
+    cdef object _serialize(self, eventRec * er):
+        cdef int slot = er.type if 0 <= er.type < EVENT_TYPE_SLOTS else EVENT_TYPE_SLOTS
+        cdef array.array plan = self._plan(slot)
+        cdef int member = self._members[slot]
+        cdef int i, code
+        cdef list values = [None] * len(plan)
+
+        for i in range(len(plan)):
+            code = plan.data.as_ints[i]
+            if code >= 0:
+                values[i] = _log_field(member, &er.eventLog, code)
+            elif code == FIELD_VERSION:
+                values[i] = _field_string(er.version)
+            elif code == FIELD_TYPE:
+                values[i] = er.type
+            elif code == FIELD_EVENT_TIME:
+                values[i] = er.eventTime
+
+        if self._as_tuple:
+            return tuple(values)
+        return dict(zip(self._names[slot], values))
+
+    def __call__(self, EventRecord rec):
+        """Serialize a single EventRecord"""
+        if rec is None or rec._data == NULL:
+            raise ValueError("No event record")
+        return self._serialize(rec._data)
+
+    def read(self, EventLogReader reader, int max_rows=0):
+        """Serialize up to max_rows records from reader, 0 for no limit, stopping at the end of the file, and return them as a list"""
+        cdef eventRec * er
+        cdef list rows = []
+        while max_rows <= 0 or len(rows) < max_rows:
+            with library_lock:
+                er = reader._read()
+                if er == NULL:
+                    break
+                rows.append(self._serialize(er))
+        return rows
+
+
 cdef class LsfRusage:
     cdef lsfRusage * _data
 
@@ -63,13 +63,72 @@ Members
 """
 
 import cython
-from libc.stdlib cimport malloc, free
-from libc.string cimport strcmp, memset
+from libc.stdlib cimport malloc, realloc, free
+from libc.string cimport strcmp, memset, memcpy, strlen
 from cpython.string cimport PyString_AsString
+from cpython cimport array
+import array
 
 cimport lsmethods
 from lsconstants cimport *
 from lsstructs cimport clusterInfo, hostInfo, hostLoad, lsInfo, resItem, lserrno
+from posix.time cimport clock_gettime, timespec, CLOCK_MONOTONIC
+from openlava.utils import library_lock, library_errors
+
+include "packing.pxi"
+
+cdef _save_errors():
+	"""Remember lserrno after the last call for this thread, call while holding library_lock"""
+	library_errors.lserrno = lserrno
+
+cdef _restore_errors():
+	"""Put back this thread's lserrno before asking openlava to describe it"""
+	global lserrno
+	lserrno = getattr(library_errors, 'lserrno', lserrno)
+
+#set by openlava.instrument, while on the time spent in liblsf is added to library_errors.c_time
+cdef bint _timing = False
+cdef timespec _c_started
+
+cdef inline void _c_start():
+	if _timing:
+		clock_gettime(CLOCK_MONOTONIC, &_c_started)
+
+cdef inline _c_stop():
+	cdef timespec now
+	if _timing:
+		clock_gettime(CLOCK_MONOTONIC, &now)
+		library_errors.c_time = (getattr(library_errors, 'c_time', 0.0) + (now.tv_sec - _c_started.tv_sec) +
+		                         (now.tv_nsec - _c_started.tv_nsec) * 1e-9)
+
+def _set_timing(enabled):
+	"""Turn the timing of calls into liblsf on or off, used by openlava.instrument"""
+	global _timing
+	_timing = enabled
+
+cdef array.array _INT_ARRAY = array.array('i')
+
+include "float_array.pxi"
+
+cdef list _index_names(char ** names, int n):
+	"""Names of the load indices in the NULL terminated list returned by ls_loadinfo()"""
+	return [u"%s" % names[i] for i in range(n)]
+
+cdef dict _positions(names):
+	"""Dict of name -> position of its first occurrence in names"""
+	cdef dict positions = {}
+	for i, name in enumerate(names):
+		positions.setdefault(name, i)
+	return positions
+
+cdef list _host_loads(hostLoad * hosts, int numHosts, int nIdx):
+	hlist=[]
+	for i in range(numHosts):
+		h=HostLoad()
+		h._load_struct(&hosts[i])
+		h._nIdx=nIdx
+		hlist.append(h)
+	return hlist
 
 def LS_ISUNAVAIL(status):
 	"""openlava.lslib.LS_ISUNAVAIL(status)
@@ -571,9 +630,13 @@ Returns true as long as the RES and SBD are not down
 	return ((status[0]) & (LIM_RESDOWN | LIM_SBDDOWN)) == 0
 
 cdef char ** to_cstring_array(list_str):
-	cdef char **ret = <char **>malloc(len(list_str) * sizeof(char *))
+	#NULL terminated, as liblsf expects for index name lists
+	cdef char **ret = <char **>malloc((len(list_str) + 1) * sizeof(char *))
+	if ret == NULL:
+		raise MemoryError()
 	for i in xrange(len(list_str)):
 		ret[i] = PyString_AsString(list_str[i])
+	ret[len(list_str)] = NULL
 	return ret
 
 
@@ -588,6 +651,9 @@ Returns an array of ClusterInfo objects.
 :param int options: ignored
 :returns: Array of ClusterInfo objects, or None on error
 :rtype: Array or None
+
+Thread safety: releases the GIL while waiting for the LIM.  The returned objects point
+into a buffer that is reused by the next call to ls_clusterinfo() from any thread.
 """
 	cdef int nClusters
 	nClusters=0
@@ -602,7 +668,16 @@ Returns an array of ClusterInfo objects.
 	clusterlist=NULL
 	if listSize > 0:
 		clusterlist=to_cstring_array(clusterList)
-	cinfo=lsmethods.ls_clusterinfo(resreq, &nClusters, clusterlist, listSize, options)
+	cdef int opts=options
+	try:
+		with library_lock:
+			_c_start()
+			with nogil:
+				cinfo=lsmethods.ls_clusterinfo(resreq, &nClusters, clusterlist, listSize, opts)
+			_c_stop()
+			_save_errors()
+	finally:
+		free(clusterlist)
 	if cinfo==NULL:
 		return None
 	# iterate and populat
@@ -734,10 +809,33 @@ Returns the lserrno
 	u'Internal library error'
 	>>> 
 
+Thread safety: returns the lserrno left by the last call made in the calling thread,
+including calls made through lsblib.
 
 """
 
-	return lserrno
+	return getattr(library_errors, 'lserrno', lserrno)
+
+def has_resource(host, name):
+	"""openlava.lslib.has_resource(host, name)
+
+True if a host has a resource.  The resources of each HostInfo are kept in a set the
+first time it is asked, so checking many resources of many hosts is a hash lookup each.
+
+:param HostInfo host: Host, as returned by ls_gethostinfo()
+:param str name: Name of the resource
+:return: True if the host has the resource
+:rtype: bool
+
+::
+
+	>>> from openlava import lslib
+	>>> hosts = lslib.ls_gethostinfo()
+	>>> [h.hostName for h in hosts if lslib.has_resource(h, "cs")]
+	[u'master']
+
+"""
+	return (<HostInfo?>host).has_resource(name)
 
 def ls_getclustername():
 	"""openlava.lslib.ls_getclustername()
@@ -753,8 +851,17 @@ Returns the name of the cluster
 	>>> lslib.ls_getclustername()
 	u'openlava'
 
+Thread safety: releases the GIL while waiting for the LIM.
+
 """
-	return u"%s" % lsmethods.ls_getclustername()
+	cdef char * name
+	with library_lock:
+		_c_start()
+		with nogil:
+			name = lsmethods.ls_getclustername()
+		_c_stop()
+		_save_errors()
+		return u"%s" % name
 
 def ls_gethostfactor(hostname):
 	"""openlava.lslib.ls_gethostfactor(hostname)
@@ -772,11 +879,19 @@ Returns the host factor of the host
 	100.0
 	>>> 
 
+Thread safety: releases the GIL while waiting for the LIM.
 
 """
 	cdef float *factor
-	factor = lsmethods.ls_gethostfactor(hostname)
-	return factor[0]
+	hostname = str(hostname)
+	cdef char * host = hostname
+	with library_lock:
+		_c_start()
+		with nogil:
+			factor = lsmethods.ls_gethostfactor(host)
+		_c_stop()
+		_save_errors()
+		return factor[0]
 
 def ls_gethostinfo(resReq="", hostList=[], options=0):
 	"""openlava.lslib.ls_gethostinfo(resReq="", hostList=[], options=0)
@@ -803,6 +918,9 @@ Returns an array of HostInfo objects that meet the criteria specified
 	comp04
 	>>> 
 
+Thread safety: releases the GIL while waiting for the LIM.  The returned objects point
+into a buffer that is reused by the next call to ls_gethostinfo() from any thread.
+
 """
 	host_list=[]
 	cdef hostInfo * h
@@ -815,7 +933,17 @@ Returns an array of HostInfo objects that meet the criteria specified
 	if len(hostList)>0:
 		hosts=to_cstring_array(hostList)
 
-	h=lsmethods.ls_gethostinfo(resourceRequest, &numHosts, hosts, len(hostList), options)
+	cdef int listsize=len(hostList)
+	cdef int opts=options
+	try:
+		with library_lock:
+			_c_start()
+			with nogil:
+				h=lsmethods.ls_gethostinfo(resourceRequest, &numHosts, hosts, listsize, opts)
+			_c_stop()
+			_save_errors()
+	finally:
+		free(hosts)
 	if h==NULL:
 		return None
 
@@ -841,13 +969,22 @@ Returns the model name of the host
 	u'IntelI5'
 	>>> 
 
+Thread safety: releases the GIL while waiting for the LIM.
 
 """
 
-	cdef char * model=lsmethods.ls_gethostmodel(hostname)
-	if model==NULL:
-		return None
-	return unicode(model)
+	cdef char * model
+	hostname = str(hostname)
+	cdef char * host = hostname
+	with library_lock:
+		_c_start()
+		with nogil:
+			model=lsmethods.ls_gethostmodel(host)
+		_c_stop()
+		_save_errors()
+		if model==NULL:
+			return None
+		return unicode(model)
 
 def ls_gethosttype(hostname):
 	"""openlava.lslib.ls_gethosttype(hostname)
@@ -865,13 +1002,22 @@ Returns the type of the host
 	u'linux'
 	>>> 
 
+Thread safety: releases the GIL while waiting for the LIM.
 
 """
 
-	cdef char * hosttype=lsmethods.ls_gethosttype(hostname)
-	if hosttype==NULL:
-		return None
-	return unicode(hosttype)
+	cdef char * hosttype
+	hostname = str(hostname)
+	cdef char * host = hostname
+	with library_lock:
+		_c_start()
+		with nogil:
+			hosttype=lsmethods.ls_gethosttype(host)
+		_c_stop()
+		_save_errors()
+		if hosttype==NULL:
+			return None
+		return unicode(hosttype)
 
 def ls_getmastername():
 	"""openlava.lslib.ls_getmastername()
@@ -888,9 +1034,17 @@ Returns the name of the master host
 	u'master'
 	>>>
 
+Thread safety: releases the GIL while waiting for the LIM.
 
 """
-	return u"%s" % lsmethods.ls_getmastername()
+	cdef char * name
+	with library_lock:
+		_c_start()
+		with nogil:
+			name = lsmethods.ls_getmastername()
+		_c_stop()
+		_save_errors()
+		return u"%s" % name
 
 def ls_info():
 	"""openlava.lslib.ls_info()
@@ -907,19 +1061,26 @@ Returns an LsInfo object for the cluster
 	>>> info.hostTypes
 	[u'linux']
 
+Thread safety: releases the GIL while waiting for the LIM.  The returned object points
+into a buffer that is reused by the next call to ls_info() from any thread.
 
 """
 
 	cdef lsInfo * l
-	l=lsmethods.ls_info()
+	with library_lock:
+		_c_start()
+		with nogil:
+			l=lsmethods.ls_info()
+		_c_stop()
+		_save_errors()
 	if l==NULL:
 		return None
 	ls=LsInfo()
 	ls._load_struct(l)
 	return ls
 
-def ls_load(resreq=None, numhosts=0, options=0, fromhost=None):
-	"""openlava.lslib.ls_load(resreq=None, numhosts=0, options=0, fromhost=None)
+def ls_load(resreq=None, numhosts=0, options=0, fromhost=None, as_matrix=False):
+	"""openlava.lslib.ls_load(resreq=None, numhosts=0, options=0, fromhost=None, as_matrix=False)
 	
 Returns an array of HostLoad objects for hosts that meet the criteria
 
@@ -927,7 +1088,8 @@ Returns an array of HostLoad objects for hosts that meet the criteria
 :param int numhosts: if None, return only one host. if zero, return all matching hosts.
 :param int options: flags that affect how the hostlist is created
 :param str fromhost: when used with DFT_FROMTYPE option sets the default resource requirements to that of jobs submitted from fromhost
-:return: Array of HostLoad objects
+:param bool as_matrix: Return a LoadMatrix holding the load of every host instead of HostLoad objects
+:return: Array of HostLoad objects, or a LoadMatrix
 :rtype: array
 
 ::
@@ -952,6 +1114,10 @@ Returns an array of HostLoad objects for hosts that meet the criteria
 	master
 	>>> 
 
+Thread safety: releases the GIL while waiting for the LIM.  The returned objects point
+into a buffer that is reused by the next call to ls_load() from any thread, a LoadMatrix
+is a copy.  The load is read with ls_loadinfo(), as liblsf's own ls_load() does, so the
+number and names of the load indices come with it and follow any reconfiguration.
 
 """
 	cdef hostLoad *hosts
@@ -968,24 +1134,36 @@ Returns an array of HostLoad objects for hosts that meet the criteria
 		fromhost=str(fromhost)
 		fromHost=fromhost
 
-	if numhosts==None:
-		hosts = lsmethods.ls_load(resReq, NULL, options, fromHost)
-		numHosts=1
-	else:
-		numHosts=int(numhosts)
-		hosts = lsmethods.ls_load(resReq, &numHosts, options, fromHost);
-	if hosts==NULL:
-		return None
-
-	hlist=[]
-	for i in range(numHosts):
-		h=HostLoad()
-		h._load_struct(&hosts[i])
-		hlist.append(h)
-	return hlist
-
-def ls_loadinfo(resreq=None, numhosts=0, options=0, fromhost=None, hostlist=[], indxnamelist=[]):
-	"""openlava.lslib.ls_loadinfo(resreq=None, numhosts=0, options=0, fromhost=None, hostlist=[], indxnamelist=[])
+	#NULL asks for every load index, liblsf points it at the names of those returned
+	cdef char ** IndexList = NULL
+	cdef int opts=options
+	cdef int nIdx
+	with library_lock:
+		if numhosts==None:
+			_c_start()
+			with nogil:
+				hosts = lsmethods.ls_loadinfo(resReq, NULL, opts, fromHost, NULL, 0, &IndexList)
+			_c_stop()
+			numHosts=1
+		else:
+			numHosts=int(numhosts)
+			_c_start()
+			with nogil:
+				hosts = lsmethods.ls_loadinfo(resReq, &numHosts, opts, fromHost, NULL, 0, &IndexList)
+			_c_stop()
+		_save_errors()
+		if hosts==NULL:
+			return None
+
+		nIdx = 0
+		while IndexList != NULL and IndexList[nIdx] != NULL:
+			nIdx += 1
+		if as_matrix:
+			return LoadMatrix._create(hosts, numHosts, nIdx, _index_names(IndexList, nIdx))
+	return _host_loads(hosts, numHosts, nIdx)
+
+def ls_loadinfo(resreq=None, numhosts=0, options=0, fromhost=None, hostlist=[], indxnamelist=[], as_matrix=False):
+	"""openlava.lslib.ls_loadinfo(resreq=None, numhosts=0, options=0, fromhost=None, hostlist=[], indxnamelist=[], as_matrix=False)
 
 Returns an array of HostLoad objects for hosts that meet the specified criteria
 
@@ -995,7 +1173,8 @@ Returns an array of HostLoad objects for hosts that meet the specified criteria
 :param str fromhost: when used with DFT_FROMTYPE option sets the default resource requirements to that of jobs submitted from fromhost
 :param array hostlist: Hostnames to select from
 :param array indxnamelist: When empty returns all load indexes, else returns loadindexes specified in indxnamelist
-:return: Array of HostLoad objects
+:param bool as_matrix: Return a LoadMatrix holding the load of every host instead of HostLoad objects
+:return: Array of HostLoad objects, or a LoadMatrix
 :rtype: array
 
 ::
@@ -1018,6 +1197,10 @@ Returns an array of HostLoad objects for hosts that meet the specified criteria
 	master
 	>>> 
 
+Thread safety: releases the GIL while waiting for the LIM.  The returned objects point
+into a buffer that is reused by the next call to ls_loadinfo() from any thread, a
+LoadMatrix is a copy.
+
 """
 	cdef hostLoad *hosts
 	cdef char *resReq
@@ -1042,22 +1225,37 @@ Returns an array of HostLoad objects for hosts that meet the specified criteria
 	IndexList=NULL
 	if len(indxnamelist)>0:
 		IndexList=to_cstring_array(indxnamelist)
+	#liblsf replaces IndexList with its own list, so keep ours to free
+	cdef char ** requested = IndexList
 	
-	if numhosts==None:
-		hosts = lsmethods.ls_loadinfo(resReq, NULL, options, fromHost, hostList, listsize, &IndexList)
-		numHosts=1
-	else:
-		numHosts=int(numhosts)
-		hosts = lsmethods.ls_loadinfo(resReq, &numHosts, options, fromHost, hostList, listsize, &IndexList)
-	free(hostList)
-	if hosts==NULL:
-		return None
-	hlist=[]
-	for i in range(numHosts):
-		h=HostLoad()
-		h._load_struct(&hosts[i])
-		hlist.append(h)
-	return hlist	
+	cdef int opts=options
+	cdef int nIdx
+	with library_lock:
+		if numhosts==None:
+			_c_start()
+			with nogil:
+				hosts = lsmethods.ls_loadinfo(resReq, NULL, opts, fromHost, hostList, listsize, &IndexList)
+			_c_stop()
+			numHosts=1
+		else:
+			numHosts=int(numhosts)
+			_c_start()
+			with nogil:
+				hosts = lsmethods.ls_loadinfo(resReq, &numHosts, opts, fromHost, hostList, listsize, &IndexList)
+			_c_stop()
+		_save_errors()
+		free(hostList)
+		free(requested)
+		if hosts==NULL:
+			return None
+
+		#on return IndexList is the NULL terminated list of the indices in each host's li
+		nIdx = 0
+		while IndexList != NULL and IndexList[nIdx] != NULL:
+			nIdx += 1
+		if as_matrix:
+			return LoadMatrix._create(hosts, numHosts, nIdx, _index_names(IndexList, nIdx))
+	return _host_loads(hosts, numHosts, nIdx)
 	
 def ls_perror(message):
 	"""openlava.lslib.ls_perror(message)
@@ -1079,12 +1277,16 @@ Prints the lslib error message associated with the lserrno prefixed by message.
 	u'Internal library error'
 	>>> 
 
+Thread safety: describes the error from the last call made in the calling thread.
+
 """
 
 	cdef char * m
 	message=str(message)
 	m=message
-	lsmethods.ls_perror(m)
+	with library_lock:
+		_restore_errors()
+		lsmethods.ls_perror(m)
 
 def ls_sysmsg():
 	"""openlava.lsblib.lsb_sysmsg()
@@ -1104,19 +1306,36 @@ Get the lslib error message associated with lserrno
 	>>> lslib.ls_sysmsg()
 	u'Internal library error'
 	>>>
-	
+
+Thread safety: describes the error from the last call made in the calling thread.
+
 """
 
 	cdef char * msg
-	msg=lsmethods.ls_sysmsg()
-	if msg==NULL:
-		return u""
-	else:
-		return u"%s" % msg
+	with library_lock:
+		_restore_errors()
+		msg=lsmethods.ls_sysmsg()
+		if msg==NULL:
+			return u""
+		else:
+			return u"%s" % msg
 	
 
 cdef class ClusterInfo:
+	"""
+Sequences are copied into tuples on first access and the same tuple is returned after
+that.  resourceIndex, hostTypeIndex and hostModelIndex map names to their position in
+resources, hostTypes and hostModels.
+"""
 	cdef clusterInfo * _data
+	cdef tuple _resources
+	cdef tuple _hostTypes
+	cdef tuple _hostModels
+	cdef tuple _adminIds
+	cdef tuple _admins
+	cdef dict _resourceIndex
+	cdef dict _hostTypeIndex
+	cdef dict _hostModelIndex
 	cdef _load_struct(self, clusterInfo * data):
 		self._data=data
 
@@ -1154,7 +1373,15 @@ cdef class ClusterInfo:
 
 	property resources:
 		def __get__(self):
-			return [u"%s" % self._data.resources[i] for i in range(self.nRes)]
+			if self._resources is None:
+				self._resources = tuple([u"%s" % self._data.resources[i] for i in range(self.nRes)])
+			return self._resources
+
+	property resourceIndex:
+		def __get__(self):
+			if self._resourceIndex is None:
+				self._resourceIndex = _positions(self.resources)
+			return self._resourceIndex
 
 	property nTypes:
 		def __get__(self):
@@ -1162,7 +1389,15 @@ cdef class ClusterInfo:
 
 	property hostTypes:
 		def __get__(self):
-			return [u"%s" % self._data.hostTypes[i] for i in range(self.nTypes)]
+			if self._hostTypes is None:
+				self._hostTypes = tuple([u"%s" % self._data.hostTypes[i] for i in range(self.nTypes)])
+			return self._hostTypes
+
+	property hostTypeIndex:
+		def __get__(self):
+			if self._hostTypeIndex is None:
+				self._hostTypeIndex = _positions(self.hostTypes)
+			return self._hostTypeIndex
 
 	property nModels:
 		def __get__(self):
@@ -1170,21 +1405,41 @@ cdef class ClusterInfo:
 
 	property hostModels:
 		def __get__(self):
-			return [u"%s" % self._data.hostModels[i] for i in range(self.nModels)]
+			if self._hostModels is None:
+				self._hostModels = tuple([u"%s" % self._data.hostModels[i] for i in range(self.nModels)])
+			return self._hostModels
+
+	property hostModelIndex:
+		def __get__(self):
+			if self._hostModelIndex is None:
+				self._hostModelIndex = _positions(self.hostModels)
+			return self._hostModelIndex
 
 	property nAdmins:
 		def __get__(self):
 			return self._data.nAdmins
+
 	property adminIds:
 		def __get__(self):
-			return [self._data.adminIds[i] for i in range(self.nAdmins)]
+			if self._adminIds is None:
+				self._adminIds = tuple([self._data.adminIds[i] for i in range(self.nAdmins)])
+			return self._adminIds
+
 	property admins:
 		def __get__(self):
-			return [u"%s" % self._data.admins[i] for i in range(self.nAdmins)]
+			if self._admins is None:
+				self._admins = tuple([u"%s" % self._data.admins[i] for i in range(self.nAdmins)])
+			return self._admins
 	
 
-cdef class HostInfo:
+cdef class HostInfo(_Record):
+	"""
+resources is copied into a tuple on first access and the same tuple is returned after
+that.  has_resource() looks the name up in a set of the resources.
+"""
 	cdef hostInfo * _data
+	cdef tuple _resources
+	cdef frozenset _resourceSet
 	cdef _load_struct(self, hostInfo * data):
 		self._data=data
 
@@ -1230,7 +1485,15 @@ cdef class HostInfo:
 
 	property resources:
 		def __get__(self):
-			return [u"%s" % self._data.resources[i] for i in range(self.nRes)]
+			if self._resources is None:
+				self._resources = tuple([u"%s" % self._data.resources[i] for i in range(self.nRes)])
+			return self._resources
+
+	def has_resource(self, name):
+		"""True if the host has the resource name"""
+		if self._resourceSet is None:
+			self._resourceSet = frozenset(self.resources)
+		return name in self._resourceSet
 
 	property windows:
 		def __get__(self):
@@ -1242,7 +1505,7 @@ cdef class HostInfo:
 
 	property busyThreshold:
 		def __get__(self):
-			return [float(self._data.busyThreshold[i]) for i in range(self.numIndx)]
+			return _float_array(self._data.busyThreshold, self._data.numIndx)
 
 	property isServer:
 		def __get__(self):
@@ -1255,8 +1518,9 @@ cdef class HostInfo:
 		def __get__(self):
 			return int(self._data.rexPriority)
 
-cdef class HostLoad:
+cdef class HostLoad(_Record):
 	cdef hostLoad * _data
+	cdef int _nIdx
 	cdef _load_struct(self, hostLoad * data):
 		self._data=data
 
@@ -1266,18 +1530,253 @@ cdef class HostLoad:
 
 	property status:
 		def __get__(self):
-			return [ 
-					int(self._data.status[0]),
-					int(self._data.status[1]),
-					]
+			cdef array.array a = array.clone(_INT_ARRAY, 2, False)
+			a.data.as_ints[0] = self._data.status[0]
+			a.data.as_ints[1] = self._data.status[1]
+			return a
+
+	property nIdx:
+		def __get__(self):
+			return self._nIdx
 
 	property li:
 		def __get__(self):
-			return [self._data.li[i] for i in range(12)]
+			return _float_array(self._data.li, self._nIdx)
+
+#kind of record in the index of packed records, after those of lsblib
+DEF _KIND_HOST_LOAD = 64
+DEF _KIND_HOST_INFO = 65
+DEF _KIND_LS_INFO = 66
+
+cdef Py_ssize_t _pack_host_load(_Packer p, HostLoad h) except -1:
+	cdef Py_ssize_t at = p.image(h._data, sizeof(hostLoad))
+	cdef Py_ssize_t offset
+	#as allocated by openlava, a status word followed by one bit per index
+	offset = p.copy(h._data.status, (1 + h._nIdx / (8 * sizeof(int)) + 1) * sizeof(int))
+	(<hostLoad *>(p.data + at)).status = <int *>offset
+	offset = p.copy(h._data.li, h._nIdx * sizeof(float))
+	(<hostLoad *>(p.data + at)).li = <float *>offset
+	return at
+
+cdef Py_ssize_t _pack_host_info(_Packer p, HostInfo h) except -1:
+	cdef Py_ssize_t at = p.image(h._data, sizeof(hostInfo))
+	cdef Py_ssize_t offset
+	offset = p.string(h._data.hostType)
+	(<hostInfo *>(p.data + at)).hostType = <char *>offset
+	offset = p.string(h._data.hostModel)
+	(<hostInfo *>(p.data + at)).hostModel = <char *>offset
+	offset = p.strings(h._data.resources, h._data.nRes)
+	(<hostInfo *>(p.data + at)).resources = <char **>offset
+	offset = p.string(h._data.windows)
+	(<hostInfo *>(p.data + at)).windows = <char *>offset
+	offset = p.copy(h._data.busyThreshold, h._data.numIndx * sizeof(float))
+	(<hostInfo *>(p.data + at)).busyThreshold = <float *>offset
+	return at
+
+cdef Py_ssize_t _pack_ls_info(_Packer p, LsInfo l) except -1:
+	cdef Py_ssize_t at = p.image(l._data, sizeof(lsInfo))
+	cdef Py_ssize_t offset
+	offset = p.copy(l._data.resTable, l._data.nRes * sizeof(resItem))
+	(<lsInfo *>(p.data + at)).resTable = <resItem *>offset
+	return at
+
+def pack_records(records):
+	"""pack_records(records)
+
+Packs HostLoad, HostInfo and LsInfo objects into a single string of bytes, which
+unpack_records() turns back into objects of the same classes, as lsblib.pack_records()
+does for lsblib records.  This is what is used when they are pickled.
+
+:param list records: HostLoad, HostInfo and LsInfo objects to pack
+:return: Packed records
+:rtype: str
+:raises TypeError: If a record is not a HostLoad, HostInfo or LsInfo
+
+::
+
+	>>> from openlava import lslib
+	>>> data = lslib.pack_records(lslib.ls_load())
+	>>> [h.hostName for h in lslib.unpack_records(data)]
+	[u'master', u'comp00', u'comp01', u'comp02', u'comp03']
+
+"""
+	cdef _Packer p = _Packer()
+	for rec in records:
+		if isinstance(rec, HostLoad):
+			p.add(_KIND_HOST_LOAD, (<HostLoad>rec)._nIdx, _pack_host_load(p, rec))
+		elif isinstance(rec, HostInfo):
+			p.add(_KIND_HOST_INFO, 0, _pack_host_info(p, rec))
+		elif isinstance(rec, LsInfo):
+			p.add(_KIND_LS_INFO, 0, _pack_ls_info(p, rec))
+		else:
+			raise TypeError("Can not pack {} objects".format(type(rec).__name__))
+	return p.finish()
+
+def unpack_records(data):
+	"""unpack_records(data)
+
+Turns the bytes returned by pack_records() back into HostLoad, HostInfo and LsInfo
+objects.
+
+:param str data: Packed records
+:return: List of records
+:rtype: list
+:raises ValueError: If data is not packed lslib records
+
+"""
+	cdef _Block block = _open_block(data)
+	cdef list records = []
+	cdef Py_ssize_t i
+	cdef int kind
+	cdef HostLoad h
+	cdef HostInfo hi
+	cdef LsInfo l
+	for i in range(block.count):
+		kind = block.index[i].kind
+		if kind == _KIND_HOST_LOAD:
+			h = HostLoad()
+			h._data = <hostLoad *>block.record(i, sizeof(hostLoad))
+			h._data.status = <int *>_rebase(block.data, h._data.status)
+			h._data.li = <float *>_rebase(block.data, h._data.li)
+			h._nIdx = block.index[i].extra
+			h._block = block
+			records.append(h)
+		elif kind == _KIND_HOST_INFO:
+			hi = HostInfo()
+			hi._data = <hostInfo *>block.record(i, sizeof(hostInfo))
+			hi._data.hostType = <char *>_rebase(block.data, hi._data.hostType)
+			hi._data.hostModel = <char *>_rebase(block.data, hi._data.hostModel)
+			hi._data.resources = <char **>_rebase(block.data, hi._data.resources)
+			_rebase_strings(block.data, hi._data.resources, hi._data.nRes)
+			hi._data.windows = <char *>_rebase(block.data, hi._data.windows)
+			hi._data.busyThreshold = <float *>_rebase(block.data, hi._data.busyThreshold)
+			hi._block = block
+			records.append(hi)
+		elif kind == _KIND_LS_INFO:
+			l = LsInfo()
+			l._data = <lsInfo *>block.record(i, sizeof(lsInfo))
+			l._data.resTable = <resItem *>_rebase(block.data, l._data.resTable)
+			l._block = block
+			records.append(l)
+		else:
+			raise ValueError("Unknown packed record kind {}".format(kind))
+	return records
+
+def _unpack_record(data):
+	"""Unpickles a single record packed by _Record.__reduce__()"""
+	return unpack_records(data)[0]
+
+cdef class LoadMatrix:
+	"""
+The load of a set of hosts as one hosts x nIdx matrix of float32, as returned by
+ls_load() and ls_loadinfo() with as_matrix=True.  The matrix supports the buffer
+protocol, so numpy.asarray(matrix) is a 2D view of it without copying.
+
+The matrix is a copy of openlava's data, so it remains valid after later calls.
+
+::
+
+	>>> import numpy
+	>>> from openlava import lslib
+	>>> m = lslib.ls_load(as_matrix=True)
+	>>> load = numpy.asarray(m)
+	>>> load[m.rows['master'], m.columns['r1m']]
+	0.05
+
+"""
+	#values of the load indices, row by row
+	cdef readonly array.array values
+	#status[0] of each host, for LS_ISOK() and friends
+	cdef readonly array.array status
+	cdef readonly list hostNames
+	cdef readonly list indexNames
+	#host name -> row
+	cdef readonly dict rows
+	#index name -> column
+	cdef readonly dict columns
+	cdef readonly int nHosts
+	cdef readonly int nIdx
+	cdef Py_ssize_t _shape[2]
+	cdef Py_ssize_t _strides[2]
+
+	@staticmethod
+	cdef LoadMatrix _create(hostLoad * hosts, int numHosts, int nIdx, list indexNames):
+		cdef LoadMatrix m = LoadMatrix()
+		cdef int i
+		m.nHosts = numHosts
+		m.nIdx = nIdx
+		m.indexNames = indexNames
+		m.columns = _positions(indexNames)
+		m.values = array.clone(_FLOAT_ARRAY, numHosts * nIdx, False)
+		m.status = array.clone(_INT_ARRAY, numHosts, False)
+		m.hostNames = []
+		m.rows = {}
+		for i in range(numHosts):
+			if nIdx > 0:
+				memcpy(&m.values.data.as_floats[i * nIdx], hosts[i].li, nIdx * sizeof(float))
+			m.status.data.as_ints[i] = hosts[i].status[0]
+			name = u"%s" % hosts[i].hostName
+			m.hostNames.append(name)
+			m.rows[name] = i
+		m._shape[0] = numHosts
+		m._shape[1] = nIdx
+		m._strides[0] = nIdx * sizeof(float)
+		m._strides[1] = sizeof(float)
+		return m
+
+	def __len__(self):
+		return self.nHosts
+
+	def __getbuffer__(self, Py_buffer * buffer, int flags):
+		buffer.buf = self.values.data.as_voidptr
+		buffer.obj = self
+		buffer.len = self.nHosts * self.nIdx * sizeof(float)
+		buffer.readonly = 0
+		buffer.itemsize = sizeof(float)
+		buffer.format = 'f'
+		buffer.ndim = 2
+		buffer.shape = self._shape
+		buffer.strides = self._strides
+		buffer.suboffsets = NULL
+		buffer.internal = NULL
+
+	def __releasebuffer__(self, Py_buffer * buffer):
+		pass
+
+	def row(self, hostName):
+		"""Returns the load indices of a host as a FloatArray"""
+		cdef int i = self.rows[hostName]
+		return _float_array(&self.values.data.as_floats[i * self.nIdx], self.nIdx)
+
+	def column(self, indexName):
+		"""Returns one load index for every host as a FloatArray, in the order of hostNames"""
+		cdef int j = self.columns[indexName]
+		cdef FloatArray a = _float_array(NULL, self.nHosts)
+		for i in range(self.nHosts):
+			a.values.data.as_floats[i] = self.values.data.as_floats[i * self.nIdx + j]
+		return a
 
 	
-cdef class LsInfo:
+cdef class LsInfo(_Record):
+	"""
+Sequences are copied into tuples on first access and the same tuple is returned after
+that.  The ResItems of resTable hold their own copy of each item, so stay valid after
+later calls to ls_info().  resourceIndex, hostTypeIndex and hostModelIndex map names to
+their position in resTable, hostTypes and hostModels, and indexColumns maps the names of the
+load indices in indexNames to their position in HostLoad.li and LoadMatrix rows.
+"""
 	cdef lsInfo * _data
+	cdef tuple _resTable
+	cdef tuple _hostTypes
+	cdef tuple _hostModels
+	cdef tuple _hostArchs
+	cdef tuple _modelRefs
+	cdef tuple _cpuFactor
+	cdef tuple _indexNames
+	cdef dict _resourceIndex
+	cdef dict _hostTypeIndex
+	cdef dict _hostModelIndex
+	cdef dict _indexColumns
 	cdef _load_struct(self, lsInfo * data):
 		self._data=data
 
@@ -1287,12 +1786,34 @@ cdef class LsInfo:
 
 	property resTable:
 		def __get__(self):
-			t=[]
-			for i in range(self.nRes):
-				r=ResItem()
-				r._load_struct(&self._data.resTable[i])
-				t.append(r)
-			return t
+			if self._resTable is None:
+				t=[]
+				for i in range(self.nRes):
+					r=ResItem()
+					r._copy_struct(&self._data.resTable[i])
+					t.append(r)
+				self._resTable = tuple(t)
+			return self._resTable
+
+	property resourceIndex:
+		def __get__(self):
+			if self._resourceIndex is None:
+				self._resourceIndex = _positions([u"%s" % self._data.resTable[i].name for i in range(self.nRes)])
+			return self._resourceIndex
+
+	property indexNames:
+		def __get__(self):
+			"""Names of the load indices, the first numIndx resources"""
+			if self._indexNames is None:
+				self._indexNames = tuple([u"%s" % self._data.resTable[i].name
+				                          for i in range(min(self._data.numIndx, self._data.nRes))])
+			return self._indexNames
+
+	property indexColumns:
+		def __get__(self):
+			if self._indexColumns is None:
+				self._indexColumns = _positions(self.indexNames)
+			return self._indexColumns
 
 	property nTypes:
 		def __get__(self):
@@ -1300,7 +1821,15 @@ cdef class LsInfo:
 
 	property hostTypes:
 		def __get__(self):
-			return [u"%s" % self._data.hostTypes[i] for i in range(self.nTypes)]
+			if self._hostTypes is None:
+				self._hostTypes = tuple([u"%s" % self._data.hostTypes[i] for i in range(self.nTypes)])
+			return self._hostTypes
+
+	property hostTypeIndex:
+		def __get__(self):
+			if self._hostTypeIndex is None:
+				self._hostTypeIndex = _positions(self.hostTypes)
+			return self._hostTypeIndex
 
 	property nModels:
 		def __get__(self):
@@ -1308,19 +1837,33 @@ cdef class LsInfo:
 
 	property hostModels:
 		def __get__(self):
-			return [u"%s" % self._data.hostModels[i] for i in range(self.nModels)]
+			if self._hostModels is None:
+				self._hostModels = tuple([u"%s" % self._data.hostModels[i] for i in range(self.nModels)])
+			return self._hostModels
+
+	property hostModelIndex:
+		def __get__(self):
+			if self._hostModelIndex is None:
+				self._hostModelIndex = _positions(self.hostModels)
+			return self._hostModelIndex
 
 	property hostArchs:
 		def __get__(self):
-			return [u"%s" % self._data.hostArchs[i] for i in range(self.nModels)]
+			if self._hostArchs is None:
+				self._hostArchs = tuple([u"%s" % self._data.hostArchs[i] for i in range(self.nModels)])
+			return self._hostArchs
 
 	property modelRefs:
 		def __get__(self):
-			return [int(self._data.modelRefs[i]) for i in range(self.nModels)]
+			if self._modelRefs is None:
+				self._modelRefs = tuple([int(self._data.modelRefs[i]) for i in range(self.nModels)])
+			return self._modelRefs
 
 	property cpuFactor:
 		def __get__(self):
-			return [float(self._data.cpuFactor[i]) for i in range(self.nModels)]
+			if self._cpuFactor is None:
+				self._cpuFactor = tuple([float(self._data.cpuFactor[i]) for i in range(self.nModels)])
+			return self._cpuFactor
 
 	property numIndx:
 		def __get__(self):
@@ -1332,9 +1875,15 @@ cdef class LsInfo:
 
 cdef class ResItem:
 	cdef resItem * data
+	#holds the item when it is copied out of openlava's buffer
+	cdef resItem _copy
 	cdef _load_struct(self, resItem * data):
 		self.data=data
 
+	cdef _copy_struct(self, resItem * data):
+		self._copy = data[0]
+		self.data = &self._copy
+
 	property name:
 		def __get__(self):
 			return u"%s" % self.data.name
@@ -0,0 +1,1095 @@
+# Generated by tools/gen_record_layouts.py from lsstructs.pxd, do not edit.
+#
+# For each struct behind a record class there is a function that packs what its pointers
+# point to, once the struct itself has been copied into the _Packer at offset at, and a
+# function that turns the offsets in an unpacked copy back into pointers.  Included into
+# lsblib.pyx after packing.pxi and event_fields.pxi, and used by pack_records() and
+# unpack_records().
+
+cdef int _pack_submit(_Packer p, submit * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.jobName)
+    (<submit *>(p.data + at)).jobName = <char *>offset
+    offset = p.string(s.queue)
+    (<submit *>(p.data + at)).queue = <char *>offset
+    offset = p.strings(s.askedHosts, s.numAskedHosts)
+    (<submit *>(p.data + at)).askedHosts = <char **>offset
+    offset = p.string(s.resReq)
+    (<submit *>(p.data + at)).resReq = <char *>offset
+    offset = p.string(s.hostSpec)
+    (<submit *>(p.data + at)).hostSpec = <char *>offset
+    offset = p.string(s.dependCond)
+    (<submit *>(p.data + at)).dependCond = <char *>offset
+    offset = p.string(s.inFile)
+    (<submit *>(p.data + at)).inFile = <char *>offset
+    offset = p.string(s.outFile)
+    (<submit *>(p.data + at)).outFile = <char *>offset
+    offset = p.string(s.errFile)
+    (<submit *>(p.data + at)).errFile = <char *>offset
+    offset = p.string(s.command)
+    (<submit *>(p.data + at)).command = <char *>offset
+    offset = p.string(s.newCommand)
+    (<submit *>(p.data + at)).newCommand = <char *>offset
+    offset = p.string(s.chkpntDir)
+    (<submit *>(p.data + at)).chkpntDir = <char *>offset
+    offset = p.copy(s.xf, s.nxf * sizeof(xFile))
+    (<submit *>(p.data + at)).xf = <xFile *>offset
+    offset = p.string(s.preExecCmd)
+    (<submit *>(p.data + at)).preExecCmd = <char *>offset
+    offset = p.string(s.mailUser)
+    (<submit *>(p.data + at)).mailUser = <char *>offset
+    offset = p.string(s.projectName)
+    (<submit *>(p.data + at)).projectName = <char *>offset
+    offset = p.string(s.loginShell)
+    (<submit *>(p.data + at)).loginShell = <char *>offset
+    return 0
+
+cdef void _relocate_submit(char * base, submit * s):
+    s.jobName = <char *>_rebase(base, s.jobName)
+    s.queue = <char *>_rebase(base, s.queue)
+    s.askedHosts = <char **>_rebase(base, s.askedHosts)
+    _rebase_strings(base, s.askedHosts, s.numAskedHosts)
+    s.resReq = <char *>_rebase(base, s.resReq)
+    s.hostSpec = <char *>_rebase(base, s.hostSpec)
+    s.dependCond = <char *>_rebase(base, s.dependCond)
+    s.inFile = <char *>_rebase(base, s.inFile)
+    s.outFile = <char *>_rebase(base, s.outFile)
+    s.errFile = <char *>_rebase(base, s.errFile)
+    s.command = <char *>_rebase(base, s.command)
+    s.newCommand = <char *>_rebase(base, s.newCommand)
+    s.chkpntDir = <char *>_rebase(base, s.chkpntDir)
+    s.xf = <xFile *>_rebase(base, s.xf)
+    s.preExecCmd = <char *>_rebase(base, s.preExecCmd)
+    s.mailUser = <char *>_rebase(base, s.mailUser)
+    s.projectName = <char *>_rebase(base, s.projectName)
+    s.loginShell = <char *>_rebase(base, s.loginShell)
+
+
+cdef int _pack_jRusage(_Packer p, jRusage * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.copy(s.pidInfo, s.npids * sizeof(pidInfo))
+    (<jRusage *>(p.data + at)).pidInfo = <pidInfo *>offset
+    offset = p.copy(s.pgid, s.npgids * sizeof(int))
+    (<jRusage *>(p.data + at)).pgid = <int *>offset
+    return 0
+
+cdef void _relocate_jRusage(char * base, jRusage * s):
+    s.pidInfo = <pidInfo *>_rebase(base, s.pidInfo)
+    s.pgid = <int *>_rebase(base, s.pgid)
+
+
+cdef int _pack_jobInfoEnt(_Packer p, jobInfoEnt * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.user)
+    (<jobInfoEnt *>(p.data + at)).user = <char *>offset
+    offset = p.copy(s.reasonTb, s.numReasons * sizeof(int))
+    (<jobInfoEnt *>(p.data + at)).reasonTb = <int *>offset
+    offset = p.string(s.cwd)
+    (<jobInfoEnt *>(p.data + at)).cwd = <char *>offset
+    offset = p.string(s.subHomeDir)
+    (<jobInfoEnt *>(p.data + at)).subHomeDir = <char *>offset
+    offset = p.string(s.fromHost)
+    (<jobInfoEnt *>(p.data + at)).fromHost = <char *>offset
+    offset = p.strings(s.exHosts, s.numExHosts)
+    (<jobInfoEnt *>(p.data + at)).exHosts = <char **>offset
+    offset = p.copy(s.loadSched, s.nIdx * sizeof(float))
+    (<jobInfoEnt *>(p.data + at)).loadSched = <float *>offset
+    offset = p.copy(s.loadStop, s.nIdx * sizeof(float))
+    (<jobInfoEnt *>(p.data + at)).loadStop = <float *>offset
+    _pack_submit(p, &s.submit, at + (<char *>&s.submit - <char *>s))
+    offset = p.string(s.execHome)
+    (<jobInfoEnt *>(p.data + at)).execHome = <char *>offset
+    offset = p.string(s.execCwd)
+    (<jobInfoEnt *>(p.data + at)).execCwd = <char *>offset
+    offset = p.string(s.execUsername)
+    (<jobInfoEnt *>(p.data + at)).execUsername = <char *>offset
+    _pack_jRusage(p, &s.runRusage, at + (<char *>&s.runRusage - <char *>s))
+    offset = p.string(s.parentGroup)
+    (<jobInfoEnt *>(p.data + at)).parentGroup = <char *>offset
+    offset = p.string(s.jName)
+    (<jobInfoEnt *>(p.data + at)).jName = <char *>offset
+    return 0
+
+cdef void _relocate_jobInfoEnt(char * base, jobInfoEnt * s):
+    s.user = <char *>_rebase(base, s.user)
+    s.reasonTb = <int *>_rebase(base, s.reasonTb)
+    s.cwd = <char *>_rebase(base, s.cwd)
+    s.subHomeDir = <char *>_rebase(base, s.subHomeDir)
+    s.fromHost = <char *>_rebase(base, s.fromHost)
+    s.exHosts = <char **>_rebase(base, s.exHosts)
+    _rebase_strings(base, s.exHosts, s.numExHosts)
+    s.loadSched = <float *>_rebase(base, s.loadSched)
+    s.loadStop = <float *>_rebase(base, s.loadStop)
+    _relocate_submit(base, &s.submit)
+    s.execHome = <char *>_rebase(base, s.execHome)
+    s.execCwd = <char *>_rebase(base, s.execCwd)
+    s.execUsername = <char *>_rebase(base, s.execUsername)
+    _relocate_jRusage(base, &s.runRusage)
+    s.parentGroup = <char *>_rebase(base, s.parentGroup)
+    s.jName = <char *>_rebase(base, s.jName)
+
+
+cdef int _pack_hostInfoEnt(_Packer p, hostInfoEnt * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.host)
+    (<hostInfoEnt *>(p.data + at)).host = <char *>offset
+    offset = p.copy(s.busySched, s.nIdx * sizeof(int))
+    (<hostInfoEnt *>(p.data + at)).busySched = <int *>offset
+    offset = p.copy(s.busyStop, s.nIdx * sizeof(int))
+    (<hostInfoEnt *>(p.data + at)).busyStop = <int *>offset
+    offset = p.copy(s.load, s.nIdx * sizeof(float))
+    (<hostInfoEnt *>(p.data + at)).load = <float *>offset
+    offset = p.copy(s.loadSched, s.nIdx * sizeof(float))
+    (<hostInfoEnt *>(p.data + at)).loadSched = <float *>offset
+    offset = p.copy(s.loadStop, s.nIdx * sizeof(float))
+    (<hostInfoEnt *>(p.data + at)).loadStop = <float *>offset
+    offset = p.string(s.windows)
+    (<hostInfoEnt *>(p.data + at)).windows = <char *>offset
+    offset = p.copy(s.realLoad, s.nIdx * sizeof(float))
+    (<hostInfoEnt *>(p.data + at)).realLoad = <float *>offset
+    return 0
+
+cdef void _relocate_hostInfoEnt(char * base, hostInfoEnt * s):
+    s.host = <char *>_rebase(base, s.host)
+    s.busySched = <int *>_rebase(base, s.busySched)
+    s.busyStop = <int *>_rebase(base, s.busyStop)
+    s.load = <float *>_rebase(base, s.load)
+    s.loadSched = <float *>_rebase(base, s.loadSched)
+    s.loadStop = <float *>_rebase(base, s.loadStop)
+    s.windows = <char *>_rebase(base, s.windows)
+    s.realLoad = <float *>_rebase(base, s.realLoad)
+
+
+cdef int _pack_queueInfoEnt(_Packer p, queueInfoEnt * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.queue)
+    (<queueInfoEnt *>(p.data + at)).queue = <char *>offset
+    offset = p.string(s.description)
+    (<queueInfoEnt *>(p.data + at)).description = <char *>offset
+    offset = p.string(s.userList)
+    (<queueInfoEnt *>(p.data + at)).userList = <char *>offset
+    offset = p.string(s.hostList)
+    (<queueInfoEnt *>(p.data + at)).hostList = <char *>offset
+    offset = p.copy(s.loadSched, s.nIdx * sizeof(float))
+    (<queueInfoEnt *>(p.data + at)).loadSched = <float *>offset
+    offset = p.copy(s.loadStop, s.nIdx * sizeof(float))
+    (<queueInfoEnt *>(p.data + at)).loadStop = <float *>offset
+    offset = p.string(s.windows)
+    (<queueInfoEnt *>(p.data + at)).windows = <char *>offset
+    offset = p.string(s.hostSpec)
+    (<queueInfoEnt *>(p.data + at)).hostSpec = <char *>offset
+    offset = p.string(s.windowsD)
+    (<queueInfoEnt *>(p.data + at)).windowsD = <char *>offset
+    offset = p.string(s.defaultHostSpec)
+    (<queueInfoEnt *>(p.data + at)).defaultHostSpec = <char *>offset
+    offset = p.string(s.admins)
+    (<queueInfoEnt *>(p.data + at)).admins = <char *>offset
+    offset = p.string(s.preCmd)
+    (<queueInfoEnt *>(p.data + at)).preCmd = <char *>offset
+    offset = p.string(s.postCmd)
+    (<queueInfoEnt *>(p.data + at)).postCmd = <char *>offset
+    offset = p.string(s.prepostUsername)
+    (<queueInfoEnt *>(p.data + at)).prepostUsername = <char *>offset
+    offset = p.string(s.requeueEValues)
+    (<queueInfoEnt *>(p.data + at)).requeueEValues = <char *>offset
+    offset = p.string(s.resReq)
+    (<queueInfoEnt *>(p.data + at)).resReq = <char *>offset
+    offset = p.string(s.resumeCond)
+    (<queueInfoEnt *>(p.data + at)).resumeCond = <char *>offset
+    offset = p.string(s.stopCond)
+    (<queueInfoEnt *>(p.data + at)).stopCond = <char *>offset
+    offset = p.string(s.jobStarter)
+    (<queueInfoEnt *>(p.data + at)).jobStarter = <char *>offset
+    offset = p.string(s.suspendActCmd)
+    (<queueInfoEnt *>(p.data + at)).suspendActCmd = <char *>offset
+    offset = p.string(s.resumeActCmd)
+    (<queueInfoEnt *>(p.data + at)).resumeActCmd = <char *>offset
+    offset = p.string(s.terminateActCmd)
+    (<queueInfoEnt *>(p.data + at)).terminateActCmd = <char *>offset
+    offset = p.string(s.chkpntDir)
+    (<queueInfoEnt *>(p.data + at)).chkpntDir = <char *>offset
+    return 0
+
+cdef void _relocate_queueInfoEnt(char * base, queueInfoEnt * s):
+    s.queue = <char *>_rebase(base, s.queue)
+    s.description = <char *>_rebase(base, s.description)
+    s.userList = <char *>_rebase(base, s.userList)
+    s.hostList = <char *>_rebase(base, s.hostList)
+    s.loadSched = <float *>_rebase(base, s.loadSched)
+    s.loadStop = <float *>_rebase(base, s.loadStop)
+    s.windows = <char *>_rebase(base, s.windows)
+    s.hostSpec = <char *>_rebase(base, s.hostSpec)
+    s.windowsD = <char *>_rebase(base, s.windowsD)
+    s.defaultHostSpec = <char *>_rebase(base, s.defaultHostSpec)
+    s.admins = <char *>_rebase(base, s.admins)
+    s.preCmd = <char *>_rebase(base, s.preCmd)
+    s.postCmd = <char *>_rebase(base, s.postCmd)
+    s.prepostUsername = <char *>_rebase(base, s.prepostUsername)
+    s.requeueEValues = <char *>_rebase(base, s.requeueEValues)
+    s.resReq = <char *>_rebase(base, s.resReq)
+    s.resumeCond = <char *>_rebase(base, s.resumeCond)
+    s.stopCond = <char *>_rebase(base, s.stopCond)
+    s.jobStarter = <char *>_rebase(base, s.jobStarter)
+    s.suspendActCmd = <char *>_rebase(base, s.suspendActCmd)
+    s.resumeActCmd = <char *>_rebase(base, s.resumeActCmd)
+    s.terminateActCmd = <char *>_rebase(base, s.terminateActCmd)
+    s.chkpntDir = <char *>_rebase(base, s.chkpntDir)
+
+
+cdef int _pack_userInfoEnt(_Packer p, userInfoEnt * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.user)
+    (<userInfoEnt *>(p.data + at)).user = <char *>offset
+    return 0
+
+cdef void _relocate_userInfoEnt(char * base, userInfoEnt * s):
+    s.user = <char *>_rebase(base, s.user)
+
+
+cdef int _pack_jobNewLog(_Packer p, jobNewLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.resReq)
+    (<jobNewLog *>(p.data + at)).resReq = <char *>offset
+    offset = p.strings(s.askedHosts, s.numAskedHosts)
+    (<jobNewLog *>(p.data + at)).askedHosts = <char **>offset
+    offset = p.string(s.dependCond)
+    (<jobNewLog *>(p.data + at)).dependCond = <char *>offset
+    offset = p.copy(s.xf, s.nxf * sizeof(xFile))
+    (<jobNewLog *>(p.data + at)).xf = <xFile *>offset
+    offset = p.string(s.preExecCmd)
+    (<jobNewLog *>(p.data + at)).preExecCmd = <char *>offset
+    offset = p.string(s.mailUser)
+    (<jobNewLog *>(p.data + at)).mailUser = <char *>offset
+    offset = p.string(s.projectName)
+    (<jobNewLog *>(p.data + at)).projectName = <char *>offset
+    offset = p.string(s.schedHostType)
+    (<jobNewLog *>(p.data + at)).schedHostType = <char *>offset
+    offset = p.string(s.loginShell)
+    (<jobNewLog *>(p.data + at)).loginShell = <char *>offset
+    return 0
+
+cdef void _relocate_jobNewLog(char * base, jobNewLog * s):
+    s.resReq = <char *>_rebase(base, s.resReq)
+    s.askedHosts = <char **>_rebase(base, s.askedHosts)
+    _rebase_strings(base, s.askedHosts, s.numAskedHosts)
+    s.dependCond = <char *>_rebase(base, s.dependCond)
+    s.xf = <xFile *>_rebase(base, s.xf)
+    s.preExecCmd = <char *>_rebase(base, s.preExecCmd)
+    s.mailUser = <char *>_rebase(base, s.mailUser)
+    s.projectName = <char *>_rebase(base, s.projectName)
+    s.schedHostType = <char *>_rebase(base, s.schedHostType)
+    s.loginShell = <char *>_rebase(base, s.loginShell)
+
+
+cdef int _pack_jobStartLog(_Packer p, jobStartLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.strings(s.execHosts, s.numExHosts)
+    (<jobStartLog *>(p.data + at)).execHosts = <char **>offset
+    offset = p.string(s.queuePreCmd)
+    (<jobStartLog *>(p.data + at)).queuePreCmd = <char *>offset
+    offset = p.string(s.queuePostCmd)
+    (<jobStartLog *>(p.data + at)).queuePostCmd = <char *>offset
+    return 0
+
+cdef void _relocate_jobStartLog(char * base, jobStartLog * s):
+    s.execHosts = <char **>_rebase(base, s.execHosts)
+    _rebase_strings(base, s.execHosts, s.numExHosts)
+    s.queuePreCmd = <char *>_rebase(base, s.queuePreCmd)
+    s.queuePostCmd = <char *>_rebase(base, s.queuePostCmd)
+
+
+cdef int _pack_jobStatusLog(_Packer p, jobStatusLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_jobStatusLog(char * base, jobStatusLog * s):
+    pass
+
+
+cdef int _pack_sbdJobStatusLog(_Packer p, sbdJobStatusLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_sbdJobStatusLog(char * base, sbdJobStatusLog * s):
+    pass
+
+
+cdef int _pack_jobSwitchLog(_Packer p, jobSwitchLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_jobSwitchLog(char * base, jobSwitchLog * s):
+    pass
+
+
+cdef int _pack_jobMoveLog(_Packer p, jobMoveLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_jobMoveLog(char * base, jobMoveLog * s):
+    pass
+
+
+cdef int _pack_queueCtrlLog(_Packer p, queueCtrlLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_queueCtrlLog(char * base, queueCtrlLog * s):
+    pass
+
+
+cdef int _pack_newDebugLog(_Packer p, newDebugLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_newDebugLog(char * base, newDebugLog * s):
+    pass
+
+
+cdef int _pack_hostCtrlLog(_Packer p, hostCtrlLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_hostCtrlLog(char * base, hostCtrlLog * s):
+    pass
+
+
+cdef int _pack_mbdStartLog(_Packer p, mbdStartLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_mbdStartLog(char * base, mbdStartLog * s):
+    pass
+
+
+cdef int _pack_mbdDieLog(_Packer p, mbdDieLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_mbdDieLog(char * base, mbdDieLog * s):
+    pass
+
+
+cdef int _pack_unfulfillLog(_Packer p, unfulfillLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_unfulfillLog(char * base, unfulfillLog * s):
+    pass
+
+
+cdef int _pack_jobFinishLog(_Packer p, jobFinishLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.resReq)
+    (<jobFinishLog *>(p.data + at)).resReq = <char *>offset
+    offset = p.strings(s.askedHosts, s.numAskedHosts)
+    (<jobFinishLog *>(p.data + at)).askedHosts = <char **>offset
+    offset = p.strings(s.execHosts, s.numExHosts)
+    (<jobFinishLog *>(p.data + at)).execHosts = <char **>offset
+    offset = p.string(s.dependCond)
+    (<jobFinishLog *>(p.data + at)).dependCond = <char *>offset
+    offset = p.string(s.preExecCmd)
+    (<jobFinishLog *>(p.data + at)).preExecCmd = <char *>offset
+    offset = p.string(s.mailUser)
+    (<jobFinishLog *>(p.data + at)).mailUser = <char *>offset
+    offset = p.string(s.projectName)
+    (<jobFinishLog *>(p.data + at)).projectName = <char *>offset
+    offset = p.string(s.loginShell)
+    (<jobFinishLog *>(p.data + at)).loginShell = <char *>offset
+    return 0
+
+cdef void _relocate_jobFinishLog(char * base, jobFinishLog * s):
+    s.resReq = <char *>_rebase(base, s.resReq)
+    s.askedHosts = <char **>_rebase(base, s.askedHosts)
+    _rebase_strings(base, s.askedHosts, s.numAskedHosts)
+    s.execHosts = <char **>_rebase(base, s.execHosts)
+    _rebase_strings(base, s.execHosts, s.numExHosts)
+    s.dependCond = <char *>_rebase(base, s.dependCond)
+    s.preExecCmd = <char *>_rebase(base, s.preExecCmd)
+    s.mailUser = <char *>_rebase(base, s.mailUser)
+    s.projectName = <char *>_rebase(base, s.projectName)
+    s.loginShell = <char *>_rebase(base, s.loginShell)
+
+
+cdef int _pack_loadIndexLog(_Packer p, loadIndexLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.strings(s.name, s.nIdx)
+    (<loadIndexLog *>(p.data + at)).name = <char **>offset
+    return 0
+
+cdef void _relocate_loadIndexLog(char * base, loadIndexLog * s):
+    s.name = <char **>_rebase(base, s.name)
+    _rebase_strings(base, s.name, s.nIdx)
+
+
+cdef int _pack_migLog(_Packer p, migLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.strings(s.askedHosts, s.numAskedHosts)
+    (<migLog *>(p.data + at)).askedHosts = <char **>offset
+    return 0
+
+cdef void _relocate_migLog(char * base, migLog * s):
+    s.askedHosts = <char **>_rebase(base, s.askedHosts)
+    _rebase_strings(base, s.askedHosts, s.numAskedHosts)
+
+
+cdef int _pack_signalLog(_Packer p, signalLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.signalSymbol)
+    (<signalLog *>(p.data + at)).signalSymbol = <char *>offset
+    return 0
+
+cdef void _relocate_signalLog(char * base, signalLog * s):
+    s.signalSymbol = <char *>_rebase(base, s.signalSymbol)
+
+
+cdef int _pack_jobExecuteLog(_Packer p, jobExecuteLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.execHome)
+    (<jobExecuteLog *>(p.data + at)).execHome = <char *>offset
+    offset = p.string(s.execCwd)
+    (<jobExecuteLog *>(p.data + at)).execCwd = <char *>offset
+    offset = p.string(s.execUsername)
+    (<jobExecuteLog *>(p.data + at)).execUsername = <char *>offset
+    return 0
+
+cdef void _relocate_jobExecuteLog(char * base, jobExecuteLog * s):
+    s.execHome = <char *>_rebase(base, s.execHome)
+    s.execCwd = <char *>_rebase(base, s.execCwd)
+    s.execUsername = <char *>_rebase(base, s.execUsername)
+
+
+cdef int _pack_jobMsgLog(_Packer p, jobMsgLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.src)
+    (<jobMsgLog *>(p.data + at)).src = <char *>offset
+    offset = p.string(s.dest)
+    (<jobMsgLog *>(p.data + at)).dest = <char *>offset
+    offset = p.string(s.msg)
+    (<jobMsgLog *>(p.data + at)).msg = <char *>offset
+    return 0
+
+cdef void _relocate_jobMsgLog(char * base, jobMsgLog * s):
+    s.src = <char *>_rebase(base, s.src)
+    s.dest = <char *>_rebase(base, s.dest)
+    s.msg = <char *>_rebase(base, s.msg)
+
+
+cdef int _pack_jobMsgAckLog(_Packer p, jobMsgAckLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.src)
+    (<jobMsgAckLog *>(p.data + at)).src = <char *>offset
+    offset = p.string(s.dest)
+    (<jobMsgAckLog *>(p.data + at)).dest = <char *>offset
+    offset = p.string(s.msg)
+    (<jobMsgAckLog *>(p.data + at)).msg = <char *>offset
+    return 0
+
+cdef void _relocate_jobMsgAckLog(char * base, jobMsgAckLog * s):
+    s.src = <char *>_rebase(base, s.src)
+    s.dest = <char *>_rebase(base, s.dest)
+    s.msg = <char *>_rebase(base, s.msg)
+
+
+cdef int _pack_jobRequeueLog(_Packer p, jobRequeueLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_jobRequeueLog(char * base, jobRequeueLog * s):
+    pass
+
+
+cdef int _pack_chkpntLog(_Packer p, chkpntLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_chkpntLog(char * base, chkpntLog * s):
+    pass
+
+
+cdef int _pack_sigactLog(_Packer p, sigactLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.signalSymbol)
+    (<sigactLog *>(p.data + at)).signalSymbol = <char *>offset
+    return 0
+
+cdef void _relocate_sigactLog(char * base, sigactLog * s):
+    s.signalSymbol = <char *>_rebase(base, s.signalSymbol)
+
+
+cdef int _pack_jobStartAcceptLog(_Packer p, jobStartAcceptLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_jobStartAcceptLog(char * base, jobStartAcceptLog * s):
+    pass
+
+
+cdef int _pack_jobCleanLog(_Packer p, jobCleanLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_jobCleanLog(char * base, jobCleanLog * s):
+    pass
+
+
+cdef int _pack_jobForceRequestLog(_Packer p, jobForceRequestLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.strings(s.execHosts, s.numExecHosts)
+    (<jobForceRequestLog *>(p.data + at)).execHosts = <char **>offset
+    return 0
+
+cdef void _relocate_jobForceRequestLog(char * base, jobForceRequestLog * s):
+    s.execHosts = <char **>_rebase(base, s.execHosts)
+    _rebase_strings(base, s.execHosts, s.numExecHosts)
+
+
+cdef int _pack_logSwitchLog(_Packer p, logSwitchLog * s, Py_ssize_t at) except -1:
+    return 0
+
+cdef void _relocate_logSwitchLog(char * base, logSwitchLog * s):
+    pass
+
+
+cdef int _pack_jobModLog(_Packer p, jobModLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.jobIdStr)
+    (<jobModLog *>(p.data + at)).jobIdStr = <char *>offset
+    offset = p.string(s.userName)
+    (<jobModLog *>(p.data + at)).userName = <char *>offset
+    offset = p.string(s.jobName)
+    (<jobModLog *>(p.data + at)).jobName = <char *>offset
+    offset = p.string(s.queue)
+    (<jobModLog *>(p.data + at)).queue = <char *>offset
+    offset = p.strings(s.askedHosts, s.numAskedHosts)
+    (<jobModLog *>(p.data + at)).askedHosts = <char **>offset
+    offset = p.string(s.resReq)
+    (<jobModLog *>(p.data + at)).resReq = <char *>offset
+    offset = p.string(s.hostSpec)
+    (<jobModLog *>(p.data + at)).hostSpec = <char *>offset
+    offset = p.string(s.dependCond)
+    (<jobModLog *>(p.data + at)).dependCond = <char *>offset
+    offset = p.string(s.subHomeDir)
+    (<jobModLog *>(p.data + at)).subHomeDir = <char *>offset
+    offset = p.string(s.inFile)
+    (<jobModLog *>(p.data + at)).inFile = <char *>offset
+    offset = p.string(s.outFile)
+    (<jobModLog *>(p.data + at)).outFile = <char *>offset
+    offset = p.string(s.errFile)
+    (<jobModLog *>(p.data + at)).errFile = <char *>offset
+    offset = p.string(s.command)
+    (<jobModLog *>(p.data + at)).command = <char *>offset
+    offset = p.string(s.inFileSpool)
+    (<jobModLog *>(p.data + at)).inFileSpool = <char *>offset
+    offset = p.string(s.commandSpool)
+    (<jobModLog *>(p.data + at)).commandSpool = <char *>offset
+    offset = p.string(s.chkpntDir)
+    (<jobModLog *>(p.data + at)).chkpntDir = <char *>offset
+    offset = p.copy(s.xf, s.nxf * sizeof(xFile))
+    (<jobModLog *>(p.data + at)).xf = <xFile *>offset
+    offset = p.string(s.jobFile)
+    (<jobModLog *>(p.data + at)).jobFile = <char *>offset
+    offset = p.string(s.fromHost)
+    (<jobModLog *>(p.data + at)).fromHost = <char *>offset
+    offset = p.string(s.cwd)
+    (<jobModLog *>(p.data + at)).cwd = <char *>offset
+    offset = p.string(s.preExecCmd)
+    (<jobModLog *>(p.data + at)).preExecCmd = <char *>offset
+    offset = p.string(s.mailUser)
+    (<jobModLog *>(p.data + at)).mailUser = <char *>offset
+    offset = p.string(s.projectName)
+    (<jobModLog *>(p.data + at)).projectName = <char *>offset
+    offset = p.string(s.loginShell)
+    (<jobModLog *>(p.data + at)).loginShell = <char *>offset
+    offset = p.string(s.schedHostType)
+    (<jobModLog *>(p.data + at)).schedHostType = <char *>offset
+    return 0
+
+cdef void _relocate_jobModLog(char * base, jobModLog * s):
+    s.jobIdStr = <char *>_rebase(base, s.jobIdStr)
+    s.userName = <char *>_rebase(base, s.userName)
+    s.jobName = <char *>_rebase(base, s.jobName)
+    s.queue = <char *>_rebase(base, s.queue)
+    s.askedHosts = <char **>_rebase(base, s.askedHosts)
+    _rebase_strings(base, s.askedHosts, s.numAskedHosts)
+    s.resReq = <char *>_rebase(base, s.resReq)
+    s.hostSpec = <char *>_rebase(base, s.hostSpec)
+    s.dependCond = <char *>_rebase(base, s.dependCond)
+    s.subHomeDir = <char *>_rebase(base, s.subHomeDir)
+    s.inFile = <char *>_rebase(base, s.inFile)
+    s.outFile = <char *>_rebase(base, s.outFile)
+    s.errFile = <char *>_rebase(base, s.errFile)
+    s.command = <char *>_rebase(base, s.command)
+    s.inFileSpool = <char *>_rebase(base, s.inFileSpool)
+    s.commandSpool = <char *>_rebase(base, s.commandSpool)
+    s.chkpntDir = <char *>_rebase(base, s.chkpntDir)
+    s.xf = <xFile *>_rebase(base, s.xf)
+    s.jobFile = <char *>_rebase(base, s.jobFile)
+    s.fromHost = <char *>_rebase(base, s.fromHost)
+    s.cwd = <char *>_rebase(base, s.cwd)
+    s.preExecCmd = <char *>_rebase(base, s.preExecCmd)
+    s.mailUser = <char *>_rebase(base, s.mailUser)
+    s.projectName = <char *>_rebase(base, s.projectName)
+    s.loginShell = <char *>_rebase(base, s.loginShell)
+    s.schedHostType = <char *>_rebase(base, s.schedHostType)
+
+
+cdef int _pack_jobAttrSetLog(_Packer p, jobAttrSetLog * s, Py_ssize_t at) except -1:
+    cdef Py_ssize_t offset
+    offset = p.string(s.hostname)
+    (<jobAttrSetLog *>(p.data + at)).hostname = <char *>offset
+    return 0
+
+cdef void _relocate_jobAttrSetLog(char * base, jobAttrSetLog * s):
+    s.hostname = <char *>_rebase(base, s.hostname)
+
+
+cdef int _pack_log_member(int member, _Packer p, eventLog * el, Py_ssize_t at) except -1:
+    """Pack the member of the union at position member in LOG_MEMBERS"""
+    if member == 0:
+        return _pack_jobNewLog(p, &el.jobNewLog, at)
+    elif member == 1:
+        return _pack_jobStartLog(p, &el.jobStartLog, at)
+    elif member == 2:
+        return _pack_jobStatusLog(p, &el.jobStatusLog, at)
+    elif member == 3:
+        return _pack_sbdJobStatusLog(p, &el.sbdJobStatusLog, at)
+    elif member == 4:
+        return _pack_jobSwitchLog(p, &el.jobSwitchLog, at)
+    elif member == 5:
+        return _pack_jobMoveLog(p, &el.jobMoveLog, at)
+    elif member == 6:
+        return _pack_queueCtrlLog(p, &el.queueCtrlLog, at)
+    elif member == 7:
+        return _pack_newDebugLog(p, &el.newDebugLog, at)
+    elif member == 8:
+        return _pack_hostCtrlLog(p, &el.hostCtrlLog, at)
+    elif member == 9:
+        return _pack_mbdStartLog(p, &el.mbdStartLog, at)
+    elif member == 10:
+        return _pack_mbdDieLog(p, &el.mbdDieLog, at)
+    elif member == 11:
+        return _pack_unfulfillLog(p, &el.unfulfillLog, at)
+    elif member == 12:
+        return _pack_jobFinishLog(p, &el.jobFinishLog, at)
+    elif member == 13:
+        return _pack_loadIndexLog(p, &el.loadIndexLog, at)
+    elif member == 14:
+        return _pack_migLog(p, &el.migLog, at)
+    elif member == 15:
+        return _pack_signalLog(p, &el.signalLog, at)
+    elif member == 16:
+        return _pack_jobExecuteLog(p, &el.jobExecuteLog, at)
+    elif member == 17:
+        return _pack_jobMsgLog(p, &el.jobMsgLog, at)
+    elif member == 18:
+        return _pack_jobMsgAckLog(p, &el.jobMsgAckLog, at)
+    elif member == 19:
+        return _pack_jobRequeueLog(p, &el.jobRequeueLog, at)
+    elif member == 20:
+        return _pack_chkpntLog(p, &el.chkpntLog, at)
+    elif member == 21:
+        return _pack_sigactLog(p, &el.sigactLog, at)
+    elif member == 22:
+        return _pack_jobStartAcceptLog(p, &el.jobStartAcceptLog, at)
+    elif member == 23:
+        return _pack_jobCleanLog(p, &el.jobCleanLog, at)
+    elif member == 24:
+        return _pack_jobForceRequestLog(p, &el.jobForceRequestLog, at)
+    elif member == 25:
+        return _pack_logSwitchLog(p, &el.logSwitchLog, at)
+    elif member == 26:
+        return _pack_jobModLog(p, &el.jobModLog, at)
+    elif member == 27:
+        return _pack_jobAttrSetLog(p, &el.jobAttrSetLog, at)
+    return 0
+
+cdef void _relocate_log_member(int member, char * base, eventLog * el):
+    if member == 0:
+        _relocate_jobNewLog(base, &el.jobNewLog)
+    elif member == 1:
+        _relocate_jobStartLog(base, &el.jobStartLog)
+    elif member == 2:
+        _relocate_jobStatusLog(base, &el.jobStatusLog)
+    elif member == 3:
+        _relocate_sbdJobStatusLog(base, &el.sbdJobStatusLog)
+    elif member == 4:
+        _relocate_jobSwitchLog(base, &el.jobSwitchLog)
+    elif member == 5:
+        _relocate_jobMoveLog(base, &el.jobMoveLog)
+    elif member == 6:
+        _relocate_queueCtrlLog(base, &el.queueCtrlLog)
+    elif member == 7:
+        _relocate_newDebugLog(base, &el.newDebugLog)
+    elif member == 8:
+        _relocate_hostCtrlLog(base, &el.hostCtrlLog)
+    elif member == 9:
+        _relocate_mbdStartLog(base, &el.mbdStartLog)
+    elif member == 10:
+        _relocate_mbdDieLog(base, &el.mbdDieLog)
+    elif member == 11:
+        _relocate_unfulfillLog(base, &el.unfulfillLog)
+    elif member == 12:
+        _relocate_jobFinishLog(base, &el.jobFinishLog)
+    elif member == 13:
+        _relocate_loadIndexLog(base, &el.loadIndexLog)
+    elif member == 14:
+        _relocate_migLog(base, &el.migLog)
+    elif member == 15:
+        _relocate_signalLog(base, &el.signalLog)
+    elif member == 16:
+        _relocate_jobExecuteLog(base, &el.jobExecuteLog)
+    elif member == 17:
+        _relocate_jobMsgLog(base, &el.jobMsgLog)
+    elif member == 18:
+        _relocate_jobMsgAckLog(base, &el.jobMsgAckLog)
+    elif member == 19:
+        _relocate_jobRequeueLog(base, &el.jobRequeueLog)
+    elif member == 20:
+        _relocate_chkpntLog(base, &el.chkpntLog)
+    elif member == 21:
+        _relocate_sigactLog(base, &el.sigactLog)
+    elif member == 22:
+        _relocate_jobStartAcceptLog(base, &el.jobStartAcceptLog)
+    elif member == 23:
+        _relocate_jobCleanLog(base, &el.jobCleanLog)
+    elif member == 24:
+        _relocate_jobForceRequestLog(base, &el.jobForceRequestLog)
+    elif member == 25:
+        _relocate_logSwitchLog(base, &el.logSwitchLog)
+    elif member == 26:
+        _relocate_jobModLog(base, &el.jobModLog)
+    elif member == 27:
+        _relocate_jobAttrSetLog(base, &el.jobAttrSetLog)
+
+
+cdef bint _pack_log_object(_Packer p, object rec) except -1:
+    """Pack a *Log object, returns False if rec is not one"""
+    cdef Py_ssize_t at
+    if isinstance(rec, JobNewLog):
+        at = p.image((<JobNewLog>rec)._data, sizeof(jobNewLog))
+        _pack_jobNewLog(p, (<JobNewLog>rec)._data, at)
+        p.add(_KIND_LOG + 0, 0, at)
+        return True
+    elif isinstance(rec, JobStartLog):
+        at = p.image((<JobStartLog>rec)._data, sizeof(jobStartLog))
+        _pack_jobStartLog(p, (<JobStartLog>rec)._data, at)
+        p.add(_KIND_LOG + 1, 0, at)
+        return True
+    elif isinstance(rec, JobStatusLog):
+        at = p.image((<JobStatusLog>rec)._data, sizeof(jobStatusLog))
+        _pack_jobStatusLog(p, (<JobStatusLog>rec)._data, at)
+        p.add(_KIND_LOG + 2, 0, at)
+        return True
+    elif isinstance(rec, SbdJobStatusLog):
+        at = p.image((<SbdJobStatusLog>rec)._data, sizeof(sbdJobStatusLog))
+        _pack_sbdJobStatusLog(p, (<SbdJobStatusLog>rec)._data, at)
+        p.add(_KIND_LOG + 3, 0, at)
+        return True
+    elif isinstance(rec, JobSwitchLog):
+        at = p.image((<JobSwitchLog>rec)._data, sizeof(jobSwitchLog))
+        _pack_jobSwitchLog(p, (<JobSwitchLog>rec)._data, at)
+        p.add(_KIND_LOG + 4, 0, at)
+        return True
+    elif isinstance(rec, JobMoveLog):
+        at = p.image((<JobMoveLog>rec)._data, sizeof(jobMoveLog))
+        _pack_jobMoveLog(p, (<JobMoveLog>rec)._data, at)
+        p.add(_KIND_LOG + 5, 0, at)
+        return True
+    elif isinstance(rec, QueueCtrlLog):
+        at = p.image((<QueueCtrlLog>rec)._data, sizeof(queueCtrlLog))
+        _pack_queueCtrlLog(p, (<QueueCtrlLog>rec)._data, at)
+        p.add(_KIND_LOG + 6, 0, at)
+        return True
+    elif isinstance(rec, NewDebugLog):
+        at = p.image((<NewDebugLog>rec)._data, sizeof(newDebugLog))
+        _pack_newDebugLog(p, (<NewDebugLog>rec)._data, at)
+        p.add(_KIND_LOG + 7, 0, at)
+        return True
+    elif isinstance(rec, HostCtrlLog):
+        at = p.image((<HostCtrlLog>rec)._data, sizeof(hostCtrlLog))
+        _pack_hostCtrlLog(p, (<HostCtrlLog>rec)._data, at)
+        p.add(_KIND_LOG + 8, 0, at)
+        return True
+    elif isinstance(rec, MbdStartLog):
+        at = p.image((<MbdStartLog>rec)._data, sizeof(mbdStartLog))
+        _pack_mbdStartLog(p, (<MbdStartLog>rec)._data, at)
+        p.add(_KIND_LOG + 9, 0, at)
+        return True
+    elif isinstance(rec, MbdDieLog):
+        at = p.image((<MbdDieLog>rec)._data, sizeof(mbdDieLog))
+        _pack_mbdDieLog(p, (<MbdDieLog>rec)._data, at)
+        p.add(_KIND_LOG + 10, 0, at)
+        return True
+    elif isinstance(rec, UnfulfillLog):
+        at = p.image((<UnfulfillLog>rec)._data, sizeof(unfulfillLog))
+        _pack_unfulfillLog(p, (<UnfulfillLog>rec)._data, at)
+        p.add(_KIND_LOG + 11, 0, at)
+        return True
+    elif isinstance(rec, JobFinishLog):
+        at = p.image((<JobFinishLog>rec)._data, sizeof(jobFinishLog))
+        _pack_jobFinishLog(p, (<JobFinishLog>rec)._data, at)
+        p.add(_KIND_LOG + 12, 0, at)
+        return True
+    elif isinstance(rec, LoadIndexLog):
+        at = p.image((<LoadIndexLog>rec)._data, sizeof(loadIndexLog))
+        _pack_loadIndexLog(p, (<LoadIndexLog>rec)._data, at)
+        p.add(_KIND_LOG + 13, 0, at)
+        return True
+    elif isinstance(rec, MigLog):
+        at = p.image((<MigLog>rec)._data, sizeof(migLog))
+        _pack_migLog(p, (<MigLog>rec)._data, at)
+        p.add(_KIND_LOG + 14, 0, at)
+        return True
+    elif isinstance(rec, SignalLog):
+        at = p.image((<SignalLog>rec)._data, sizeof(signalLog))
+        _pack_signalLog(p, (<SignalLog>rec)._data, at)
+        p.add(_KIND_LOG + 15, 0, at)
+        return True
+    elif isinstance(rec, JobExecuteLog):
+        at = p.image((<JobExecuteLog>rec)._data, sizeof(jobExecuteLog))
+        _pack_jobExecuteLog(p, (<JobExecuteLog>rec)._data, at)
+        p.add(_KIND_LOG + 16, 0, at)
+        return True
+    elif isinstance(rec, JobMsgLog):
+        at = p.image((<JobMsgLog>rec)._data, sizeof(jobMsgLog))
+        _pack_jobMsgLog(p, (<JobMsgLog>rec)._data, at)
+        p.add(_KIND_LOG + 17, 0, at)
+        return True
+    elif isinstance(rec, JobMsgAckLog):
+        at = p.image((<JobMsgAckLog>rec)._data, sizeof(jobMsgAckLog))
+        _pack_jobMsgAckLog(p, (<JobMsgAckLog>rec)._data, at)
+        p.add(_KIND_LOG + 18, 0, at)
+        return True
+    elif isinstance(rec, JobRequeueLog):
+        at = p.image((<JobRequeueLog>rec)._data, sizeof(jobRequeueLog))
+        _pack_jobRequeueLog(p, (<JobRequeueLog>rec)._data, at)
+        p.add(_KIND_LOG + 19, 0, at)
+        return True
+    elif isinstance(rec, ChkpntLog):
+        at = p.image((<ChkpntLog>rec)._data, sizeof(chkpntLog))
+        _pack_chkpntLog(p, (<ChkpntLog>rec)._data, at)
+        p.add(_KIND_LOG + 20, 0, at)
+        return True
+    elif isinstance(rec, SigactLog):
+        at = p.image((<SigactLog>rec)._data, sizeof(sigactLog))
+        _pack_sigactLog(p, (<SigactLog>rec)._data, at)
+        p.add(_KIND_LOG + 21, 0, at)
+        return True
+    elif isinstance(rec, JobStartAcceptLog):
+        at = p.image((<JobStartAcceptLog>rec)._data, sizeof(jobStartAcceptLog))
+        _pack_jobStartAcceptLog(p, (<JobStartAcceptLog>rec)._data, at)
+        p.add(_KIND_LOG + 22, 0, at)
+        return True
+    elif isinstance(rec, JobCleanLog):
+        at = p.image((<JobCleanLog>rec)._data, sizeof(jobCleanLog))
+        _pack_jobCleanLog(p, (<JobCleanLog>rec)._data, at)
+        p.add(_KIND_LOG + 23, 0, at)
+        return True
+    elif isinstance(rec, JobForceRequestLog):
+        at = p.image((<JobForceRequestLog>rec)._data, sizeof(jobForceRequestLog))
+        _pack_jobForceRequestLog(p, (<JobForceRequestLog>rec)._data, at)
+        p.add(_KIND_LOG + 24, 0, at)
+        return True
+    elif isinstance(rec, LogSwitchLog):
+        at = p.image((<LogSwitchLog>rec)._data, sizeof(logSwitchLog))
+        _pack_logSwitchLog(p, (<LogSwitchLog>rec)._data, at)
+        p.add(_KIND_LOG + 25, 0, at)
+        return True
+    elif isinstance(rec, JobModLog):
+        at = p.image((<JobModLog>rec)._data, sizeof(jobModLog))
+        _pack_jobModLog(p, (<JobModLog>rec)._data, at)
+        p.add(_KIND_LOG + 26, 0, at)
+        return True
+    elif isinstance(rec, JobAttrSetLog):
+        at = p.image((<JobAttrSetLog>rec)._data, sizeof(jobAttrSetLog))
+        _pack_jobAttrSetLog(p, (<JobAttrSetLog>rec)._data, at)
+        p.add(_KIND_LOG + 27, 0, at)
+        return True
+    return False
+
+cdef object _unpack_log_object(int member, _Block block, Py_ssize_t i):
+    """Record i of block, a *Log object for the member of the union at position member"""
+    cdef JobNewLog log0
+    cdef JobStartLog log1
+    cdef JobStatusLog log2
+    cdef SbdJobStatusLog log3
+    cdef JobSwitchLog log4
+    cdef JobMoveLog log5
+    cdef QueueCtrlLog log6
+    cdef NewDebugLog log7
+    cdef HostCtrlLog log8
+    cdef MbdStartLog log9
+    cdef MbdDieLog log10
+    cdef UnfulfillLog log11
+    cdef JobFinishLog log12
+    cdef LoadIndexLog log13
+    cdef MigLog log14
+    cdef SignalLog log15
+    cdef JobExecuteLog log16
+    cdef JobMsgLog log17
+    cdef JobMsgAckLog log18
+    cdef JobRequeueLog log19
+    cdef ChkpntLog log20
+    cdef SigactLog log21
+    cdef JobStartAcceptLog log22
+    cdef JobCleanLog log23
+    cdef JobForceRequestLog log24
+    cdef LogSwitchLog log25
+    cdef JobModLog log26
+    cdef JobAttrSetLog log27
+    if member == 0:
+        log0 = JobNewLog()
+        log0._data = <jobNewLog *>block.record(i, sizeof(jobNewLog))
+        _relocate_jobNewLog(block.data, log0._data)
+        log0._block = block
+        return log0
+    elif member == 1:
+        log1 = JobStartLog()
+        log1._data = <jobStartLog *>block.record(i, sizeof(jobStartLog))
+        _relocate_jobStartLog(block.data, log1._data)
+        log1._block = block
+        return log1
+    elif member == 2:
+        log2 = JobStatusLog()
+        log2._data = <jobStatusLog *>block.record(i, sizeof(jobStatusLog))
+        _relocate_jobStatusLog(block.data, log2._data)
+        log2._block = block
+        return log2
+    elif member == 3:
+        log3 = SbdJobStatusLog()
+        log3._data = <sbdJobStatusLog *>block.record(i, sizeof(sbdJobStatusLog))
+        _relocate_sbdJobStatusLog(block.data, log3._data)
+        log3._block = block
+        return log3
+    elif member == 4:
+        log4 = JobSwitchLog()
+        log4._data = <jobSwitchLog *>block.record(i, sizeof(jobSwitchLog))
+        _relocate_jobSwitchLog(block.data, log4._data)
+        log4._block = block
+        return log4
+    elif member == 5:
+        log5 = JobMoveLog()
+        log5._data = <jobMoveLog *>block.record(i, sizeof(jobMoveLog))
+        _relocate_jobMoveLog(block.data, log5._data)
+        log5._block = block
+        return log5
+    elif member == 6:
+        log6 = QueueCtrlLog()
+        log6._data = <queueCtrlLog *>block.record(i, sizeof(queueCtrlLog))
+        _relocate_queueCtrlLog(block.data, log6._data)
+        log6._block = block
+        return log6
+    elif member == 7:
+        log7 = NewDebugLog()
+        log7._data = <newDebugLog *>block.record(i, sizeof(newDebugLog))
+        _relocate_newDebugLog(block.data, log7._data)
+        log7._block = block
+        return log7
+    elif member == 8:
+        log8 = HostCtrlLog()
+        log8._data = <hostCtrlLog *>block.record(i, sizeof(hostCtrlLog))
+        _relocate_hostCtrlLog(block.data, log8._data)
+        log8._block = block
+        return log8
+    elif member == 9:
+        log9 = MbdStartLog()
+        log9._data = <mbdStartLog *>block.record(i, sizeof(mbdStartLog))
+        _relocate_mbdStartLog(block.data, log9._data)
+        log9._block = block
+        return log9
+    elif member == 10:
+        log10 = MbdDieLog()
+        log10._data = <mbdDieLog *>block.record(i, sizeof(mbdDieLog))
+        _relocate_mbdDieLog(block.data, log10._data)
+        log10._block = block
+        return log10
+    elif member == 11:
+        log11 = UnfulfillLog()
+        log11._data = <unfulfillLog *>block.record(i, sizeof(unfulfillLog))
+        _relocate_unfulfillLog(block.data, log11._data)
+        log11._block = block
+        return log11
+    elif member == 12:
+        log12 = JobFinishLog()
+        log12._data = <jobFinishLog *>block.record(i, sizeof(jobFinishLog))
+        _relocate_jobFinishLog(block.data, log12._data)
+        log12._block = block
+        return log12
+    elif member == 13:
+        log13 = LoadIndexLog()
+        log13._data = <loadIndexLog *>block.record(i, sizeof(loadIndexLog))
+        _relocate_loadIndexLog(block.data, log13._data)
+        log13._block = block
+        return log13
+    elif member == 14:
+        log14 = MigLog()
+        log14._data = <migLog *>block.record(i, sizeof(migLog))
+        _relocate_migLog(block.data, log14._data)
+        log14._block = block
+        return log14
+    elif member == 15:
+        log15 = SignalLog()
+        log15._data = <signalLog *>block.record(i, sizeof(signalLog))
+        _relocate_signalLog(block.data, log15._data)
+        log15._block = block
+        return log15
+    elif member == 16:
+        log16 = JobExecuteLog()
+        log16._data = <jobExecuteLog *>block.record(i, sizeof(jobExecuteLog))
+        _relocate_jobExecuteLog(block.data, log16._data)
+        log16._block = block
+        return log16
+    elif member == 17:
+        log17 = JobMsgLog()
+        log17._data = <jobMsgLog *>block.record(i, sizeof(jobMsgLog))
+        _relocate_jobMsgLog(block.data, log17._data)
+        log17._block = block
+        return log17
+    elif member == 18:
+        log18 = JobMsgAckLog()
+        log18._data = <jobMsgAckLog *>block.record(i, sizeof(jobMsgAckLog))
+        _relocate_jobMsgAckLog(block.data, log18._data)
+        log18._block = block
+        return log18
+    elif member == 19:
+        log19 = JobRequeueLog()
+        log19._data = <jobRequeueLog *>block.record(i, sizeof(jobRequeueLog))
+        _relocate_jobRequeueLog(block.data, log19._data)
+        log19._block = block
+        return log19
+    elif member == 20:
+        log20 = ChkpntLog()
+        log20._data = <chkpntLog *>block.record(i, sizeof(chkpntLog))
+        _relocate_chkpntLog(block.data, log20._data)
+        log20._block = block
+        return log20
+    elif member == 21:
+        log21 = SigactLog()
+        log21._data = <sigactLog *>block.record(i, sizeof(sigactLog))
+        _relocate_sigactLog(block.data, log21._data)
+        log21._block = block
+        return log21
+    elif member == 22:
+        log22 = JobStartAcceptLog()
+        log22._data = <jobStartAcceptLog *>block.record(i, sizeof(jobStartAcceptLog))
+        _relocate_jobStartAcceptLog(block.data, log22._data)
+        log22._block = block
+        return log22
+    elif member == 23:
+        log23 = JobCleanLog()
+        log23._data = <jobCleanLog *>block.record(i, sizeof(jobCleanLog))
+        _relocate_jobCleanLog(block.data, log23._data)
+        log23._block = block
+        return log23
+    elif member == 24:
+        log24 = JobForceRequestLog()
+        log24._data = <jobForceRequestLog *>block.record(i, sizeof(jobForceRequestLog))
+        _relocate_jobForceRequestLog(block.data, log24._data)
+        log24._block = block
+        return log24
+    elif member == 25:
+        log25 = LogSwitchLog()
+        log25._data = <logSwitchLog *>block.record(i, sizeof(logSwitchLog))
+        _relocate_logSwitchLog(block.data, log25._data)
+        log25._block = block
+        return log25
+    elif member == 26:
+        log26 = JobModLog()
+        log26._data = <jobModLog *>block.record(i, sizeof(jobModLog))
+        _relocate_jobModLog(block.data, log26._data)
+        log26._block = block
+        return log26
+    elif member == 27:
+        log27 = JobAttrSetLog()
+        log27._data = <jobAttrSetLog *>block.record(i, sizeof(jobAttrSetLog))
+        _relocate_jobAttrSetLog(block.data, log27._data)
+        log27._block = block
+        return log27
+    raise ValueError("Unknown packed record kind {}".format(_KIND_LOG + member))
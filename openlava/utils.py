@@ -2,6 +2,67 @@
 
 import os, os.path
 import glob
+import threading
+
+#liblsf and liblsbatch keep their state (connections, errno values, the job
+#cursor and the buffers they return) in globals, so lsblib and lslib make
+#every call into them while holding this lock.
+library_lock = threading.RLock()
+
+#lsberrno and lserrno as they were after the last library call made by each thread
+library_errors = threading.local()
+
+
+class Snapshot(object):
+    """Plain copy of the attributes of an lsblib or lslib object that can not be packed, see snapshot()"""
+    def __init__(self, type_name, attributes):
+        self.__dict__.update(attributes)
+        self._type_name = type_name
+
+    def __repr__(self):
+        return "<{} snapshot>".format(self._type_name)
+
+
+def _record_module(value):
+    """lsblib or lslib if value is one of their packable records, otherwise None"""
+    #imported here as both modules import this one
+    from openlava import lsblib, lslib
+    for module in (lsblib, lslib):
+        if isinstance(value, module._Record):
+            return module
+    return None
+
+
+def snapshot(value):
+    """Copy an object returned by lsblib or lslib, or a list of them, out of openlava's buffers.
+
+    Many calls return objects that point into buffers owned by openlava, which are reused
+    by the next call.  Records that pack_records() supports are packed and unpacked, which
+    gives objects of the same class, with all their methods, holding their own copy of the
+    data; a list of them shares one block of memory.  Other objects are copied into
+    Snapshot objects by reading every property once.  Call it while holding library_lock,
+    together with the call that returned the value.
+    """
+    if isinstance(value, (list, tuple)):
+        modules = set(_record_module(v) for v in value)
+        if len(modules) == 1 and None not in modules:
+            module = modules.pop()
+            return type(value)(module.unpack_records(module.pack_records(value)))
+        return type(value)(snapshot(v) for v in value)
+    module = _record_module(value)
+    if module is not None:
+        return module.unpack_records(module.pack_records([value]))[0]
+    if isinstance(value, Snapshot) or not type(value).__module__.startswith("openlava."):
+        return value
+    attributes = {}
+    for name in dir(value):
+        if name.startswith("_"):
+            continue
+        attr = getattr(value, name)
+        if callable(attr):
+            continue
+        attributes[name] = snapshot(attr)
+    return Snapshot(type(value).__name__, attributes)
 
 def find_openlava():
     if 'LSF_ENVDIR' in os.environ:
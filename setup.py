@@ -69,7 +69,19 @@ setup(
     license      = "GPL 3",
     ext_modules  = cythonize(extensions),
     test_suite   = 'tests.test.suite',
+    #openlava.aio needs these on Python 2, where asyncio and concurrent.futures are missing
+    extras_require = {
+        'aio': ['trollius; python_version < "3.4"', 'futures; python_version < "3.2"'],
+    },
+    tests_require = ['trollius; python_version < "3.4"', 'futures; python_version < "3.2"'],
     packages     = ['openlava'],
+    entry_points = {
+        'console_scripts': [
+            'olbjobs = openlava.cli:main_jobs',
+            'olbhosts = openlava.cli:main_hosts',
+            'olbqueues = openlava.cli:main_queues',
+        ],
+    },
     classifiers  = [
         'Programming Language :: Python',
         'Programming Language :: Python :: 2',
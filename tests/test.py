@@ -16,17 +16,45 @@
 # You should have received a copy of the GNU General Public License
 # along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
 import unittest
+import csv
+import json
 import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import time
+from StringIO import StringIO
 try:
     from openlava import lsblib
     from openlava import lslib
     from openlava import constants
+    from openlava import events
+    from openlava import jobindex
+    from openlava import accounting
+    from openlava import aio
+    from openlava import cache
+    from openlava import jobtracker
+    from openlava import jobquery
+    from openlava import instrument
+    from openlava import allocations
+    from openlava import cli
 except ImportError as e:
     print "Error importing openlava modules: {}".format(e) #to get around setuptools hiding this
     raise
 from openlava.utils import find_openlava
 
+
+def gen_events(path, *args):
+    """Write a synthetic lsb.events to path, and lsb.acct next to it, with tools/gen_events.py"""
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "gen_events.py")
+    with open(os.devnull, "w") as devnull:
+        subprocess.check_call([sys.executable, script, path] + list(args), stderr=devnull)
+    return path
+
+
 class LsblibTest(unittest.TestCase):
     def setUp(self):
         lsblib.lsb_init("test case")
@@ -46,6 +74,35 @@ class LsblibTest(unittest.TestCase):
         sr = lsblib.lsb_submit(s)
         self.assertGreaterEqual(sr.jobId, 0)
 
+    def test_submit_many(self):
+        template = lsblib.Submit()
+        template.command = "hostname"
+        template.numProcessors = 1
+        submits = [template.clone(jobName="test{}".format(i)) for i in range(3)]
+        self.assertEqual(submits[1].jobName, "test1")
+        self.assertEqual(submits[1].command, "hostname")
+        self.assertEqual(template.jobName, "")
+
+        submits.append(template.clone(queue="no_such_queue"))
+        replies, errors = lsblib.lsb_submit_many(submits, rate=100)
+        self.assertEqual(len(replies), 4)
+        for sr in replies[:3]:
+            self.assertGreaterEqual(sr.jobId, 0)
+        self.assertEqual(replies[3].jobId, -1)
+        self.assertEqual([e.index for e in errors], [3])
+
+    def test_submit_environment(self):
+        environ = dict(os.environ)
+        env = lsblib.Environment({"PATH": os.environ.get("PATH", "/bin"), "TEST_VAR": 1})
+        self.assertEqual(env.variables["TEST_VAR"], "1")
+        s = lsblib.Submit(environment=env)
+        s.command = "hostname"
+        s.numProcessors = 1
+        self.assertGreaterEqual(lsblib.lsb_submit(s).jobId, 0)
+        replies, errors = lsblib.lsb_submit_many([s.clone(), s.clone()])
+        self.assertEqual(errors, [])
+        self.assertEqual(dict(os.environ), environ)
+
 #this will alter our live queues!
 #    def test_queuecontrol(self):
 #        queues = lsblib.lsb_queueinfo()
@@ -115,6 +172,98 @@ class LsblibTest(unittest.TestCase):
         finally:
            lsblib.lsb_closejobinfo()
 
+    def test_pending_reasons(self):
+        jobs = [j for j in lsblib.lsb_jobinfo_many(lsblib.read_jobs().jobId).values()
+                if j.status == "PEND"]
+        reasons, histogram = lsblib.pending_reasons(jobs, lsblib.LoadIndexLog())
+        self.assertEqual(sorted(reasons), sorted(j.jobId for j in jobs))
+        ld = lsblib.LoadIndexLog()
+        for job in jobs[:10]:
+            self.assertEqual(reasons[job.jobId], lsblib.lsb_pendreason(job.numReasons, job.reasonTb, None, ld))
+        for reason, count in histogram.items():
+            self.assertLessEqual(count, len(jobs))
+
+    def test_jobs_view(self):
+        try:
+            num_jobs = lsblib.lsb_openjobinfo()
+            views = []
+            for i in range(num_jobs):
+                job = lsblib.lsb_readjobinfo(view=True)
+                self.assertIsInstance(job, lsblib.JobInfoView)
+                self.assertEqual(job.submit_epoch, time.mktime(job.submitTime))
+                self.assertIn(job.status, lsblib.JOB_STATUS_STRINGS.values())
+                views.append(job.materialize())
+                self.check_job(job)
+        finally:
+            lsblib.lsb_closejobinfo()
+
+        for job in views:
+            self.assertIsInstance(job.user, basestring)
+
+    def test_read_jobs(self):
+        jobs = lsblib.read_jobs()
+        self.assertIsInstance(jobs, lsblib.JobColumns)
+        for name in lsblib.JobColumns.COLUMNS:
+            self.assertEqual(len(jobs[name]), len(jobs))
+        for i in range(len(jobs)):
+            row = jobs.row(i)
+            self.assertGreater(row['jobId'], 0)
+            self.assertIsInstance(row['user'], basestring)
+
+        #the cursor must have been closed again
+        lsblib.lsb_openjobinfo()
+        lsblib.lsb_closejobinfo()
+
+    def test_jobinfo_many(self):
+        job_ids = list(lsblib.read_jobs().jobId)
+        self.assertEqual(sorted(lsblib.lsb_jobinfo_many(job_ids)), sorted(job_ids))
+        for job_id in job_ids[:2]:
+            jobs = lsblib.lsb_jobinfo_many([job_id, 0x7ffffff])
+            self.assertEqual(list(jobs), [job_id])
+            self.check_job(jobs[job_id])
+        self.assertEqual(lsblib.lsb_jobinfo_many([]), {})
+
+    def test_cursor(self):
+        with lsblib.JobInfoCursor() as cursor:
+            job_ids = [job.jobId for job in cursor]
+            self.assertEqual(len(job_ids), len(set(job_ids)))
+        self.assertEqual(sorted(job_ids), sorted(lsblib.read_jobs().jobId))
+        self.assertEqual(cursor.retries, 0)
+        self.assertGreaterEqual(cursor.open_time, 0)
+
+        #leaving early must close the cursor
+        with lsblib.JobInfoCursor(view=True) as cursor:
+            for job in cursor:
+                break
+        lsblib.lsb_openjobinfo()
+        lsblib.lsb_closejobinfo()
+
+    def test_threads(self):
+        errors = []
+
+        def query():
+            try:
+                for i in range(10):
+                    self.assertIsInstance(lsblib.lsb_hostinfo(), list)
+                    lsblib.read_jobs()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=query) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+        #a failed call in another thread does not change this thread's lsberrno
+        lsblib.lsb_hostinfo()
+        lsberrno = lsblib.get_lsberrno()
+        t = threading.Thread(target=lsblib.lsb_queueinfo, args=(["no_such_queue"],))
+        t.start()
+        t.join()
+        self.assertEqual(lsblib.get_lsberrno(), lsberrno)
+
     def check_job(self, job):
         self.assertIsInstance(job, lsblib.JobInfoEnt)
 
@@ -149,6 +298,8 @@ class LsblibTest(unittest.TestCase):
         self.assertIsInstance(queues, list)
         for queue in queues:
             self.check_queue(queue)
+            self.assertIs(queue.userList, queue.userList)
+            self.assertIs(queue.hostList, queue.hostList)
 
     def test_hostinfo(self):
         hosts = lsblib.lsb_hostinfo()
@@ -162,11 +313,11 @@ class LsblibTest(unittest.TestCase):
         self.assertIsInstance(queue.description, basestring)
         self.assertIsInstance(queue.priority, int)
         self.assertIsInstance(queue.nice, int)
-        self.assertIsInstance(queue.userList, list)
+        self.assertIsInstance(queue.userList, tuple)
         for user in queue.userList:
             self.assertIsInstance(user, basestring)
             self.assertNotEqual(user, "")
-        self.assertIsInstance(queue.hostList, list)
+        self.assertIsInstance(queue.hostList, tuple)
         for host in queue.hostList:
             self.assertIsInstance(host, basestring)
             self.assertNotEqual(host, "")
@@ -216,6 +367,642 @@ class LsblibTest(unittest.TestCase):
                     continue
                 self.assertEqual(lsblib.get_lsberrno(), constants.LSBE_NO_ERROR)
 
+    def test_event_log_reader(self):
+        events = os.path.join(find_openlava(), "work", "logdir", "lsb.events")
+        types = [constants.EVENT_JOB_NEW, constants.EVENT_JOB_FINISH]
+
+        reader = lsblib.EventLogReader(events, event_types=types)
+        first = [(rec.type, rec.eventTime) for rec in reader]
+        for t, event_time in first:
+            self.assertIn(t, types)
+
+        #resuming from the end should not return anything new
+        resumed = lsblib.EventLogReader(**reader.checkpoint())
+        self.assertEqual([], list(resumed))
+
+        if first:
+            reader = lsblib.EventLogReader(events, event_types=types, start_time=first[-1][1])
+            self.assertTrue(all(rec.eventTime >= first[-1][1] for rec in reader))
+
+
+    def test_event_serializer(self):
+        events = os.path.join(find_openlava(), "work", "logdir", "lsb.events")
+        full = lsblib.EventSerializer()
+        projected = lsblib.EventSerializer(['eventTime', 'jobId', 'noSuchField'], as_tuple=True)
+        for rec in lsblib.EventLogReader(events):
+            d = full(rec)
+            self.assertEqual(d['type'], rec.type)
+            self.assertEqual(d['eventTime'], rec.eventTime)
+            name = lsblib.EVENT_LOG_ATTRIBUTES.get(rec.type)
+            if name is not None:
+                self.assertEqual(set(d), set(lsblib.EVENT_HEADER_FIELDS + lsblib.LOG_FIELDS[name]))
+            event_time, job_id, missing = projected(rec)
+            self.assertEqual(event_time, rec.eventTime)
+            self.assertIsNone(missing)
+            if job_id is not None:
+                self.assertEqual(job_id, lsblib.get_job_id(rec.jobId))
+
+        rows = projected.read(lsblib.EventLogReader(events), 5)
+        self.assertLessEqual(len(rows), 5)
+        for row in rows:
+            self.assertIsInstance(row, tuple)
+
+
+class EventsTest(unittest.TestCase):
+    def test_scan_event_files(self):
+        lsblib.lsb_init("test")
+        logdir = tempfile.mkdtemp()
+        try:
+            paths = []
+            for i in range(2):
+                os.mkdir(os.path.join(logdir, str(i)))
+                gen_events(os.path.join(logdir, str(i), "lsb.events"), "--jobs", "50", "--seed", str(i),
+                           "--start-time", str(1400000000 + i * 100))
+                paths.append(os.path.join(logdir, str(i), "lsb.acct"))
+            types = [constants.EVENT_JOB_FINISH]
+            finished = sorted(rec.jobId for path in paths
+                              for rec in lsblib.EventLogReader(path, event_types=types))
+
+            serial = list(events.scan_event_files(paths, types, ['jobId'], workers=1, spill_dir=logdir))
+            parallel = list(events.scan_event_files(paths, types, ['jobId'], workers=2, spill_dir=logdir))
+            #the run files are gone once the records have been read
+            self.assertEqual(sorted(os.listdir(logdir)), ['0', '1'])
+
+            rows = events.scan_event_files(paths, types, ['jobId'], workers=2, spill_dir=logdir)
+            rows.next()
+            rows.close()
+            self.assertEqual(sorted(os.listdir(logdir)), ['0', '1'])
+        finally:
+            shutil.rmtree(logdir)
+        self.assertEqual(serial, parallel)
+        self.assertGreaterEqual(len(finished), 100)
+        self.assertEqual(sorted(r[2] for r in parallel), finished)
+        self.assertEqual([r[0] for r in parallel], sorted(r[0] for r in parallel))
+        for event_time, event_type, job_id in parallel:
+            self.assertEqual(event_type, constants.EVENT_JOB_FINISH)
+            self.assertGreater(job_id, 0)
+
+    def test_scan_runs(self):
+        lsblib.lsb_init("test")
+        logdir = tempfile.mkdtemp()
+        run_size, batch_size = events.RUN_SIZE, events.BATCH_SIZE
+        try:
+            paths = [gen_events(os.path.join(logdir, "lsb.events.{}".format(i)), "--jobs", "100",
+                                "--seed", str(i)) for i in range(3)]
+            whole = list(events.scan_event_files(paths, fields=['jobId'], workers=1))
+            file_order = list(events.scan_event_files(paths, fields=['jobId'], workers=1,
+                                                      keep_file_order=True))
+            events.RUN_SIZE, events.BATCH_SIZE = 50, 7
+            self.assertEqual(list(events.scan_event_files(paths, fields=['jobId'], workers=2)), whole)
+            self.assertEqual(list(events.scan_event_files(paths, fields=['jobId'], workers=2,
+                                                          keep_file_order=True)), file_order)
+        finally:
+            events.RUN_SIZE, events.BATCH_SIZE = run_size, batch_size
+            shutil.rmtree(logdir)
+        self.assertEqual([r[0] for r in whole], sorted(r[0] for r in whole))
+        self.assertEqual(len(whole), len(file_order))
+        self.assertGreater(len(whole), 150)
+
+
+class JobIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.index_dir)
+
+    def _expected(self, paths):
+        """job id -> [(eventTime, type)] of the job records in paths, read without the index"""
+        expected = {}
+        for path in paths:
+            reader = lsblib.EventLogReader(path, event_types=jobindex.JOB_EVENT_TYPES)
+            for rec in reader:
+                expected.setdefault(rec.jobId, []).append((rec.eventTime, rec.type))
+            reader.close()
+        return expected
+
+    def _check(self, index, expected):
+        self.assertTrue(expected)
+        for job_id, records in expected.items():
+            entries = index.lookup(job_id)
+            self.assertEqual(sorted((e.eventTime, e.type) for e in entries), sorted(records))
+            history = [(rec.jobId, rec.eventTime, rec.type) for rec in index.job_history(job_id)]
+            self.assertEqual(history, [(job_id, e.eventTime, e.type) for e in entries])
+        self.assertEqual(index.lookup(max(expected) + 1000), [])
+
+    def test_job_history(self):
+        lsblib.lsb_init("test")
+        logdir = tempfile.mkdtemp()
+        try:
+            events_path = gen_events(os.path.join(logdir, "lsb.events"), "--jobs", "40",
+                                     "--array-fraction", "0", "--seed", "5")
+            paths = [events_path, os.path.join(logdir, "lsb.acct")]
+            with open(events_path) as f:
+                lines = f.readlines()
+            self.assertGreater(len(lines), 100)
+
+            #index the first half of lsb.events, then the rest as if mbatchd had logged it since
+            with open(events_path, "w") as f:
+                f.writelines(lines[:len(lines) // 2])
+            index = jobindex.JobIndex(self.index_dir)
+            first = index.update(paths)
+            self._check(index, self._expected(paths))
+
+            with open(events_path, "a") as f:
+                f.writelines(lines[len(lines) // 2:])
+            expected = self._expected(paths)
+            self.assertEqual(first + index.update(paths), sum(len(r) for r in expected.values()))
+            self.assertEqual(len(index.files), 2)
+            self.assertEqual(len(index._state['segments']), 2)
+            finished = [job_id for job_id, records in expected.items()
+                        if constants.EVENT_JOB_FINISH in [t for _, t in records]]
+            self.assertEqual(len(finished), 40)
+            self._check(index, expected)
+            self.assertEqual(index.update(paths), 0)
+
+            index.compact()
+            self.assertEqual(len(index._state['segments']), 1)
+            self._check(index, expected)
+
+            #a fresh index reads the same state back from disk
+            index.close()
+            index = jobindex.JobIndex(self.index_dir)
+            self._check(index, expected)
+            index.close()
+        finally:
+            shutil.rmtree(logdir)
+
+
+class AccountingTest(unittest.TestCase):
+    def setUp(self):
+        lsblib.lsb_init("test")
+        self.logdir = tempfile.mkdtemp()
+        gen_events(os.path.join(self.logdir, "lsb.events"), "--jobs", "300", "--exit-fraction", "0.2")
+        self.acct = os.path.join(self.logdir, "lsb.acct")
+        serializer = lsblib.EventSerializer(['userName', 'queue', 'jStatus', 'cpuTime'], as_tuple=True)
+        self.finished = serializer.read(lsblib.EventLogReader(
+            self.acct, event_types=[constants.EVENT_JOB_FINISH]))
+
+    def tearDown(self):
+        shutil.rmtree(self.logdir)
+
+    def test_read_finish_columns(self):
+        reader = lsblib.EventLogReader(self.acct)
+        strings = lsblib.StringTable()
+        rows = []
+        while True:
+            batch = reader.read_finish_columns(10, strings)
+            self.assertLessEqual(len(batch), 10)
+            if not len(batch):
+                break
+            for name in lsblib.FinishColumns.COLUMNS:
+                self.assertEqual(len(batch[name]), len(batch))
+            rows.extend(batch.row(i) for i in range(len(batch)))
+        self.assertGreater(len(self.finished), 0)
+        self.assertEqual([(r['userName'], r['queue'], r['jStatus']) for r in rows],
+                         [f[:3] for f in self.finished])
+
+    @unittest.skipIf(accounting.numpy is None, "numpy is not installed")
+    def test_aggregate(self):
+        expected = {}
+        for user, queue, status, cpu_time in self.finished:
+            totals = expected.setdefault((user, queue), [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += bool(status & constants.JOB_STAT_EXIT)
+            totals[2] += cpu_time
+        self.assertGreater(sum(t[1] for t in expected.values()), 0)
+
+        rows = accounting.aggregate([self.acct], by=('user', 'queue'), workers=1)
+        self.assertEqual(sorted(expected), [(row['user'], row['queue']) for row in rows])
+        for row in rows:
+            jobs, failed, cpu_time = expected[(row['user'], row['queue'])]
+            self.assertEqual((row['jobs'], row['failed']), (jobs, failed))
+            self.assertAlmostEqual(row['cpu_hours'], cpu_time / 3600.0, places=3)
+            self.assertLessEqual(row['maxrss_p50'], row['maxrss_p99'])
+
+        by_bucket = accounting.aggregate([self.acct], by=('bucket',), bucket=3600, workers=1)
+        self.assertEqual(sum(row['jobs'] for row in by_bucket), len(self.finished))
+
+
+@unittest.skipIf(aio.asyncio is None or aio.ThreadPoolExecutor is None,
+                 "asyncio is not installed, on Python 2 install the aio extra")
+class AioTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = aio.asyncio.get_event_loop()
+        self.client = aio.Client()
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_coalesce(self):
+        queries = [self.client.hostinfo() for i in range(10)]
+        self.assertEqual(self.client.in_flight, 1)
+        results = self.loop.run_until_complete(aio.asyncio.gather(*queries))
+        self.assertEqual(self.client.in_flight, 0)
+        for hosts in results:
+            self.assertIs(hosts, results[0])
+        for host in results[0]:
+            self.assertIsInstance(host.host, basestring)
+
+    def test_jobs(self):
+        queries = [self.client.jobs(), self.client.jobs(), self.client.jobs(options=constants.RUN_JOB)]
+        self.assertEqual(self.client.in_flight, 2)
+        all_jobs, same, running = self.loop.run_until_complete(aio.asyncio.gather(*queries))
+        self.assertIs(all_jobs, same)
+        for job in running:
+            self.assertIsInstance(job, lsblib.JobInfoEnt)
+
+    def test_detached(self):
+        hosts = self.loop.run_until_complete(self.client.hostinfo())
+        self.assertTrue(hosts)
+        self.assertIsInstance(hosts[0], lsblib.HostInfoEnt)
+        #the results own their data, so later calls do not change them
+        names = [h.host for h in hosts]
+        lsblib.lsb_hostinfo([names[-1]])
+        self.assertEqual([h.host for h in hosts], names)
+
+        loads = self.loop.run_until_complete(self.client.load())
+        self.assertEqual([h.hostName for h in loads], [h.hostName for h in lslib.ls_load()])
+        for h in loads:
+            self.assertIsInstance(h, lslib.HostLoad)
+            self.assertEqual(len(h.li), h.nIdx)
+
+
+class CacheTest(unittest.TestCase):
+    def test_cache(self):
+        c = cache.MetadataCache(max_size=2)
+        self.assertEqual(c.ls_getclustername(), lslib.ls_getclustername())
+        self.assertEqual(c.ls_getclustername(), lslib.ls_getclustername())
+        self.assertEqual((c.hits, c.misses), (1, 1))
+
+        hosts = c.ls_gethostinfo()
+        self.assertIs(c.ls_gethostinfo(), hosts)
+        for host in hosts:
+            self.assertIsInstance(host, lslib.HostInfo)
+            self.assertIsInstance(host.hostName, basestring)
+            self.assertTrue(host.has_resource(u"cs"))
+            self.assertTrue(lslib.has_resource(host, u"fs"))
+            self.assertFalse(host.has_resource(u"nores"))
+        #the cached copies stay valid after openlava reuses its buffers
+        names = [h.hostName for h in hosts]
+        lslib.ls_gethostinfo(hostList=[names[-1]])
+        self.assertEqual([h.hostName for h in hosts], names)
+        self.assertEqual([h.busyThreshold.tolist() for h in hosts],
+                         [h.busyThreshold.tolist() for h in lslib.ls_gethostinfo()])
+        info = c.ls_info()
+        self.assertIsInstance(info, lslib.LsInfo)
+        self.assertEqual(info.indexNames, lslib.ls_info().indexNames)
+        self.assertEqual(pickle.loads(pickle.dumps(info)).hostTypes, info.hostTypes)
+        queues = c.lsb_queueinfo()
+        self.assertTrue(all(isinstance(q, lsblib.QueueInfoEnt) for q in queues))
+        self.assertEqual(len(c), 2)
+        self.assertEqual(len(c), 2)
+
+        invalidated = []
+        c.add_invalidation_hook(invalidated.append)
+        c.invalidate('lsb_queueinfo')
+        self.assertEqual(len(c), 1)
+        c.invalidate()
+        self.assertEqual(len(c), 0)
+        self.assertEqual(invalidated, [('lsb_queueinfo',), ()])
+
+    def test_invalidate_in_flight(self):
+        c = cache.MetadataCache()
+
+        def invalidated_during_call():
+            c.invalidate('ls_getclustername')
+            return lslib.ls_getclustername()
+
+        #a result fetched while the cache is invalidated may be stale, so is not kept
+        self.assertEqual(c._call('ls_getclustername', invalidated_during_call),
+                         lslib.ls_getclustername())
+        self.assertEqual(len(c), 0)
+        c.ls_getclustername()
+        self.assertEqual(len(c), 1)
+
+    def test_watch(self):
+        c = cache.MetadataCache()
+        c.ls_getmastername()
+        watcher = c.watch(os.path.join(find_openlava(), "work", "logdir", "lsb.events"), 0.1)
+        self.assertTrue(watcher.is_alive())
+        c.close()
+        self.assertFalse(watcher.is_alive())
+        self.assertEqual(len(c), 1)
+
+    def test_poll(self):
+        lsblib.lsb_init("test")
+        logdir = tempfile.mkdtemp()
+        try:
+            generated = gen_events(os.path.join(logdir, "generated"), "--jobs", "20",
+                                   "--mix", "QUEUE_CTRL=1", "--mix", "HOST_CTRL=1",
+                                   "--only", "QUEUE_CTRL", "--only", "HOST_CTRL")
+            path = os.path.join(logdir, "lsb.events")
+            open(path, "w").close()
+            c = cache.MetadataCache()
+            invalidated = []
+            c.add_invalidation_hook(invalidated.append)
+            watcher = cache.EventWatcher(c, path)
+            shutil.copyfile(generated, path)
+            watcher.poll()
+            watcher._reader.close()
+            self.assertEqual(invalidated.count(('lsb_queueinfo',)), 20)
+            self.assertEqual(invalidated.count(('ls_gethostinfo',)), 20)
+        finally:
+            shutil.rmtree(logdir)
+
+
+class JobTrackerTest(unittest.TestCase):
+    def test_tracker(self):
+        tracker = jobtracker.JobTracker(os.path.join(find_openlava(), "work", "logdir", "lsb.events"))
+        tracker.snapshot()
+        version, jobs = tracker.changed_since(0)
+        self.assertEqual(len(jobs), len(tracker))
+        self.assertEqual(len(tracker), len(lsblib.read_jobs()))
+
+        transitions = []
+        tracker.add_callback(lambda *args: transitions.append(args))
+        s = lsblib.Submit()
+        s.command = "hostname"
+        s.numProcessors = 1
+        job_id = lsblib.lsb_submit(s).jobId
+        deadline = time.time() + 30
+        while tracker.job(job_id) is None and time.time() < deadline:
+            time.sleep(0.5)
+            tracker.poll()
+        self.assertIsNotNone(tracker.job(job_id))
+        self.assertIn(job_id, [t[0] for t in transitions])
+
+        version2, changes = tracker.changed_since(version)
+        self.assertGreater(version2, version)
+        self.assertIn(job_id, changes)
+        tracker.stop()
+
+    def test_array_jobs(self):
+        tracker = jobtracker.JobTracker(os.path.join(find_openlava(), "work", "logdir", "lsb.events"),
+                                        clean_period=0)
+
+        def event(event_type, idx=0, **fields):
+            #the stub's event reader does not decode job names or indices, so events are
+            #applied directly
+            e = dict.fromkeys(jobtracker.EVENT_FIELDS)
+            e.update(type=event_type, eventTime=1400000000, jobId=500, idx=idx, **fields)
+            return e
+
+        transitions = []
+        tracker._apply(event(constants.EVENT_JOB_NEW, jobName=u"sim[1-5:2]", userName=u"irvined",
+                             queue=u"normal"), transitions)
+        elements = [lsblib.create_job_id(500, i) for i in (1, 3, 5)]
+        self.assertEqual(sorted(tracker.jobs), sorted(elements))
+        self.assertEqual([t[0] for t in transitions], elements)
+        self.assertEqual(tracker.job(elements[1])['jName'], u"sim[3]")
+        self.assertIsNone(tracker.job(500))
+
+        #an event for the whole array applies to each element
+        tracker._apply(event(constants.EVENT_JOB_SWITCH, queue=u"short"), transitions)
+        self.assertEqual(set(job['queue'] for job in tracker.jobs.values()), set([u"short"]))
+
+        for i in (1, 3, 5):
+            tracker._apply(event(constants.EVENT_JOB_START, i, jStatus=constants.JOB_STAT_RUN,
+                                 jobPid=i, numExHosts=1, execHosts=[u"comp00"]), transitions)
+            tracker._apply(event(constants.EVENT_JOB_STATUS, i, jStatus=constants.JOB_STAT_DONE,
+                                 cpuTime=1.0, exitStatus=0), transitions)
+        for job in tracker.jobs.values():
+            self.assertEqual(job['status'], constants.JOB_STAT_DONE)
+            self.assertEqual(job['exHosts'], (u"comp00",))
+
+    def test_array_indices(self):
+        self.assertEqual(jobtracker._array_indices(u"sim[1-10:3,12]%2"), (u"sim", [1, 4, 7, 10, 12]))
+        self.assertEqual(jobtracker._array_indices(u"sim[5]"), (u"sim", [5]))
+        self.assertIsNone(jobtracker._array_indices(u"sim"))
+        self.assertIsNone(jobtracker._array_indices(u"sim[a-b]"))
+        self.assertIsNone(jobtracker._array_indices(None))
+
+
+class JobQueryTest(unittest.TestCase):
+    def test_select(self):
+        columns = lsblib.read_jobs()
+        jobs = jobquery.JobSnapshot.from_columns(columns)
+        self.assertEqual(len(jobs), len(columns))
+        for user in jobs.values('user'):
+            expected = [j for j in jobs.jobs if j['user'] == user and j['status'] & constants.JOB_STAT_PEND]
+            found = jobs.select(user=user, status=constants.JOB_STAT_PEND)
+            self.assertEqual([j['jobId'] for j in found], [j['jobId'] for j in expected])
+
+        found = jobs.select(order_by='submitTime', reverse=True, limit=5)
+        self.assertLessEqual(len(found), 5)
+        times = [j['submitTime'] for j in found]
+        self.assertEqual(times, sorted(times, reverse=True))
+
+    def test_select_many_values(self):
+        job = {'jobId': 1, 'user': 'irvined', 'queue': 'normal', 'fromHost': 'master',
+               'exHosts': ['node1', 'node2'], 'jName': 'test', 'status': constants.JOB_STAT_RUN,
+               'submitTime': 1, 'startTime': 2}
+        jobs = jobquery.JobSnapshot([job])
+        self.assertEqual(jobs.select(host=['node1', 'node2']), [job])
+        self.assertEqual(jobs.select(user=['irvined', 'irvined']), [job])
+
+    def test_push_down(self):
+        kwargs = jobquery.push_down({'user': 'irvined', 'queue': 'normal', 'status': constants.JOB_STAT_RUN})
+        self.assertEqual(kwargs, {'user': 'irvined', 'options': constants.RUN_JOB})
+        for job in jobquery.select(user='irvined', status=constants.JOB_STAT_RUN):
+            self.assertEqual(job['user'], 'irvined')
+            self.assertTrue(job['status'] & constants.JOB_STAT_RUN)
+
+
+class InstrumentTest(unittest.TestCase):
+    def tearDown(self):
+        instrument.disable()
+        instrument.registry.reset()
+
+    def test_instrument(self):
+        original = lsblib.lsb_hostinfo
+        records = []
+        instrument.enable()
+        instrument.registry.add_hook(records.append)
+        try:
+            hosts = lsblib.lsb_hostinfo()
+            lslib.ls_getclustername()
+        finally:
+            instrument.registry.remove_hook(records.append)
+            instrument.disable()
+        self.assertIs(lsblib.lsb_hostinfo, original)
+
+        stats = instrument.registry.stats()
+        self.assertEqual(stats['lsb_hostinfo'].calls, 1)
+        self.assertEqual(stats['lsb_hostinfo'].records, len(hosts))
+        self.assertGreater(stats['lsb_hostinfo'].c_seconds, 0)
+        self.assertLessEqual(stats['lsb_hostinfo'].c_seconds, stats['lsb_hostinfo'].seconds)
+        self.assertEqual([r.name for r in records], ['lsb_hostinfo', 'ls_getclustername'])
+
+        path = os.path.join(tempfile.mkdtemp(), "openlava.prom")
+        try:
+            instrument.registry.write_prometheus(path)
+            with open(path) as f:
+                text = f.read()
+            self.assertIn('openlava_calls_total{function="lsb_hostinfo"} 1.0', text)
+        finally:
+            shutil.rmtree(os.path.dirname(path))
+
+        #nothing is recorded once disabled
+        lsblib.lsb_hostinfo()
+        self.assertEqual(instrument.registry.stats()['lsb_hostinfo'].calls, 1)
+
+    def test_errors(self):
+        lsblib.lsb_init("test")
+        instrument.enable()
+        try:
+            self.assertIsNone(lsblib.lsb_hostinfo(["no such host"]))
+            lsblib.lsb_closejobinfo()
+        finally:
+            instrument.disable()
+        stats = instrument.registry.stats()
+        self.assertEqual(sum(stats['lsb_hostinfo'].errors.values()), 1)
+        self.assertEqual(stats['lsb_closejobinfo'].errors, {})
+
+
+class AllocationsTest(unittest.TestCase):
+    def setUp(self):
+        allocations.enable()
+
+    def tearDown(self):
+        allocations.disable()
+        allocations.reset()
+
+    def test_snapshot(self):
+        s = lsblib.Submit()
+        s.command = "hostname"
+        s.askedHosts = ["master"]
+        copy = s.clone(jobName="test")
+        stats = allocations.snapshot()['Submit']
+        self.assertEqual(stats.live, 2)
+        self.assertGreater(stats.bytes, len("hostname") * 2)
+        del s, copy
+        stats = allocations.snapshot()['Submit']
+        self.assertEqual((stats.live, stats.bytes, stats.created, stats.deallocated), (0, 0, 2, 2))
+
+    def test_reset(self):
+        s = lsblib.Submit()
+        allocations.reset()
+        self.assertEqual(allocations.snapshot()['Submit'].live, 1)
+        del s
+        stats = allocations.snapshot()['Submit']
+        self.assertEqual((stats.live, stats.bytes, stats.created, stats.deallocated), (0, 0, 0, 1))
+
+    def test_soak(self):
+        allocations.soak(lsblib.lsb_hostinfo, rounds=2, iterations=10)
+        kept = []
+        self.assertRaises(allocations.LeakError, allocations.soak,
+                          lambda: kept.append(lsblib.Submit()), rounds=2, iterations=10)
+
+
+class PackingTest(unittest.TestCase):
+    def setUp(self):
+        lsblib.lsb_init("test")
+
+    def test_pickle_jobs(self):
+        count = lsblib.lsb_openjobinfo(user="all", options=constants.ALL_JOB)
+        try:
+            jobs = [lsblib.lsb_readjobinfo() for i in range(min(count, 50))]
+        finally:
+            lsblib.lsb_closejobinfo()
+        copies = pickle.loads(pickle.dumps(jobs, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual([j.as_dict() for j in copies], [j.as_dict() for j in jobs])
+
+        #zero words are left out, a stub job is 968 bytes as a plain copy
+        data = lsblib.pack_records(jobs)
+        self.assertLess(len(data), 600 * len(jobs))
+        self.assertRaises(ValueError, lsblib.unpack_records, data[:len(data) // 2])
+        self.assertRaises(ValueError, lsblib.unpack_records, b"not packed records")
+
+    def test_pickle_info(self):
+        for records, key in [(lsblib.lsb_hostinfo(), 'host'), (lsblib.lsb_queueinfo(), 'queue'),
+                             (lsblib.lsb_userinfo(), 'user')]:
+            copies = lsblib.unpack_records(lsblib.pack_records(records))
+            self.assertEqual([getattr(r, key) for r in copies], [getattr(r, key) for r in records])
+            copy = pickle.loads(pickle.dumps(records[0], pickle.HIGHEST_PROTOCOL))
+            self.assertEqual(getattr(copy, key), getattr(records[0], key))
+
+    def test_pickle_events(self):
+        logdir = os.path.join(find_openlava(), "work", "logdir")
+        serializer = lsblib.EventSerializer()
+        for name in ['lsb.events', 'lsb.acct']:
+            for rec in lsblib.EventLogReader(os.path.join(logdir, name)):
+                copy = pickle.loads(pickle.dumps(rec, pickle.HIGHEST_PROTOCOL))
+                self.assertEqual(serializer(copy), serializer(rec))
+                if rec.log is not None:
+                    log = lsblib.unpack_records(lsblib.pack_records([rec.log]))[0]
+                    self.assertIs(type(log), type(rec.log))
+        self.assertRaises(TypeError, lsblib.pack_records, [lsblib.Submit()])
+
+    def test_pickle_loads(self):
+        loads = lslib.ls_load()
+        copies = pickle.loads(pickle.dumps(loads, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual([(h.hostName, list(h.status), list(h.li)) for h in copies],
+                         [(h.hostName, list(h.status), list(h.li)) for h in loads])
+
+
+class CliTest(unittest.TestCase):
+    def run_command(self, command, *args):
+        out = StringIO()
+        self.assertEqual(command(list(args), out=out), 0)
+        return out.getvalue().splitlines()
+
+    def test_batches(self):
+        lsblib.lsb_init("test")
+        batches = list(lsblib.read_job_batches(batch_size=7))
+        self.assertTrue(all(len(b) <= 7 for b in batches))
+        self.assertEqual([j for b in batches for j in b.jobId], list(lsblib.read_jobs().jobId))
+
+    def test_olbjobs(self):
+        count = len(lsblib.read_jobs())
+        table = self.run_command(cli.olbjobs, "-u", "all", "-a", "--batch-size", "3")
+        self.assertEqual(table[0].split(), [c.header for c in cli.select_columns(
+            cli._job_columns(), cli.JOB_DEFAULT)])
+        self.assertEqual(len(table), count + 1)
+
+        rows = [json.loads(line) for line in self.run_command(
+            cli.olbjobs, "-u", "all", "-a", "--format", "json", "-o", "jobid,stat,exec_host")]
+        self.assertEqual(len(rows), count)
+        for row in rows:
+            self.assertEqual(sorted(row), ['exec_host', 'jobid', 'stat'])
+            self.assertIsInstance(row['exec_host'], list)
+
+        rows = list(csv.reader(self.run_command(
+            cli.olbjobs, "-u", "all", "-a", "--format", "csv", "--no-header", "-o", "jobid user")))
+        self.assertEqual(len(rows), count)
+        self.assertTrue(all(len(row) == 2 for row in rows))
+        self.assertRaises(SystemExit, cli.olbjobs, ["-o", "nonsense"], StringIO())
+
+    def test_olbhosts_olbqueues(self):
+        lsblib.lsb_init("test")
+        hosts = self.run_command(cli.olbhosts, "--format", "csv", "-o", "host_name,status")
+        self.assertEqual(hosts[1:], ["{},{}".format(h.host, cli._host_status(h.hStatus))
+                                     for h in lsblib.lsb_hostinfo()])
+        queues = self.run_command(cli.olbqueues, "--format", "json")
+        self.assertEqual([json.loads(q)['queue_name'] for q in queues],
+                         [q.queue for q in lsblib.lsb_queueinfo()])
+
+    def test_errors(self):
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            for command, args in [(cli.olbjobs, ["-q", "no such queue"]),
+                                  (cli.olbhosts, ["no such host"]),
+                                  (cli.olbqueues, ["no such queue"])]:
+                out = StringIO()
+                self.assertEqual(command(args, out=out), 1)
+                self.assertEqual(out.getvalue(), "")
+            messages = sys.stderr.getvalue().splitlines()
+        finally:
+            sys.stderr = stderr
+        self.assertEqual([m.split(":")[0] for m in messages], ["olbjobs", "olbhosts", "olbqueues"])
+
+    def test_formatters(self):
+        self.assertEqual(cli.HostListFormatter()([("a", "a", "b"), ()]), ["2*a:b", "-"])
+        times = cli.TimeFormatter("%H:%M")([0, 3600, 3601])
+        self.assertEqual(times[0], "-")
+        self.assertEqual(times[1], times[2])
+
 
 class LslibTest(unittest.TestCase):
     def test_clustername(self):
@@ -279,6 +1066,58 @@ class LslibTest(unittest.TestCase):
         self.assertIsInstance(ls.numIndx, int)
         self.assertIsInstance(ls.numUsrIndx, int)
 
+    def test_load_matrix(self):
+        hosts = lslib.ls_load()
+        matrix = lslib.ls_load(as_matrix=True)
+        self.assertIsInstance(matrix, lslib.LoadMatrix)
+        self.assertEqual(matrix.nIdx, lslib.ls_info().numIndx)
+        self.assertEqual(len(matrix.indexNames), matrix.nIdx)
+        self.assertEqual(len(matrix.values), len(matrix) * matrix.nIdx)
+        self.assertEqual(sorted(matrix.hostNames), sorted(h.hostName for h in hosts))
+        for h in hosts:
+            self.assertEqual(len(h.li), matrix.nIdx)
+            self.assertEqual(len(matrix.row(h.hostName)), matrix.nIdx)
+        self.assertEqual(len(matrix.column(matrix.indexNames[0])), len(matrix))
+
+        view = memoryview(matrix)
+        self.assertEqual(view.shape, (len(matrix), matrix.nIdx))
+        self.assertEqual(view.format, 'f')
+
+        li = hosts[0].li
+        self.assertIsInstance(li, lslib.FloatArray)
+        view = memoryview(li)
+        self.assertEqual((view.format, view.shape, view.itemsize), ('f', (len(li),), 4))
+        self.assertEqual(view.tobytes(), li.values.tostring())
+        self.assertEqual(list(pickle.loads(pickle.dumps(li))), list(li))
+
+        matrix = lslib.ls_loadinfo(indxnamelist=['r1m', 'mem'], as_matrix=True)
+        self.assertEqual(matrix.indexNames, [u'r1m', u'mem'])
+        self.assertEqual(matrix.columns, {u'r1m': 0, u'mem': 1})
+
+    def test_metadata_indexes(self):
+        ls = lslib.ls_info()
+        self.assertIs(ls.resTable, ls.resTable)
+        self.assertIs(ls.hostTypes, ls.hostTypes)
+        self.assertIsInstance(ls.hostTypes, tuple)
+        #the ResItems are copies, so are not changed by the next call
+        names = [r.name for r in ls.resTable]
+        lslib.ls_info()
+        self.assertEqual([r.name for r in ls.resTable], names)
+        for name, i in ls.resourceIndex.items():
+            self.assertEqual(names.index(name), i)
+        for name, i in ls.hostTypeIndex.items():
+            self.assertEqual(ls.hostTypes.index(name), i)
+        for name, i in ls.hostModelIndex.items():
+            self.assertEqual(ls.hostModels.index(name), i)
+        self.assertEqual(ls.indexNames, tuple(names[:ls.numIndx]))
+        self.assertEqual(ls.indexColumns, lslib.ls_load(as_matrix=True).columns)
+
+        for host in lslib.ls_gethostinfo():
+            self.assertIs(host.resources, host.resources)
+            for resource in host.resources:
+                self.assertTrue(lslib.has_resource(host, resource))
+            self.assertFalse(lslib.has_resource(host, "no_such_resource"))
+
     def test_gethostinfo(self):
         hosts = lslib.ls_gethostinfo()
         hinfo = {}
@@ -340,6 +1179,17 @@ class LslibTest(unittest.TestCase):
 
 suite = unittest.TestSuite()
 suite.addTests(unittest.TestLoader().loadTestsFromTestCase(LsblibTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(EventsTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(JobIndexTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(AccountingTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(AioTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(CacheTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(JobTrackerTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(JobQueryTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(InstrumentTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(AllocationsTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(PackingTest))
+suite.addTests(unittest.TestLoader().loadTestsFromTestCase(CliTest))
 suite.addTests(unittest.TestLoader().loadTestsFromTestCase(LslibTest))
 
 if __name__ == '__main__':
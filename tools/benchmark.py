@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Measures the throughput of the bindings for job listing, host and load polling, event
+parsing and submission.  For each case it reports the records returned by one call, the
+seconds per call, records per second, and the objects owning native memory that one call
+leaves alive, and the bytes they own, as counted by openlava.allocations.  That call is
+made before the timed ones, as counting has a cost of its own.  Objects that point into
+openlava's buffers, or hold only Python objects, own no native memory and are not counted.
+
+It runs against whatever openlava the bindings were built with.  Built against the stub
+libraries in tools/stub, it needs no cluster, and the size of the synthetic cluster and
+the latency of each call are set with the OPENLAVA_STUB_* environment variables described
+in tools/stub/stub.h:
+
+    make -C tools/stub
+    LSF_ENVDIR=$PWD/tools/stub/build/etc python setup.py build_ext --inplace
+    OPENLAVA_STUB_JOBS=100000 python tools/benchmark.py --json before.json
+    ...
+    OPENLAVA_STUB_JOBS=100000 python tools/benchmark.py --compare before.json
+
+Submission is only measured against the stub, or when --submit is given, as it submits
+real jobs.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+from openlava import allocations, constants, lsblib, lslib
+from openlava.utils import find_openlava
+
+
+def live_allocations():
+    """Objects owning native memory that are alive, and the bytes they own"""
+    stats = allocations.snapshot().values()
+    return sum(s.live for s in stats), sum(s.bytes for s in stats)
+
+
+#each case returns the objects it read, which are held while allocations are counted
+
+def read_all_jobs(view=False):
+    count = lsblib.lsb_openjobinfo(user="all", options=constants.ALL_JOB)
+    try:
+        return [lsblib.lsb_readjobinfo(view=view) for i in range(count)]
+    finally:
+        lsblib.lsb_closejobinfo()
+
+
+def read_jobs_columns():
+    return lsblib.read_jobs(options=constants.ALL_JOB)
+
+
+def host_info():
+    return lsblib.lsb_hostinfo()
+
+
+def load():
+    return lslib.ls_load()
+
+
+def load_matrix():
+    return lslib.ls_load(as_matrix=True)
+
+
+def event_records(path):
+    records = []
+    line_number = 0
+    with open(path) as f:
+        while True:
+            rec = lsblib.lsb_geteventrec(f, line_number)
+            if rec is None:
+                break
+            #the binding does not return the line number liblsbatch advances, each record is a line
+            line_number += 1
+            records.append(rec.jobId)
+    return records
+
+
+def event_reader(path):
+    return [rec.jobId for rec in lsblib.EventLogReader(path)]
+
+
+def submit(count):
+    replies = []
+    for i in range(count):
+        s = lsblib.Submit()
+        s.command = "true"
+        s.numProcessors = 1
+        replies.append(lsblib.lsb_submit(s))
+    return replies
+
+
+def cases(args):
+    """(name, function) for each benchmark to run"""
+    result = [
+        ("lsb_readjobinfo", read_all_jobs),
+        ("lsb_readjobinfo(view=True)", lambda: read_all_jobs(view=True)),
+        ("read_jobs", read_jobs_columns),
+        ("lsb_hostinfo", host_info),
+        ("ls_load", load),
+        ("ls_load(as_matrix=True)", load_matrix),
+    ]
+    if os.path.exists(args.events):
+        result.append(("lsb_geteventrec", lambda: event_records(args.events)))
+        result.append(("EventLogReader", lambda: event_reader(args.events)))
+    else:
+        print >>sys.stderr, "Skipping event parsing, {} does not exist".format(args.events)
+    if args.submit:
+        result.append(("lsb_submit", lambda: submit(args.submit)))
+    if args.only:
+        result = [(name, func) for name, func in result if any(o in name for o in args.only)]
+    return result
+
+
+def allocated(func):
+    """Objects owning native memory left alive by one call of func, and the bytes they own"""
+    was_enabled = allocations.enabled()
+    allocations.enable()
+    try:
+        gc.collect()
+        objects, owned = live_allocations()
+        result = func()
+        after_objects, after_owned = live_allocations()
+        del result
+    finally:
+        if not was_enabled:
+            allocations.disable()
+    return after_objects - objects, after_owned - owned
+
+
+def run(name, func, repeat, min_time):
+    """Best of repeat measurements, each calling func until min_time has passed"""
+    best = None
+    records = 0
+    objects, owned = allocated(func)
+    for i in range(repeat):
+        gc.collect()
+        calls = 0
+        start = time.time()
+        while True:
+            result = func()
+            records = len(result)
+            del result
+            calls += 1
+            elapsed = time.time() - start
+            if elapsed >= min_time:
+                break
+        if best is None or elapsed / calls < best:
+            best = elapsed / calls
+    return {
+        'name': name,
+        'records': records,
+        'seconds': best,
+        'rate': records / best if best > 0 else 0.0,
+        'objects': objects,
+        'bytes': owned,
+    }
+
+
+def main():
+    default_events = None
+    try:
+        default_events = os.path.join(find_openlava(), "work", "logdir", "lsb.events")
+    except Exception:
+        default_events = "lsb.events"
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--repeat", type=int, default=3, help="Measurements of each case, the fastest is reported")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds to keep calling each case for in a measurement")
+    parser.add_argument("--events", default=default_events, help="Event log to parse")
+    parser.add_argument("--submit", type=int, default=None, help="Number of jobs to submit")
+    parser.add_argument("--only", action="append", help="Run only cases whose name contains this")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Show the change from results written earlier with --json")
+    args = parser.parse_args()
+
+    lsblib.lsb_init("benchmark")
+    cluster = lslib.ls_getclustername()
+    if args.submit is None:
+        args.submit = 1000 if cluster == "stub" else 0
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = dict((r['name'], r) for r in json.load(f)['results'])
+
+    print "Cluster: {}".format(cluster)
+    print "{:<28} {:>9} {:>10} {:>12} {:>9} {:>12}{}".format(
+        "case", "records", "seconds", "records/s", "objects", "bytes", "  change" if previous else "")
+    results = []
+    for name, func in cases(args):
+        r = run(name, func, args.repeat, args.min_time)
+        results.append(r)
+        change = ""
+        if name in previous and previous[name]['rate'] > 0:
+            change = "  {:+.1f}%".format(100.0 * (r['rate'] / previous[name]['rate'] - 1))
+        print "{name:<28} {records:>9} {seconds:>10.6f} {rate:>12.0f} {objects:>9} {bytes:>12}".format(**r) + change
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'cluster': cluster, 'time': time.time(), 'results': results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Generates openlava/event_fields.pxi, the per-field accessors used by
+lsblib.EventSerializer, from the event log structs declared in lsstructs.pxd.
+
+Run it again whenever the eventLog union or any of its structs change:
+
+    python tools/gen_event_fields.py
+"""
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STRUCTS = os.path.join(ROOT, "openlava", "lsstructs.pxd")
+OUTPUT = os.path.join(ROOT, "openlava", "event_fields.pxi")
+
+NUMERIC_TYPES = ('int', 'time_t', 'LS_LONG_INT', 'float', 'double')
+
+#structs embedded in the event logs, returned as dicts
+NESTED = ('lsfRusage', 'xFile')
+
+#char ** members and the int member holding their length
+COUNT_FIELDS = {
+    'askedHosts': ('numAskedHosts',),
+    'execHosts': ('numExHosts', 'numExecHosts'),
+    'name': ('nIdx',),
+}
+
+STRUCT_RE = re.compile(r"^\s*extern\s+(struct|union)\s+(\w+)\s*:")
+FIELD_RE = re.compile(r"^\s*(\w+)\s*(\**)\s*(\w+)\s*((?:\[\w+\])*)\s*(?:#.*)?$")
+
+HEADER = """\
+# Generated by tools/gen_event_fields.py from lsstructs.pxd, do not edit.
+#
+# For each struct in the eventLog union there is a tuple of its field names, and a
+# function returning the value of a field by its position in that tuple.  Structs
+# embedded in the logs are returned as dicts.  Included into lsblib.pyx and used by
+# EventSerializer.
+
+"""
+
+
+def parse(path):
+    """Return a dict of struct or union name -> list of (type, pointers, name, dimensions)"""
+    structs = {}
+    current = None
+    with open(path) as fh:
+        for line in fh:
+            m = STRUCT_RE.match(line)
+            if m:
+                name = m.group(2)
+                #loadIndexLog is declared twice, keep the first
+                current = [] if name not in structs else None
+                if current is not None:
+                    structs[name] = current
+                continue
+            if current is None:
+                continue
+            if line.strip() == "" or line.strip().startswith("#"):
+                continue
+            if not line.startswith("        "):
+                current = None
+                continue
+            m = FIELD_RE.match(line)
+            if m is None:
+                raise ValueError("Cannot parse field: {}".format(line.rstrip()))
+            current.append(m.groups())
+    return structs
+
+
+def accessor(struct, fields, field):
+    ctype, pointers, name, dimensions = field
+    if dimensions.count("[") > 1:
+        raise ValueError("Unsupported array for {}.{}: {}".format(struct, name, dimensions))
+    length = dimensions.strip("[]")
+    value = "d.{}".format(name)
+    if ctype == 'char' and (pointers == '*' or (pointers == '' and length)):
+        return "_field_string({})".format(value)
+    if ctype == 'char' and pointers == '**':
+        names = [f[2] for f in fields]
+        count = [c for c in COUNT_FIELDS.get(name, ()) if c in names]
+        if not count:
+            raise ValueError("No length for {}.{}".format(struct, name))
+        return "_field_strings({}, d.{})".format(value, count[0])
+    if ctype == 'xFile' and pointers == '*':
+        return "_field_xfiles({}, d.nxf)".format(value)
+    if ctype == 'lsfRusage' and pointers == '':
+        return "_lsfRusage_dict(&{})".format(value)
+    if ctype == 'int' and pointers == '' and length:
+        return "_field_ints({}, {})".format(value, length)
+    if ctype in NUMERIC_TYPES and pointers == '' and not length:
+        return value
+    raise ValueError("Unsupported type for {}.{}: {}".format(struct, name, field))
+
+
+def generate(structs):
+    members = structs['eventLog']
+    out = [HEADER]
+
+    for struct in NESTED:
+        fields = structs[struct]
+        out.append("cdef dict _{0}_dict({0} * d):\n".format(struct))
+        out.append("    return {\n")
+        for field in fields:
+            out.append("        '{}': {},\n".format(field[2], accessor(struct, fields, field)))
+        out.append("    }\n\n\n")
+
+    for struct, pointers, member, length in members:
+        fields = structs[struct]
+        out.append("_{}_FIELDS = (\n".format(member.upper()))
+        for field in fields:
+            out.append("    '{}',\n".format(field[2]))
+        out.append(")\n\n")
+        out.append("cdef object _{}_field({} * d, int i):\n".format(member, struct))
+        for i, field in enumerate(fields):
+            out.append("    {} i == {}:\n".format("if" if i == 0 else "elif", i))
+            out.append("        return {}\n".format(accessor(struct, fields, field)))
+        out.append("    return None\n\n\n")
+
+    out.append("#members of the eventLog union, in declaration order\n")
+    out.append("LOG_MEMBERS = (\n")
+    for struct, pointers, member, length in members:
+        out.append("    '{}',\n".format(member))
+    out.append(")\n\n")
+
+    out.append("#field names of each member of the eventLog union\n")
+    out.append("LOG_FIELDS = {\n")
+    for struct, pointers, member, length in members:
+        out.append("    '{0}': _{1}_FIELDS,\n".format(member, member.upper()))
+    out.append("}\n\n")
+
+    out.append("cdef object _log_field(int member, eventLog * el, int i):\n")
+    out.append("    \"\"\"Return field i of the member of the union at position member in LOG_MEMBERS\"\"\"\n")
+    for i, (struct, pointers, member, length) in enumerate(members):
+        out.append("    {} member == {}:\n".format("if" if i == 0 else "elif", i))
+        out.append("        return _{0}_field(&el.{0}, i)\n".format(member))
+    out.append("    return None\n")
+    return "".join(out)
+
+
+def main():
+    source = generate(parse(STRUCTS))
+    with open(OUTPUT, "w") as fh:
+        fh.write(source)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,482 @@
+#!/usr/bin/env python
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Writes a synthetic lsb.events and lsb.acct, as logged by an openlava 3.1 mbatchd running
+a made up workload.  Jobs arrive at random, pend, run and finish, logging JOB_NEW,
+JOB_START, JOB_START_ACCEPT, JOB_EXECUTE, JOB_STATUS and JOB_CLEAN to lsb.events and
+JOB_FINISH to lsb.acct.  The other record types are logged for a fraction of the jobs,
+set with --mix, and the log is switched every --switch-every records as mbatchd would.
+
+Users, queues, processor counts, run times and resource usage are drawn from skewed
+distributions, so a few users and the default queue account for most of the jobs, most
+jobs are serial and short, and a few run for days.  The output only depends on the
+options, including --seed, and memory use only depends on the number of jobs running at
+once, so millions of jobs can be written:
+
+    python tools/gen_events.py --jobs 1000000 /tmp/logdir/lsb.events
+    python tools/gen_events.py --jobs 1000 --mix JOB_SIGNAL=0.5 --only JOB_SIGNAL lsb.events
+
+Host, user and queue names are those of the stub cluster in tools/stub, so the files can
+be read back with the stub libraries, eg with tools/benchmark.py --events.
+"""
+import argparse
+import bisect
+import collections
+import heapq
+import math
+import os
+import random
+import sys
+
+EVENT_VERSION = "3.1"
+
+#job states, as in lsbatch.h
+JOB_STAT_PEND = 0x01
+JOB_STAT_RUN = 0x04
+JOB_STAT_EXIT = 0x20
+JOB_STAT_DONE = 0x40
+JOB_STAT_PDONE = 0x80
+JOB_STAT_PERR = 0x100
+
+LSF_RLIM_NLIMITS = 11
+DEFAULT_RLIMIT = -1
+LOAD_INDICES = ["r15s", "r1m", "r15m", "ut", "pg", "io", "ls", "it", "tmp", "swp", "mem"]
+
+#fraction of jobs, or of running jobs, each optional record is logged for
+DEFAULT_MIX = collections.OrderedDict([
+    ("JOB_MODIFY2", 0.01),
+    ("JOB_SWITCH", 0.005),
+    ("JOB_MOVE", 0.002),
+    ("UNFULFILL", 0.005),
+    ("PRE_EXEC_START", 0.02),
+    ("SBD_JOB_STATUS", 0.01),
+    ("JOB_SIGNAL", 0.02),
+    ("JOB_SIGACT", 0.005),
+    ("CHKPNT", 0.001),
+    ("MIG", 0.001),
+    ("JOB_MSG", 0.001),
+    ("JOB_MSG_ACK", 0.001),
+    ("JOB_REQUEUE", 0.002),
+    ("JOB_FORCE", 0.001),
+    ("JOB_ATTR_SET", 0.001),
+    ("HOST_CTRL", 0.001),
+    ("QUEUE_CTRL", 0.0005),
+    ("MBD_DIE", 0.00002),
+])
+
+EVENT_TYPES = ["JOB_NEW", "JOB_START", "JOB_STATUS", "JOB_SWITCH", "JOB_MOVE", "QUEUE_CTRL",
+               "HOST_CTRL", "MBD_DIE", "UNFULFILL", "JOB_FINISH", "LOAD_INDEX", "CHKPNT", "MIG",
+               "PRE_EXEC_START", "MBD_START", "JOB_SIGNAL", "JOB_EXECUTE", "JOB_MSG",
+               "JOB_MSG_ACK", "JOB_REQUEUE", "JOB_SIGACT", "SBD_JOB_STATUS",
+               "JOB_START_ACCEPT", "JOB_CLEAN", "JOB_FORCE", "LOG_SWITCH", "JOB_MODIFY2",
+               "JOB_ATTR_SET"]
+
+COMMANDS = ["./run.sh", "make -j{procs} all", "python analyse.py --part {n}",
+            "sleep {runtime}", "mpirun -np {procs} ./solver input{n}.dat",
+            "blastn -query q{n}.fa -db nt", "Rscript model.R {n}"]
+
+
+def q(value):
+    """A string field, quoted as openlava quotes them"""
+    return '"' + value.replace('"', '""') + '"'
+
+
+class Job(object):
+    __slots__ = ('id', 'idx', 'user', 'uid', 'queue', 'from_host', 'procs', 'ex_hosts',
+                 'submit_time', 'begin_time', 'start_time', 'end_time', 'pid', 'name',
+                 'command', 'cwd', 'res_req', 'project', 'exit_status', 'status')
+
+
+class Generator(object):
+    """
+    Generator(args)
+
+    Simulates the workload described by the parsed command line arguments, and writes
+    each record to the events or accounting file as it is logged.
+    """
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.now = args.start_time
+        self.next_job_id = args.first_job_id
+        self.pending = []
+        self.sequence = 0
+        self.running = {}
+        self.counts = collections.Counter()
+        self.event_records = 0
+        self.switching = False
+        self.only = set(args.only) if args.only else None
+        self.mix = dict(DEFAULT_MIX)
+        self.mix.update(args.mix)
+
+        self.hosts = ["host%04d" % i for i in range(args.hosts)]
+        self.users = ["user%02d" % i for i in range(args.users)]
+        self.queues = ["normal"] + ["queue%d" % i for i in range(1, args.queues)]
+        #a few users submit most of the jobs, and most jobs go to the default queue
+        self.user_weights = self._cumulative([1.0 / (i + 1) for i in range(args.users)])
+        self.queue_weights = self._cumulative([4.0] + [1.0 / i for i in range(1, args.queues)])
+        self.procs_weights = self._cumulative([70, 10, 8, 6, 4, 2])
+
+        self.events = open(args.events, "w")
+        self.acct = open(args.acct, "w")
+
+    @staticmethod
+    def _cumulative(weights):
+        total = 0.0
+        result = []
+        for w in weights:
+            total += w
+            result.append(total)
+        return result
+
+    def _pick(self, cumulative):
+        return bisect.bisect(cumulative, self.random.random() * cumulative[-1])
+
+    def _chance(self, event_type):
+        return self.random.random() < self.mix.get(event_type, 0.0)
+
+    def _schedule(self, when, action, *args):
+        #the sequence number keeps records logged at the same time in order
+        self.sequence += 1
+        heapq.heappush(self.pending, (when, self.sequence, action, args))
+
+    # Writing records
+
+    def log(self, event_type, fields, acct=False):
+        self.counts[event_type] += 1
+        if self.only is not None and event_type not in self.only:
+            return
+        line = '%s "%s" %d %s\n' % (q(event_type), self.args.version, self.now,
+                                     " ".join(str(f) for f in fields))
+        if acct:
+            self.acct.write(line)
+            return
+        self.events.write(line)
+        self.event_records += 1
+        if (self.args.switch_every and self.event_records >= self.args.switch_every
+                and not self.switching):
+            self.switch()
+
+    def switch(self):
+        """Move lsb.events to lsb.events.1, and so on, and start a new file"""
+        self.events.close()
+        path = self.args.events
+        n = 1
+        while os.path.exists("%s.%d" % (path, n)):
+            n += 1
+        for i in range(n - 1, 0, -1):
+            os.rename("%s.%d" % (path, i), "%s.%d" % (path, i + 1))
+        os.rename(path, path + ".1")
+        self.events = open(path, "w")
+        self.event_records = 0
+        self.switching = True
+        self.log("LOG_SWITCH", [self.next_job_id - 1])
+        #like mbatchd, the jobs that have not finished are logged again, so each file
+        #stands on its own
+        logged = set()
+        for job in sorted(self.running.values(), key=lambda j: (j.id, j.idx)):
+            if job.id not in logged:
+                self.log_job_new(job)
+                logged.add(job.id)
+            if job.start_time:
+                self.log_job_start(job, "JOB_START")
+        self.switching = False
+
+    def rusage(self, job, run_time):
+        r = self.random
+        utime = run_time * job.procs * r.uniform(0.3, 0.98)
+        maxrss = int(r.lognormvariate(11, 1.5))
+        fields = [utime, utime * r.uniform(0.01, 0.1), maxrss, 0, 0, 0, 0,
+                  int(maxrss / 4 * r.random()), r.randint(0, 50), 0,
+                  r.randint(0, 100000), r.randint(0, 100000), 0, 0, 0,
+                  r.randint(0, 5), r.randint(0, 10000), r.randint(0, 5000), -1]
+        return ["%f" % v for v in fields]
+
+    def log_job_new(self, job):
+        r = self.random
+        rlimits = [DEFAULT_RLIMIT] * LSF_RLIM_NLIMITS
+        if r.random() < 0.2:
+            #a run limit
+            rlimits[2] = r.choice([3600, 14400, 86400])
+        self.log("JOB_NEW", [
+            job.id, job.uid, 0, job.procs, job.submit_time, job.begin_time, 0, 0, 0, 0,
+            q(job.user)] + rlimits + [
+            q(""), "%.2f" % 1.0, 18, q(job.queue), q(job.res_req), q(job.from_host),
+            q(job.cwd), q(""), q("/dev/null"), q("%s/%s.out" % (job.cwd, job.id)), q(""),
+            q(""), q(""), q(""), q("/home/" + job.user), q("%d.%d" % (job.submit_time, job.id)),
+            0, q(""), q(""), q(job.name), q(job.command), 0, q(""), q(job.project), 0,
+            job.procs, q(""), q(""), job.idx, -1])
+
+    def log_job_start(self, job, event_type):
+        self.log(event_type, [job.id, JOB_STAT_RUN, job.pid, job.pid, "%.2f" % 1.0,
+                              len(job.ex_hosts)] + [q(h) for h in job.ex_hosts] +
+                 [q(""), q(""), 0, job.idx])
+
+    def log_job_status(self, job, status, **kwargs):
+        fields = [job.id, status, kwargs.get('reason', 0), 0]
+        if 'rusage' in kwargs:
+            fields += ["%f" % kwargs['cpu_time'], self.now, 1] + kwargs['rusage']
+        else:
+            fields += ["%f" % 0.0, 0, 0]
+        fields += [0, kwargs.get('exit_status', 0), job.idx]
+        self.log("JOB_STATUS", fields)
+
+    def log_job_finish(self, job, rusage, cpu_time):
+        self.log("JOB_FINISH", [
+            job.id, job.uid, 0, job.procs, job.submit_time, job.begin_time, 0,
+            job.start_time, q(job.user), q(job.queue), q(job.res_req), q(""), q(""),
+            q(job.from_host), q(job.cwd), q("/dev/null"), q("%s/%s.out" % (job.cwd, job.id)),
+            q(""), q("%d.%d" % (job.submit_time, job.id)), 0, len(job.ex_hosts)] +
+            [q(h) for h in job.ex_hosts] + [
+            job.status, "%.2f" % 1.0, q(job.name), q(job.command)] + rusage + [
+            q(""), q(job.project), job.exit_status, job.procs, q(""), job.idx,
+            self.random.randint(1000, 4000000), self.random.randint(1000, 1000000)],
+            acct=True)
+
+    def log_cluster_start(self):
+        self.log("MBD_START", [q(self.hosts[0]), q("stub"), len(self.hosts), len(self.queues)])
+        self.log("LOAD_INDEX", [len(LOAD_INDICES)] + [q(n) for n in LOAD_INDICES])
+
+    # The workload
+
+    def new_jobs(self):
+        """Submit the next job, or array of jobs"""
+        r = self.random
+        args = self.args
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        user = self._pick(self.user_weights)
+        size = 0
+        if r.random() < args.array_fraction:
+            size = r.randint(2, args.max_array_size)
+        procs = [1, 2, 4, 8, 16, 32][self._pick(self.procs_weights)]
+        n = r.randint(1, 10000)
+        runtime = int(r.lognormvariate(math.log(args.mean_run_time), 1.5))
+        template = Job()
+        template.id = job_id
+        template.idx = 0
+        template.user = self.users[user]
+        template.uid = 1000 + user
+        template.queue = self.queues[self._pick(self.queue_weights)]
+        template.from_host = self.hosts[r.randrange(len(self.hosts))]
+        template.procs = procs
+        template.submit_time = self.now
+        template.begin_time = 0
+        template.start_time = 0
+        template.name = "job%d" % n
+        if size:
+            template.name += "[1-%d]" % size
+        template.command = r.choice(COMMANDS).format(procs=procs, n=n, runtime=runtime)
+        template.cwd = "/home/%s/work/p%d" % (template.user, n % 20)
+        template.res_req = "rusage[mem=%d]" % (256 << r.randint(0, 6)) if r.random() < 0.4 else ""
+        template.project = "default" if r.random() < 0.7 else "proj%d" % (user % 5)
+        self.log_job_new(template)
+
+        for idx in range(1, size + 1) if size else [0]:
+            job = Job()
+            for name in Job.__slots__:
+                if hasattr(template, name):
+                    setattr(job, name, getattr(template, name))
+            job.idx = idx
+            job.status = JOB_STAT_PEND
+            self.running[(job.id, idx)] = job
+            pend = r.expovariate(1.0 / args.mean_pend_time)
+            self._schedule(self.now + pend, self.pending_job, job)
+
+    def pending_job(self, job):
+        """Things that happen to a pending job, before it starts"""
+        r = self.random
+        if self._chance("JOB_MODIFY2"):
+            fields = [q(str(job.id) if not job.idx else "%d[%d]" % (job.id, job.idx)),
+                      0, 0, 0, 0, job.uid, q(job.user), job.submit_time, 18, job.procs,
+                      job.begin_time, 0, 0, 0, q(""), q(job.queue), 0, q("rusage[mem=1024]")]
+            fields += [DEFAULT_RLIMIT] * LSF_RLIM_NLIMITS
+            fields += [q("")] * 9 + [0, q(""), 0] + [q("")] * 6 + [0, job.procs, q(""), q(""), -1]
+            self.log("JOB_MODIFY2", fields)
+        if self._chance("JOB_SWITCH"):
+            job.queue = r.choice(self.queues)
+            self.log("JOB_SWITCH", [job.uid, job.id, q(job.queue), job.idx, q(job.user)])
+        if self._chance("JOB_MOVE"):
+            self.log("JOB_MOVE", [job.uid, job.id, r.randint(1, 10), r.choice([1, 2]), job.idx,
+                                  q(job.user)])
+        if self._chance("UNFULFILL"):
+            self.log("UNFULFILL", [job.id, 0, 0, 0, 0, 0, 0, job.idx])
+        self.start_job(job)
+
+    def start_job(self, job):
+        r = self.random
+        job.start_time = self.now
+        job.pid = r.randint(1000, 4000000)
+        first = r.randrange(len(self.hosts))
+        job.ex_hosts = [self.hosts[(first + i // 8) % len(self.hosts)] for i in range(job.procs)]
+        job.status = JOB_STAT_RUN
+        if self._chance("PRE_EXEC_START"):
+            self.log_job_start(job, "PRE_EXEC_START")
+        self.log_job_start(job, "JOB_START")
+        if self._chance("JOB_FORCE"):
+            self.log("JOB_FORCE", [0, len(job.ex_hosts)] + [q(h) for h in job.ex_hosts] +
+                     [job.id, job.idx, 0, q("openlava")])
+        runtime = max(1, int(r.lognormvariate(math.log(self.args.mean_run_time), 1.5)))
+        self._schedule(self.now + r.uniform(0.1, 2), self.accepted_job, job, runtime)
+
+    def accepted_job(self, job, runtime):
+        self.log("JOB_START_ACCEPT", [job.id, job.pid, job.pid, job.idx])
+        self.log("JOB_EXECUTE", [job.id, job.uid, job.pid, q(job.cwd), q("/home/" + job.user),
+                                 q(job.user), job.pid, job.idx])
+        self.log_job_status(job, JOB_STAT_RUN)
+        if self._chance("JOB_ATTR_SET"):
+            self.log("JOB_ATTR_SET", [job.id, job.idx, job.uid, self.random.randint(1024, 65535),
+                                      q(job.ex_hosts[0])])
+        self._schedule(self.now + runtime * self.random.random(), self.running_job, job)
+        self._schedule(self.now + runtime, self.finish_job, job, False)
+
+    def running_job(self, job):
+        """Things that happen to a running job, part way through"""
+        r = self.random
+        if job.status != JOB_STAT_RUN:
+            return
+        if self._chance("SBD_JOB_STATUS"):
+            self.log("SBD_JOB_STATUS", [job.id, JOB_STAT_RUN, 0, 0, 0, 0, 0, 0, 0, 0, 0, job.idx])
+        if self._chance("CHKPNT"):
+            self.log("CHKPNT", [job.id, 3600, job.pid, 1, 0, job.idx])
+        if self._chance("MIG"):
+            self.log("MIG", [job.id, 1, q(r.choice(self.hosts)), job.uid, job.idx, q(job.user)])
+        if self._chance("JOB_MSG"):
+            fields = [job.uid, job.id, 0, 0, q(job.from_host), q(job.ex_hosts[0]),
+                      q("checkpoint requested"), job.idx]
+            self.log("JOB_MSG", fields)
+            if self._chance("JOB_MSG_ACK"):
+                self.log("JOB_MSG_ACK", fields)
+        if self._chance("JOB_SIGACT"):
+            self.log("JOB_SIGACT", [job.id, 0, job.pid, JOB_STAT_RUN, 0, 0, q("SIGSTOP"), 1,
+                                    job.idx])
+        if self._chance("JOB_SIGNAL"):
+            self.log("JOB_SIGNAL", [job.uid, job.id, q("KILL"), 1, job.idx, q(job.user)])
+            self.finish_job(job, True)
+        elif self._chance("JOB_REQUEUE"):
+            self.log("JOB_REQUEUE", [job.id, job.idx])
+            job.status = JOB_STAT_PEND
+            self._schedule(self.now + r.expovariate(1.0 / self.args.mean_pend_time),
+                           self.start_job, job)
+
+    def finish_job(self, job, killed):
+        r = self.random
+        if job.status != JOB_STAT_RUN or (job.id, job.idx) not in self.running:
+            #killed or requeued earlier
+            return
+        run_time = max(1, self.now - job.start_time)
+        if killed:
+            job.status, job.exit_status = JOB_STAT_EXIT, 130
+        elif r.random() < self.args.exit_fraction:
+            job.status, job.exit_status = JOB_STAT_EXIT, r.choice([1, 1, 2, 127, 137])
+        else:
+            job.status, job.exit_status = JOB_STAT_DONE, 0
+        rusage = self.rusage(job, run_time)
+        cpu_time = float(rusage[0]) + float(rusage[1])
+        self.log_job_status(job, job.status, rusage=rusage, cpu_time=cpu_time,
+                            exit_status=job.exit_status << 8)
+        self.log_job_status(job, job.status | JOB_STAT_PDONE, rusage=rusage, cpu_time=cpu_time,
+                            exit_status=job.exit_status << 8)
+        self.log_job_finish(job, rusage, cpu_time)
+        del self.running[(job.id, job.idx)]
+        #finished jobs are cleaned from mbatchd's memory after CLEAN_PERIOD
+        self._schedule(self.now + 3600, self.clean_job, job)
+
+    def clean_job(self, job):
+        self.log("JOB_CLEAN", [job.id, job.idx])
+
+    def cluster_events(self):
+        r = self.random
+        if self._chance("HOST_CTRL"):
+            self.log("HOST_CTRL", [r.choice([1, 2]), q(r.choice(self.hosts)), 0, q("openlava")])
+        if self._chance("QUEUE_CTRL"):
+            self.log("QUEUE_CTRL", [r.choice([1, 2, 3, 4]), q(r.choice(self.queues)), 0,
+                                    q("openlava")])
+        if self._chance("MBD_DIE"):
+            self.log("MBD_DIE", [q(self.hosts[0]), 0, 0])
+            self.log_cluster_start()
+
+    def run(self):
+        r = self.random
+        self.log_cluster_start()
+        next_arrival = self.now
+        submitted = 0
+        while submitted < self.args.jobs or self.pending:
+            if submitted < self.args.jobs and (not self.pending or self.pending[0][0] >= next_arrival):
+                self.now = int(next_arrival)
+                self.new_jobs()
+                self.cluster_events()
+                submitted += 1
+                next_arrival += r.expovariate(self.args.rate)
+            else:
+                when, seq, action, args = heapq.heappop(self.pending)
+                self.now = int(when)
+                action(*args)
+        self.events.close()
+        self.acct.close()
+
+
+def mix_entry(text):
+    name, sep, value = text.partition("=")
+    if not sep or name not in DEFAULT_MIX:
+        raise argparse.ArgumentTypeError(
+            "expected TYPE=FRACTION with TYPE one of {}".format(", ".join(DEFAULT_MIX)))
+    return name, float(value)
+
+
+def event_type(text):
+    if text not in EVENT_TYPES:
+        raise argparse.ArgumentTypeError("unknown event type {}".format(text))
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("events", help="Path of the lsb.events file to write")
+    parser.add_argument("--acct", help="Path of the lsb.acct file to write, by default lsb.acct next to the events file")
+    parser.add_argument("--jobs", type=int, default=10000, help="Number of jobs, or job arrays, to submit")
+    parser.add_argument("--rate", type=float, default=1.0, help="Jobs submitted per second of simulated time")
+    parser.add_argument("--mean-pend-time", type=float, default=60.0, help="Mean seconds a job pends for")
+    parser.add_argument("--mean-run-time", type=float, default=600.0, help="Median seconds a job runs for")
+    parser.add_argument("--exit-fraction", type=float, default=0.05, help="Fraction of jobs that exit with an error")
+    parser.add_argument("--array-fraction", type=float, default=0.02, help="Fraction of submissions that are job arrays")
+    parser.add_argument("--max-array-size", type=int, default=50, help="Largest number of elements in a job array")
+    parser.add_argument("--mix", type=mix_entry, action="append", default=[],
+                        help="Fraction of jobs to log an optional record type for, eg JOB_SIGNAL=0.1")
+    parser.add_argument("--only", type=event_type, action="append",
+                        help="Only write records of this type, the workload is unchanged")
+    parser.add_argument("--switch-every", type=int, default=0, help="Switch lsb.events after this many records")
+    parser.add_argument("--hosts", type=int, default=100)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--queues", type=int, default=4)
+    parser.add_argument("--first-job-id", type=int, default=101)
+    parser.add_argument("--start-time", type=int, default=1400000000, help="Epoch time of the first record")
+    parser.add_argument("--version", default=EVENT_VERSION, help="Version written in each record")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if args.acct is None:
+        args.acct = os.path.join(os.path.dirname(args.events), "lsb.acct")
+
+    generator = Generator(args)
+    generator.run()
+    for name, count in sorted(generator.counts.items(), key=lambda c: -c[1]):
+        sys.stderr.write("{:<17} {:>10}\n".format(name, count))
+
+
+if __name__ == "__main__":
+    main()
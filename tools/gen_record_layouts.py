@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Generates openlava/record_layouts.pxi, the functions that pack the structs behind the
+lsblib record classes and relocate them again, from the structs declared in
+lsstructs.pxd.
+
+Run it again whenever any of the structs change:
+
+    python tools/gen_record_layouts.py
+"""
+import os
+import sys
+
+from gen_event_fields import ROOT, STRUCTS, parse
+
+OUTPUT = os.path.join(ROOT, "openlava", "record_layouts.pxi")
+
+#structs of the record classes, other than the members of the eventLog union
+RECORDS = ('jobInfoEnt', 'hostInfoEnt', 'queueInfoEnt', 'userInfoEnt')
+
+#pointer members and the int member holding the number of elements
+COUNT_FIELDS = {
+    'askedHosts': ('numAskedHosts',),
+    'execHosts': ('numExHosts', 'numExecHosts'),
+    'exHosts': ('numExHosts',),
+    'hostNames': ('numHosts',),
+    'jobIds': ('numJobs',),
+    'name': ('nIdx',),
+    'reasonTb': ('numReasons',),
+    'loadSched': ('nIdx',),
+    'loadStop': ('nIdx',),
+    'busySched': ('nIdx',),
+    'busyStop': ('nIdx',),
+    'load': ('nIdx',),
+    'realLoad': ('nIdx',),
+    'pidInfo': ('npids',),
+    'pgid': ('npgids',),
+    'xf': ('nxf',),
+}
+
+#types of the elements of arrays that are copied as they are
+ARRAY_TYPES = ('int', 'float', 'LS_LONG_INT', 'pidInfo', 'xFile')
+
+HEADER = """\
+# Generated by tools/gen_record_layouts.py from lsstructs.pxd, do not edit.
+#
+# For each struct behind a record class there is a function that packs what its pointers
+# point to, once the struct itself has been copied into the _Packer at offset at, and a
+# function that turns the offsets in an unpacked copy back into pointers.  Included into
+# lsblib.pyx after packing.pxi and event_fields.pxi, and used by pack_records() and
+# unpack_records().
+
+"""
+
+
+def class_name(struct):
+    return struct[0].upper() + struct[1:]
+
+
+def count(struct, fields, name):
+    names = [f[2] for f in fields]
+    found = [c for c in COUNT_FIELDS.get(name, ()) if c in names]
+    if not found:
+        raise ValueError("No length for {}.{}".format(struct, name))
+    return "s.{}".format(found[0])
+
+
+def has_pointers(structs, struct):
+    for ctype, pointers, name, dimensions in structs[struct]:
+        if pointers:
+            return True
+        if ctype in structs and has_pointers(structs, ctype):
+            return True
+    return False
+
+
+def members(structs, struct):
+    """(kind, field, ctype, count) for each member that needs packing"""
+    fields = structs[struct]
+    result = []
+    for ctype, pointers, name, dimensions in fields:
+        if dimensions and pointers:
+            raise ValueError("Unsupported array of pointers {}.{}".format(struct, name))
+        if ctype == 'char' and pointers == '*':
+            result.append(('string', name, ctype, None))
+        elif ctype == 'char' and pointers == '**':
+            result.append(('strings', name, ctype, count(struct, fields, name)))
+        elif ctype in ARRAY_TYPES and pointers == '*':
+            result.append(('array', name, ctype, count(struct, fields, name)))
+        elif pointers:
+            raise ValueError("Unsupported pointer {}.{}: {}{}".format(struct, name, ctype, pointers))
+        elif ctype in structs and has_pointers(structs, ctype):
+            result.append(('struct', name, ctype, None))
+    return result
+
+
+def generate_struct(structs, struct):
+    out = []
+    fields = members(structs, struct)
+    out.append("cdef int _pack_{0}(_Packer p, {0} * s, Py_ssize_t at) except -1:\n".format(struct))
+    if fields:
+        out.append("    cdef Py_ssize_t offset\n")
+    for kind, name, ctype, n in fields:
+        if kind == 'string':
+            out.append("    offset = p.string(s.{})\n".format(name))
+            out.append("    (<{} *>(p.data + at)).{} = <char *>offset\n".format(struct, name))
+        elif kind == 'strings':
+            out.append("    offset = p.strings(s.{}, {})\n".format(name, n))
+            out.append("    (<{} *>(p.data + at)).{} = <char **>offset\n".format(struct, name))
+        elif kind == 'array':
+            out.append("    offset = p.copy(s.{}, {} * sizeof({}))\n".format(name, n, ctype))
+            out.append("    (<{} *>(p.data + at)).{} = <{} *>offset\n".format(struct, name, ctype))
+        else:
+            out.append("    _pack_{0}(p, &s.{1}, at + (<char *>&s.{1} - <char *>s))\n".format(ctype, name))
+    out.append("    return 0\n\n")
+
+    out.append("cdef void _relocate_{0}(char * base, {0} * s):\n".format(struct))
+    if not fields:
+        out.append("    pass\n")
+    for kind, name, ctype, n in fields:
+        if kind == 'string':
+            out.append("    s.{0} = <char *>_rebase(base, s.{0})\n".format(name))
+        elif kind == 'strings':
+            out.append("    s.{0} = <char **>_rebase(base, s.{0})\n".format(name))
+            out.append("    _rebase_strings(base, s.{}, {})\n".format(name, n))
+        elif kind == 'array':
+            out.append("    s.{0} = <{1} *>_rebase(base, s.{0})\n".format(name, ctype))
+        else:
+            out.append("    _relocate_{0}(base, &s.{1})\n".format(ctype, name))
+    out.append("\n\n")
+    return "".join(out)
+
+
+def generate(structs):
+    logs = [(struct, member) for struct, pointers, member, length in structs['eventLog']]
+    out = [HEADER]
+
+    done = set()
+
+    def visit(struct):
+        for kind, name, ctype, n in members(structs, struct):
+            if kind == 'struct' and ctype not in done:
+                visit(ctype)
+        if struct not in done:
+            done.add(struct)
+            out.append(generate_struct(structs, struct))
+
+    for struct in RECORDS:
+        visit(struct)
+    for struct, member in logs:
+        visit(struct)
+
+    out.append("cdef int _pack_log_member(int member, _Packer p, eventLog * el, Py_ssize_t at) except -1:\n")
+    out.append("    \"\"\"Pack the member of the union at position member in LOG_MEMBERS\"\"\"\n")
+    for i, (struct, member) in enumerate(logs):
+        out.append("    {} member == {}:\n".format("if" if i == 0 else "elif", i))
+        out.append("        return _pack_{}(p, &el.{}, at)\n".format(struct, member))
+    out.append("    return 0\n\n")
+
+    out.append("cdef void _relocate_log_member(int member, char * base, eventLog * el):\n")
+    for i, (struct, member) in enumerate(logs):
+        out.append("    {} member == {}:\n".format("if" if i == 0 else "elif", i))
+        out.append("        _relocate_{}(base, &el.{})\n".format(struct, member))
+    out.append("\n\n")
+
+    out.append("cdef bint _pack_log_object(_Packer p, object rec) except -1:\n")
+    out.append("    \"\"\"Pack a *Log object, returns False if rec is not one\"\"\"\n")
+    out.append("    cdef Py_ssize_t at\n")
+    for i, (struct, member) in enumerate(logs):
+        cls = class_name(struct)
+        out.append("    {} isinstance(rec, {}):\n".format("if" if i == 0 else "elif", cls))
+        out.append("        at = p.image((<{0}>rec)._data, sizeof({1}))\n".format(cls, struct))
+        out.append("        _pack_{1}(p, (<{0}>rec)._data, at)\n".format(cls, struct))
+        out.append("        p.add(_KIND_LOG + {}, 0, at)\n".format(i))
+        out.append("        return True\n")
+    out.append("    return False\n\n")
+
+    out.append("cdef object _unpack_log_object(int member, _Block block, Py_ssize_t i):\n")
+    out.append("    \"\"\"Record i of block, a *Log object for the member of the union at position member\"\"\"\n")
+    for i, (struct, member) in enumerate(logs):
+        out.append("    cdef {} log{}\n".format(class_name(struct), i))
+    for i, (struct, member) in enumerate(logs):
+        out.append("    {} member == {}:\n".format("if" if i == 0 else "elif", i))
+        out.append("        log{} = {}()\n".format(i, class_name(struct)))
+        out.append("        log{0}._data = <{1} *>block.record(i, sizeof({1}))\n".format(i, struct))
+        out.append("        _relocate_{0}(block.data, log{1}._data)\n".format(struct, i))
+        out.append("        log{}._block = block\n".format(i))
+        out.append("        return log{}\n".format(i))
+    out.append("    raise ValueError(\"Unknown packed record kind {}\".format(_KIND_LOG + member))\n")
+    return "".join(out)
+
+
+def main():
+    source = generate(parse(STRUCTS))
+    with open(OUTPUT, "w") as fh:
+        fh.write(source)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
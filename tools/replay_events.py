@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Appends the records of an existing event log to another file at a steady rate, as
+mbatchd would log them, so that programs following the file can be tested under a known
+load.  Records are written in whole lines and flushed as they fall due, and their event
+times can be changed to the time they are written.
+
+With --measure, the target is also followed with EventLogReader(follow=True) in this
+process, and the delay between writing each record and reading it back is reported:
+
+    python tools/gen_events.py --jobs 100000 /tmp/source/lsb.events
+    python tools/replay_events.py --rate 5000 --duration 30 --measure \\
+        /tmp/source/lsb.events /tmp/live/lsb.events
+
+With --switch-every the target is moved to target.1 and a new file started, as when
+mbatchd switches lsb.events.
+"""
+import argparse
+import array
+import os
+import sys
+import threading
+import time
+
+
+def source_lines(path, loop):
+    """The records of the event log at path, from the start again when loop is set"""
+    while True:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield line
+        if not loop:
+            return
+
+
+def retime(line, now):
+    """The record with its event time, the third field, replaced with now"""
+    fields = line.split(" ", 3)
+    if len(fields) < 4:
+        return line
+    fields[2] = str(int(now))
+    return " ".join(fields)
+
+
+def switch(path):
+    """Move path to path.1, path.1 to path.2 and so on"""
+    n = 1
+    while os.path.exists("%s.%d" % (path, n)):
+        n += 1
+    for i in range(n - 1, 0, -1):
+        os.rename("%s.%d" % (path, i), "%s.%d" % (path, i + 1))
+    os.rename(path, path + ".1")
+
+
+class Follower(threading.Thread):
+    """
+    Follower(path, offset, poll_interval)
+
+    Follows the target from offset, and records the time each record is read.
+    """
+    def __init__(self, path, offset, poll_interval):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.path = path
+        self.offset = offset
+        self.poll_interval = poll_interval
+        self.read_times = array.array('d')
+        self.error = None
+
+    def run(self):
+        try:
+            from openlava import lsblib
+            reader = lsblib.EventLogReader(self.path, offset=self.offset, follow=True,
+                                           poll_interval=self.poll_interval)
+            for rec in reader:
+                self.read_times.append(time.time())
+        except Exception as e:
+            self.error = e
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("source", help="Event log to read records from")
+    parser.add_argument("target", help="Event log to append records to")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Records written per second")
+    parser.add_argument("--count", type=int, default=0, help="Stop after this many records")
+    parser.add_argument("--duration", type=float, default=0, help="Stop after this many seconds")
+    parser.add_argument("--loop", action="store_true", help="Start the source again when it runs out")
+    parser.add_argument("--retime", action="store_true", help="Set the event time of each record to the time it is written")
+    parser.add_argument("--truncate", action="store_true", help="Empty the target first instead of appending to it")
+    parser.add_argument("--switch-every", type=int, default=0, help="Switch the target after this many records")
+    parser.add_argument("--measure", action="store_true", help="Follow the target and report how long each record takes to be read")
+    parser.add_argument("--poll-interval", type=float, default=0.01, help="Poll interval of the follower with --measure")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for the follower to catch up with --measure")
+    args = parser.parse_args()
+
+    out = open(args.target, "w" if args.truncate else "a")
+    follower = None
+    if args.measure:
+        follower = Follower(args.target, out.tell(), args.poll_interval)
+        follower.start()
+
+    write_times = array.array('d')
+    lines = source_lines(args.source, args.loop)
+    written = 0
+    in_file = 0
+    start = time.time()
+    finished = False
+    while not finished:
+        now = time.time()
+        elapsed = now - start
+        if args.duration and elapsed >= args.duration:
+            break
+        #every record that has fallen due is written together, then flushed
+        due = int(elapsed * args.rate) + 1
+        if args.count:
+            due = min(due, args.count)
+        batch = 0
+        while written < due:
+            try:
+                line = next(lines)
+            except StopIteration:
+                finished = True
+                break
+            if args.retime:
+                line = retime(line, now)
+            out.write(line)
+            written += 1
+            in_file += 1
+            batch += 1
+            if args.switch_every and in_file >= args.switch_every:
+                out.close()
+                write_times.extend([time.time()] * batch)
+                batch = 0
+                switch(args.target)
+                out = open(args.target, "w")
+                in_file = 0
+        out.flush()
+        write_times.extend([time.time()] * batch)
+        if args.count and written >= args.count:
+            break
+        wait = start + float(written) / args.rate - time.time()
+        if wait > 0:
+            time.sleep(wait)
+    out.close()
+    elapsed = time.time() - start
+    print("Wrote {} records in {:.3f}s, {:.0f} records/s".format(
+        written, elapsed, written / elapsed if elapsed > 0 else 0.0))
+
+    if follower is not None:
+        deadline = time.time() + args.timeout
+        while len(follower.read_times) < written and time.time() < deadline and follower.is_alive():
+            time.sleep(0.01)
+        if follower.error is not None:
+            sys.exit("Follower failed: {}".format(follower.error))
+        read = len(follower.read_times)
+        if read < written:
+            print("Follower read {} of {} records within {}s".format(read, written, args.timeout))
+        if read:
+            delays = sorted(follower.read_times[i] - write_times[i] for i in range(read))
+            print("Read delay ms: p50 {:.2f} p90 {:.2f} p99 {:.2f} max {:.2f}".format(
+                *[1000 * v for v in (percentile(delays, 0.5), percentile(delays, 0.9),
+                                     percentile(delays, 0.99), delays[-1])]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Calls each of the lsblib and lslib functions that copy data or pass lists to openlava
+over and over, and fails if memory keeps growing, using openlava.allocations.soak().  For
+each case it reports the live objects owning native memory, the bytes they own and the
+resident memory of the process after the warmup rounds and after the last round, and
+exits with status 1 if any case leaked.
+
+Like tools/benchmark.py it runs against whatever openlava the bindings were built with,
+and needs no cluster when built against the stub libraries in tools/stub:
+
+    make -C tools/stub
+    LSF_ENVDIR=$PWD/tools/stub/build/etc python setup.py build_ext --inplace
+    OPENLAVA_STUB_JOBS=200 python tools/soak.py --rounds 20
+"""
+import argparse
+import os
+import sys
+
+from openlava import allocations, constants, lsblib, lslib
+
+
+def read_all_jobs():
+    count = lsblib.lsb_openjobinfo(user="all", options=constants.ALL_JOB)
+    try:
+        for i in range(count):
+            job = lsblib.lsb_readjobinfo()
+            job.submit, job.runRusage
+    finally:
+        lsblib.lsb_closejobinfo()
+
+
+def submit_templates():
+    template = lsblib.Submit(environment={"PATH": "/bin:/usr/bin"})
+    template.queue = "normal"
+    template.askedHosts = ["host0001", "host0002"]
+    template.clone(command="true", jobName="soak")
+
+
+def pending_reasons():
+    jobs = lsblib.lsb_jobinfo_many([101, 102, 103])
+    lsblib.pending_reasons(jobs.values())
+
+
+def event_records(path):
+    for rec in lsblib.EventLogReader(path):
+        pass
+
+
+def cases(args):
+    """(name, function) for each case to run"""
+    result = [
+        ("lsb_readjobinfo", read_all_jobs),
+        ("Submit.clone", submit_templates),
+        ("pending_reasons", pending_reasons),
+        ("lsb_hostinfo", lambda: lsblib.lsb_hostinfo(["host0001", "host0002"])),
+        ("lsb_queueinfo", lambda: lsblib.lsb_queueinfo(["normal"])),
+        ("lsb_userinfo", lambda: lsblib.lsb_userinfo(["user01"])),
+        ("ls_gethostinfo", lambda: lslib.ls_gethostinfo(hostList=["host0001"])),
+        ("ls_loadinfo", lambda: lslib.ls_loadinfo(indxnamelist=["r1m", "ut", "mem"])),
+    ]
+    if args.events and os.path.exists(args.events):
+        result.append(("EventLogReader", lambda: event_records(args.events)))
+    if args.only:
+        result = [(name, func) for name, func in result if any(o in name for o in args.only)]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rounds", type=int, default=10, help="Rounds to measure after the warmup")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls in each round")
+    parser.add_argument("--warmup", type=int, default=2, help="Rounds to run before measuring")
+    parser.add_argument("--max-rss-growth", type=int, default=4096, help="KB resident memory may grow by")
+    parser.add_argument("--events", help="Event log to read in the EventLogReader case")
+    parser.add_argument("--only", action="append", help="Only run cases whose name contains this")
+    args = parser.parse_args()
+
+    lsblib.lsb_init("soak")
+    allocations.enable()
+    failed = []
+    print "{:<20} {:>10} {:>12} {:>12}  {}".format("case", "live", "bytes", "rss KB", "")
+    for name, func in cases(args):
+        try:
+            samples = allocations.soak(func, rounds=args.rounds, iterations=args.iterations,
+                                       warmup=args.warmup, max_rss_growth=args.max_rss_growth * 1024)
+            error = None
+        except allocations.LeakError as e:
+            samples = e.samples
+            error = e
+            failed.append(name)
+        base, last = samples[max(args.warmup - 1, 0)], samples[-1]
+        print "{:<20} {:>4} {:>+5} {:>6} {:>+5} {:>6} {:>+5}  {}".format(
+            name, base.live, last.live - base.live, base.bytes, last.bytes - base.bytes,
+            base.rss // 1024, (last.rss - base.rss) // 1024, error or "ok")
+    if failed:
+        sys.exit("Memory grew in: {}".format(", ".join(failed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# Copyright 2013 David Irvine
+#
+# This file is part of openlava-python
+#
+# openlava-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at
+# your option) any later version.
+#
+# openlava-python is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Writes lsf.h and lsbatch.h for the stub openlava libraries, from the declarations in
+openlava/*.pxd.  Structs are laid out exactly as the bindings declare them, so the
+extension modules compile against the stub just as they do against openlava.
+
+Constants take openlava's values where the bindings or the stub depend on them, and
+otherwise distinct values of their own.
+
+usage: gen_headers.py OUTPUT_DIR
+"""
+import os
+import re
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "openlava")
+
+#values from openlava's lsf.h and lsbatch.h
+KNOWN_VALUES = {
+    'ALL_JOB': 0x0001, 'DONE_JOB': 0x0002, 'PEND_JOB': 0x0004, 'SUSP_JOB': 0x0008,
+    'CUR_JOB': 0x0010, 'LAST_JOB': 0x0020, 'RUN_JOB': 0x0040, 'JOBID_ONLY': 0x0080,
+    'HOST_NAME': 0x0100, 'NO_PEND_REASONS': 0x0200, 'JGRP_ARRAY_INFO': 0x1000,
+    'JOBID_ONLY_ALL': 0x2000, 'ZOMBIE_JOB': 0x4000,
+    'JOB_STAT_NULL': 0x00, 'JOB_STAT_PEND': 0x01, 'JOB_STAT_PSUSP': 0x02,
+    'JOB_STAT_RUN': 0x04, 'JOB_STAT_SSUSP': 0x08, 'JOB_STAT_USUSP': 0x10,
+    'JOB_STAT_EXIT': 0x20, 'JOB_STAT_DONE': 0x40, 'JOB_STAT_PDONE': 0x80,
+    'JOB_STAT_PERR': 0x100, 'JOB_STAT_WAIT': 0x200, 'JOB_STAT_UNKWN': 0x10000,
+    'HOST_STAT_OK': 0x0, 'HOST_STAT_BUSY': 0x01, 'HOST_STAT_WIND': 0x02,
+    'HOST_STAT_DISABLED': 0x04, 'HOST_STAT_LOCKED': 0x08, 'HOST_STAT_FULL': 0x10,
+    'HOST_STAT_UNREACH': 0x20, 'HOST_STAT_UNAVAIL': 0x40, 'HOST_STAT_NO_LIM': 0x80,
+    'HOST_STAT_EXCLUSIVE': 0x100, 'HOST_STAT_LOCKED_MASTER': 0x200,
+    'LSF_RLIM_NLIMITS': 11, 'LSF_RLIMIT_RSS': 5, 'DEFAULT_RLIMIT': -1, 'NBUILTINDEX': 11,
+    'NUM_JGRP_COUNTERS': 8, 'MAXMODELS_31': 30, 'MAXTYPES_31': 25,
+    'R15S': 0, 'R1M': 1, 'R15M': 2, 'UT': 3, 'PG': 4, 'IO': 5, 'LS': 6, 'IT': 7, 'TMP': 8,
+    'SWP': 9, 'MEM': 10, 'USR1': 11, 'USR2': 12,
+    'INFINIT_LOAD': '((float) (0x7fffffff))', 'INFINIT_FLOAT': '((float) (0x7fffffff))',
+    'INFINIT_INT': 0x7fffffff, 'INFINIT_LONG_INT': 0x7fffffff,
+    'MAXHOSTNAMELEN': 64, 'MAXLSFNAMELEN': 128, 'MAXFILENAMELEN': 4096, 'MAXLINELEN': 512,
+    'MAXMODELS': 128, 'MAXTYPES': 128, 'MAXSRES': 32, 'MAXRESDESLEN': 256,
+    'LIM_UNAVAIL': 0x00010000, 'LIM_LOCKEDU': 0x00020000, 'LIM_LOCKEDW': 0x00040000,
+    'LIM_BUSY': 0x00080000, 'LIM_RESDOWN': 0x00100000, 'LIM_LOCKEDM': 0x00200000,
+    'LIM_OK_MASK': 0x02bf0000, 'LIM_SBDDOWN': 0x00400000,
+}
+
+#groups of bit flags, numbered 1, 2, 4... in the order they are declared
+FLAG_PREFIXES = ('SUB_', 'SUB2_', 'H_ATTR_', 'QUEUE_STAT_', 'SUSP_', 'EXIT_')
+
+#event types are numbered in the order openlava logs them
+EVENT_TYPES = (
+    'JOB_NEW', 'JOB_START', 'JOB_STATUS', 'JOB_SWITCH', 'JOB_MOVE', 'QUEUE_CTRL', 'HOST_CTRL',
+    'MBD_DIE', 'MBD_UNFULFILL', 'JOB_FINISH', 'LOAD_INDEX', 'CHKPNT', 'MIG', 'PRE_EXEC_START',
+    'MBD_START', 'JOB_MODIFY', 'JOB_SIGNAL', 'JOB_EXECUTE', 'JOB_MSG', 'JOB_MSG_ACK',
+    'JOB_REQUEUE', 'JOB_SIGACT', 'SBD_JOB_STATUS', 'JOB_START_ACCEPT', 'JOB_CLEAN', 'JOB_FORCE',
+    'LOG_SWITCH', 'JOB_MODIFY2', 'JOB_ATTR_SET',
+)
+for number, name in enumerate(EVENT_TYPES):
+    KNOWN_VALUES['EVENT_' + name] = number + 1
+for number in range(len(EVENT_TYPES) + 1, 64):
+    KNOWN_VALUES['EVENT_UNUSED_{}'.format(number)] = number
+
+#defined by the system headers the generated headers include
+SYSTEM_NAMES = set(['SIGKILL', 'SIGSTOP', 'SIGCONT', 'time_t', 'u_short'])
+
+HEADER_START = """/* Generated by tools/stub/gen_headers.py from the openlava .pxd files, do not edit. */
+#ifndef {guard}
+#define {guard}
+
+#include <stdio.h>
+#include <signal.h>
+#include <sys/types.h>
+#include <time.h>
+"""
+
+
+def read(name):
+    with open(os.path.join(ROOT, name)) as f:
+        return f.read()
+
+
+def blocks(text):
+    """Split a pxd into (header, lines) for each cdef extern block"""
+    result = []
+    current = None
+    for line in text.splitlines():
+        line = line.split("#")[0].rstrip()
+        m = re.match(r'cdef extern from "(\w+\.h)":', line)
+        if m:
+            current = (m.group(1), [])
+            result.append(current)
+        elif current is not None and line.strip():
+            if not line.startswith((" ", "\t")):
+                current = None
+            else:
+                current[1].append(line)
+    return result
+
+
+def lsberrno_values():
+    """LSBE_ values are listed in the docstring of lsblib.get_lsberrno()"""
+    values = {}
+    for m in re.finditer(r"^\s+(LSBE_\w+) = (\d+)$", read("lsblib.pyx"), re.M):
+        values[m.group(1)] = int(m.group(2), 10)
+    return values
+
+
+class Header(object):
+    def __init__(self, name):
+        self.name = name
+        self.typedefs = []
+        self.enums = []
+        self.structs = []
+        self.variables = []
+        self.constants = []
+        self.functions = []
+
+
+def parse():
+    headers = {'lsf.h': Header('lsf.h'), 'lsbatch.h': Header('lsbatch.h')}
+    structs = {}
+    enums = set()
+    enum_members = set()
+
+    for header, lines in blocks(read("lstypes.pxd")):
+        for line in lines:
+            line = line.strip()
+            m = re.match(r"ctypedef (.+) (\w+)$", line)
+            if m and m.group(2) not in SYSTEM_NAMES:
+                #openlava declares every type in lsf.h, which lsbatch.h includes
+                headers['lsf.h'].typedefs.append((m.group(1), m.group(2)))
+            m = re.match(r"extern enum (\w+): (.+)$", line)
+            if m:
+                members = [v.strip() for v in m.group(2).split(",")]
+                headers[header].enums.append((m.group(1), members))
+                enums.add(m.group(1))
+                enum_members.update(members)
+
+    for header, lines in blocks(read("lsstructs.pxd")):
+        current = None
+        for line in lines:
+            m = re.match(r"\s+extern (struct|union)\s+(\w+):", line)
+            if m:
+                if m.group(2) in structs:
+                    current = None
+                    continue
+                current = (m.group(1), m.group(2), [])
+                structs[m.group(2)] = current
+                headers[header].structs.append(current)
+                continue
+            m = re.match(r"\s+extern int (\w+)", line)
+            if m:
+                headers[header].variables.append(m.group(1))
+                current = None
+                continue
+            if current is not None:
+                m = re.match(r"\s+(\w+)\s*([\s*]+)(\w+)((?:\[\d+\])*)$", line)
+                if not m:
+                    raise ValueError("Cannot parse field: {}".format(line))
+                current[2].append((m.group(1), m.group(2).replace(" ", ""), m.group(3), m.group(4)))
+
+    lsbe = lsberrno_values()
+    counter = [1000]
+    flags = {}
+    for header, lines in blocks(read("lsconstants.pxd")):
+        for line in lines:
+            m = re.match(r"\s+(int|float) (\w+)$", line)
+            if not m:
+                continue
+            name = m.group(2)
+            if name in enum_members or name in SYSTEM_NAMES:
+                continue
+            if name in KNOWN_VALUES:
+                value = KNOWN_VALUES[name]
+            elif name in lsbe:
+                value = lsbe[name]
+            elif name == 'LSBE_NUM_ERR':
+                value = max(lsbe.values()) + 1
+            elif name.startswith(FLAG_PREFIXES):
+                prefix = max([p for p in FLAG_PREFIXES if name.startswith(p)], key=len)
+                value = 1 << flags.get(prefix, 0)
+                flags[prefix] = flags.get(prefix, 0) + 1
+            else:
+                value = counter[0]
+                counter[0] += 1
+            headers[header].constants.append((name, value))
+
+    for header, lines in blocks(read("lsmethods.pxd")):
+        for line in lines:
+            m = re.match(r"\s+extern (.+?)\s*\((.*)\)\s*nogil$", line)
+            if not m:
+                continue
+            ret, args = m.group(1), m.group(2)
+            ret = re.sub(r"\s+", " ", ret)
+            name = re.search(r"(\w+)$", ret).group(1)
+            ret = ret[:-len(name)].strip()
+            headers[header].functions.append((ret, name, args))
+
+    return headers, structs, enums
+
+
+def c_type(name, structs, enums):
+    if name in structs:
+        return "{} {}".format(structs[name][0], name)
+    if name in enums:
+        return "enum " + name
+    return name
+
+
+def c_args(args, structs, enums):
+    def replace(m):
+        return c_type(m.group(0), structs, enums)
+    return re.sub(r"\b\w+\b", replace, args) if args.strip() else "void"
+
+
+def ordered(header_structs, structs):
+    """Structs in an order in which every struct embedded by value is defined first"""
+    done = set()
+    result = []
+
+    def visit(struct):
+        if struct[1] in done:
+            return
+        done.add(struct[1])
+        for ftype, stars, fname, dims in struct[2]:
+            if not stars and ftype in structs and structs[ftype] in header_structs:
+                visit(structs[ftype])
+        result.append(struct)
+
+    for struct in header_structs:
+        visit(struct)
+    return result
+
+
+def write(headers, structs, enums, out_dir):
+    for name in ('lsf.h', 'lsbatch.h'):
+        h = headers[name]
+        guard = "STUB_" + name.upper().replace(".", "_")
+        lines = [HEADER_START.format(guard=guard)]
+        if name == 'lsbatch.h':
+            lines.append('#include "lsf.h"\n')
+        for ctype, tname in h.typedefs:
+            lines.append("typedef {} {};".format(ctype, tname))
+        for ename, members in h.enums:
+            lines.append("enum {} {{ {} }};".format(ename, ", ".join(members)))
+        lines.append("")
+        for cname, value in h.constants:
+            lines.append("#ifndef {0}\n#define {0} {1}\n#endif".format(cname, value))
+        lines.append("")
+        for kind, sname, fields in ordered(h.structs, structs):
+            lines.append("{} {} {{".format(kind, sname))
+            for ftype, stars, fname, dims in fields:
+                lines.append("    {} {}{}{};".format(c_type(ftype, structs, enums), stars, fname, dims))
+            lines.append("};\n")
+        for variable in h.variables:
+            lines.append("extern int {};".format(variable))
+        for ret, fname, args in h.functions:
+            lines.append("extern {} {}({});".format(c_args(ret, structs, enums), fname,
+                                                    c_args(args, structs, enums)))
+        lines.append("\n#endif")
+        with open(os.path.join(out_dir, name), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    headers, structs, enums = parse()
+    if not os.path.isdir(sys.argv[1]):
+        os.makedirs(sys.argv[1])
+    write(headers, structs, enums, sys.argv[1])
@@ -0,0 +1,56 @@
+/* Copyright 2013 David Irvine
+ *
+ * This file is part of openlava-python
+ *
+ * openlava-python is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or (at
+ * your option) any later version.
+ *
+ * openlava-python is distributed in the hope that it will be useful, but
+ * WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ * General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+/* Shared by the stub liblsf and liblsbatch. */
+#ifndef STUB_H
+#define STUB_H
+
+/* Sizes of the synthetic cluster and the latency of each call, read from the
+ * environment the first time any call is made:
+ *
+ * OPENLAVA_STUB_JOBS          jobs known to the MBD (default 1000)
+ * OPENLAVA_STUB_HOSTS         hosts in the cluster (default 100)
+ * OPENLAVA_STUB_QUEUES        queues (default 4)
+ * OPENLAVA_STUB_USERS         users owning the jobs (default 20)
+ * OPENLAVA_STUB_LATENCY       microseconds taken by each request to a daemon (default 0)
+ * OPENLAVA_STUB_READ_LATENCY  microseconds taken by each lsb_readjobinfo() (default 0)
+ */
+struct stubConfig {
+    int jobs;
+    int hosts;
+    int queues;
+    int users;
+    long latency;
+    long readLatency;
+};
+
+extern struct stubConfig *stub_config(void);
+
+/* Sleep for the configured latency of a request to a daemon */
+extern void stub_request(void);
+extern void stub_sleep(long usec);
+
+extern const char *stub_host_name(int i);
+extern const char *stub_user_name(int i);
+extern const char *stub_queue_name(int i);
+
+#define STUB_NUM_INDICES 11
+
+extern const char *stub_index_names[STUB_NUM_INDICES + 1];
+
+#endif
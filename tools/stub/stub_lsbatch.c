@@ -0,0 +1,991 @@
+/* Copyright 2013 David Irvine
+ *
+ * This file is part of openlava-python
+ *
+ * openlava-python is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or (at
+ * your option) any later version.
+ *
+ * openlava-python is distributed in the hope that it will be useful, but
+ * WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ * General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+/* Stand-in for liblsbatch, answering from a synthetic cluster instead of the MBD.
+ *
+ * Job i (counting from 0) has job id i + FIRST_JOB_ID, and every tenth job is an element of an
+ * array.  Jobs cycle through pending, running and finished, every fiftieth job exits,
+ * and owners, queues and hosts cycle through the names set up by stub_lsf.c.
+ *
+ * Event files are read a line at a time.  The type, version, time and the job id are
+ * taken from each record, the other fields are filled in with synthetic values.
+ */
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+#include "lsbatch.h"
+#include "stub.h"
+
+#define BASE_TIME 1400000000
+#define FIRST_JOB_ID 101
+#define JOB_INDEX(jobId) ((int) (((jobId) >> 32) & 0xFFFFFFFF))
+#define JOB_BASE(jobId) ((int) ((jobId) & 0xFFFFFFFF))
+#define MAX_EX_HOSTS 4
+#define STUB_EVENT_VERSION "3.1"
+
+int lsberrno = 0;
+
+/* Synthetic description of job i */
+static LS_LONG_INT job_id(int i)
+{
+    LS_LONG_INT id = FIRST_JOB_ID + i;
+
+    if (i % 10 == 9)
+        id |= ((LS_LONG_INT) ((i % 7) + 1)) << 32;
+    return id;
+}
+
+static int job_status(int i)
+{
+    if (i % 50 == 49)
+        return JOB_STAT_EXIT;
+    switch (i % 5) {
+    case 0:
+    case 1:
+        return JOB_STAT_PEND;
+    case 2:
+    case 3:
+        return JOB_STAT_RUN;
+    default:
+        return JOB_STAT_DONE;
+    }
+}
+
+static const char *job_user(int i)
+{
+    return stub_user_name(i);
+}
+
+static const char *job_queue(int i)
+{
+    return stub_queue_name(i / 3);
+}
+
+static int job_num_ex_hosts(int i)
+{
+    if (job_status(i) == JOB_STAT_PEND)
+        return 0;
+    return 1 + i % MAX_EX_HOSTS;
+}
+
+static const char *job_ex_host(int i, int n)
+{
+    return stub_host_name(i * 7 + n);
+}
+
+static int job_index(LS_LONG_INT jobId)
+{
+    int i = JOB_BASE(jobId) - FIRST_JOB_ID;
+
+    if (i < 0 || i >= stub_config()->jobs)
+        return -1;
+    if (JOB_INDEX(jobId) && job_id(i) != jobId)
+        return -1;
+    return i;
+}
+
+static int queue_index(const char *name)
+{
+    int i;
+
+    for (i = 0; i < stub_config()->queues; i++) {
+        if (strcmp(stub_queue_name(i), name) == 0)
+            return i;
+    }
+    return -1;
+}
+
+static int host_index(const char *name)
+{
+    int i;
+
+    for (i = 0; i < stub_config()->hosts; i++) {
+        if (strcmp(stub_host_name(i), name) == 0)
+            return i;
+    }
+    return -1;
+}
+
+static int user_index(const char *name)
+{
+    int i;
+
+    for (i = 0; i < stub_config()->users; i++) {
+        if (strcmp(stub_user_name(i), name) == 0)
+            return i;
+    }
+    return -1;
+}
+
+static float *float_array(float value)
+{
+    static float values[STUB_NUM_INDICES];
+    int i;
+
+    for (i = 0; i < STUB_NUM_INDICES; i++)
+        values[i] = value;
+    return values;
+}
+
+/* Job cursor, as opened by lsb_openjobinfo_a() */
+static int *cursor;
+static int cursorSize;
+static int cursorPos;
+static struct jobInfoHead head;
+
+static int job_matches(int i, LS_LONG_INT jobId, char *jobName, char *userName, char *queueName,
+                       char *hostName, int options)
+{
+    int status = job_status(i);
+    int n;
+
+    if (jobId) {
+        if (JOB_INDEX(jobId)) {
+            if (job_id(i) != jobId)
+                return 0;
+        } else if (JOB_BASE(job_id(i)) != JOB_BASE(jobId)) {
+            return 0;
+        }
+    }
+    if (jobName && *jobName) {
+        char name[32];
+        sprintf(name, "job%d", FIRST_JOB_ID + i);
+        if (strcmp(name, jobName) != 0)
+            return 0;
+    }
+    if (userName && *userName && strcmp(userName, "all") != 0
+        && strcmp(userName, job_user(i)) != 0)
+        return 0;
+    if (queueName && *queueName && strcmp(queueName, job_queue(i)) != 0)
+        return 0;
+    if (hostName && *hostName) {
+        for (n = 0; n < job_num_ex_hosts(i); n++) {
+            if (strcmp(hostName, job_ex_host(i, n)) == 0)
+                break;
+        }
+        if (n == job_num_ex_hosts(i))
+            return 0;
+    }
+
+    if (options == 0)
+        options = CUR_JOB;
+    if (options & ALL_JOB)
+        return 1;
+    if ((options & CUR_JOB) && !(status & (JOB_STAT_DONE | JOB_STAT_EXIT)))
+        return 1;
+    if ((options & (DONE_JOB | LAST_JOB)) && (status & (JOB_STAT_DONE | JOB_STAT_EXIT)))
+        return 1;
+    if ((options & PEND_JOB) && (status & JOB_STAT_PEND))
+        return 1;
+    if ((options & RUN_JOB) && (status & JOB_STAT_RUN))
+        return 1;
+    if ((options & SUSP_JOB) && (status & (JOB_STAT_PSUSP | JOB_STAT_SSUSP | JOB_STAT_USUSP)))
+        return 1;
+    return 0;
+}
+
+void lsb_closejobinfo(void)
+{
+    free(cursor);
+    free(head.jobIds);
+    cursor = NULL;
+    head.jobIds = NULL;
+    cursorSize = cursorPos = 0;
+}
+
+struct jobInfoHead *lsb_openjobinfo_a(long jobId, char *jobName, char *userName, char *queueName,
+                                      char *hostName, int options)
+{
+    int jobs = stub_config()->jobs;
+    int i;
+
+    stub_request();
+    lsb_closejobinfo();
+    if (hostName && *hostName && host_index(hostName) < 0) {
+        lsberrno = LSBE_BAD_HOST;
+        return NULL;
+    }
+    if (queueName && *queueName && queue_index(queueName) < 0) {
+        lsberrno = LSBE_BAD_QUEUE;
+        return NULL;
+    }
+
+    cursor = malloc((jobs > 0 ? jobs : 1) * sizeof(int));
+    for (i = 0; i < jobs; i++) {
+        if (job_matches(i, jobId, jobName, userName, queueName, hostName, options))
+            cursor[cursorSize++] = i;
+    }
+    if (cursorSize == 0) {
+        lsb_closejobinfo();
+        lsberrno = LSBE_NO_JOB;
+        return NULL;
+    }
+
+    head.numJobs = cursorSize;
+    head.jobIds = malloc(cursorSize * sizeof(LS_LONG_INT));
+    for (i = 0; i < cursorSize; i++)
+        head.jobIds[i] = job_id(cursor[i]);
+    head.numHosts = 0;
+    head.hostNames = NULL;
+    return &head;
+}
+
+int lsb_openjobinfo(long jobId, char *jobName, char *userName, char *queueName, char *hostName,
+                    int options)
+{
+    struct jobInfoHead *h = lsb_openjobinfo_a(jobId, jobName, userName, queueName, hostName,
+                                              options);
+    return h ? h->numJobs : -1;
+}
+
+struct jobInfoEnt *lsb_readjobinfo(int *more)
+{
+    static struct jobInfoEnt job;
+    static char *exHosts[MAX_EX_HOSTS];
+    static int reasonTb[2];
+    static char jobName[32];
+    static char command[64];
+    static char user[MAXLSFNAMELEN];
+    static char queue[MAXLSFNAMELEN];
+    static char fromHost[MAXHOSTNAMELEN];
+    int i, n;
+
+    if (cursor == NULL || cursorPos >= cursorSize) {
+        lsberrno = LSBE_EOF;
+        return NULL;
+    }
+    stub_sleep(stub_config()->readLatency);
+    i = cursor[cursorPos++];
+
+    memset(&job, 0, sizeof(job));
+    job.jobId = job_id(i);
+    job.status = job_status(i);
+    strcpy(user, job_user(i));
+    strcpy(queue, job_queue(i));
+    strcpy(fromHost, stub_host_name(i * 13));
+    sprintf(jobName, "job%d", FIRST_JOB_ID + i);
+    sprintf(command, "sleep %d", 60 + i % 3600);
+    job.user = user;
+    job.fromHost = fromHost;
+    job.jName = jobName;
+    job.cwd = "/home/stub";
+    job.subHomeDir = "/home/stub";
+    job.execHome = "/home/stub";
+    job.execCwd = "/home/stub";
+    job.execUsername = user;
+    job.parentGroup = "/";
+    job.submitTime = BASE_TIME + i * 10;
+    job.exitStatus = -1;
+    job.cpuFactor = 1.0;
+    job.nIdx = STUB_NUM_INDICES;
+    job.loadSched = float_array(INFINIT_LOAD);
+    job.loadStop = job.loadSched;
+    for (n = 0; n < 8; n++)
+        job.counter[n] = -1;
+    if (job.status == JOB_STAT_PEND) {
+        reasonTb[0] = 1 + i % 3;
+        reasonTb[1] = 4 + i % 5;
+        job.reasonTb = reasonTb;
+        job.numReasons = 2;
+        job.reasons = reasonTb[0];
+    } else {
+        job.startTime = job.submitTime + 60;
+        job.jobPid = 1000 + i;
+        job.numExHosts = job_num_ex_hosts(i);
+        for (n = 0; n < job.numExHosts; n++)
+            exHosts[n] = (char *) job_ex_host(i, n);
+        job.exHosts = exHosts;
+        job.runRusage.mem = 1024 * (1 + i % 64);
+        job.runRusage.utime = i % 3600;
+    }
+    if (job.status & (JOB_STAT_DONE | JOB_STAT_EXIT)) {
+        job.endTime = job.startTime + 3600;
+        job.cpuTime = 3500.0;
+        job.exitStatus = job.status == JOB_STAT_EXIT ? 1 << 8 : 0;
+    }
+
+    job.submit.options = SUB_QUEUE | SUB_JOB_NAME;
+    job.submit.jobName = jobName;
+    job.submit.queue = queue;
+    job.submit.resReq = "";
+    job.submit.hostSpec = "";
+    job.submit.dependCond = "";
+    job.submit.inFile = "";
+    job.submit.outFile = "";
+    job.submit.errFile = "";
+    job.submit.command = command;
+    job.submit.newCommand = "";
+    job.submit.chkpntDir = "";
+    job.submit.preExecCmd = "";
+    job.submit.mailUser = "";
+    job.submit.projectName = "default";
+    job.submit.loginShell = "";
+    job.submit.numProcessors = 1;
+    job.submit.maxNumProcessors = 1;
+    for (n = 0; n < LSF_RLIM_NLIMITS; n++)
+        job.submit.rLimits[n] = DEFAULT_RLIMIT;
+
+    if (more)
+        *more = cursorSize - cursorPos;
+    return &job;
+}
+
+struct hostInfoEnt *lsb_hostinfo(char **hosts, int *numHosts)
+{
+    static struct hostInfoEnt *entries;
+    static float *loads;
+    static int *busy;
+    int *selected;
+    int i, j, n = 0;
+    int count = stub_config()->hosts;
+
+    stub_request();
+    selected = malloc(count * sizeof(int));
+    if (hosts == NULL && numHosts && *numHosts == 1) {
+        /* the local host, which is the master */
+        selected[n++] = 0;
+    } else if (hosts == NULL || numHosts == NULL || *numHosts == 0) {
+        for (i = 0; i < count; i++)
+            selected[n++] = i;
+    } else {
+        for (i = 0; i < *numHosts; i++) {
+            int h = host_index(hosts[i]);
+            if (h < 0) {
+                free(selected);
+                lsberrno = LSBE_BAD_HOST;
+                return NULL;
+            }
+            selected[n++] = h;
+        }
+    }
+
+    free(entries);
+    free(loads);
+    free(busy);
+    entries = calloc(n, sizeof(struct hostInfoEnt));
+    loads = calloc(n * STUB_NUM_INDICES * 4, sizeof(float));
+    busy = calloc(n * STUB_NUM_INDICES * 2, sizeof(int));
+    for (i = 0; i < n; i++) {
+        struct hostInfoEnt *h = &entries[i];
+        float *l = &loads[i * STUB_NUM_INDICES * 4];
+
+        h->host = (char *) stub_host_name(selected[i]);
+        h->hStatus = HOST_STAT_OK;
+        h->busySched = &busy[i * STUB_NUM_INDICES * 2];
+        h->busyStop = h->busySched + STUB_NUM_INDICES;
+        h->cpuFactor = 1.0;
+        h->nIdx = STUB_NUM_INDICES;
+        h->load = l;
+        h->loadSched = l + STUB_NUM_INDICES;
+        h->loadStop = l + STUB_NUM_INDICES * 2;
+        h->realLoad = l + STUB_NUM_INDICES * 3;
+        for (j = 0; j < STUB_NUM_INDICES; j++) {
+            h->load[j] = h->realLoad[j] = (float) ((selected[i] * 7 + j * 3) % 100) / 10.0f;
+            h->loadSched[j] = h->loadStop[j] = INFINIT_LOAD;
+        }
+        h->windows = "-";
+        h->userJobLimit = INFINIT_INT;
+        h->maxJobs = 8;
+        h->numJobs = selected[i] % 9;
+        h->numRUN = h->numJobs;
+        h->mig = INFINIT_INT;
+    }
+    free(selected);
+    if (numHosts)
+        *numHosts = n;
+    return entries;
+}
+
+struct queueInfoEnt *lsb_queueinfo(char **queues, int *numQueues, char *host, char *userName,
+                                   int options)
+{
+    static struct queueInfoEnt *entries;
+    int *selected;
+    int i, j, n = 0;
+    int count = stub_config()->queues;
+
+    stub_request();
+    if (host && *host && host_index(host) < 0) {
+        lsberrno = LSBE_BAD_HOST;
+        return NULL;
+    }
+    selected = malloc(count * sizeof(int));
+    if (queues == NULL || numQueues == NULL || *numQueues == 0) {
+        for (i = 0; i < count; i++)
+            selected[n++] = i;
+    } else {
+        for (i = 0; i < *numQueues; i++) {
+            int q = queue_index(queues[i]);
+            if (q < 0) {
+                free(selected);
+                lsberrno = LSBE_BAD_QUEUE;
+                return NULL;
+            }
+            selected[n++] = q;
+        }
+    }
+
+    free(entries);
+    entries = calloc(n, sizeof(struct queueInfoEnt));
+    for (i = 0; i < n; i++) {
+        struct queueInfoEnt *q = &entries[i];
+
+        q->queue = (char *) stub_queue_name(selected[i]);
+        q->description = "Synthetic queue";
+        q->priority = 30 + selected[i];
+        q->userList = "all";
+        q->hostList = "all";
+        q->nIdx = STUB_NUM_INDICES;
+        q->loadSched = float_array(INFINIT_LOAD);
+        q->loadStop = q->loadSched;
+        q->userJobLimit = INFINIT_INT;
+        q->procJobLimit = INFINIT_FLOAT;
+        q->windows = "";
+        q->hostSpec = "";
+        q->qAttrib = 0;
+        q->qStatus = QUEUE_STAT_OPEN | QUEUE_STAT_ACTIVE;
+        q->maxJobs = INFINIT_INT;
+        q->numJobs = stub_config()->jobs / count;
+        q->numPEND = q->numJobs * 2 / 5;
+        q->numRUN = q->numJobs * 2 / 5;
+        q->mig = INFINIT_INT;
+        q->windowsD = "";
+        q->defaultHostSpec = "";
+        q->procLimit = INFINIT_INT;
+        q->admins = "";
+        q->preCmd = "";
+        q->postCmd = "";
+        q->prepostUsername = "";
+        q->requeueEValues = "";
+        q->hostJobLimit = INFINIT_INT;
+        q->resReq = "";
+        q->resumeCond = "";
+        q->stopCond = "";
+        q->jobStarter = "";
+        q->suspendActCmd = "";
+        q->resumeActCmd = "";
+        q->terminateActCmd = "";
+        q->chkpntDir = "";
+        for (j = 0; j < LSF_RLIM_NLIMITS; j++)
+            q->rLimits[j] = q->defLimits[j] = DEFAULT_RLIMIT;
+    }
+    free(selected);
+    if (numQueues)
+        *numQueues = n;
+    return entries;
+}
+
+struct userInfoEnt *lsb_userinfo(char **users, int *numUsers)
+{
+    static struct userInfoEnt *entries;
+    int *selected;
+    int i, n = 0;
+    int count = stub_config()->users;
+
+    stub_request();
+    selected = malloc(count * sizeof(int));
+    if (users == NULL || numUsers == NULL || *numUsers == 0) {
+        for (i = 0; i < count; i++)
+            selected[n++] = i;
+    } else {
+        for (i = 0; i < *numUsers; i++) {
+            int u = user_index(users[i]);
+            if (u < 0) {
+                free(selected);
+                lsberrno = LSBE_BAD_USER;
+                return NULL;
+            }
+            selected[n++] = u;
+        }
+    }
+
+    free(entries);
+    entries = calloc(n, sizeof(struct userInfoEnt));
+    for (i = 0; i < n; i++) {
+        struct userInfoEnt *u = &entries[i];
+
+        u->user = (char *) stub_user_name(selected[i]);
+        u->procJobLimit = INFINIT_FLOAT;
+        u->maxJobs = INFINIT_INT;
+        u->numJobs = stub_config()->jobs / count;
+        u->numPEND = u->numJobs * 2 / 5;
+        u->numRUN = u->numJobs * 2 / 5;
+        u->numStartJobs = u->numRUN;
+    }
+    free(selected);
+    if (numUsers)
+        *numUsers = n;
+    return entries;
+}
+
+char *lsb_pendreason(int numReasons, int *rsTb, struct jobInfoHead *jInfoH,
+                     struct loadIndexLog *ld)
+{
+    static char *text;
+    size_t size;
+    int i;
+
+    free(text);
+    size = 64 * (numReasons + 1);
+    text = malloc(size);
+    text[0] = '\0';
+    for (i = 0; i < numReasons; i++)
+        sprintf(text + strlen(text), " Synthetic pending reason %d: %d host(s);\n",
+                rsTb[i] & 0xFFFF, (rsTb[i] >> 16) + 1);
+    return text;
+}
+
+char *lsb_suspreason(int reasons, int subreasons, struct loadIndexLog *ld)
+{
+    static char text[128];
+
+    sprintf(text, " Synthetic suspending reason %d;\n", reasons);
+    return text;
+}
+
+int lsb_init(char *appName)
+{
+    stub_config();
+    return 0;
+}
+
+/* Like the MBD, log new jobs to lsb.events, which is found from LSF_ENVDIR as in a real
+ * installation.  Nothing is logged when there is no log directory.
+ */
+static void log_job_new(LS_LONG_INT jobId, const char *queue, struct submit *subPtr)
+{
+    const char *envdir = getenv("LSF_ENVDIR");
+    char path[MAXFILENAMELEN];
+    time_t now = time(NULL);
+    FILE *f;
+    int i;
+
+    if (envdir == NULL)
+        return;
+    snprintf(path, sizeof(path), "%s/../work/logdir/lsb.events", envdir);
+    f = fopen(path, "a");
+    if (f == NULL)
+        return;
+    fprintf(f, "\"JOB_NEW\" \"%s\" %ld %d %d %d %d %ld %ld %ld %d %d %d \"%s\"",
+            STUB_EVENT_VERSION, (long) now, JOB_BASE(jobId), 0, subPtr->options,
+            subPtr->numProcessors, (long) now, (long) subPtr->beginTime,
+            (long) subPtr->termTime, 0, 0, 0, stub_user_name(0));
+    for (i = 0; i < LSF_RLIM_NLIMITS; i++)
+        fprintf(f, " %d", subPtr->rLimits[i]);
+    fprintf(f, " \"\" 1.00 18 \"%s\" \"\" \"%s\" \"/home/stub\" \"\" \"\" \"\" \"\" \"\" \"\" \"\""
+            " \"/home/stub\" \"\" 0 \"\" \"\" \"%s\" \"%s\" 0 \"\" \"default\" 0 %d \"\" \"\" 0\n",
+            queue, stub_host_name(0), subPtr->jobName ? subPtr->jobName : "",
+            subPtr->command, subPtr->maxNumProcessors);
+    fclose(f);
+}
+
+LS_LONG_INT lsb_submit(struct submit *subPtr, struct submitReply *repPtr)
+{
+    LS_LONG_INT jobId;
+    static int submitted = 0;
+    const char *queue = stub_queue_name(0);
+
+    stub_request();
+    if (subPtr == NULL || subPtr->command == NULL) {
+        lsberrno = LSBE_BAD_ARG;
+        return -1;
+    }
+    if (subPtr->options & SUB_QUEUE) {
+        int q = queue_index(subPtr->queue);
+        if (q < 0) {
+            lsberrno = LSBE_BAD_QUEUE;
+            if (repPtr) {
+                repPtr->queue = subPtr->queue;
+                repPtr->badJobId = 0;
+                repPtr->badJobName = NULL;
+                repPtr->badReqIndx = 0;
+            }
+            return -1;
+        }
+        queue = stub_queue_name(q);
+    }
+    if (repPtr) {
+        repPtr->queue = (char *) queue;
+        repPtr->badJobId = 0;
+        repPtr->badJobName = NULL;
+        repPtr->badReqIndx = 0;
+    }
+    submitted++;
+    jobId = FIRST_JOB_ID + stub_config()->jobs + submitted;
+    log_job_new(jobId, queue, subPtr);
+    return jobId;
+}
+
+LS_LONG_INT lsb_modify(struct submit *subPtr, struct submitReply *repPtr, LS_LONG_INT jobId)
+{
+    stub_request();
+    if (job_index(jobId) < 0) {
+        lsberrno = LSBE_NO_JOB;
+        return -1;
+    }
+    if (subPtr && (subPtr->options & SUB_QUEUE) && queue_index(subPtr->queue) < 0) {
+        lsberrno = LSBE_BAD_QUEUE;
+        return -1;
+    }
+    return jobId;
+}
+
+static int job_request(LS_LONG_INT jobId)
+{
+    stub_request();
+    if (job_index(jobId) < 0) {
+        lsberrno = LSBE_NO_JOB;
+        return -1;
+    }
+    return 0;
+}
+
+int lsb_signaljob(LS_LONG_INT jobId, int sigValue)
+{
+    return job_request(jobId);
+}
+
+int lsb_deletejob(LS_LONG_INT jobId, int times, int options)
+{
+    return job_request(jobId);
+}
+
+int lsb_requeuejob(struct jobrequeue *reqPtr)
+{
+    if (reqPtr == NULL) {
+        lsberrno = LSBE_BAD_ARG;
+        return -1;
+    }
+    return job_request(reqPtr->jobId);
+}
+
+int lsb_hostcontrol(char *host, int opCode)
+{
+    stub_request();
+    if (host == NULL || host_index(host) < 0) {
+        lsberrno = LSBE_BAD_HOST;
+        return -1;
+    }
+    return 0;
+}
+
+int lsb_queuecontrol(char *queue, int opCode)
+{
+    stub_request();
+    if (queue == NULL || queue_index(queue) < 0) {
+        lsberrno = LSBE_BAD_QUEUE;
+        return -1;
+    }
+    return 0;
+}
+
+int lsb_reconfig(int configFlag)
+{
+    stub_request();
+    return 0;
+}
+
+char *lsb_peekjob(unsigned long jobId)
+{
+    static char path[64];
+
+    if (job_request(jobId) < 0)
+        return NULL;
+    sprintf(path, "/tmp/stub.%lu.out", jobId);
+    return path;
+}
+
+/* Event log records */
+static const char *event_names[] = {
+    NULL, "JOB_NEW", "JOB_START", "JOB_STATUS", "JOB_SWITCH", "JOB_MOVE", "QUEUE_CTRL",
+    "HOST_CTRL", "MBD_DIE", "UNFULFILL", "JOB_FINISH", "LOAD_INDEX", "CHKPNT", "MIG",
+    "PRE_EXEC_START", "MBD_START", "JOB_MODIFY", "JOB_SIGNAL", "JOB_EXECUTE", "JOB_MSG",
+    "JOB_MSG_ACK", "JOB_REQUEUE", "JOB_SIGACT", "SBD_JOB_STATUS", "JOB_START_ACCEPT",
+    "JOB_CLEAN", "JOB_FORCE", "LOG_SWITCH", "JOB_MODIFY2", "JOB_ATTR_SET", NULL
+};
+
+/* Reads the next space separated field, which may be quoted, into value */
+static char *next_field(char *p, char *value, size_t size)
+{
+    size_t n = 0;
+
+    while (*p == ' ')
+        p++;
+    if (*p == '"') {
+        p++;
+        while (*p && *p != '"') {
+            if (n + 1 < size)
+                value[n++] = *p;
+            p++;
+        }
+        if (*p == '"')
+            p++;
+    } else {
+        while (*p && *p != ' ' && *p != '\n') {
+            if (n + 1 < size)
+                value[n++] = *p;
+            p++;
+        }
+    }
+    value[n] = '\0';
+    return p;
+}
+
+/* Fills every field of the event, with the job id given where the record has one */
+static void fill_event(struct eventRec *er, int jobId)
+{
+    static char *hosts[MAX_EX_HOSTS];
+    union eventLog *el = &er->eventLog;
+    /* the same owner, queue and hosts as the synthetic job with this id */
+    int job = jobId >= FIRST_JOB_ID ? jobId - FIRST_JOB_ID : jobId < 0 ? 0 : jobId;
+    const char *user = job_user(job);
+    const char *queue = job_queue(job);
+    const char *host = stub_host_name(job * 13);
+    int numHosts = 1 + job % MAX_EX_HOSTS;
+    int i;
+
+    for (i = 0; i < numHosts; i++)
+        hosts[i] = (char *) job_ex_host(job, i);
+    memset(el, 0, sizeof(*el));
+
+    switch (er->type) {
+    case EVENT_JOB_NEW: {
+        struct jobNewLog *l = &el->jobNewLog;
+        l->jobId = jobId;
+        strcpy(l->userName, user);
+        l->options = SUB_QUEUE;
+        l->numProcessors = l->maxNumProcessors = 1;
+        l->submitTime = er->eventTime;
+        strcpy(l->queue, queue);
+        strcpy(l->fromHost, host);
+        strcpy(l->cwd, "/home/stub");
+        strcpy(l->outFile, "/dev/null");
+        sprintf(l->jobName, "job%d", jobId);
+        sprintf(l->command, "sleep %d", 60 + jobId % 3600);
+        for (i = 0; i < LSF_RLIM_NLIMITS; i++)
+            l->rLimits[i] = DEFAULT_RLIMIT;
+        l->hostFactor = 1.0;
+        l->resReq = l->dependCond = l->preExecCmd = l->mailUser = "";
+        l->projectName = "default";
+        l->schedHostType = l->loginShell = "";
+        break;
+    }
+    case EVENT_JOB_START:
+    case EVENT_PRE_EXEC_START: {
+        struct jobStartLog *l = &el->jobStartLog;
+        l->jobId = jobId;
+        l->jStatus = JOB_STAT_RUN;
+        l->jobPid = l->jobPGid = 1000 + jobId;
+        l->hostFactor = 1.0;
+        l->numExHosts = numHosts;
+        l->execHosts = hosts;
+        l->queuePreCmd = l->queuePostCmd = "";
+        break;
+    }
+    case EVENT_JOB_STATUS:
+        el->jobStatusLog.jobId = jobId;
+        el->jobStatusLog.jStatus = jobId % 50 == 0 ? JOB_STAT_EXIT : JOB_STAT_DONE;
+        el->jobStatusLog.cpuTime = 3500.0;
+        el->jobStatusLog.endTime = er->eventTime;
+        break;
+    case EVENT_JOB_FINISH: {
+        struct jobFinishLog *l = &el->jobFinishLog;
+        l->jobId = jobId;
+        strcpy(l->userName, user);
+        l->options = SUB_QUEUE;
+        l->numProcessors = l->maxNumProcessors = 1;
+        l->jStatus = jobId % 50 == 0 ? JOB_STAT_EXIT : JOB_STAT_DONE;
+        l->endTime = er->eventTime;
+        l->startTime = l->endTime - 3600;
+        l->submitTime = l->startTime - 60;
+        strcpy(l->queue, queue);
+        strcpy(l->fromHost, host);
+        strcpy(l->cwd, "/home/stub");
+        strcpy(l->outFile, "/dev/null");
+        l->hostFactor = 1.0;
+        l->numExHosts = numHosts;
+        l->execHosts = hosts;
+        l->cpuTime = 3500.0;
+        sprintf(l->jobName, "job%d", jobId);
+        sprintf(l->command, "sleep %d", 60 + jobId % 3600);
+        l->lsfRusage.ru_utime = 3400.0;
+        l->lsfRusage.ru_stime = 100.0;
+        l->lsfRusage.ru_maxrss = 1024 * (1 + jobId % 64);
+        l->resReq = l->dependCond = l->preExecCmd = l->mailUser = "";
+        l->projectName = "default";
+        l->loginShell = "";
+        l->exitStatus = l->jStatus == JOB_STAT_EXIT ? 1 << 8 : 0;
+        break;
+    }
+    case EVENT_LOAD_INDEX:
+        el->loadIndexLog.nIdx = STUB_NUM_INDICES;
+        el->loadIndexLog.name = (char **) stub_index_names;
+        break;
+    case EVENT_MIG:
+        el->migLog.jobId = jobId;
+        strcpy(el->migLog.userName, user);
+        break;
+    case EVENT_JOB_SIGNAL:
+        el->signalLog.jobId = jobId;
+        el->signalLog.signalSymbol = "KILL";
+        strcpy(el->signalLog.userName, user);
+        break;
+    case EVENT_JOB_EXECUTE:
+        el->jobExecuteLog.jobId = jobId;
+        el->jobExecuteLog.execHome = el->jobExecuteLog.execCwd = "/home/stub";
+        el->jobExecuteLog.execUsername = (char *) user;
+        el->jobExecuteLog.jobPid = el->jobExecuteLog.jobPGid = 1000 + jobId;
+        break;
+    case EVENT_JOB_MSG:
+    case EVENT_JOB_MSG_ACK:
+        el->jobMsgLog.jobId = jobId;
+        el->jobMsgLog.src = el->jobMsgLog.dest = (char *) host;
+        el->jobMsgLog.msg = "";
+        break;
+    case EVENT_JOB_SIGACT:
+        el->sigactLog.jobId = jobId;
+        el->sigactLog.signalSymbol = "SIG_CHKPNT";
+        break;
+    case EVENT_JOB_FORCE:
+        el->jobForceRequestLog.jobId = jobId;
+        el->jobForceRequestLog.numExecHosts = numHosts;
+        el->jobForceRequestLog.execHosts = hosts;
+        strcpy(el->jobForceRequestLog.userName, user);
+        break;
+    case EVENT_JOB_MODIFY:
+    case EVENT_JOB_MODIFY2: {
+        static char jobIdStr[32];
+        struct jobModLog *l = &el->jobModLog;
+        sprintf(jobIdStr, "%d", jobId);
+        l->jobIdStr = jobIdStr;
+        l->userName = (char *) user;
+        l->jobName = l->queue = l->resReq = l->hostSpec = l->dependCond = "";
+        l->subHomeDir = l->inFile = l->outFile = l->errFile = l->command = "";
+        l->inFileSpool = l->commandSpool = l->chkpntDir = l->jobFile = "";
+        l->fromHost = l->cwd = l->preExecCmd = l->mailUser = l->projectName = "";
+        l->loginShell = l->schedHostType = "";
+        for (i = 0; i < LSF_RLIM_NLIMITS; i++)
+            l->rLimits[i] = DEFAULT_RLIMIT;
+        break;
+    }
+    case EVENT_JOB_ATTR_SET:
+        el->jobAttrSetLog.jobId = jobId;
+        el->jobAttrSetLog.hostname = (char *) host;
+        break;
+    case EVENT_JOB_SWITCH:
+        el->jobSwitchLog.jobId = jobId;
+        strcpy(el->jobSwitchLog.queue, queue);
+        strcpy(el->jobSwitchLog.userName, user);
+        break;
+    case EVENT_JOB_MOVE:
+        el->jobMoveLog.jobId = jobId;
+        strcpy(el->jobMoveLog.userName, user);
+        break;
+    case EVENT_QUEUE_CTRL:
+        strcpy(el->queueCtrlLog.queue, stub_queue_name(0));
+        strcpy(el->queueCtrlLog.userName, "openlava");
+        break;
+    case EVENT_HOST_CTRL:
+        strcpy(el->hostCtrlLog.host, stub_host_name(0));
+        strcpy(el->hostCtrlLog.userName, "openlava");
+        break;
+    case EVENT_MBD_START:
+        strcpy(el->mbdStartLog.master, stub_host_name(0));
+        strcpy(el->mbdStartLog.cluster, "stub");
+        el->mbdStartLog.numHosts = stub_config()->hosts;
+        el->mbdStartLog.numQueues = stub_config()->queues;
+        break;
+    case EVENT_MBD_DIE:
+        strcpy(el->mbdDieLog.master, stub_host_name(0));
+        break;
+    case EVENT_LOG_SWITCH:
+        el->logSwitchLog.lastJobId = jobId;
+        break;
+    default:
+        /* the remaining job events start with the job id */
+        *(int *) el = jobId;
+        break;
+    }
+}
+
+struct eventRec *lsb_geteventrec(FILE *log_fp, int *lineNum)
+{
+    static struct eventRec er;
+    static char *line;
+    static size_t size;
+    char field[MAXLINELEN];
+    char *p;
+    int type;
+
+    lsberrno = LSBE_NO_ERROR;
+    if (log_fp == NULL) {
+        lsberrno = LSBE_BAD_ARG;
+        return NULL;
+    }
+    if (getline(&line, &size, log_fp) < 0) {
+        lsberrno = LSBE_EOF;
+        return NULL;
+    }
+    if (lineNum)
+        (*lineNum)++;
+
+    p = next_field(line, field, sizeof(field));
+    for (type = 1; event_names[type]; type++) {
+        if (strcmp(field, event_names[type]) == 0)
+            break;
+    }
+    if (event_names[type] == NULL) {
+        lsberrno = LSBE_EVENT_FORMAT;
+        return NULL;
+    }
+    er.type = type;
+    p = next_field(p, field, sizeof(field));
+    strncpy(er.version, field, sizeof(er.version) - 1);
+    er.version[sizeof(er.version) - 1] = '\0';
+    p = next_field(p, field, sizeof(field));
+    er.eventTime = atol(field);
+
+    /* user ids come before the job id in a few records */
+    if (type == EVENT_JOB_SWITCH || type == EVENT_JOB_MOVE || type == EVENT_JOB_SIGNAL
+        || type == EVENT_JOB_MSG || type == EVENT_JOB_MSG_ACK)
+        p = next_field(p, field, sizeof(field));
+    next_field(p, field, sizeof(field));
+    fill_event(&er, atoi(field));
+    return &er;
+}
+
+char *lsb_sysmsg(void)
+{
+    static char message[64];
+
+    if (lsberrno == LSBE_NO_ERROR)
+        return "No error";
+    sprintf(message, "Stub liblsbatch error %d", lsberrno);
+    return message;
+}
+
+void lsb_perror(char *usrMsg)
+{
+    if (usrMsg)
+        fprintf(stderr, "%s: %s\n", usrMsg, lsb_sysmsg());
+    else
+        fprintf(stderr, "%s\n", lsb_sysmsg());
+}
@@ -0,0 +1,409 @@
+/* Copyright 2013 David Irvine
+ *
+ * This file is part of openlava-python
+ *
+ * openlava-python is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or (at
+ * your option) any later version.
+ *
+ * openlava-python is distributed in the hope that it will be useful, but
+ * WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ * General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with openlava-python.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+/* Stand-in for liblsf, answering from a synthetic cluster instead of the LIM.
+ * Like the real library, results are returned in static buffers that are
+ * reused by the next call.
+ */
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+#include "lsf.h"
+#include "stub.h"
+
+int lserrno = 0;
+
+const char *stub_index_names[STUB_NUM_INDICES + 1] = {
+    "r15s", "r1m", "r15m", "ut", "pg", "io", "ls", "it", "tmp", "swp", "mem", NULL
+};
+
+static struct stubConfig config;
+static int configured = 0;
+static char (*hostNames)[MAXHOSTNAMELEN];
+static char (*userNames)[MAXLSFNAMELEN];
+static char (*queueNames)[MAXLSFNAMELEN];
+
+static int env_int(const char *name, int def)
+{
+    const char *value = getenv(name);
+    return value && *value ? atoi(value) : def;
+}
+
+struct stubConfig *stub_config(void)
+{
+    int i;
+
+    if (configured)
+        return &config;
+    config.jobs = env_int("OPENLAVA_STUB_JOBS", 1000);
+    config.hosts = env_int("OPENLAVA_STUB_HOSTS", 100);
+    config.queues = env_int("OPENLAVA_STUB_QUEUES", 4);
+    config.users = env_int("OPENLAVA_STUB_USERS", 20);
+    config.latency = env_int("OPENLAVA_STUB_LATENCY", 0);
+    config.readLatency = env_int("OPENLAVA_STUB_READ_LATENCY", 0);
+    if (config.hosts < 1)
+        config.hosts = 1;
+    if (config.queues < 1)
+        config.queues = 1;
+    if (config.users < 1)
+        config.users = 1;
+
+    hostNames = calloc(config.hosts, sizeof(*hostNames));
+    userNames = calloc(config.users, sizeof(*userNames));
+    queueNames = calloc(config.queues, sizeof(*queueNames));
+    for (i = 0; i < config.hosts; i++)
+        sprintf(hostNames[i], "host%04d", i);
+    for (i = 0; i < config.users; i++)
+        sprintf(userNames[i], "user%02d", i);
+    for (i = 0; i < config.queues; i++) {
+        if (i == 0)
+            strcpy(queueNames[i], "normal");
+        else
+            sprintf(queueNames[i], "queue%d", i);
+    }
+    configured = 1;
+    return &config;
+}
+
+void stub_sleep(long usec)
+{
+    struct timespec ts;
+
+    if (usec <= 0)
+        return;
+    ts.tv_sec = usec / 1000000;
+    ts.tv_nsec = (usec % 1000000) * 1000;
+    nanosleep(&ts, NULL);
+}
+
+void stub_request(void)
+{
+    stub_sleep(stub_config()->latency);
+}
+
+const char *stub_host_name(int i)
+{
+    return hostNames[i % stub_config()->hosts];
+}
+
+const char *stub_user_name(int i)
+{
+    return userNames[i % stub_config()->users];
+}
+
+const char *stub_queue_name(int i)
+{
+    return queueNames[i % stub_config()->queues];
+}
+
+static int host_index(const char *name)
+{
+    int i;
+
+    for (i = 0; i < stub_config()->hosts; i++) {
+        if (strcmp(hostNames[i], name) == 0)
+            return i;
+    }
+    return -1;
+}
+
+static char *host_types[] = {"linux", NULL};
+static char *host_models[] = {"x86_64", NULL};
+static char *resources[] = {"cs", "fs", NULL};
+static char *admins[] = {"openlava", NULL};
+static int admin_ids[] = {0};
+
+struct clusterInfo *ls_clusterinfo(char *resreq, int *numclusters, char **clusterlist,
+                                   int listsize, int options)
+{
+    static struct clusterInfo cluster;
+
+    stub_request();
+    memset(&cluster, 0, sizeof(cluster));
+    strcpy(cluster.clusterName, "stub");
+    strcpy(cluster.masterName, stub_host_name(0));
+    strcpy(cluster.managerName, "openlava");
+    cluster.numServers = stub_config()->hosts;
+    cluster.nRes = 2;
+    cluster.resources = resources;
+    cluster.nTypes = 1;
+    cluster.hostTypes = host_types;
+    cluster.nModels = 1;
+    cluster.hostModels = host_models;
+    cluster.nAdmins = 1;
+    cluster.adminIds = admin_ids;
+    cluster.admins = admins;
+    if (numclusters)
+        *numclusters = 1;
+    return &cluster;
+}
+
+char *ls_getclustername(void)
+{
+    stub_request();
+    return "stub";
+}
+
+char *ls_getmastername(void)
+{
+    stub_request();
+    return (char *) stub_host_name(0);
+}
+
+float *ls_gethostfactor(char *hostname)
+{
+    static float factor = 1.0;
+
+    stub_request();
+    if (hostname && host_index(hostname) < 0) {
+        lserrno = LSE_BAD_HOST;
+        return NULL;
+    }
+    return &factor;
+}
+
+char *ls_gethostmodel(char *hostname)
+{
+    stub_request();
+    if (hostname && host_index(hostname) < 0) {
+        lserrno = LSE_BAD_HOST;
+        return NULL;
+    }
+    return host_models[0];
+}
+
+char *ls_gethosttype(char *hostname)
+{
+    stub_request();
+    if (hostname && host_index(hostname) < 0) {
+        lserrno = LSE_BAD_HOST;
+        return NULL;
+    }
+    return host_types[0];
+}
+
+struct lsInfo *ls_info(void)
+{
+    static struct lsInfo info;
+    static struct resItem table[STUB_NUM_INDICES];
+    int i;
+
+    if (info.nRes == 0) {
+        for (i = 0; i < STUB_NUM_INDICES; i++) {
+            strcpy(table[i].name, stub_index_names[i]);
+            sprintf(table[i].des, "Load index %s", stub_index_names[i]);
+            table[i].valueType = LS_NUMERIC;
+            table[i].orderType = INCR;
+            table[i].interval = 15;
+        }
+        info.nRes = STUB_NUM_INDICES;
+        info.resTable = table;
+        info.nTypes = 1;
+        strcpy(info.hostTypes[0], host_types[0]);
+        info.nModels = 1;
+        strcpy(info.hostModels[0], host_models[0]);
+        strcpy(info.hostArchs[0], host_models[0]);
+        info.cpuFactor[0] = 1.0;
+        info.numIndx = STUB_NUM_INDICES;
+    }
+    return &info;
+}
+
+/* Hosts selected by an optional host list, as indices into the cluster */
+static int select_hosts(char **hostlist, int listsize, int *selected)
+{
+    int i, n = 0;
+
+    if (hostlist == NULL || listsize <= 0) {
+        for (i = 0; i < stub_config()->hosts; i++)
+            selected[n++] = i;
+        return n;
+    }
+    for (i = 0; i < listsize; i++) {
+        int h = host_index(hostlist[i]);
+        if (h >= 0)
+            selected[n++] = h;
+    }
+    return n;
+}
+
+struct hostInfo *ls_gethostinfo(char *resreq, int *numhosts, char **hostlist, int listsize,
+                                int options)
+{
+    static struct hostInfo *hosts;
+    static float busy[STUB_NUM_INDICES];
+    int *selected;
+    int i, n;
+
+    stub_request();
+    selected = malloc(stub_config()->hosts * sizeof(int));
+    n = select_hosts(hostlist, listsize, selected);
+    if (n == 0) {
+        free(selected);
+        lserrno = LSE_BAD_HOST;
+        return NULL;
+    }
+    for (i = 0; i < STUB_NUM_INDICES; i++)
+        busy[i] = INFINIT_LOAD;
+    free(hosts);
+    hosts = calloc(n, sizeof(struct hostInfo));
+    for (i = 0; i < n; i++) {
+        struct hostInfo *h = &hosts[i];
+        strcpy(h->hostName, stub_host_name(selected[i]));
+        h->hostType = host_types[0];
+        h->hostModel = host_models[0];
+        h->cpuFactor = 1.0;
+        h->maxCpus = 8;
+        h->maxMem = 16384;
+        h->maxSwap = 4096;
+        h->maxTmp = 10240;
+        h->nRes = 2;
+        h->resources = resources;
+        h->windows = "-";
+        h->numIndx = STUB_NUM_INDICES;
+        h->busyThreshold = busy;
+        h->isServer = 1;
+    }
+    free(selected);
+    if (numhosts)
+        *numhosts = n;
+    return hosts;
+}
+
+/* Fills the given load indices for the selected hosts, with values that vary a little
+ * between calls
+ */
+static struct hostLoad *make_loads(int *selected, int n, int *indices, int nIdx)
+{
+    static struct hostLoad *loads;
+    static float *values;
+    static int *status;
+    static unsigned int tick;
+    int i, j;
+
+    free(loads);
+    free(values);
+    free(status);
+    loads = calloc(n, sizeof(struct hostLoad));
+    values = calloc(n * nIdx + 1, sizeof(float));
+    status = calloc(n * 2, sizeof(int));
+    tick++;
+    for (i = 0; i < n; i++) {
+        strcpy(loads[i].hostName, stub_host_name(selected[i]));
+        loads[i].li = &values[i * nIdx];
+        loads[i].status = &status[i * 2];
+        for (j = 0; j < nIdx; j++)
+            loads[i].li[j] = (float) ((selected[i] * 7 + indices[j] * 3 + tick) % 100) / 10.0f;
+    }
+    return loads;
+}
+
+static int all_indices[STUB_NUM_INDICES] = {0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10};
+
+struct hostLoad *ls_load(char *resreq, int *numhosts, int options, char *fromhost)
+{
+    int *selected;
+    struct hostLoad *loads;
+    int n;
+
+    stub_request();
+    selected = malloc(stub_config()->hosts * sizeof(int));
+    n = select_hosts(NULL, 0, selected);
+    if (numhosts && *numhosts > 0 && *numhosts < n)
+        n = *numhosts;
+    else if (numhosts == NULL)
+        n = 1;
+    loads = make_loads(selected, n, all_indices, STUB_NUM_INDICES);
+    free(selected);
+    if (numhosts)
+        *numhosts = n;
+    return loads;
+}
+
+struct hostLoad *ls_loadinfo(char *resreq, int *numhosts, int options, char *fromhost,
+                             char **hostlist, int listsize, char ***indxnamelist)
+{
+    static char *names[STUB_NUM_INDICES + 1];
+    int indices[STUB_NUM_INDICES];
+    int *selected;
+    struct hostLoad *loads;
+    int i, j, n, nIdx = 0;
+
+    stub_request();
+    /* like liblsf, only the indices asked for are returned, in the order asked for */
+    if (indxnamelist && *indxnamelist) {
+        for (i = 0; (*indxnamelist)[i] && nIdx < STUB_NUM_INDICES; i++) {
+            for (j = 0; j < STUB_NUM_INDICES; j++) {
+                if (strcmp((*indxnamelist)[i], stub_index_names[j]) == 0)
+                    break;
+            }
+            if (j == STUB_NUM_INDICES) {
+                lserrno = LSE_BAD_NAMELIST;
+                return NULL;
+            }
+            indices[nIdx++] = j;
+        }
+    } else {
+        for (nIdx = 0; nIdx < STUB_NUM_INDICES; nIdx++)
+            indices[nIdx] = nIdx;
+    }
+
+    selected = malloc(stub_config()->hosts * sizeof(int));
+    n = select_hosts(hostlist, listsize, selected);
+    if (numhosts && *numhosts > 0 && *numhosts < n)
+        n = *numhosts;
+    else if (numhosts == NULL)
+        n = 1;
+    if (n == 0) {
+        free(selected);
+        lserrno = LSE_BAD_HOST;
+        return NULL;
+    }
+    loads = make_loads(selected, n, indices, nIdx);
+    free(selected);
+    if (numhosts)
+        *numhosts = n;
+    /* and the caller's list is replaced with the library's own */
+    if (indxnamelist) {
+        for (i = 0; i < nIdx; i++)
+            names[i] = (char *) stub_index_names[indices[i]];
+        names[nIdx] = NULL;
+        *indxnamelist = names;
+    }
+    return loads;
+}
+
+char *ls_sysmsg(void)
+{
+    static char message[64];
+
+    if (lserrno == 0)
+        return "No error";
+    sprintf(message, "Stub liblsf error %d", lserrno);
+    return message;
+}
+
+void ls_perror(char *usrMsg)
+{
+    if (usrMsg)
+        fprintf(stderr, "%s: %s\n", usrMsg, ls_sysmsg());
+    else
+        fprintf(stderr, "%s\n", ls_sysmsg());
+}